@@ -0,0 +1,40 @@
+"""add task list indexes
+
+Revision ID: 74988db8c69a
+Revises: 4713e7ebca9
+Create Date: 2026-10-19 09:12:44.102336
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '74988db8c69a'
+down_revision = '4713e7ebca9'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from drydock_provisioner.statemgmt.db import tables
+
+
+def upgrade():
+    # Keyset pagination of the task list, newest first
+    op.create_index('ix_tasks_created_task_id', tables.Tasks.__tablename__,
+                    ['created', 'task_id'])
+    # Task list limited to top-level tasks
+    op.create_index('ix_tasks_parent_only_created_task_id',
+                    tables.Tasks.__tablename__, ['created', 'task_id'],
+                    postgresql_where=sa.text('parent_task_id IS NULL'))
+    # Task list filtered by design reference
+    op.create_index('ix_tasks_design_ref_created', tables.Tasks.__tablename__,
+                    ['design_ref', 'created'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_design_ref_created',
+                  table_name=tables.Tasks.__tablename__)
+    op.drop_index('ix_tasks_parent_only_created_task_id',
+                  table_name=tables.Tasks.__tablename__)
+    op.drop_index('ix_tasks_created_task_id',
+                  table_name=tables.Tasks.__tablename__)
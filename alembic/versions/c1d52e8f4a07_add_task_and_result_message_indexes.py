@@ -0,0 +1,116 @@
+"""add task and result message indexes
+
+Optionally converts result_message to a table partitioned by month on ts,
+enabled with ``alembic -x partition_result_message=true upgrade head``.
+
+Revision ID: c1d52e8f4a07
+Revises: 74988db8c69a
+Create Date: 2026-10-19 11:02:17.518804
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'c1d52e8f4a07'
+down_revision = '74988db8c69a'
+branch_labels = None
+depends_on = None
+
+import datetime
+
+from alembic import context
+from alembic import op
+import sqlalchemy as sa
+
+from drydock_provisioner.statemgmt.db import partitions
+from drydock_provisioner.statemgmt.db import tables
+
+# Months of partitions created ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+RESULT_MESSAGE_COLUMNS = ('sequence, task_id, message, error, context, '
+                          'context_type, ts, extra')
+
+
+def upgrade():
+    x_args = context.get_x_argument(as_dictionary=True)
+    if x_args.get('partition_result_message', '').lower() == 'true':
+        partition_result_message()
+
+    # Orchestrator polling for queued tasks and task listing by status
+    op.create_index('ix_tasks_status_created', tables.Tasks.__tablename__,
+                    ['status', 'created'])
+    op.create_index('ix_tasks_action_created', tables.Tasks.__tablename__,
+                    ['action', 'created'])
+    # Subtask rollups and subtask tree queries
+    op.create_index('ix_tasks_parent_task_id_status',
+                    tables.Tasks.__tablename__, ['parent_task_id', 'status'])
+    # Result messages of a task in order
+    op.create_index('ix_result_message_task_id_sequence',
+                    tables.ResultMessage.__tablename__,
+                    ['task_id', 'sequence'])
+
+
+def downgrade():
+    op.drop_index('ix_result_message_task_id_sequence',
+                  table_name=tables.ResultMessage.__tablename__)
+    op.drop_index('ix_tasks_parent_task_id_status',
+                  table_name=tables.Tasks.__tablename__)
+    op.drop_index('ix_tasks_action_created',
+                  table_name=tables.Tasks.__tablename__)
+    op.drop_index('ix_tasks_status_created',
+                  table_name=tables.Tasks.__tablename__)
+
+    if partitions.is_partitioned(op.get_bind()):
+        unpartition_result_message()
+
+
+def partition_result_message():
+    """Replace result_message with a table partitioned by month on ts."""
+    conn = op.get_bind()
+    if partitions.is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE result_message RENAME TO result_message_old")
+    op.execute("ALTER SEQUENCE result_message_sequence_seq OWNED BY NONE")
+    op.execute("CREATE TABLE result_message ("
+               "sequence integer NOT NULL "
+               "DEFAULT nextval('result_message_sequence_seq'), "
+               "task_id bytea, message varchar(1024), error boolean, "
+               "context varchar(64), context_type varchar(16), "
+               "ts timestamp without time zone, extra json) "
+               "PARTITION BY RANGE (ts)")
+    op.execute("ALTER SEQUENCE result_message_sequence_seq "
+               "OWNED BY result_message.sequence")
+    op.execute("CREATE TABLE %s PARTITION OF result_message DEFAULT" %
+               partitions.DEFAULT_PARTITION)
+
+    first_ts = conn.execute(
+        sa.text("SELECT min(ts) FROM result_message_old")).scalar()
+    now = datetime.datetime.now(datetime.UTC)
+    start = partitions.month_start(first_ts or now)
+    months = ((now.year - start.year) * 12 + now.month - start.month + 1 +
+              PARTITION_MONTHS_AHEAD)
+    partitions.create_partitions(conn, start, months)
+
+    op.execute("INSERT INTO result_message (%s) "
+               "SELECT %s FROM result_message_old" %
+               (RESULT_MESSAGE_COLUMNS, RESULT_MESSAGE_COLUMNS))
+    op.execute("DROP TABLE result_message_old")
+
+
+def unpartition_result_message():
+    """Replace the partitioned result_message with a plain table."""
+    op.execute("ALTER TABLE result_message RENAME TO result_message_old")
+    op.execute("ALTER SEQUENCE result_message_sequence_seq OWNED BY NONE")
+    op.execute("CREATE TABLE result_message ("
+               "sequence integer PRIMARY KEY "
+               "DEFAULT nextval('result_message_sequence_seq'), "
+               "task_id bytea, message varchar(1024), error boolean, "
+               "context varchar(64), context_type varchar(16), "
+               "ts timestamp without time zone, extra json)")
+    op.execute("ALTER SEQUENCE result_message_sequence_seq "
+               "OWNED BY result_message.sequence")
+    op.execute("INSERT INTO result_message (%s) "
+               "SELECT %s FROM result_message_old" %
+               (RESULT_MESSAGE_COLUMNS, RESULT_MESSAGE_COLUMNS))
+    op.execute("DROP TABLE result_message_old")
@@ -0,0 +1,42 @@
+"""add build data compression
+
+Revision ID: e3b7a9c2d415
+Revises: c1d52e8f4a07
+Create Date: 2026-10-19 14:21:46.203517
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'e3b7a9c2d415'
+down_revision = 'c1d52e8f4a07'
+branch_labels = None
+depends_on = None
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from drydock_provisioner.statemgmt.db import tables
+
+
+def upgrade():
+    for c in tables.BuildData.__add_compressed_data__:
+        op.add_column(tables.BuildData.__tablename__, c)
+
+
+def downgrade():
+    # Restore compressed data elements before dropping the column
+    conn = op.get_bind()
+    rs = conn.execute(
+        sa.text("SELECT ctid, data_compressed FROM build_data "
+                "WHERE data_compressed IS NOT NULL"))
+    for r in rs.fetchall():
+        conn.execute(sa.text("UPDATE build_data SET data_element = :data "
+                             "WHERE ctid = :ctid"),
+                     data=zlib.decompress(bytes(
+                         r['data_compressed'])).decode('utf-8'),
+                     ctid=r['ctid'])
+
+    for c in tables.BuildData.__add_compressed_data__:
+        op.drop_column(tables.BuildData.__tablename__, c.name)
@@ -4,6 +4,7 @@
 # Get task status
 # GET  /api/v1.0/tasks
 # GET  /api/v1.0/tasks/{task_id}
+# GET  /api/v1.0/tasks/{task_id}/events
 #"physical_provisioner:read_task": "role:admin"
 
 # Create validate_design task
@@ -12,10 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Actions related to task commands."""
-import time
-
 from drydock_provisioner.cli.action import CliAction
-from drydock_provisioner.cli.const import TaskStatus
 
 
 class TaskList(CliAction):  # pylint: disable=too-few-public-methods
@@ -55,7 +52,7 @@ class TaskCreate(CliAction):  # pylint: disable=too-few-public-methods
         :param List rack_names: The list of rack names to restrict action application
         :param List node_tags: The list of node tags to restrict action application
         :param bool block: Whether to block CLI exit until task completes
-        :param integer poll_interval: Polling interval to query task status
+        :param integer poll_interval: Maximum interval between queries of task status
         """
         super().__init__(api_client)
         self.design_ref = design_ref
@@ -97,14 +94,8 @@ class TaskCreate(CliAction):  # pylint: disable=too-few-public-methods
         if not self.block:
             return task
 
-        task_id = task.get('task_id')
-
-        while True:
-            time.sleep(self.poll_interval)
-            task = self.api_client.get_task(task_id=task_id)
-            if task.get('status',
-                        '') in [TaskStatus.Complete, TaskStatus.Terminated]:
-                return task
+        return self.api_client.wait_for_task(task.get('task_id'),
+                                             poll_interval=self.poll_interval)
 
 
 class TaskShow(CliAction):  # pylint: disable=too-few-public-methods
@@ -116,7 +107,7 @@ class TaskShow(CliAction):  # pylint: disable=too-few-public-methods
         :param DrydockClient api_client: The api client used for invocation.
         :param string task_id: the UUID of the task to retrieve
         :param bool block: Whether to block CLI exit until task completes
-        :param integer poll_interval: Polling interval to query task status
+        :param integer poll_interval: Maximum interval between queries of task status
         """
         super().__init__(api_client)
         self.task_id = task_id
@@ -128,18 +119,11 @@ class TaskShow(CliAction):  # pylint: disable=too-few-public-methods
 
     def invoke(self):
         """Invoke execution of this action."""
-        task = self.api_client.get_task(task_id=self.task_id)
-
-        if not self.block:
-            return task
-
-        task_id = task.get('task_id')
+        if self.block:
+            return self.api_client.wait_for_task(
+                self.task_id, poll_interval=self.poll_interval)
 
-        while True:
-            time.sleep(self.poll_interval)
-            task = self.api_client.get_task(task_id=task_id)
-            if task.status in [TaskStatus.Complete, TaskStatus.Terminated]:
-                return task
+        return self.api_client.get_task(task_id=self.task_id)
 
 
 class TaskBuildData(CliAction):
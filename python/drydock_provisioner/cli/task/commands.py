@@ -105,7 +105,9 @@ def task_show(ctx, task_id=None, block=False):
         ctx.fail('The task id must be specified by --task-id')
 
     click.echo(
-        json.dumps(TaskShow(ctx.obj['CLIENT'], task_id=task_id).invoke()))
+        json.dumps(
+            TaskShow(ctx.obj['CLIENT'], task_id=task_id,
+                     block=block).invoke()))
 
 
 @task.command(name='builddata')
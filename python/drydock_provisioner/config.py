@@ -63,6 +63,55 @@ class DrydockConfig(object):
             help=
             'How often will an instance attempt to claim leadership, in seconds'
         ),
+        cfg.IntOpt(
+            'health_check_interval',
+            min=1,
+            default=30,
+            help=
+            'How often the API checks its dependencies for the health endpoints, in seconds'
+        ),
+        cfg.IntOpt(
+            'node_inventory_interval',
+            min=1,
+            default=60,
+            help=
+            'How often the API refreshes the MaaS node inventory served by the nodes endpoint, in seconds'
+        ),
+        cfg.IntOpt(
+            'design_cache_ttl',
+            min=0,
+            default=300,
+            help=
+            'How long a compiled site design is reused by the node filter endpoint, in seconds. 0 disables the cache'
+        ),
+        cfg.IntOpt(
+            'design_cache_size',
+            min=0,
+            default=16,
+            help=
+            'Maximum number of compiled site designs kept for the node filter endpoint'
+        ),
+        cfg.IntOpt(
+            'task_wait_max',
+            min=0,
+            default=60,
+            help='Maximum seconds a task request waits for the task to finish '
+            'when the client asks to wait. 0 disables waiting'
+        ),
+        cfg.IntOpt(
+            'task_events_max',
+            min=1,
+            default=300,
+            help='Maximum seconds a task event stream is held open. The client '
+            'is then asked to reconnect to continue the stream'
+        ),
+        cfg.StrOpt(
+            'json_encoder',
+            default='json',
+            choices=['json', 'orjson'],
+            help=
+            'JSON encoder for API responses. orjson is faster and is used only if the orjson package is installed'
+        ),
     ]
 
     # Logging options
@@ -115,6 +164,60 @@ class DrydockConfig(object):
             help=
             'Time, in seconds, when a connection should be closed and re-established. -1 for no recycling.'
         ),
+        cfg.IntOpt(
+            'result_message_batch_size',
+            default=100,
+            min=1,
+            help=
+            'Number of buffered task result messages that triggers writing them to the database.'
+        ),
+        cfg.FloatOpt(
+            'result_message_flush_interval',
+            default=1.0,
+            min=0,
+            help='Maximum time, in seconds, a task result message is buffered '
+            'before being written. 0 writes each message immediately.'
+        ),
+        cfg.IntOpt(
+            'retention_batch_size',
+            default=500,
+            min=1,
+            help=
+            'Number of tasks, and their subtasks, deleted per transaction when enforcing task retention.'
+        ),
+    ]
+
+    # Options for bounding the threads used to execute tasks
+    executor_options = [
+        cfg.IntOpt(
+            'default_pool_size',
+            default=64,
+            min=1,
+            help=
+            'Maximum worker threads for an executor pool without an entry in pool_sizes'
+        ),
+        cfg.DictOpt(
+            'pool_sizes',
+            default={},
+            help=
+            'Map of executor pool name to maximum worker threads. Pools are '
+            'orchestrator, orchestrator_split, orchestrator_subtask and '
+            '<driver_key>.<action> (e.g. maasdriver.deploy_node) for drivers. '
+            'A driver pool without an entry uses the entry for <driver_key>.'),
+        cfg.BoolOpt(
+            'async_actions',
+            default=False,
+            help=
+            'Run actions that support it as coroutines on a shared event loop '
+            'instead of dedicating a worker thread to each. Blocking calls '
+            'made by these actions use the async_io pool.'),
+        cfg.IntOpt(
+            'async_pool_size',
+            default=4096,
+            min=1,
+            help=
+            'Maximum concurrently running coroutine actions per executor pool'
+        ),
     ]
 
     # Options for the boot action framework
@@ -252,6 +355,8 @@ class DrydockConfig(object):
                                 group='database')
         self.conf.register_opts(DrydockConfig.timeout_options,
                                 group='timeouts')
+        self.conf.register_opts(DrydockConfig.executor_options,
+                                group='executor')
         if enable_keystone:
             self.conf.register_opts(
                 loading.get_auth_plugin_conf_options('password'),
@@ -270,6 +375,7 @@ def list_opts():
         'database': DrydockConfig.database_options,
         'network': DrydockConfig.network_options,
         'networkconfig': DrydockConfig.networkconfig_options,
+        'executor': DrydockConfig.executor_options,
     }
 
     package_path = os.path.dirname(os.path.abspath(__file__))
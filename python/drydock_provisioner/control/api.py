@@ -21,11 +21,16 @@ from .designs import DesignsPartResource
 from .tasks import TasksResource
 from .tasks import TaskResource
 from .tasks import TaskBuilddataResource
+from .tasks import TaskEventsResource
 from .nodes import NodesResource
+from .nodes import NodeInventory
 from .nodes import NodeBuildDataResource
 from .nodes import NodeFilterResource
 from .health import HealthResource
 from .health import HealthExtendedResource
+from .health import HealthLivenessResource
+from .health import HealthMonitor
+from .metrics import MetricsResource
 from .bootaction import BootactionUnitsResource
 from .bootaction import BootactionFilesResource
 from .bootaction import BootactionResource
@@ -54,21 +59,40 @@ def start_api(state_manager=None, ingester=None, orchestrator=None):
 
     control_api.add_route('/versions', VersionsResource())
 
+    # Metrics of this process for Prometheus to scrape
+    control_api.add_route('/metrics', MetricsResource())
+
+    # MaaS node inventory refreshed in the background for the nodes endpoint
+    node_inventory = NodeInventory()
+
+    # Dependency checks are shared by the readiness endpoints
+    health_monitor = HealthMonitor(state_manager=state_manager,
+                                   orchestrator=orchestrator)
+
     # v1.0 of Drydock API
     v1_0_routes = [
         # API for managing orchestrator tasks
         ('/health',
          HealthResource(state_manager=state_manager,
-                        orchestrator=orchestrator)),
+                        orchestrator=orchestrator,
+                        health_monitor=health_monitor)),
+        ('/health/live', HealthLivenessResource()),
+        ('/health/ready',
+         HealthResource(state_manager=state_manager,
+                        orchestrator=orchestrator,
+                        health_monitor=health_monitor)),
         ('/health/extended',
          HealthExtendedResource(state_manager=state_manager,
-                                orchestrator=orchestrator)),
+                                orchestrator=orchestrator,
+                                health_monitor=health_monitor)),
         ('/tasks',
          TasksResource(state_manager=state_manager,
                        orchestrator=orchestrator)),
         ('/tasks/{task_id}', TaskResource(state_manager=state_manager)),
         ('/tasks/{task_id}/builddata',
          TaskBuilddataResource(state_manager=state_manager)),
+        ('/tasks/{task_id}/events',
+         TaskEventsResource(state_manager=state_manager)),
 
         # API for managing site design data
         ('/designs', DesignsResource(state_manager=state_manager)),
@@ -76,7 +100,9 @@ def start_api(state_manager=None, ingester=None, orchestrator=None):
          DesignResource(state_manager=state_manager,
                         orchestrator=orchestrator)),
         ('/designs/{design_id}/parts',
-         DesignsPartsResource(state_manager=state_manager, ingester=ingester)),
+         DesignsPartsResource(state_manager=state_manager,
+                              ingester=ingester,
+                              orchestrator=orchestrator)),
         ('/designs/{design_id}/parts/{kind}',
          DesignsPartsKindsResource(state_manager=state_manager)),
         ('/designs/{design_id}/parts/{kind}/{name}',
@@ -84,7 +110,7 @@ def start_api(state_manager=None, ingester=None, orchestrator=None):
                              orchestrator=orchestrator)),
 
         # API to list current MaaS nodes
-        ('/nodes', NodesResource()),
+        ('/nodes', NodesResource(node_inventory=node_inventory)),
         # API to get build data for a node
         ('/nodes/{hostname}/builddata',
          NodeBuildDataResource(state_manager=state_manager)),
@@ -19,6 +19,12 @@ import falcon
 import falcon.request
 
 import drydock_provisioner.error as errors
+from drydock_provisioner import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class BaseResource(object):
@@ -71,6 +77,18 @@ class BaseResource(object):
         })
         resp.status = status_code
 
+    @staticmethod
+    def get_list_param(req, name):
+        """Return a list parameter given as comma-separated or repeated values.
+
+        :param req: falcon.Request
+        :param name: name of the query parameter
+        """
+        values = req.get_param_as_list(name)
+        if values is None:
+            return None
+        return [v for value in values for v in value.split(',') if v]
+
     def log_error(self, ctx, level, msg):
         extra = {
             'user': 'N/A',
@@ -93,7 +111,64 @@ class BaseResource(object):
         """
         Thin wrapper around json.dumps, providing the default=str config
         """
-        return json.dumps(body_dict, default=str)
+        return self.encode_json(body_dict).decode('utf-8')
+
+    def encode_json(self, value):
+        """Serialize a value to UTF-8 encoded JSON.
+
+        Uses orjson if it is installed and selected with the
+        ``json_encoder`` option. Values orjson cannot serialize fall back
+        to the json module.
+        """
+        encoder = config.config_mgr.conf.json_encoder
+        if orjson is not None and encoder == 'orjson':
+            try:
+                return orjson.dumps(value,
+                                    default=str,
+                                    option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                pass
+        return json.dumps(value, default=str).encode('utf-8')
+
+    def stream_json_list(self, items, chunk_size=65536):
+        """Serialize an iterable as a JSON list in encoded chunks.
+
+        Intended for ``resp.stream`` so large lists are sent as they
+        are read rather than rendered in memory first.
+
+        :param items: iterable of JSON serializable values
+        :param chunk_size: approximate size in bytes of each chunk
+        """
+        return self._stream_json(b'[', (self.encode_json(i) for i in items),
+                                 b']', chunk_size)
+
+    def stream_json_object(self, items, chunk_size=65536):
+        """Serialize key/value pairs as a JSON object in encoded chunks.
+
+        Like ``stream_json_list``, each value is serialized only as the
+        response is sent.
+
+        :param items: iterable of (key, value) tuples with string keys
+        :param chunk_size: approximate size in bytes of each chunk
+        """
+        return self._stream_json(
+            b'{', (self.encode_json(str(k)) + b':' + self.encode_json(v)
+                   for k, v in items), b'}', chunk_size)
+
+    def _stream_json(self, start, members, end, chunk_size):
+        chunk = [start]
+        size = len(start)
+        for i, member in enumerate(members):
+            if i:
+                chunk.append(b',')
+            chunk.append(member)
+            size += len(member) + 1
+            if size >= chunk_size:
+                yield b''.join(chunk)
+                chunk = []
+                size = 0
+        chunk.append(end)
+        yield b''.join(chunk)
 
     def debug(self, ctx, msg):
         self.log_error(ctx, logging.DEBUG, msg)
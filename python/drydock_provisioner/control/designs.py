@@ -126,9 +126,10 @@ class DesignResource(StatefulResource):
 
 class DesignsPartsResource(StatefulResource):
 
-    def __init__(self, ingester=None, **kwargs):
+    def __init__(self, ingester=None, orchestrator=None, **kwargs):
         super(DesignsPartsResource, self).__init__(**kwargs)
         self.ingester = ingester
+        self.orchestrator = orchestrator
         self.authorized_roles = ['user']
 
         if ingester is None:
@@ -182,48 +183,66 @@ class DesignsPartsResource(StatefulResource):
 
     @policy.ApiEnforcer('physical_provisioner:ingest_data')
     def on_get(self, req, resp, design_id):
+        """Method Handler for GET the part catalog of a design.
+
+        :param req: Falcon request object
+        :param resp: Falcon response object
+        :param design_id: reference of the design
+        """
+        source = req.params.get('source', 'designed')
+
         try:
-            design = self.state_manager.get_design(design_id)
+            if source == 'compiled':
+                status, design = self.orchestrator.get_effective_site(
+                    design_id)
+            else:
+                status, design = self.orchestrator.get_described_site(
+                    design_id)
+            if design is None:
+                raise errors.DesignError("Design %s not found" % design_id)
+
+            # The catalog is built before streaming so an error is not
+            # sent after the response headers
+            parts = list(self.part_catalog(design))
         except errors.DesignError:
+            self.error(req.context, "Design %s not found" % design_id)
             self.return_error(resp,
                               falcon.HTTP_404,
-                              message="Design %s nout found" % design_id,
+                              message="Design %s not found" % design_id,
                               retry=False)
+            return
+        except Exception as ex:
+            self.error(req.context, "Unknown error: %s" % str(ex))
+            self.return_error(resp,
+                              falcon.HTTP_500,
+                              message="Unknown error",
+                              retry=False)
+            return
 
-        part_catalog = []
+        resp.stream = self.stream_json_list(parts)
+        resp.content_type = falcon.MEDIA_JSON
+        resp.status = falcon.HTTP_200
 
+    def part_catalog(self, design):
+        """Generate the kind and key of each part of a design."""
         site = design.get_site()
 
-        part_catalog.append({'kind': 'Region', 'key': site.get_id()})
+        yield {'kind': 'Region', 'key': site.get_id()}
 
-        part_catalog.extend([{
-            'kind': 'Network',
-            'key': n.get_id()
-        } for n in design.networks])
+        for n in design.networks:
+            yield {'kind': 'Network', 'key': n.get_id()}
 
-        part_catalog.extend([{
-            'kind': 'NetworkLink',
-            'key': link.get_id()
-        } for link in design.network_links])
+        for link in design.network_links:
+            yield {'kind': 'NetworkLink', 'key': link.get_id()}
 
-        part_catalog.extend([{
-            'kind': 'HostProfile',
-            'key': p.get_id()
-        } for p in design.host_profiles])
+        for p in design.host_profiles:
+            yield {'kind': 'HostProfile', 'key': p.get_id()}
 
-        part_catalog.extend([{
-            'kind': 'HardwareProfile',
-            'key': p.get_id()
-        } for p in design.hardware_profiles])
+        for p in design.hardware_profiles:
+            yield {'kind': 'HardwareProfile', 'key': p.get_id()}
 
-        part_catalog.extend([{
-            'kind': 'BaremetalNode',
-            'key': n.get_id()
-        } for n in design.baremetal_nodes])
-
-        resp.text = json.dumps(part_catalog)
-        resp.status = falcon.HTTP_200
-        return
+        for n in design.baremetal_nodes:
+            yield {'kind': 'BaremetalNode', 'key': n.get_id()}
 
 
 class DesignsPartsKindsResource(StatefulResource):
@@ -13,37 +13,54 @@
 # limitations under the License.
 import falcon
 import json
+import logging
+import threading
+import time
 
+import drydock_provisioner.config as config
+import drydock_provisioner.drivers.node.maasdriver.models.rack_controller as maas_rack
+
+from drydock_provisioner.control.base import BaseResource
 from drydock_provisioner.control.base import StatefulResource
-from drydock_provisioner.drivers.node.maasdriver.actions.node import ValidateNodeServices
+from drydock_provisioner.drivers.node.maasdriver.api_client import MaasRequestFactory
 from drydock_provisioner.objects.healthcheck import HealthCheck
 from drydock_provisioner.objects.healthcheck import HealthCheckMessage
-from drydock_provisioner.objects.fields import ActionResult
-import drydock_provisioner.objects.fields as hd_fields
 import drydock_provisioner.policy as policy
 
 
+class HealthLivenessResource(BaseResource):
+    """
+    Returns empty response body that the Drydock API is serving requests
+    """
+
+    def on_get(self, req, resp):
+        """
+        Returns 204 without response body. Does not access any dependency.
+        """
+        resp.status = falcon.HTTP_204
+
+
 class HealthResource(StatefulResource):
     """
     Returns empty response body that Drydock is healthy
     """
 
-    def __init__(self, orchestrator=None, **kwargs):
+    def __init__(self, orchestrator=None, health_monitor=None, **kwargs):
         """Object initializer.
 
         :param orchestrator: instance of Drydock orchestrator
+        :param health_monitor: instance of HealthMonitor to serve results from
         """
         super().__init__(**kwargs)
         self.orchestrator = orchestrator
+        self.health_monitor = health_monitor or HealthMonitor(
+            state_manager=self.state_manager, orchestrator=orchestrator)
 
     def on_get(self, req, resp):
         """
         Returns 204 on healthy, otherwise 503, without response body.
         """
-        hc = HealthCheckCombined(state_manager=self.state_manager,
-                                 orchestrator=self.orchestrator,
-                                 extended=False)
-        return hc.get(req, resp)
+        return self.health_monitor.get(req, resp, extended=False)
 
 
 class HealthExtendedResource(StatefulResource):
@@ -51,23 +68,104 @@ class HealthExtendedResource(StatefulResource):
     Returns response body that Drydock is healthy
     """
 
-    def __init__(self, orchestrator=None, **kwargs):
+    def __init__(self, orchestrator=None, health_monitor=None, **kwargs):
         """Object initializer.
 
         :param orchestrator: instance of Drydock orchestrator
+        :param health_monitor: instance of HealthMonitor to serve results from
         """
         super().__init__(**kwargs)
         self.orchestrator = orchestrator
+        self.health_monitor = health_monitor or HealthMonitor(
+            state_manager=self.state_manager, orchestrator=orchestrator)
 
     @policy.ApiEnforcer('physical_provisioner:health_data')
     def on_get(self, req, resp):
         """
         Returns 200 on success, otherwise 503, with a response body.
         """
-        hc = HealthCheckCombined(state_manager=self.state_manager,
-                                 orchestrator=self.orchestrator,
-                                 extended=True)
-        return hc.get(req, resp)
+        return self.health_monitor.get(req, resp, extended=True)
+
+
+class HealthMonitor(object):
+    """
+    Runs the Drydock dependency checks in the background and caches the result.
+
+    The checks run once synchronously on the first request and then every
+    ``health_check_interval`` seconds in a daemon thread. Results older than
+    three intervals are reported as unhealthy.
+    """
+
+    def __init__(self, state_manager=None, orchestrator=None):
+        """Object initializer.
+
+        :param state_manager: instance of Drydock state manager
+        :param orchestrator: instance of Drydock orchestrator
+        """
+        self.checker = HealthCheckCombined(state_manager=state_manager,
+                                           orchestrator=orchestrator)
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.control_logger_name)
+
+        self.health_check = None
+        self.last_check = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self, req, resp, extended=False):
+        """
+        Returns updated response from the cached health check, with body if extended.
+        """
+        health_check = self.get_health_check()
+
+        if extended:
+            resp.text = json.dumps(health_check.to_dict())
+
+        if health_check.is_healthy() and extended:
+            resp.status = falcon.HTTP_200
+        elif health_check.is_healthy():
+            resp.status = falcon.HTTP_204
+        else:
+            resp.status = falcon.HTTP_503
+
+    def get_health_check(self):
+        """Return the cached HealthCheck, running the checks if there is none."""
+        with self._lock:
+            if self.health_check is None:
+                self.refresh()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name="drydock-health",
+                                                daemon=True)
+                self._thread.start()
+            health_check = self.health_check
+            last_check = self.last_check
+
+        max_age = 3 * config.config_mgr.conf.health_check_interval
+        if time.monotonic() - last_check > max_age:
+            stale_check = HealthCheck()
+            for m in health_check.message_list:
+                stale_check.add_detail_msg(msg=m)
+            stale_check.add_detail_msg(msg=HealthCheckMessage(
+                msg='Health check results older than %d seconds' % max_age,
+                error=True))
+            return stale_check
+
+        return health_check
+
+    def refresh(self):
+        """Run the dependency checks and update the cached result."""
+        health_check = self.checker.check()
+        self.health_check = health_check
+        self.last_check = time.monotonic()
+
+    def _run(self):
+        while True:
+            time.sleep(config.config_mgr.conf.health_check_interval)
+            try:
+                self.refresh()
+            except Exception as ex:
+                self.logger.error("Error running health checks.", exc_info=ex)
 
 
 class HealthCheckCombined(object):
@@ -75,18 +173,18 @@ class HealthCheckCombined(object):
     Returns Drydock health check status.
     """
 
-    def __init__(self, state_manager=None, orchestrator=None, extended=False):
+    def __init__(self, state_manager=None, orchestrator=None):
         """Object initializer.
 
+        :param state_manager: instance of Drydock state manager
         :param orchestrator: instance of Drydock orchestrator
         """
         self.state_manager = state_manager
         self.orchestrator = orchestrator
-        self.extended = extended
 
-    def get(self, req, resp):
+    def check(self):
         """
-        Returns updated response with body if extended.
+        Returns a HealthCheck with the status of Drydock dependencies.
         """
         health_check = HealthCheck()
         # Test database connection
@@ -101,24 +199,19 @@ class HealthCheckCombined(object):
 
         # Test MaaS connection
         try:
-            task = self.orchestrator.create_task(
-                action=hd_fields.OrchestratorAction.Noop)
-            maas_validation = ValidateNodeServices(task, self.orchestrator,
-                                                   self.state_manager)
-            maas_validation.start()
-            if maas_validation.task.get_status() == ActionResult.Failure:
-                raise Exception('MaaS task failure')
+            maas_client = MaasRequestFactory(
+                config.config_mgr.conf.maasdriver.maas_api_url,
+                config.config_mgr.conf.maasdriver.maas_api_key)
+            maas_client.test_connectivity()
+            maas_client.test_authentication()
+
+            rack_ctlrs = maas_rack.RackControllers(maas_client)
+            rack_ctlrs.refresh()
+            if not [r for r in rack_ctlrs if r.is_healthy()]:
+                raise Exception('No healthy rack controllers found')
         except Exception:
             hcm = HealthCheckMessage(msg='Unable to connect to MaaS',
                                      error=True)
             health_check.add_detail_msg(msg=hcm)
 
-        if self.extended:
-            resp.text = json.dumps(health_check.to_dict())
-
-        if health_check.is_healthy() and self.extended:
-            resp.status = falcon.HTTP_200
-        elif health_check.is_healthy():
-            resp.status = falcon.HTTP_204
-        else:
-            resp.status = falcon.HTTP_503
+        return health_check
@@ -0,0 +1,32 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import falcon
+import prometheus_client
+
+from drydock_provisioner import metrics
+from drydock_provisioner.control.base import BaseResource
+
+
+class MetricsResource(BaseResource):
+    """
+    Returns the metrics of this process for Prometheus to scrape
+    """
+
+    def on_get(self, req, resp):
+        """
+        Returns 200 with the metrics in the Prometheus text format.
+        """
+        resp.data = metrics.generate_latest()
+        resp.content_type = prometheus_client.CONTENT_TYPE_LATEST
+        resp.status = falcon.HTTP_200
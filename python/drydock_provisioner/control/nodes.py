@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import falcon
+import hashlib
+import itertools
 import json
+import logging
+import threading
+import time
 
 from drydock_provisioner import policy
 from drydock_provisioner import config
+from drydock_provisioner import metrics
 
 from drydock_provisioner.drivers.node.maasdriver.api_client import MaasRequestFactory
 from drydock_provisioner.drivers.node.maasdriver.models.machine import Machines
@@ -24,41 +30,188 @@ from .base import BaseResource, StatefulResource
 
 
 class NodesResource(BaseResource):
+    """Resource for the MaaS node inventory.
 
-    def __init__(self):
+    Nodes are served from the snapshot of a NodeInventory. ``fields``
+    selects a comma-separated subset of the node fields. Responses carry
+    an ETag of the snapshot, so clients polling with ``If-None-Match`` get
+    a 304 until the inventory changes.
+    """
+
+    def __init__(self, node_inventory=None):
         super().__init__()
+        self.node_inventory = node_inventory or NodeInventory()
 
     @policy.ApiEnforcer('physical_provisioner:read_data')
     def on_get(self, req, resp):
+        fields = self.get_list_param(req, 'fields')
+        if fields:
+            unknown = set(fields) - set(NodeInventory.fields)
+            if unknown:
+                self.return_error(resp,
+                                  falcon.HTTP_400,
+                                  message="Unknown node fields: %s" %
+                                  ', '.join(sorted(unknown)),
+                                  retry=False)
+                return
+
         try:
-            maas_client = MaasRequestFactory(
-                config.config_mgr.conf.maasdriver.maas_api_url,
-                config.config_mgr.conf.maasdriver.maas_api_key)
-
-            machine_list = Machines(maas_client)
-            machine_list.refresh()
-
-            node_view = list()
-            for m in machine_list:
-                m.get_power_params()
-                node_view.append(
-                    dict(hostname=m.hostname,
-                         memory=m.memory,
-                         cpu_count=m.cpu_count,
-                         status_name=m.status_name,
-                         boot_mac=m.boot_mac,
-                         power_state=m.power_state,
-                         power_address=m.power_parameters.get('power_address'),
-                         boot_ip=m.boot_ip))
-
-            resp.text = json.dumps(node_view)
-            resp.status = falcon.HTTP_200
+            snapshot = self.node_inventory.get()
         except Exception as ex:
             self.error(req.context, "Unknown error: %s" % str(ex), exc_info=ex)
             self.return_error(resp,
                               falcon.HTTP_500,
                               message="Unknown error",
                               retry=False)
+            return
+
+        if snapshot is None:
+            self.return_error(resp,
+                              falcon.HTTP_503,
+                              message="Node inventory is not available",
+                              retry=True)
+            return
+        node_view, etag = snapshot
+
+        if fields:
+            node_view = [{f: n[f] for f in fields} for n in node_view]
+            etag = NodeInventory.etag_for('%s;%s' % (etag, ','.join(fields)))
+
+        resp.etag = etag
+        if req.if_none_match and (etag in req.if_none_match
+                                  or '*' in req.if_none_match):
+            resp.status = falcon.HTTP_304
+            return
+
+        resp.text = json.dumps(node_view)
+        resp.content_type = falcon.MEDIA_JSON
+        resp.status = falcon.HTTP_200
+
+
+class NodeInventory(object):
+    """Snapshot of the MaaS node inventory refreshed in the background.
+
+    The inventory is read once on the first request and then every
+    ``node_inventory_interval`` seconds in a daemon thread, with one
+    listing of the machines and one request for all their power
+    parameters. If a refresh fails the previous snapshot is kept.
+    """
+
+    # Seconds a request waits for the first read of the inventory by
+    # another request
+    wait_timeout = 30
+
+    fields = [
+        'hostname', 'memory', 'cpu_count', 'status_name', 'boot_mac',
+        'power_state', 'power_address', 'boot_ip'
+    ]
+
+    def __init__(self):
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.control_logger_name)
+
+        # Tuple of the node list and its ETag, replaced as a whole
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._read_done = threading.Condition(self._lock)
+        self._reading = False
+        self._read_failed = False
+        self._thread = None
+
+    def get(self):
+        """Return the node list and its ETag, reading it if there is none.
+
+        Only the first request reads the inventory, without holding the
+        lock. Other requests wait up to ``wait_timeout`` seconds for it. If
+        the first read fails, the inventory is only read again by the
+        background refresh.
+
+        :returns: tuple of the node list and its ETag, or None if the
+                  inventory is not available
+        """
+        with self._lock:
+            metrics.cache_lookup('node_inventory', self.snapshot is not None)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name="drydock-node-inventory",
+                                                daemon=True)
+                self._thread.start()
+            if self.snapshot is not None or self._read_failed:
+                return self.snapshot
+            if self._reading:
+                self._read_done.wait_for(lambda: not self._reading,
+                                         timeout=self.wait_timeout)
+                return self.snapshot
+            self._reading = True
+
+        failed = True
+        try:
+            self.refresh()
+            failed = False
+        except Exception as ex:
+            self.logger.error("Error reading node inventory.", exc_info=ex)
+        finally:
+            with self._lock:
+                self._reading = False
+                self._read_failed = failed
+                self._read_done.notify_all()
+        return self.snapshot
+
+    def refresh(self):
+        """Read the node inventory from MaaS and update the snapshot."""
+        machines = Machines(self.get_maas_client())
+        machine_list = machines.get_machine_list()
+        power_params = machines.get_power_params()
+
+        node_view = [
+            self.node_summary(m, power_params.get(m.get('system_id'), {}))
+            for m in machine_list
+        ]
+        etag = self.etag_for(json.dumps(node_view, sort_keys=True))
+
+        self.snapshot = (node_view, etag)
+
+    def get_maas_client(self):
+        return MaasRequestFactory(
+            config.config_mgr.conf.maasdriver.maas_api_url,
+            config.config_mgr.conf.maasdriver.maas_api_key)
+
+    def node_summary(self, machine, power_params):
+        """Summarize a machine as listed by MaaS.
+
+        :param machine: dict of the machine as returned by MaaS
+        :param power_params: dict of the machine's power parameters
+        """
+        boot_mac = None
+        boot_ip = None
+        boot_interface = machine.get('boot_interface')
+        if isinstance(boot_interface, dict):
+            boot_mac = boot_interface.get('mac_address')
+            links = boot_interface.get('links') or []
+            if len(links) > 0:
+                boot_ip = links[0].get('ip_address', None)
+
+        return dict(hostname=machine.get('hostname'),
+                    memory=machine.get('memory'),
+                    cpu_count=machine.get('cpu_count'),
+                    status_name=machine.get('status_name'),
+                    boot_mac=boot_mac,
+                    power_state=machine.get('power_state'),
+                    power_address=power_params.get('power_address'),
+                    boot_ip=boot_ip)
+
+    @staticmethod
+    def etag_for(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+    def _run(self):
+        while True:
+            time.sleep(config.config_mgr.conf.node_inventory_interval)
+            try:
+                self.refresh()
+            except Exception as ex:
+                self.logger.error("Error refreshing node inventory.",
+                                  exc_info=ex)
 
 
 class NodeBuildDataResource(StatefulResource):
@@ -66,22 +219,34 @@ class NodeBuildDataResource(StatefulResource):
 
     @policy.ApiEnforcer('physical_provisioner:read_build_data')
     def on_get(self, req, resp, hostname):
+        """Handler for GET method.
+
+        ``verbosity=1`` returns a summary of the build data without the
+        collected data elements. The list is streamed as it is read.
+        """
+        verbosity = req.get_param_as_int('verbosity',
+                                         min_value=1,
+                                         max_value=2,
+                                         default=2)
         try:
             latest = req.params.get('latest', 'false').upper()
             latest = True if latest == 'TRUE' else False
 
-            node_bd = self.state_manager.get_build_data(node_name=hostname,
-                                                        latest=latest)
+            node_bd = self.state_manager.stream_build_data(node_name=hostname,
+                                                           latest=latest,
+                                                           verbosity=verbosity)
+            first_bd = next(node_bd, None)
 
-            if not node_bd:
+            if first_bd is None:
                 self.return_error(resp,
                                   falcon.HTTP_404,
                                   message="No build data found",
                                   retry=False)
             else:
-                node_bd = [bd.to_dict() for bd in node_bd]
                 resp.status = falcon.HTTP_200
-                resp.text = json.dumps(node_bd)
+                resp.stream = self.stream_json_list(
+                    bd.to_dict(verbosity=verbosity)
+                    for bd in itertools.chain([first_bd], node_bd))
                 resp.content_type = falcon.MEDIA_JSON
         except Exception as ex:
             self.error(req.context, "Unknown error: %s" % str(ex), exc_info=ex)
@@ -116,10 +281,25 @@ class NodeFilterResource(StatefulResource):
                     message='Missing input required value: design_ref',
                     retry=False)
                 return
-            _, site_design = self.orchestrator.get_effective_site(design_ref)
-            nodes = self.orchestrator.process_node_filter(
-                node_filter=node_filter, site_design=site_design)
-            resp_list = [n.name for n in nodes if nodes]
+
+            node_filters = json_data.get('node_filters', None)
+            if node_filters is not None and not isinstance(node_filters, list):
+                self.info(req.context, 'Invalid input value: node_filters')
+                self.return_error(
+                    resp,
+                    falcon.HTTP_400,
+                    message='Invalid input value: node_filters must be a list',
+                    retry=False)
+                return
+
+            design = self.orchestrator.design_cache.get(design_ref)
+
+            if node_filters is not None:
+                resp_list = [
+                    self.select_nodes(design, f) for f in node_filters
+                ]
+            else:
+                resp_list = self.select_nodes(design, node_filter)
 
             resp.text = json.dumps(resp_list)
             resp.status = falcon.HTTP_200
@@ -129,3 +309,15 @@ class NodeFilterResource(StatefulResource):
                               falcon.HTTP_500,
                               message="Unknown error",
                               retry=False)
+
+    def select_nodes(self, design, node_filter):
+        """Return the names of the nodes in design matching node_filter.
+
+        :param design: instance of design_cache.CompiledDesign
+        :param node_filter: node filter set to evaluate
+        """
+        nodes = self.orchestrator.process_node_filter(
+            node_filter=node_filter,
+            site_design=design.site_design,
+            node_index=design.node_index)
+        return [n.name for n in nodes if nodes]
@@ -13,21 +13,35 @@
 # limitations under the License.
 """Handler resources for task management API."""
 
+import base64
+import datetime
 import falcon
+import itertools
 import json
+import time
 import traceback
+import urllib.parse
 import uuid
 
+from drydock_provisioner import config
 from drydock_provisioner import policy
 from drydock_provisioner import error as errors
 from drydock_provisioner.objects import fields as hd_fields
 
 from .base import StatefulResource
 
+# Statuses of tasks that will not be updated further
+FINISHED_STATUSES = [
+    hd_fields.TaskStatus.Complete, hd_fields.TaskStatus.Terminated
+]
+
 
 class TasksResource(StatefulResource):
     """Handler resource for /tasks collection endpoint."""
 
+    # Upper bound on the page size a client can request
+    max_limit = 1000
+
     def __init__(self, orchestrator=None, **kwargs):
         """Object initializer.
 
@@ -38,11 +52,47 @@ class TasksResource(StatefulResource):
 
     @policy.ApiEnforcer('physical_provisioner:read_task')
     def on_get(self, req, resp):
-        """Handler for GET method."""
+        """Handler for GET method.
+
+        Tasks are listed newest first and can be filtered with the query
+        parameters ``status`` and ``action`` (comma-separated lists),
+        ``created_after`` and ``created_before`` (ISO 8601 timestamps),
+        ``parent_only`` and ``design_ref``. ``summary=true`` omits the result
+        messages of each task. If ``limit`` is given and more tasks may
+        follow, the response carries a Link header with rel="next". The list
+        is streamed as it is serialized.
+        """
         try:
-            task_model_list = self.state_manager.get_tasks()
-            task_list = [x.to_dict() for x in task_model_list]
-            resp.text = json.dumps(task_list)
+            query = self.parse_list_query(req)
+        except ValueError as ex:
+            self.info(req.context, "Invalid task list query: %s" % str(ex))
+            self.return_error(resp,
+                              falcon.HTTP_400,
+                              message=str(ex),
+                              retry=False)
+            return
+
+        try:
+            task_model_list = self.state_manager.get_tasks(**query)
+
+            limit = query['limit']
+            if limit is not None and len(task_model_list) == limit:
+                last_task = task_model_list[-1]
+                params = dict(req.params)
+                params['cursor'] = self.encode_cursor(last_task)
+                resp.append_link(
+                    "%s?%s" %
+                    (req.path, urllib.parse.urlencode(params, doseq=True)),
+                    'next')
+
+            # Converted before streaming so an error is not sent after
+            # the response headers
+            task_list = [
+                self.task_list_item(t, query['summary'])
+                for t in task_model_list
+            ]
+            resp.stream = self.stream_json_list(task_list)
+            resp.content_type = falcon.MEDIA_JSON
             resp.status = falcon.HTTP_200
         except Exception as ex:
             self.error(
@@ -53,6 +103,100 @@ class TasksResource(StatefulResource):
                               message="Unknown error",
                               retry=False)
 
+    def task_list_item(self, task, summary=False):
+        """Convert a task for the task list.
+
+        :param task: objects.Task to convert
+        :param summary: if True, omit the result messages of the task
+        """
+        task_dict = task.to_dict()
+        if summary:
+            task_dict['result']['details'].pop('messageList', None)
+        return task_dict
+
+    def parse_list_query(self, req):
+        """Parse the task list query parameters into get_tasks arguments.
+
+        :param req: falcon.Request for the task list
+        :raises ValueError: if a parameter is invalid
+        """
+        query = dict()
+
+        query['status'] = self.get_list_param(req, 'status')
+        if query['status']:
+            for st in query['status']:
+                if st not in hd_fields.TaskStatus.ALL:
+                    raise ValueError("Unknown task status %s" % st)
+
+        query['action'] = self.get_list_param(req, 'action')
+        query['design_ref'] = req.get_param('design_ref')
+        query['parent_only'] = req.get_param_as_bool('parent_only',
+                                                     default=False)
+        query['summary'] = req.get_param_as_bool('summary', default=False)
+
+        for p in ['created_after', 'created_before']:
+            query[p] = self.parse_timestamp(p, req.get_param(p))
+
+        limit = req.get_param('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError("limit must be an integer")
+            if limit < 1 or limit > self.max_limit:
+                raise ValueError("limit must be between 1 and %d" %
+                                 self.max_limit)
+        query['limit'] = limit
+
+        cursor = req.get_param('cursor')
+        query['cursor'] = self.decode_cursor(
+            cursor) if cursor is not None else None
+
+        return query
+
+    @staticmethod
+    def parse_timestamp(name, value):
+        """Parse an ISO 8601 query parameter into a naive UTC datetime.
+
+        :param name: name of the query parameter, for error messages
+        :param value: string value of the parameter or None
+        """
+        if value is None:
+            return None
+        try:
+            ts = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("%s must be an ISO 8601 timestamp" % name)
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(datetime.UTC).replace(tzinfo=None)
+        return ts
+
+    @staticmethod
+    def encode_cursor(task):
+        """Return an opaque cursor for the page following ``task``.
+
+        :param task: the last objects.Task instance of the current page
+        """
+        created = task.created
+        if created.tzinfo is not None:
+            created = created.astimezone(datetime.UTC).replace(tzinfo=None)
+        cursor = "%s|%s" % (created.isoformat(), task.task_id.hex)
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode a cursor from encode_cursor into (created, task_id).
+
+        :param cursor: string cursor from the client
+        """
+        try:
+            created, task_id = base64.urlsafe_b64decode(
+                cursor.encode()).decode().split('|')
+            return (datetime.datetime.fromisoformat(created),
+                    uuid.UUID(hex=task_id))
+        except Exception:
+            raise ValueError("Invalid cursor")
+
     @policy.ApiEnforcer('physical_provisioner:create_task')
     def on_post(self, req, resp):
         """Handler for POST method."""
@@ -103,7 +247,8 @@ class TasksResource(StatefulResource):
             if not retention_status:
                 resp.status = falcon.HTTP_404
                 return
-            resp.text = "Tables purged successfully."
+            resp.text = "Tables purged successfully. Deleted %s." % ', '.join(
+                "%d %s rows" % (v, k) for k, v in retention_status.items())
         except Exception as e:
             self.error(req.context, "Unknown error: %s" % (str(e)))
             resp.text = "Unexpected error."
@@ -368,6 +513,13 @@ class TasksResource(StatefulResource):
 class TaskResource(StatefulResource):
     """Handler resource for /tasks/<id> singleton endpoint."""
 
+    # Seconds between checks of a task being waited on, in case a
+    # notification of its update is missed
+    recheck_interval = 10
+
+    # Milliseconds a client waits before reconnecting to a closed stream
+    reconnect_delay = 1000
+
     def __init__(self, orchestrator=None, **kwargs):
         """Object initializer.
 
@@ -378,16 +530,38 @@ class TaskResource(StatefulResource):
 
     @policy.ApiEnforcer('physical_provisioner:read_task')
     def on_get(self, req, resp, task_id):
-        """Handler for GET method."""
+        """Handler for GET method.
+
+        ``layers=N`` returns a dict of the task and its subtasks N layers
+        deep (-1 for all) keyed by task ID. ``subtaskerrors=true`` adds the
+        results of all subtasks with errors and ``errorsonly=true`` limits
+        the returned subtasks to those with errors. ``wait=N`` holds the
+        response until the task is complete or terminated, for at most N
+        seconds (capped by the ``task_wait_max`` option). A waiting request
+        holds an API worker for the whole wait. The response is streamed,
+        serializing each task as it is sent.
+        """
+        # Raises falcon.HTTPInvalidParam, answered with a 400
+        wait = req.get_param_as_int('wait', min_value=0, default=0)
+
         try:
+            wait = min(wait, config.config_mgr.conf.task_wait_max)
+            if wait:
+                self.wait_for_task(uuid.UUID(task_id), wait)
+
             builddata = req.get_param_as_bool('builddata')
             subtask_errors = req.get_param_as_bool('subtaskerrors')
+            errors_only = req.get_param_as_bool('errorsonly')
             try:
                 layers = int(req.params.get('layers', '0'))
             except Exception:
                 layers = 0
 
-            first_task = self.get_task(req, resp, task_id, builddata)
+            if layers or subtask_errors:
+                first_task, layer_tasks, errors = self.handle_layers(
+                    req, resp, task_id, subtask_errors, layers, errors_only)
+            else:
+                first_task = self.get_task(req, resp, task_id)
 
             if first_task is None:
                 self.info(req.context, "Task %s does not exist" % task_id)
@@ -397,23 +571,22 @@ class TaskResource(StatefulResource):
                                   retry=False)
             else:
                 # If layers is passed in then it returns a dict of tasks instead of the task dict.
+                # The tasks and their build data are read before streaming so
+                # an error is not sent after the response headers.
                 if layers:
-                    resp_data, errors = self.handle_layers(
-                        req, resp, task_id, builddata, subtask_errors, layers,
-                        first_task)
-                    # Includes subtask_errors if the query param 'subtaskerrors' is passed in as true.
-                    if (subtask_errors):
-                        resp_data['subtask_errors'] = errors
+                    resp_items = [('init_task_id', task_id)]
+                    resp_items.extend(
+                        (str(t.task_id), self.task_to_dict(t, builddata))
+                        for t in layer_tasks)
                 else:
-                    resp_data = first_task
-                    # Includes subtask_errors if the query param 'subtaskerrors' is passed in as true.
-                    if (subtask_errors):
-                        _, errors = self.handle_layers(req, resp, task_id,
-                                                       False, subtask_errors,
-                                                       1, first_task)
-                        resp_data['subtask_errors'] = errors
-
-                resp.text = json.dumps(resp_data)
+                    resp_items = list(
+                        self.task_to_dict(first_task, builddata).items())
+                # Includes subtask_errors if the query param 'subtaskerrors' is passed in as true.
+                if (subtask_errors):
+                    resp_items.append(('subtask_errors', errors))
+
+                resp.stream = self.stream_json_object(resp_items)
+                resp.content_type = falcon.MEDIA_JSON
                 resp.status = falcon.HTTP_200
         except Exception as ex:
             self.error(req.context, "Unknown error: %s" % (str(ex)))
@@ -422,58 +595,224 @@ class TaskResource(StatefulResource):
                               message="Unknown error",
                               retry=False)
 
-    def get_task(self, req, resp, task_id, builddata):
+    def wait_for_task(self, task_id, timeout):
+        """Wait up to ``timeout`` seconds for a task to finish.
+
+        Returns early if the task does not exist. The calling worker is
+        blocked for the whole wait.
+
+        :param task_id: uuid.UUID ID of the task
+        :param timeout: seconds to wait
+        """
+        deadline = time.monotonic() + timeout
+        with self.state_manager.watch_task(task_id) as subscription:
+            while True:
+                task = self.state_manager.get_task(task_id, messages=False)
+                if task is None or task.status in FINISHED_STATUSES:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                subscription.wait(min(remaining, self.recheck_interval))
+
+    def get_task(self, req, resp, task_id):
         try:
-            task = self.state_manager.get_task(uuid.UUID(task_id))
-            if task is None:
-                return None
+            return self.state_manager.get_task(uuid.UUID(task_id))
+        except Exception as ex:
+            self.error(req.context, "Unknown error: %s" % (str(ex)))
+            self.return_error(resp,
+                              falcon.HTTP_500,
+                              message="Unknown error",
+                              retry=False)
+
+    def task_to_dict(self, task, builddata):
+        task_dict = task.to_dict()
+
+        if builddata:
+            task_bd = self.state_manager.get_build_data(task_id=task.get_id())
+            task_dict['build_data'] = [bd.to_dict() for bd in task_bd]
+
+        return task_dict
+
+    def handle_layers(self,
+                      req,
+                      resp,
+                      task_id,
+                      subtask_errors,
+                      layers,
+                      errors_only=False):
+        """Load the subtask tree of a task with a single query.
+
+        Returns a tuple of the task, a list of the tasks within ``layers``
+        and a dict of subtask error results keyed by task ID. The task is
+        None if the task does not exist.
+        """
+        # Subtask errors are collected from the entire tree
+        if subtask_errors or layers < 0:
+            depth = None
+        else:
+            depth = layers
+
+        # Without layers only the subtasks with errors are of interest
+        if not layers:
+            errors_only = True
+
+        task_tree = self.state_manager.get_task_tree(uuid.UUID(task_id),
+                                                     depth=depth,
+                                                     errors_only=errors_only)
+        if not task_tree:
+            return None, None, None
+
+        first_task = None
+        layer_tasks = []
+        errors = {}
+        for task_depth, task in task_tree:
+            # first_task is layer 1
+            in_layers = task_depth == 1 or layers < 0 or task_depth <= layers
+            id = str(task.task_id)
+            if task_depth == 1:
+                first_task = task
+            if in_layers:
+                layer_tasks.append(task)
+            if task_depth > 1 and subtask_errors and task.result.error_count:
+                result = task.result.to_dict()
+                result['task_id'] = id
+                errors[id] = result
+        return first_task, layer_tasks, errors
+
+
+class TaskEventsResource(StatefulResource):
+    """Handler resource for /tasks/<id>/events singleton endpoint.
+
+    Streams server-sent events for a task until it is complete or
+    terminated. A ``task`` event carries the task without its result
+    messages and is sent initially and whenever the task changes. A
+    ``message`` event is sent for each result message, with the message
+    sequence as the event ID. A client reconnecting with a
+    ``Last-Event-ID`` header receives only the messages after that ID. An
+    ``end`` event is sent when the task is finished.
+
+    Each stream holds an API worker while it is open, so a stream is closed
+    after the ``task_events_max`` option with a ``retry`` field asking the
+    client to reconnect and resume from its last event ID.
+    """
+
+    # Seconds between checks of the task and keepalives to the client, in
+    # case a notification of its update is missed
+    recheck_interval = 10
+
+    # Milliseconds a client waits before reconnecting to a closed stream
+    reconnect_delay = 1000
 
-            task_dict = task.to_dict()
+    @policy.ApiEnforcer('physical_provisioner:read_task')
+    def on_get(self, req, resp, task_id):
+        """Handler for GET method."""
+        try:
+            task_id = uuid.UUID(task_id)
+        except ValueError:
+            self.return_error(resp,
+                              falcon.HTTP_400,
+                              message="Invalid task ID %s" % task_id,
+                              retry=False)
+            return
 
-            if builddata:
-                task_bd = self.state_manager.get_build_data(
-                    task_id=task.get_id())
-                task_dict['build_data'] = [bd.to_dict() for bd in task_bd]
+        last_event_id = req.get_header('Last-Event-ID')
+        try:
+            after = int(last_event_id) if last_event_id else None
+        except ValueError:
+            after = None
 
-            return task_dict
+        try:
+            # Subscribe before reading the task so no update is missed
+            subscription = self.state_manager.watch_task(task_id)
+            task = self.state_manager.get_task(task_id, messages=False)
+            if task is None:
+                subscription.close()
+                self.info(req.context, "Task %s does not exist" % task_id)
+                self.return_error(resp,
+                                  falcon.HTTP_404,
+                                  message="Task %s does not exist" % task_id,
+                                  retry=False)
+                return
         except Exception as ex:
             self.error(req.context, "Unknown error: %s" % (str(ex)))
             self.return_error(resp,
                               falcon.HTTP_500,
                               message="Unknown error",
                               retry=False)
+            return
 
-    def handle_layers(self, req, resp, task_id, builddata, subtask_errors,
-                      layers, first_task):
-        resp_data = {}
-        errors = {}
-        resp_data['init_task_id'] = task_id
-        resp_data[first_task['task_id']] = first_task
-        queued_ids = first_task['subtask_id_list']
-        # first_task is layer 1
-        current_layer = 1
-        # The while loop handles each layer.
-        while queued_ids and (current_layer < layers or layers == -1
-                              or subtask_errors):
-            # Copies the current list (a layer) then clears the queue for the next layer.
-            processing_ids = list(queued_ids)
-            queued_ids = []
-            # The for loop handles each task in a layer.
-            for id in processing_ids:
-                task = self.get_task(req, resp, id, builddata)
-                # Only adds the task if within the layers range.
-                if current_layer < layers or layers == -1:
-                    resp_data[id] = task
-                if task:
-                    queued_ids.extend(task.get('subtask_id_list', []))
-                    if task.get('result', {}).get('details', {}).get(
-                            'errorCount', 0) > 0 and subtask_errors:
-                        result = task.get('result', {})
-                        result['task_id'] = id
-                        errors[id] = task.get('result', {})
-            # Finished this layer, incrementing for the next while loop.
-            current_layer = current_layer + 1
-        return resp_data, errors
+        resp.content_type = 'text/event-stream'
+        resp.set_header('Cache-Control', 'no-cache')
+        resp.stream = self.stream_events(subscription, task, after)
+        resp.status = falcon.HTTP_200
+
+    def stream_events(self, subscription, task, after=None):
+        """Yield the encoded events of a task until it is finished.
+
+        Stops after ``task_events_max`` seconds, asking the client to
+        reconnect.
+
+        :param subscription: listener.Subscription for the task
+        :param task: the objects.Task to stream events for
+        :param after: sequence of the last result message already sent
+        """
+        task_id = task.get_id()
+        last_task = None
+        deadline = time.monotonic() + config.config_mgr.conf.task_events_max
+        try:
+            while True:
+                events = []
+                if task is not None:
+                    task_dict = task.to_dict()
+                    task_dict['result'].pop('details', None)
+                    task_json = json.dumps(task_dict)
+                    if task_json != last_task:
+                        events.append(self.format_event('task', task_json))
+                        last_task = task_json
+
+                for sequence, msg in self.state_manager.get_result_messages(
+                        task_id, after=after):
+                    events.append(
+                        self.format_event('message',
+                                          json.dumps(msg.to_dict()),
+                                          event_id=sequence))
+                    after = sequence
+
+                if task is None or task.status in FINISHED_STATUSES:
+                    events.append(self.format_event('end', '{}'))
+                    yield ''.join(events).encode('utf-8')
+                    return
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # The client reconnects with its Last-Event-ID
+                    events.append('retry: %d\n\n' % self.reconnect_delay)
+                    yield ''.join(events).encode('utf-8')
+                    return
+
+                # A comment keeps idle connections open
+                yield (''.join(events) or ': keepalive\n\n').encode('utf-8')
+
+                subscription.wait(min(remaining, self.recheck_interval))
+                task = self.state_manager.get_task(task_id, messages=False)
+        finally:
+            subscription.close()
+
+    @staticmethod
+    def format_event(event, data, event_id=None):
+        """Format a server-sent event.
+
+        :param event: the event type
+        :param data: the single line event data
+        :param event_id: optional event ID
+        """
+        lines = []
+        if event_id is not None:
+            lines.append('id: %s' % event_id)
+        lines.append('event: %s' % event)
+        lines.append('data: %s' % data)
+        return '\n'.join(lines) + '\n\n'
 
 
 class TaskBuilddataResource(StatefulResource):
@@ -481,13 +820,26 @@ class TaskBuilddataResource(StatefulResource):
 
     @policy.ApiEnforcer('physical_provisioner:read_build_data')
     def on_get(self, req, resp, task_id):
+        """Handler for GET method.
+
+        ``verbosity=1`` returns a summary of the build data without the
+        collected data elements. The list is streamed as it is read.
+        """
+        verbosity = req.get_param_as_int('verbosity',
+                                         min_value=1,
+                                         max_value=2,
+                                         default=2)
         try:
-            bd_list = self.state_manager.get_build_data(
-                task_id=uuid.UUID(task_id))
-            if not bd_list:
+            bd_list = self.state_manager.stream_build_data(
+                task_id=uuid.UUID(task_id), verbosity=verbosity)
+            first_bd = next(bd_list, None)
+            if first_bd is None:
                 resp.status = falcon.HTTP_404
                 return
-            resp.text = json.dumps([bd.to_dict() for bd in bd_list])
+            resp.stream = self.stream_json_list(
+                bd.to_dict(verbosity=verbosity)
+                for bd in itertools.chain([first_bd], bd_list))
+            resp.content_type = falcon.MEDIA_JSON
         except Exception as e:
             self.error(req.context, "Unknown error: %s" % (str(e)))
             resp.text = "Unexpected error."
@@ -43,6 +43,16 @@ class ProviderDriver(object):
         # These are the actions that this driver supports
         self.supported_actions = [hd_fields.OrchestratorAction.Noop]
 
+    def submit_action(self, action):
+        """Start ``action`` on this driver's executor pool for its task.
+
+        :param action: instance of orchestrator.actions.BaseAction
+        :return: concurrent.futures.Future instance
+        """
+        return self.orchestrator.executor.submit_action(
+            "%s.%s" % (self.driver_key, action.task.action),
+            action.task.get_id(), action)
+
     def execute_task(self, task_id):
         task = self.state_manager.get_task(task_id)
         task_action = task.action
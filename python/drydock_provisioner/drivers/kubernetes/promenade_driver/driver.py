@@ -81,38 +81,39 @@ class PromenadeDriver(KubernetesDriver):
             else:
                 target_nodes = self.orchestrator.get_target_nodes(task)
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=64) as e:
-                subtask_futures = dict()
-                for n in target_nodes:
-                    prom_client = PromenadeClient()
-                    nf = self.orchestrator.create_nodefilter_from_nodelist([n])
-                    subtask = self.orchestrator.create_task(
-                        design_ref=task.design_ref,
-                        action=task.action,
-                        node_filter=nf,
-                        retry=task.retry)
-                    task.register_subtask(subtask)
-
-                    action = self.action_class_map.get(task.action, None)(
-                        subtask,
-                        self.orchestrator,
-                        self.state_manager,
-                        prom_client=prom_client)
-                    subtask_futures[subtask.get_id().bytes] = e.submit(
-                        action.start)
-
-                timeout = action_timeouts.get(
-                    task.action, config.config_mgr.conf.timeouts.relabel_node)
-                finished, running = concurrent.futures.wait(
-                    subtask_futures.values(), timeout=(timeout * 60))
+            subtask_futures = dict()
+            for n in target_nodes:
+                prom_client = PromenadeClient()
+                nf = self.orchestrator.create_nodefilter_from_nodelist([n])
+                subtask = self.orchestrator.create_task(
+                    design_ref=task.design_ref,
+                    action=task.action,
+                    node_filter=nf,
+                    retry=task.retry)
+                task.register_subtask(subtask)
+
+                action = self.action_class_map.get(task.action, None)(
+                    subtask,
+                    self.orchestrator,
+                    self.state_manager,
+                    prom_client=prom_client)
+                subtask_futures[subtask.get_id().bytes] = self.submit_action(
+                    action)
+
+            timeout = action_timeouts.get(
+                task.action, config.config_mgr.conf.timeouts.relabel_node)
+            finished, running = concurrent.futures.wait(
+                subtask_futures.values(), timeout=(timeout * 60))
 
             for t, f in subtask_futures.items():
                 if not f.done():
-                    task.add_status_msg("Subtask timed out before completing.",
-                                        error=True,
-                                        ctx=str(uuid.UUID(bytes=t)),
-                                        ctx_type='task')
+                    task.add_status_msg(
+                        msg="Subtask timed out before completing.",
+                        error=True,
+                        ctx=str(uuid.UUID(bytes=t)),
+                        ctx_type='task')
                     task.failure()
+                    f.cancel()
                 else:
                     if f.exception():
                         msg = ("Subtask %s raised unexpected exception: %s" %
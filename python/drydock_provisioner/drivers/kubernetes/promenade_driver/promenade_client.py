@@ -20,6 +20,7 @@ from urllib.parse import urlparse
 from keystoneauth1 import exceptions as exc
 
 import drydock_provisioner.error as errors
+import drydock_provisioner.metrics as metrics
 from drydock_provisioner.util import KeystoneUtils
 
 
@@ -270,7 +271,10 @@ class PromenadeClient(object):
         self.logger.debug("promenade_client is calling %s API: body is %s" %
                           (route, str(node_labels)))
 
-        resp = self.session.put(route, data=node_labels)
+        with metrics.external_request('promenade', 'v1.0/node-labels/{id}',
+                                      'PUT') as req_metrics:
+            resp = self.session.put(route, data=node_labels)
+            req_metrics.status = resp.status_code
 
         self._check_response(resp)
 
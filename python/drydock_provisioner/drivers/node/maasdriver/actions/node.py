@@ -13,6 +13,7 @@
 # limitations under the License.
 """Task driver for completing node provisioning with Canonical MaaS 2.2+."""
 
+import asyncio
 import time
 import secrets  # Use secrets for cryptographic random numbers
 import logging
@@ -30,6 +31,7 @@ import drydock_provisioner.objects as objects
 
 from drydock_provisioner.control.util import get_internal_api_href
 from drydock_provisioner.orchestrator.actions.orchestrator import BaseAction
+from drydock_provisioner.drivers.node.maasdriver.api_client import AsyncMaasRequestFactory
 from drydock_provisioner.drivers.node.maasdriver.errors import RackControllerConflict
 from drydock_provisioner.drivers.node.maasdriver.errors import ApiNotAvailable
 
@@ -37,10 +39,12 @@ import drydock_provisioner.drivers.node.maasdriver.models.fabric as maas_fabric
 import drydock_provisioner.drivers.node.maasdriver.models.vlan as maas_vlan
 import drydock_provisioner.drivers.node.maasdriver.models.subnet as maas_subnet
 import drydock_provisioner.drivers.node.maasdriver.models.machine as maas_machine
+import drydock_provisioner.drivers.node.maasdriver.models.node_results as maas_nr
 import drydock_provisioner.drivers.node.maasdriver.models.tag as maas_tag
 import drydock_provisioner.drivers.node.maasdriver.models.sshkey as maas_keys
 import drydock_provisioner.drivers.node.maasdriver.models.boot_resource as maas_boot_res
 import drydock_provisioner.drivers.node.maasdriver.models.rack_controller as maas_rack
+import drydock_provisioner.drivers.node.maasdriver.models.blockdev as maas_blockdev
 import drydock_provisioner.drivers.node.maasdriver.models.partition as maas_partition
 import drydock_provisioner.drivers.node.maasdriver.models.volumegroup as maas_vg
 import drydock_provisioner.drivers.node.maasdriver.models.repository as maas_repo
@@ -48,29 +52,106 @@ import drydock_provisioner.drivers.node.maasdriver.models.domain as maas_domain
 
 class BaseMaasAction(BaseAction):
 
+    # MaaS result types saved as build data by finish_stage, mapped to the
+    # stage name used as the build data generator prefix
+    result_stages = None
+
     def __init__(self, *args, maas_client=None):
         super().__init__(*args)
 
         self.maas_client = maas_client
+        self.stage_data = None
+
+        # Nodes this action finished, as (objects.BaremetalNode,
+        # maas_machine.Machine) tuples, and build data it collected. Both
+        # are saved by finish_stage once all nodes of the stage are done
+        self.finished_machines = []
+        self.build_data = []
 
         self.logger = logging.getLogger(
             config.config_mgr.conf.logging.nodedriver_logger_name)
 
-    def _add_detail_logs(self, node, machine, stage, result_type='all'):
-        result_details = machine.get_task_results(result_type=result_type)
-        for r in result_details:
-            if r.get_decoded_data():
-                bd = objects.BuildData(node_name=node.name,
-                                       task_id=self.task.task_id,
-                                       collected_date=r.updated,
-                                       generator="{}:{}".format(stage, r.name),
-                                       data_format='text/plain',
-                                       data_element=r.get_decoded_data())
-                self.state_manager.post_build_data(bd)
-        log_href = "%s/tasks/%s/builddata" % (get_internal_api_href("v1.0"),
-                                              str(self.task.task_id))
-        self.task.result.add_link('detail_logs', log_href)
-        self.task.save()
+    @classmethod
+    def prepare_stage(cls, task, nodes, orchestrator, state_manager,
+                      maas_client):
+        """Prepare data shared by the actions for all nodes of a task.
+
+        Called once by the driver before the actions for the nodes of
+        ``task`` are started. The returned value is set as ``stage_data``
+        on each of the actions.
+
+        :param task: the task the node actions are subtasks of
+        :param nodes: list of objects.BaremetalNode targeted by the task
+        :param orchestrator: orchestrator.Orchestrator instance
+        :param state_manager: state.DrydockState instance
+        :param maas_client: api_client.MaasRequestFactory instance
+        :return: data for the actions or None
+        """
+        return None
+
+    @classmethod
+    def finish_stage(cls, task, actions, orchestrator, state_manager,
+                     maas_client):
+        """Save the build data of all actions for the nodes of a task.
+
+        Called once by the driver after the actions for the nodes of
+        ``task`` are done. The MaaS results of the machines finished by
+        all ``actions`` are fetched with a single NodeResults query and
+        saved, along with the build data the actions collected, in one
+        batch.
+
+        :param task: the task the node actions are subtasks of
+        :param actions: list of the actions that ran to completion
+        :param orchestrator: orchestrator.Orchestrator instance
+        :param state_manager: state.DrydockState instance
+        :param maas_client: api_client.MaasRequestFactory instance
+        """
+        build_data = [bd for a in actions for bd in a.build_data]
+        nodes = {
+            m.resource_id: (a, n)
+            for a in actions for n, m in a.finished_machines
+        }
+
+        if nodes and cls.result_stages:
+            if len(cls.result_stages) == 1:
+                result_type = list(cls.result_stages.keys())[0]
+            else:
+                result_type = 'all'
+            node_results = maas_nr.NodeResults(maas_client,
+                                               system_id_list=list(nodes),
+                                               result_type=result_type)
+            node_results.refresh()
+            results_by_node = node_results.group_by_system_id()
+
+            for system_id, results in results_by_node.items():
+                action_node = nodes.get(system_id)
+                if action_node is None and len(nodes) == 1:
+                    # Results without a node reference can only be for
+                    # the single node queried
+                    action_node = list(nodes.values())[0]
+                if action_node is None:
+                    continue
+                action, node = action_node
+                for r in results:
+                    stage = cls.result_stages.get(r.get_type_desc())
+                    if stage and r.get_decoded_data():
+                        bd = objects.BuildData(
+                            node_name=node.name,
+                            task_id=action.task.task_id,
+                            collected_date=r.updated,
+                            generator="{}:{}".format(stage, r.name),
+                            data_format='text/plain',
+                            data_element=r.get_decoded_data())
+                        build_data.append(bd)
+
+        state_manager.post_build_data_list(build_data)
+
+        for a in actions:
+            if a.finished_machines:
+                log_href = "%s/tasks/%s/builddata" % (
+                    get_internal_api_href("v1.0"), str(a.task.task_id))
+                a.task.result.add_link('detail_logs', log_href)
+                a.task.save()
 
 
 class ValidateNodeServices(BaseMaasAction):
@@ -1180,6 +1261,8 @@ class IdentifyNode(BaseMaasAction):
 class ConfigureHardware(BaseMaasAction):
     """Action to start commissioning a server."""
 
+    result_stages = {'commissioning': 'commission', 'testing': 'testing'}
+
     def start(self):
         try:
             maas_machine.Machines(self.maas_client).empty_refresh()
@@ -1213,6 +1296,11 @@ class ConfigureHardware(BaseMaasAction):
         nodes = self.orchestrator.process_node_filter(self.task.node_filter,
                                                       site_design)
 
+        # Nodes that finished commissioning and their collected build data,
+        # saved by finish_stage once all nodes of the stage are done
+        commissioned = []
+        build_data = []
+
         # TODO(sh8121att): Better way of representing the node statuses than static strings
         for n in nodes:
             try:
@@ -1271,7 +1359,8 @@ class ConfigureHardware(BaseMaasAction):
                                                      ctx=n.name,
                                                      ctx_type='node')
                             self.task.success(focus=n.get_id())
-                            self.collect_build_data(machine)
+                            build_data.extend(
+                                self.collect_build_data(machine))
                         else:
                             msg = "Node %s failed commissioning." % (n.name)
                             self.logger.info(msg)
@@ -1280,14 +1369,7 @@ class ConfigureHardware(BaseMaasAction):
                                                      ctx=n.name,
                                                      ctx_type='node')
                             self.task.failure(focus=n.get_id())
-                        self._add_detail_logs(n,
-                                              machine,
-                                              'commission',
-                                              result_type='commissioning')
-                        self._add_detail_logs(n,
-                                              machine,
-                                              'testing',
-                                              result_type='testing')
+                        commissioned.append((n, machine))
                     elif machine.status_name in ['Commissioning', 'Testing']:
                         msg = "Located node %s in MaaS, node already being commissioned. Skipping..." % (
                             n.name)
@@ -1337,13 +1419,21 @@ class ConfigureHardware(BaseMaasAction):
                                          ctx_type='node')
                 self.task.failure(focus=n.get_id())
 
+        self.finished_machines = commissioned
+        self.build_data = build_data
+
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
     def collect_build_data(self, machine):
-        """Collect MaaS build data after commissioning."""
+        """Collect MaaS build data after commissioning.
+
+        :param machine: instance of maas_machine.Machine to collect data for
+        :return: list of objects.BuildData to be saved
+        """
         self.logger.debug("Collecting build data for %s" % machine.hostname)
+        build_data = []
         try:
             data = machine.get_details()
             if data:
@@ -1360,7 +1450,7 @@ class ConfigureHardware(BaseMaasAction):
                                            data_element=d.decode())
                     self.logger.debug("Saving build data from generator %s" %
                                       t)
-                    self.state_manager.post_build_data(bd)
+                    build_data.append(bd)
                     self.task.add_status_msg(msg="Saving build data element.",
                                              error=False,
                                              ctx=machine.hostname,
@@ -1369,6 +1459,7 @@ class ConfigureHardware(BaseMaasAction):
             self.logger.error("Error collecting node build data for %s" %
                               machine.hostname,
                               exc_info=ex)
+        return build_data
 
 
 class ApplyNodeNetworking(BaseMaasAction):
@@ -2124,12 +2215,26 @@ class ApplyNodeStorage(BaseMaasAction):
 
             try:
                 """
-                1. Clear VGs
-                2. Clear partitions
-                3. Apply partitioning
-                4. Create VGs
-                5. Create logical volumes
+                1. Plan the storage layout and skip nodes already matching it
+                2. Clear VGs
+                3. Clear partitions
+                4. Apply partitioning
+                5. Create VGs
+                6. Create logical volumes
                 """
+                storage_plan = StoragePlan(n)
+
+                if storage_plan.matches(machine):
+                    msg = ("Storage layout on node %s already matches the "
+                           "design, skipping." % n.name)
+                    self.logger.info(msg)
+                    self.task.add_status_msg(msg=msg,
+                                             error=False,
+                                             ctx=n.name,
+                                             ctx_type='node')
+                    self.task.success(focus=n.get_id())
+                    continue
+
                 msg = "Clearing current storage layout on node %s." % n.name
                 self.logger.debug(msg)
                 self.task.add_status_msg(msg=msg,
@@ -2138,42 +2243,7 @@ class ApplyNodeStorage(BaseMaasAction):
                                          ctx_type='node')
                 machine.reset_storage_config()
 
-                (root_dev, root_block) = n.find_fs_block_device('/')
-                (boot_dev, boot_block) = n.find_fs_block_device('/boot')
-
-                storage_layout = dict()
-                if isinstance(root_block, hostprofile.HostPartition):
-                    storage_layout['layout_type'] = 'flat'
-                    storage_layout['root_device'] = n.get_logicalname(
-                        root_dev.name)
-                    storage_layout[
-                        'root_size'] = ApplyNodeStorage.calculate_bytes(
-                            root_block.size)
-                elif isinstance(root_block, hostprofile.HostVolume):
-                    storage_layout['layout_type'] = 'lvm'
-                    if len(root_dev.physical_devices) != 1:
-                        msg = "Root LV in VG with multiple physical devices on node %s" % (
-                            n.name)
-                        self.logger.error(msg)
-                        self.task.add_status_msg(msg=msg,
-                                                 error=True,
-                                                 ctx=n.name,
-                                                 ctx_type='node')
-                        self.task.failure(focus=n.get_id())
-                        continue
-                    storage_layout['root_device'] = n.get_logicalname(
-                        root_dev.physical_devices[0])
-                    storage_layout[
-                        'root_lv_size'] = ApplyNodeStorage.calculate_bytes(
-                            root_block.size)
-                    storage_layout['root_lv_name'] = root_block.name
-                    storage_layout['root_vg_name'] = root_dev.name
-
-                if boot_block is not None:
-                    storage_layout[
-                        'boot_size'] = ApplyNodeStorage.calculate_bytes(
-                            boot_block.size)
-
+                storage_layout = storage_plan.layout
                 msg = "Setting node %s root storage layout: %s" % (
                     n.name, str(storage_layout))
                 self.logger.debug(msg)
@@ -2182,6 +2252,10 @@ class ApplyNodeStorage(BaseMaasAction):
                                          ctx=n.name,
                                          ctx_type='node')
                 machine.set_storage_layout(**storage_layout)
+
+                # Single snapshot of the devices after the root layout that
+                # the partition sizes are planned against
+                machine.block_devices.refresh()
                 vg_devs = {}
 
                 for d in n.storage_devices:
@@ -2218,9 +2292,7 @@ class ApplyNodeStorage(BaseMaasAction):
                                 "Skipping manually configuring a system partition."
                             )
                             continue
-                        maas_dev.refresh()
-                        size = ApplyNodeStorage.calculate_bytes(
-                            size_str=p.size, context=maas_dev)
+                        size = storage_plan.allocate(maas_dev, p.size)
                         part = maas_partition.Partition(self.maas_client,
                                                         size=size,
                                                         bootable=p.bootable)
@@ -2311,15 +2383,17 @@ class ApplyNodeStorage(BaseMaasAction):
                                              ctx_type='node')
 
                     for lv in v.logical_volumes:
-                        calc_size = ApplyNodeStorage.calculate_bytes(
-                            size_str=lv.size, context=maas_volgroup)
+                        calc_size = storage_plan.allocate(
+                            maas_volgroup, lv.size)
                         bd_id = maas_volgroup.create_lv(name=lv.name,
                                                         uuid_str=lv.lv_uuid,
                                                         size=calc_size)
 
                         if lv.mountpoint is not None:
-                            machine.refresh()
-                            maas_lv = machine.block_devices.select(bd_id)
+                            # Logical volumes have no partitions to load
+                            maas_lv = maas_blockdev.BlockDevice(
+                                self.maas_client, resource_id=bd_id)
+                            maas_lv.system_id = machine.resource_id
                             msg = "Formatting LV %s as filesystem on node %s." % (
                                 lv.name, n.name)
                             self.logger.debug(msg)
@@ -2421,188 +2495,335 @@ class ApplyNodeStorage(BaseMaasAction):
         return computed_size
 
 
+class StoragePlan(object):
+    """Storage layout of a node planned from its design.
+
+    The plan is compared with one snapshot of the machine storage so an
+    unchanged layout is left alone. When it is applied, sizes relative to a
+    device or volume group (``>`` and ``%``) are resolved against a single
+    snapshot by tracking the space each planned partition or logical volume
+    takes instead of re-reading the device from MaaS.
+
+    :param node: instance of objects.BaremetalNode to plan storage for
+    """
+
+    # MaaS aligns partitions and logical volumes, so sizes reported by
+    # MaaS can differ from the requested sizes by up to this amount
+    SIZE_ALIGNMENT = 1024 * 1024 * 4
+
+    def __init__(self, node):
+        self.node = node
+        self.layout = self._plan_layout()
+        self.spaces = dict()
+
+    def _plan_layout(self):
+        """Plan the MaaS storage layout holding the root filesystem."""
+        n = self.node
+        (root_dev, root_block) = n.find_fs_block_device('/')
+        (boot_dev, boot_block) = n.find_fs_block_device('/boot')
+
+        storage_layout = dict()
+        if isinstance(root_block, hostprofile.HostPartition):
+            storage_layout['layout_type'] = 'flat'
+            storage_layout['root_device'] = n.get_logicalname(root_dev.name)
+            storage_layout['root_size'] = ApplyNodeStorage.calculate_bytes(
+                root_block.size)
+        elif isinstance(root_block, hostprofile.HostVolume):
+            storage_layout['layout_type'] = 'lvm'
+            if len(root_dev.physical_devices) != 1:
+                raise errors.DriverError(
+                    "Root LV in VG with multiple physical devices on node %s" %
+                    (n.name))
+            storage_layout['root_device'] = n.get_logicalname(
+                root_dev.physical_devices[0])
+            storage_layout['root_lv_size'] = ApplyNodeStorage.calculate_bytes(
+                root_block.size)
+            storage_layout['root_lv_name'] = root_block.name
+            storage_layout['root_vg_name'] = root_dev.name
+
+        if boot_block is not None:
+            storage_layout['boot_size'] = ApplyNodeStorage.calculate_bytes(
+                boot_block.size)
+
+        return storage_layout
+
+    def allocate(self, context, size_str):
+        """Plan the size of a partition or logical volume in ``context``.
+
+        The space of ``context`` is read from the snapshot the first time it
+        is used and reduced by each size planned in it afterwards.
+
+        :param context: instance of maasdriver.models.blockdev.BlockDevice or
+                        maasdriver.models.volumegroup.VolumeGroup
+        :param size_str: the size string of the partition or logical volume
+        :return: the planned size in bytes
+        """
+        key = (type(context).__name__, context.resource_id)
+        if key not in self.spaces:
+            self.spaces[key] = PlannedSpace(context.size,
+                                            context.available_size)
+        space = self.spaces[key]
+
+        size = ApplyNodeStorage.calculate_bytes(size_str=size_str,
+                                                context=space)
+        space.available_size = max(0, space.available_size - self._align(size))
+
+        return size
+
+    def matches(self, machine):
+        """Check if the storage of ``machine`` already has this layout.
+
+        Only the block devices, partitions and volume groups already loaded
+        with ``machine`` are used, so this makes no MaaS API calls.
+
+        :param machine: instance of maasdriver.models.machine.Machine
+        """
+        n = self.node
+
+        if machine.block_devices is None or machine.volume_groups is None:
+            return False
+
+        current = dict()
+        for d in machine.block_devices:
+            if d.type != 'physical':
+                continue
+            if d.partitions is None:
+                return False
+            current[d.name] = list(d.partitions)
+
+        root_device = self.layout.get('root_device')
+        wanted = []
+        if self.layout.get('layout_type') == 'flat':
+            wanted.append((root_device,
+                           dict(size=self.layout.get('root_size'),
+                                mountpoint='/')))
+        elif self.layout.get('layout_type') == 'lvm':
+            wanted.append((root_device, dict(fstype='lvm-pv')))
+        if self.layout.get('boot_size'):
+            wanted.append((root_device,
+                           dict(size=self.layout.get('boot_size'),
+                                mountpoint='/boot')))
+
+        vg_names = set()
+        for d in n.storage_devices:
+            dev_name = n.get_logicalname(d.name)
+            if d.volume_group is not None:
+                maas_dev = machine.block_devices.singleton({'name': dev_name})
+                if (maas_dev is None or current.get(dev_name)
+                        or self._fs(maas_dev).get('fstype') != 'lvm-pv'):
+                    return False
+                vg_names.add(d.volume_group)
+                continue
+            for p in d.partitions:
+                if p.is_sys():
+                    continue
+                if p.volume_group is not None:
+                    vg_names.add(p.volume_group)
+                    want = dict(fstype='lvm-pv')
+                else:
+                    want = dict(fstype=p.fstype if p.mountpoint else None,
+                                mountpoint=p.mountpoint,
+                                mount_options=p.mount_options,
+                                fs_uuid=p.fs_uuid,
+                                fs_label=p.fs_label)
+                want['size'] = self._fixed_size(p.size)
+                want['uuid'] = p.part_uuid
+                wanted.append((dev_name, want))
+
+        # Each planned partition claims one existing partition, anything
+        # left over besides the EFI system partition is not in the design
+        for dev_name, want in wanted:
+            match = None
+            for part in current.get(dev_name, []):
+                if self._part_matches(part, want):
+                    match = part
+                    break
+            if match is None:
+                return False
+            current[dev_name].remove(match)
+
+        for parts in current.values():
+            for part in parts:
+                if self._fs(part).get('mount_point') != '/boot/efi':
+                    return False
+
+        if self.layout.get('layout_type') == 'lvm':
+            vg_names.add(self.layout.get('root_vg_name'))
+
+        maas_vgs = {vg.name: vg for vg in machine.volume_groups}
+        if set(maas_vgs.keys()) != vg_names:
+            return False
+
+        for v in n.volume_groups:
+            if v.name not in vg_names:
+                continue
+            maas_lvs = maas_vgs[v.name].logical_volumes or dict()
+            lv_names = set(lv.name for lv in v.logical_volumes)
+            if set(maas_lvs.keys()) != lv_names:
+                return False
+            for lv in v.logical_volumes:
+                maas_lv = machine.block_devices.select(maas_lvs[lv.name])
+                if maas_lv is None:
+                    return False
+                want = dict(size=self._fixed_size(lv.size),
+                            fstype=lv.fstype if lv.mountpoint else None,
+                            mountpoint=lv.mountpoint,
+                            mount_options=lv.mount_options,
+                            fs_uuid=lv.fs_uuid)
+                if not self._part_matches(maas_lv, want):
+                    return False
+
+        return True
+
+    def _part_matches(self, part, want):
+        """Check a MaaS partition or block device against a planned one."""
+        fs = self._fs(part)
+
+        if want.get('size') is not None and abs(
+                int(part.size) - want['size']) > self.SIZE_ALIGNMENT:
+            return False
+        if want.get('uuid') is not None and str(
+                getattr(part, 'uuid', None)) != str(want['uuid']):
+            return False
+        if want.get('fstype') is not None and fs.get(
+                'fstype') != want['fstype']:
+            return False
+        if fs.get('mount_point') != want.get('mountpoint'):
+            return False
+        if want.get('mountpoint') is not None:
+            mount_options = want.get('mount_options') or 'defaults'
+            if (fs.get('mount_options') or 'defaults') != mount_options:
+                return False
+        if want.get('fs_uuid') is not None and str(fs.get('uuid')) != str(
+                want['fs_uuid']):
+            return False
+        if want.get('fs_label') is not None and fs.get(
+                'label') != want['fs_label']:
+            return False
+        return True
+
+    def _fs(self, part):
+        """Return the filesystem dict of a MaaS partition or block device."""
+        return getattr(part, 'filesystem', None) or dict()
+
+    def _fixed_size(self, size_str):
+        """Return the size in bytes of a size string not relative to a context."""
+        if size_str.startswith('>') or size_str.endswith('%'):
+            return None
+        return ApplyNodeStorage.calculate_bytes(size_str=size_str)
+
+    def _align(self, size):
+        """Round ``size`` up to the MaaS alignment."""
+        return -(-size // self.SIZE_ALIGNMENT) * self.SIZE_ALIGNMENT
+
+
+class PlannedSpace(object):
+    """Space of a block device or volume group tracked by a StoragePlan."""
+
+    def __init__(self, size, available_size):
+        self.size = int(size)
+        self.available_size = int(available_size)
+
+
 class DeployNode(BaseMaasAction):
     """Action to write persistent OS to node."""
 
-    def start(self):
+    result_stages = {'deploy': 'deploy'}
+
+    @classmethod
+    def prepare_stage(cls, task, nodes, orchestrator, state_manager,
+                      maas_client):
+        """Create the boot action contexts for all nodes to be deployed.
+
+        The site design is compiled once and the contexts of the nodes MaaS
+        reports as ready or allocated are saved in bulk. Nodes already
+        deployed keep their existing contexts. The node statuses are read
+        from a single listing of the MaaS machines.
+
+        :return: dict of the compiled ``site_design`` and of the
+                 ``identity_keys`` and ``package_lists`` of the prepared
+                 nodes keyed by node name
+        """
+        design_status, site_design = orchestrator.get_effective_site(
+            task.design_ref)
+        if (design_status is None
+                or design_status.status == hd_fields.ActionResult.Failure):
+            return None
+
+        node_names = [n.name for n in nodes]
+        machines = dict()
+        for m in maas_machine.Machines(maas_client).get_machine_list():
+            status_name = m.get('status_name') or ''
+            if m.get('hostname') in node_names and (
+                    status_name == 'Ready'
+                    or status_name.startswith('Allocated')):
+                machines[m.get('hostname')] = m
+        nodenames = list(machines.keys())
+
+        identity_keys = orchestrator.create_bootaction_contexts(
+            nodenames, task, site_design=site_design)
+        package_lists = {
+            name:
+            orchestrator.find_node_package_lists(name,
+                                                 task,
+                                                 site_design=site_design)
+            for name in nodenames
+        }
+
+        # Replace the boot action id key tags of all nodes from one
+        # snapshot of the tag list
+        tags = maas_tag.TagReconciler(maas_client)
+        for name in nodenames:
+            ba_key = identity_keys.get(name)
+            tags.replace("%s__baid__" % name,
+                         "%s__baid__%s" %
+                         (name, ba_key.hex()) if ba_key is not None else None,
+                         machines[name].get('system_id'))
+        failed_tags = tags.commit()
+        tagged = [
+            name for name in nodenames
+            if not any(t.startswith("%s__baid__" % name) for t in failed_tags)
+        ]
+
+        return dict(site_design=site_design,
+                    identity_keys=identity_keys,
+                    package_lists=package_lists,
+                    tagged=tagged)
+
+    async def start_async(self):
         try:
             machine_list = maas_machine.Machines(self.maas_client)
-            machine_list.empty_refresh()
+            await self.run_blocking(machine_list.empty_refresh)
         except Exception as ex:
             self.logger.debug("Error accessing the MaaS API.", exc_info=ex)
-            self.task.set_status(hd_fields.TaskStatus.Complete)
-            self.task.failure()
-            self.task.add_status_msg(msg="Error accessing MaaS API: %s" %
-                                     str(ex),
-                                     error=True,
-                                     ctx='NA',
-                                     ctx_type='NA')
-            self.task.save()
+            await self.run_blocking(self._fail_task,
+                                    "Error accessing MaaS API: %s" % str(ex))
             return
 
         self.task.set_status(hd_fields.TaskStatus.Running)
-        self.task.save()
+        await self.run_blocking(self.task.save)
 
         try:
-            site_design = self._load_site_design()
+            # The design compiled for the stage is shared by all its nodes
+            site_design = (self.stage_data or dict()).get('site_design')
+            if site_design is None:
+                site_design = await self.run_blocking(self._load_site_design)
         except errors.OrchestratorError:
-            self.task.add_status_msg(msg="Error loading site design.",
-                                     error=True,
-                                     ctx='NA',
-                                     ctx_type='NA')
-            self.task.set_status(hd_fields.TaskStatus.Complete)
-            self.task.failure()
-            self.task.save()
+            await self.run_blocking(self._fail_task,
+                                    "Error loading site design.")
             return
 
         nodes = self.orchestrator.process_node_filter(self.task.node_filter,
                                                       site_design)
 
-        for n in nodes:
-            try:
-                machine = find_node_in_maas(self.maas_client, n)
-
-                if type(machine) is maas_rack.RackController:
-                    msg = "Skipping configuration of rack controller %s." % n.name
-                    self.logger.info(msg)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.task.success(focus=n.name)
-                    continue
-                elif machine.status_name.startswith(
-                        'Deployed') or machine.status_name.startswith(
-                            'Deploying'):
-                    msg = "Node %s already deployed or deploying, skipping." % (
-                        n.name)
-                    self.logger.info(msg)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.task.success(focus=n.name)
-                    continue
-                elif machine.status_name == 'Ready':
-                    msg = "Acquiring node %s for deployment" % (n.name)
-                    self.logger.info(msg)
-                    machine = machine_list.acquire_node(n.name)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                elif machine.status_name.startswith('Allocated'):
-                    msg = "Node %s already acquired." % (n.name)
-                    self.logger.info(msg)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                else:
-                    msg = "Unexpected status %s for node %s, skipping deployment." % (
-                        machine.status_name, n.name)
-                    self.logger.warning(msg)
-                    self.task.add_status_msg(msg=msg,
-                                             error=True,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.task.failure(focus=n.get_id())
-                    continue
-            except errors.DriverError as dex:
-                msg = "Error acquiring node %s, skipping" % n.name
-                self.logger.warning(msg, exc_info=dex)
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.task.failure(focus=n.get_id())
-                continue
+        maas_async = AsyncMaasRequestFactory(self.maas_client,
+                                             self.run_blocking)
 
-            # Set owner data in MaaS
-            try:
-                self.logger.info("Setting node %s owner data." % n.name)
-                for k, v in n.owner_data.items():
-                    msg = "Set owner data %s = %s for node %s" % (k, v, n.name)
-                    self.logger.debug(msg)
-                    machine.set_owner_data(k, v)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-            except Exception as ex:
-                msg = "Error setting node %s owner data" % n.name
-                self.logger.warning(msg + ": " + str(ex))
-                self.task.failure(focus=n.get_id())
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                continue
-
-            # Saving boot action context for a node
-            self.logger.info("Saving Boot Action context for node %s." %
-                             (n.name))
-            try:
-                ba_key = self.orchestrator.create_bootaction_context(
-                    n.name, self.task)
-
-                tag_list = maas_tag.Tags(self.maas_client)
-                tag_list.refresh()
-                node_id_tags = tag_list.startswith("%s__baid__" % (n.name))
-                for t in node_id_tags:
-                    t.delete()
-
-                if ba_key is not None:
-                    msg = "Creating boot action id key tag for node %s" % (
-                        n.name)
-                    self.logger.debug(msg)
-                    node_baid_tag = maas_tag.Tag(self.maas_client,
-                                                 name="%s__baid__%s" %
-                                                 (n.name, ba_key.hex()))
-                    node_baid_tag = tag_list.add(node_baid_tag)
-                    node_baid_tag.apply_to_node(machine.resource_id)
-                    self.task.add_status_msg(msg=msg,
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-            except Exception as ex:
-                self.logger.error(
-                    "Error setting boot action id key tag for %s." % n.name,
-                    exc_info=ex)
-
-            # Extract bootaction assets that are package lists as they
-            # are included in the deployment initiation
-
-            node_packages = self.orchestrator.find_node_package_lists(
-                n.name, self.task)
-            user_data_dict = dict(packages=[])
-
-            for k, v in node_packages.items():
-                if v:
-                    user_data_dict['packages'].append([k, v])
-                else:
-                    user_data_dict['packages'].append(k)
-
-            user_data_string = None
-            if user_data_dict.get('packages'):
-                user_data_string = "#cloud-config\n%s" % yaml.dump(
-                    user_data_dict)
-
-            self.logger.info("Deploying node %s: image=%s, kernel=%s" %
-                             (n.name, n.image, n.kernel))
-
-            try:
-                machine.deploy(platform=n.image,
-                               kernel=n.kernel,
-                               user_data=user_data_string)
-            except errors.DriverError:
-                msg = "Error deploying node %s, skipping" % n.name
-                self.logger.warning(msg)
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.task.failure(focus=n.get_id())
+        deployed = []
+        for n in nodes:
+            machine = await self.run_blocking(self._start_deploy, n,
+                                              machine_list, site_design)
+            if machine is None:
                 continue
 
             attempts = 0
@@ -2614,9 +2835,10 @@ class DeployNode(BaseMaasAction):
                    and (not machine.status_name.startswith('Deployed')
                         and not machine.status_name.startswith('Failed'))):
                 attempts = attempts + 1
-                time.sleep(config.config_mgr.conf.maasdriver.poll_interval)
+                await asyncio.sleep(
+                    config.config_mgr.conf.maasdriver.poll_interval)
                 try:
-                    machine.refresh()
+                    await machine.refresh_async(maas_async)
                     self.logger.debug(
                         "Polling node %s status attempt %d of %d: %s" %
                         (n.name, attempts, max_attempts, machine.status_name))
@@ -2627,32 +2849,216 @@ class DeployNode(BaseMaasAction):
             if machine.status_name.startswith('Deployed'):
                 msg = "Node %s deployed" % (n.name)
                 self.logger.info(msg)
+                await self.run_blocking(self._node_result, n, msg, False)
+            elif machine.status_name.startswith('Failed'):
+                msg = "Node %s deployment failed" % (n.name)
+                self.logger.info(msg)
+                await self.run_blocking(self._node_result, n, msg, True)
+            else:
+                msg = "Node %s deployment timed out" % (n.name)
+                self.logger.warning(msg)
+                await self.run_blocking(self._node_result, n, msg, True)
+            deployed.append((n, machine))
+
+        self.finished_machines = deployed
+
+        self.task.set_status(hd_fields.TaskStatus.Complete)
+        await self.run_blocking(self.task.save)
+
+        return
+
+    def _fail_task(self, msg):
+        """Complete the task as failed with status message ``msg``.
+
+        :param msg: the error message for the task
+        """
+        self.task.set_status(hd_fields.TaskStatus.Complete)
+        self.task.failure()
+        self.task.add_status_msg(msg=msg,
+                                 error=True,
+                                 ctx='NA',
+                                 ctx_type='NA')
+        self.task.save()
+
+    def _node_result(self, n, msg, error):
+        """Record the deployment result of node ``n``.
+
+        :param n: instance of objects.BaremetalNode deployed
+        :param msg: the status message for the node
+        :param error: whether the deployment of the node failed
+        """
+        self.task.add_status_msg(msg=msg,
+                                 error=error,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        if error:
+            self.task.failure(focus=n.get_id())
+        else:
+            self.task.success(focus=n.get_id())
+
+    def _start_deploy(self, n, machine_list, site_design):
+        """Acquire and start deployment of node ``n`` in MaaS.
+
+        :param n: instance of objects.BaremetalNode to deploy
+        :param machine_list: instance of maas_machine.Machines
+        :param site_design: the compiled site design of the task
+        :return: the maas_machine.Machine to wait on, or None if the node
+                 needs no further monitoring
+        """
+        try:
+            machine = find_node_in_maas(self.maas_client, n)
+
+            if type(machine) is maas_rack.RackController:
+                msg = "Skipping configuration of rack controller %s." % n.name
+                self.logger.info(msg)
                 self.task.add_status_msg(msg=msg,
                                          error=False,
                                          ctx=n.name,
                                          ctx_type='node')
-                self.task.success(focus=n.get_id())
-            elif machine.status_name.startswith('Failed'):
-                msg = "Node %s deployment failed" % (n.name)
+                self.task.success(focus=n.name)
+                return None
+            elif machine.status_name.startswith(
+                    'Deployed') or machine.status_name.startswith('Deploying'):
+                msg = "Node %s already deployed or deploying, skipping." % (
+                    n.name)
                 self.logger.info(msg)
                 self.task.add_status_msg(msg=msg,
-                                         error=True,
+                                         error=False,
+                                         ctx=n.name,
+                                         ctx_type='node')
+                self.task.success(focus=n.name)
+                return None
+            elif machine.status_name == 'Ready':
+                msg = "Acquiring node %s for deployment" % (n.name)
+                self.logger.info(msg)
+                machine = machine_list.acquire_node(n.name)
+                self.task.add_status_msg(msg=msg,
+                                         error=False,
+                                         ctx=n.name,
+                                         ctx_type='node')
+            elif machine.status_name.startswith('Allocated'):
+                msg = "Node %s already acquired." % (n.name)
+                self.logger.info(msg)
+                self.task.add_status_msg(msg=msg,
+                                         error=False,
                                          ctx=n.name,
                                          ctx_type='node')
-                self.task.failure(focus=n.get_id())
             else:
-                msg = "Node %s deployment timed out" % (n.name)
+                msg = "Unexpected status %s for node %s, skipping deployment." % (
+                    machine.status_name, n.name)
                 self.logger.warning(msg)
                 self.task.add_status_msg(msg=msg,
                                          error=True,
                                          ctx=n.name,
                                          ctx_type='node')
                 self.task.failure(focus=n.get_id())
-            self._add_detail_logs(n, machine, 'deploy', result_type='deploy')
-        self.task.set_status(hd_fields.TaskStatus.Complete)
-        self.task.save()
+                return None
+        except errors.DriverError as dex:
+            msg = "Error acquiring node %s, skipping" % n.name
+            self.logger.warning(msg, exc_info=dex)
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.task.failure(focus=n.get_id())
+            return None
 
-        return
+        # Set owner data in MaaS
+        try:
+            self.logger.info("Setting node %s owner data." % n.name)
+            changes = machine.update_owner_data(n.owner_data)
+            msg = "Set %d of %d owner data keys for node %s" % (
+                len(changes), len(n.owner_data or dict()), n.name)
+            self.logger.debug(msg)
+            self.task.add_status_msg(msg=msg,
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node',
+                                     owner_data=changes)
+        except Exception as ex:
+            msg = "Error setting node %s owner data" % n.name
+            self.logger.warning(msg + ": " + str(ex))
+            self.task.failure(focus=n.get_id())
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            return None
+
+        # Saving boot action context for a node
+        self.logger.info("Saving Boot Action context for node %s." % (n.name))
+        stage_data = self.stage_data or dict()
+        try:
+            if n.name in stage_data.get('package_lists', dict()):
+                ba_key = stage_data['identity_keys'].get(n.name)
+            else:
+                ba_key = self.orchestrator.create_bootaction_context(
+                    n.name, self.task, site_design=site_design)
+
+            if ba_key is not None:
+                msg = "Creating boot action id key tag for node %s" % (n.name)
+                self.logger.debug(msg)
+
+            if n.name not in stage_data.get('tagged', []):
+                tags = maas_tag.TagReconciler(self.maas_client)
+                tags.replace("%s__baid__" % (n.name),
+                             "%s__baid__%s" % (n.name, ba_key.hex())
+                             if ba_key is not None else None,
+                             machine.resource_id)
+                failed_tags = tags.commit()
+                if failed_tags:
+                    raise errors.DriverError(
+                        "Error updating tags %s" %
+                        ", ".join(sorted(failed_tags.keys())))
+
+            if ba_key is not None:
+                self.task.add_status_msg(msg=msg,
+                                         error=False,
+                                         ctx=n.name,
+                                         ctx_type='node')
+        except Exception as ex:
+            self.logger.error("Error setting boot action id key tag for %s." %
+                              n.name,
+                              exc_info=ex)
+
+        # Extract bootaction assets that are package lists as they
+        # are included in the deployment initiation
+
+        if n.name in stage_data.get('package_lists', dict()):
+            node_packages = stage_data['package_lists'][n.name]
+        else:
+            node_packages = self.orchestrator.find_node_package_lists(
+                n.name, self.task, site_design=site_design)
+        user_data_dict = dict(packages=[])
+
+        for k, v in (node_packages or dict()).items():
+            if v:
+                user_data_dict['packages'].append([k, v])
+            else:
+                user_data_dict['packages'].append(k)
+
+        user_data_string = None
+        if user_data_dict.get('packages'):
+            user_data_string = "#cloud-config\n%s" % yaml.dump(user_data_dict)
+
+        self.logger.info("Deploying node %s: image=%s, kernel=%s" %
+                         (n.name, n.image, n.kernel))
+
+        try:
+            machine.deploy(platform=n.image,
+                           kernel=n.kernel,
+                           user_data=user_data_string)
+        except errors.DriverError:
+            msg = "Error deploying node %s, skipping" % n.name
+            self.logger.warning(msg)
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.task.failure(focus=n.get_id())
+            return None
+
+        return machine
 
 
 def find_node_in_maas(maas_client, node_model, probably_exists=True):
@@ -23,6 +23,7 @@ import requests.auth as req_auth
 import base64
 
 import drydock_provisioner.error as errors
+import drydock_provisioner.metrics as metrics
 
 
 class MaasOauth(req_auth.AuthBase):
@@ -185,7 +186,14 @@ class MaasRequestFactory(object):
 
         prepared_req = self.http_session.prepare_request(request)
 
-        resp = self.http_session.send(prepared_req, timeout=timeout)
+        metrics_endpoint = metrics.endpoint_template(endpoint)
+        if params is not None and 'op' in params:
+            metrics_endpoint = "%s?op=%s" % (metrics_endpoint, params['op'])
+
+        with metrics.external_request('maas', metrics_endpoint,
+                                      method) as req_metrics:
+            resp = self.http_session.send(prepared_req, timeout=timeout)
+            req_metrics.status = resp.status_code
 
         if resp.status_code >= 400:
             self.logger.debug(
@@ -195,3 +203,34 @@ class MaasRequestFactory(object):
             raise errors.DriverError("MAAS Error: %s - %s" %
                                      (resp.status_code, resp.text))
         return resp
+
+
+class AsyncMaasRequestFactory(object):
+    """Asyncio wrapper around MaasRequestFactory.
+
+    Each request is executed by ``run_blocking`` so a coroutine only
+    occupies a thread for the duration of a request and not while it
+    waits between requests.
+
+    :param api_client: instance of MaasRequestFactory
+    :param run_blocking: coroutine function executing a blocking callable,
+                         e.g. BaseAction.run_blocking
+    """
+
+    def __init__(self, api_client, run_blocking):
+        self.api_client = api_client
+        self.run_blocking = run_blocking
+
+    async def get(self, endpoint, **kwargs):
+        return await self.run_blocking(self.api_client.get, endpoint, **kwargs)
+
+    async def post(self, endpoint, **kwargs):
+        return await self.run_blocking(self.api_client.post, endpoint,
+                                       **kwargs)
+
+    async def delete(self, endpoint, **kwargs):
+        return await self.run_blocking(self.api_client.delete, endpoint,
+                                       **kwargs)
+
+    async def put(self, endpoint, **kwargs):
+        return await self.run_blocking(self.api_client.put, endpoint, **kwargs)
@@ -161,48 +161,66 @@ class MaasNodeDriver(NodeDriver):
             else:
                 target_nodes = self.orchestrator.get_target_nodes(task)
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=64) as e:
-                subtask_futures = dict()
-                maas_client = MaasRequestFactory(
-                    config.config_mgr.conf.maasdriver.maas_api_url,
-                    config.config_mgr.conf.maasdriver.maas_api_key)
-                for n in target_nodes:
-                    nf = self.orchestrator.create_nodefilter_from_nodelist([n])
-                    subtask = self.orchestrator.create_task(
-                        design_ref=task.design_ref,
-                        action=task.action,
-                        node_filter=nf,
-                        retry=task.retry)
-                    task.register_subtask(subtask)
-
-                    action = self.action_class_map.get(task.action, None)(
-                        subtask,
-                        self.orchestrator,
-                        self.state_manager,
-                        maas_client=maas_client)
-                    subtask_futures[subtask.get_id().bytes] = e.submit(
-                        action.start)
-
-                timeout = action_timeouts.get(
-                    task.action,
-                    config.config_mgr.conf.timeouts.drydock_timeout)
-                finished, running = concurrent.futures.wait(
-                    subtask_futures.values(), timeout=(timeout * 60))
-
+            subtask_futures = dict()
+            subtask_actions = dict()
+            maas_client = MaasRequestFactory(
+                config.config_mgr.conf.maasdriver.maas_api_url,
+                config.config_mgr.conf.maasdriver.maas_api_key)
+            action_class = self.action_class_map.get(task.action, None)
+            try:
+                stage_data = action_class.prepare_stage(
+                    task, target_nodes, self.orchestrator, self.state_manager,
+                    maas_client)
+            except Exception as ex:
+                self.logger.warning(
+                    "Error preparing task %s, nodes will be prepared "
+                    "individually." % str(task.get_id()),
+                    exc_info=ex)
+                stage_data = None
+            for n in target_nodes:
+                nf = self.orchestrator.create_nodefilter_from_nodelist([n])
+                subtask = self.orchestrator.create_task(
+                    design_ref=task.design_ref,
+                    action=task.action,
+                    node_filter=nf,
+                    retry=task.retry)
+                task.register_subtask(subtask)
+
+                action = action_class(subtask,
+                                      self.orchestrator,
+                                      self.state_manager,
+                                      maas_client=maas_client)
+                action.stage_data = stage_data
+                subtask_futures[subtask.get_id().bytes] = self.submit_action(
+                    action)
+                subtask_actions[subtask.get_id().bytes] = action
+
+            timeout = action_timeouts.get(
+                task.action, config.config_mgr.conf.timeouts.drydock_timeout)
+            finished, running = concurrent.futures.wait(
+                subtask_futures.values(), timeout=(timeout * 60))
+
+            finished_actions = []
             for t, f in subtask_futures.items():
                 if not f.done():
                     task.add_status_msg(
-                        "Subtask %s timed out before completing.",
+                        msg="Subtask %s timed out before completing." %
+                        str(uuid.UUID(bytes=t)),
                         error=True,
                         ctx=str(uuid.UUID(bytes=t)),
                         ctx_type='task')
                     task.failure()
+                    f.cancel()
                 else:
                     if f.exception():
                         self.logger.error("Uncaught exception in subtask %s." %
                                           str(uuid.UUID(bytes=t)),
                                           exc_info=f.exception())
                         task.failure()
+                    else:
+                        finished_actions.append(subtask_actions[t])
+            self._finish_stage(task, action_class, finished_actions,
+                               maas_client)
             task.bubble_results()
             task.align_result()
         else:
@@ -232,6 +250,40 @@ class MaasNodeDriver(NodeDriver):
 
         return
 
+    def _finish_stage(self, task, action_class, actions, maas_client):
+        """Save the build data of the finished actions of a task.
+
+        If saving the data of all actions at once fails, the failure is
+        recorded on the task and the data of each action is saved
+        separately.
+
+        :param task: the task the actions are subtasks of
+        :param action_class: the BaseMaasAction subclass of the actions
+        :param actions: list of the actions that ran to completion
+        :param maas_client: api_client.MaasRequestFactory instance
+        """
+        try:
+            action_class.finish_stage(task, actions, self.orchestrator,
+                                      self.state_manager, maas_client)
+            return
+        except Exception as ex:
+            msg = "Error saving build data of task %s: %s" % (str(
+                task.get_id()), str(ex))
+            self.logger.warning(msg, exc_info=ex)
+            task.add_status_msg(msg=msg,
+                                error=True,
+                                ctx=str(task.get_id()),
+                                ctx_type='task')
+
+        for a in actions:
+            try:
+                action_class.finish_stage(task, [a], self.orchestrator,
+                                          self.state_manager, maas_client)
+            except Exception as ex:
+                self.logger.warning("Error saving build data of task %s." %
+                                    str(a.task.get_id()),
+                                    exc_info=ex)
+
     def get_available_images(self):
         """Return images available in MAAS."""
         maas_client = MaasRequestFactory(
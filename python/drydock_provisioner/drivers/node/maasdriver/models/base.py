@@ -48,7 +48,19 @@ class ResourceBase(object):
         url = self.interpolate_url()
         resp = self.api_client.get(url)
 
-        updated_fields = resp.json()
+        self._update_from_json(resp.json())
+
+    async def refresh_async(self, async_client):
+        """Update resource attributes from MaaS without blocking the event loop.
+
+        :param async_client: instance of api_client.AsyncMaasRequestFactory
+        """
+        url = self.interpolate_url()
+        resp = await async_client.get(url)
+
+        self._update_from_json(resp.json())
+
+    def _update_from_json(self, updated_fields):
         updated_model = self.from_dict(self.api_client, updated_fields)
 
         for f in self.fields:
@@ -220,8 +220,10 @@ class BlockDevice(model_base.ResourceBase):
         if self.type == 'physical':
             if self.partitions is not None:
                 partition = self.partitions.add(partition)
-                self.partitions.refresh()
-                return self.partitions.select(partition.resource_id)
+                partition.system_id = self.system_id
+                partition.device_id = self.resource_id
+                self.partitions.resources[partition.resource_id] = partition
+                return partition
             else:
                 msg = "Error: could not access device %s partition list" % self.name
                 self.logger.error(msg)
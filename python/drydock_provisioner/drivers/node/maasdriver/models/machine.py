@@ -374,11 +374,34 @@ class Machine(model_base.ResourceBase):
         :param key: Key of the owner data
         :param value: Value of the owner data. If None, the key is removed
         """
+        self.update_owner_data({key: value})
+
+    def update_owner_data(self, owner_data):
+        """Add/update/remove several node owner data keys in one call.
+
+        Keys already set to the same value in MaaS are skipped.
+
+        :param owner_data: dict of owner data keys to values. Keys with a
+                           value of None are removed
+        :return: dict of the owner data keys changed
+        """
+        current = getattr(self, 'owner_data', None) or dict()
+        changes = dict()
+        for k, v in (owner_data or dict()).items():
+            if v is None:
+                if k in current:
+                    changes[k] = v
+            elif current.get(k) != str(v):
+                changes[k] = v
+
+        if not changes:
+            return changes
+
         url = self.interpolate_url()
 
         resp = self.api_client.post(url,
                                     op='set_workload_annotations',
-                                    files={key: value})
+                                    files=changes)
 
         if resp.status_code != 200:
             self.logger.error(
@@ -389,6 +412,16 @@ class Machine(model_base.ResourceBase):
                 "Error setting node metadata, received HTTP %s from MaaS" %
                 resp.status_code)
 
+        updated = dict(current)
+        for k, v in changes.items():
+            if v is None:
+                updated.pop(k, None)
+            else:
+                updated[k] = str(v)
+        self.owner_data = updated
+
+        return changes
+
     def set_power_parameters(self, power_type, **kwargs):
         """Set power parameters for this node.
 
@@ -558,8 +591,44 @@ class Machines(model_base.ResourceCollectionBase):
 
     # Add the OOB power parameters to each machine instance
     def collect_power_params(self):
+        power_params = self.get_power_params()
         for k, v in self.resources.items():
-            v.get_power_params()
+            if k in power_params:
+                v.power_parameters = power_params[k]
+
+    def get_power_params(self):
+        """Load the power parameters of all machines with one request.
+
+        :return: dict of system_id => power parameters
+        """
+        url = self.interpolate_url()
+
+        resp = self.api_client.get(url, op='power_parameters')
+
+        if resp.status_code != 200:
+            raise errors.DriverError(
+                "Error loading power parameters, MaaS returned %s" %
+                resp.status_code)
+
+        return resp.json()
+
+    def get_machine_list(self):
+        """Load the MaaS representation of all machines with one request.
+
+        Unlike ``refresh`` this does not create Machine instances, which
+        load the interfaces and storage of each machine with more requests.
+
+        :return: list of machine dicts as returned by MaaS
+        """
+        url = self.interpolate_url()
+
+        resp = self.api_client.get(url)
+
+        if resp.status_code != 200:
+            raise errors.DriverError(
+                "Error listing machines, MaaS returned %s" % resp.status_code)
+
+        return resp.json()
 
     def acquire_node(self, node_name):
         """Acquire a commissioned node fro deployment.
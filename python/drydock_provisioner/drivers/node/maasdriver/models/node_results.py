@@ -23,7 +23,7 @@ class NodeResult(model_base.ResourceBase):
     resource_url = 'installation-results/'
     fields = [
         'resource_id', 'name', 'result_type', 'updated', 'data',
-        'script_result'
+        'script_result', 'node'
     ]
     json_fields = []
 
@@ -60,6 +60,12 @@ class NodeResult(model_base.ResourceBase):
     def get_type_desc(self):
         return NodeResult.type_rev_map.get(self.result_type)
 
+    def get_system_id(self):
+        """Return the system_id of the node this result is for."""
+        if isinstance(self.node, dict):
+            return self.node.get('system_id')
+        return None
+
 
 class NodeResults(model_base.ResourceCollectionBase):
 
@@ -88,7 +94,7 @@ class NodeResults(model_base.ResourceCollectionBase):
 
         if resp.status_code in [200]:
             json_list = resp.json()
-            self.resource = dict()
+            self.resources = dict()
 
             for o in json_list:
                 if isinstance(o, dict):
@@ -96,3 +102,10 @@ class NodeResults(model_base.ResourceCollectionBase):
                     self.resources[i.resource_id] = i
 
         return
+
+    def group_by_system_id(self):
+        """Return a dict of node system_id to the list of its results."""
+        results = dict()
+        for r in self.resources.values():
+            results.setdefault(r.get_system_id(), []).append(r)
+        return results
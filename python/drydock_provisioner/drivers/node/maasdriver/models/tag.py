@@ -13,6 +13,9 @@
 # limitations under the License.
 """Models for MaaS Tag resources."""
 
+import bisect
+import logging
+
 import drydock_provisioner.error as errors
 import drydock_provisioner.drivers.node.maasdriver.models.base as model_base
 
@@ -67,20 +70,36 @@ class Tag(model_base.ResourceBase):
             self.logger.debug("Tag %s already applied to node %s" %
                               (self.name, system_id))
         else:
-            url = self.interpolate_url()
+            self.update_nodes(add=[system_id])
+
+    def update_nodes(self, add=None, remove=None):
+        """
+        Apply this tag to and remove it from MaaS nodes in one call
+
+        :param add: list of MaaS system_ids of nodes to apply the tag to
+        :param remove: list of MaaS system_ids of nodes to remove the tag from
+        """
+        node_updates = dict()
+        if add:
+            node_updates['add'] = list(add)
+        if remove:
+            node_updates['remove'] = list(remove)
 
-            resp = self.api_client.post(url,
-                                        op='update_nodes',
-                                        files={'add': system_id})
+        if not node_updates:
+            return
 
-            if not resp.ok:
-                self.logger.error(
-                    "Error applying tag to node, received HTTP %s from MaaS" %
-                    resp.status_code)
-                self.logger.debug("MaaS response: %s" % resp.text)
-                raise errors.DriverError(
-                    "Error applying tag to node, received HTTP %s from MaaS" %
-                    resp.status_code)
+        url = self.interpolate_url()
+
+        resp = self.api_client.post(url, op='update_nodes', files=node_updates)
+
+        if not resp.ok:
+            self.logger.error(
+                "Error applying tag to node, received HTTP %s from MaaS" %
+                resp.status_code)
+            self.logger.debug("MaaS response: %s" % resp.text)
+            raise errors.DriverError(
+                "Error applying tag to node, received HTTP %s from MaaS" %
+                resp.status_code)
 
     def to_dict(self):
         """
@@ -165,3 +184,112 @@ class Tags(model_base.ResourceCollectionBase):
             raise errors.DriverError(
                 "Failed updating MAAS url %s - return code %s" %
                 (url, resp.status_code))
+
+
+class TagReconciler(object):
+    """Reconcile the MaaS tags of many nodes from one tag list snapshot.
+
+    Tag names are kept sorted so prefix lookups don't scan the whole tag
+    list. Changes are queued and sent by ``commit``, which deletes the
+    queued tags and then applies each tag to all of its nodes with a
+    single ``update_nodes`` call.
+
+    :param api_client: Instance of api_client.MaasRequestFactory for accessing MaaS API
+    """
+
+    def __init__(self, api_client):
+        self.api_client = api_client
+        self.logger = logging.getLogger('drydock.nodedriver.maasdriver')
+
+        self.tag_list = Tags(api_client)
+        self.tag_list.refresh()
+        self.names = sorted(self.tag_list.resources.keys())
+
+        self.deletes = set()
+        self.applies = dict()
+
+    def select(self, name):
+        """Return the Tag named ``name`` or None."""
+        return self.tag_list.select(name)
+
+    def startswith(self, partial_tag):
+        """Return the list of Tag instances that start with ``partial_tag``.
+
+        :param partial_tag: string to compare to tags
+        """
+        results = list()
+        i = bisect.bisect_left(self.names, partial_tag)
+        while i < len(self.names) and self.names[i].startswith(partial_tag):
+            results.append(self.tag_list.select(self.names[i]))
+            i = i + 1
+        return results
+
+    def delete(self, name):
+        """Queue the tag ``name`` for deletion if it exists."""
+        if self.tag_list.contains(name):
+            self.deletes.add(name)
+        self.applies.pop(name, None)
+
+    def apply(self, name, system_ids, **kwargs):
+        """Queue applying the tag ``name`` to nodes.
+
+        The tag is created with the fields in ``kwargs`` if it doesn't exist
+        or is queued for deletion.
+
+        :param name: name of the tag
+        :param system_ids: list of MaaS system_ids of the nodes to tag
+        """
+        tag_fields, tag_nodes = self.applies.setdefault(name, (kwargs, set()))
+        tag_nodes.update(system_ids)
+
+    def replace(self, partial_tag, name, system_id, **kwargs):
+        """Queue replacing the tags starting with ``partial_tag``.
+
+        Other tags starting with ``partial_tag`` are deleted and the tag
+        ``name`` is applied to the node.
+
+        :param partial_tag: prefix of the tags to replace
+        :param name: name of the tag to apply, or None to only delete
+        :param system_id: MaaS system_id of the node to tag
+        """
+        for t in self.startswith(partial_tag):
+            if t.resource_id != name:
+                self.delete(t.resource_id)
+        if name is not None:
+            self.apply(name, [system_id], **kwargs)
+
+    def commit(self):
+        """Send the queued changes to MaaS.
+
+        :return: dict of the names of tags that could not be updated to the
+                 error message
+        """
+        failures = dict()
+
+        for name in sorted(self.deletes):
+            try:
+                self.tag_list.select(name).delete()
+                del self.tag_list.resources[name]
+                self.names.remove(name)
+            except Exception as ex:
+                self.logger.error("Error deleting tag %s: %s" %
+                                  (name, str(ex)))
+                failures[name] = str(ex)
+        self.deletes = set()
+
+        for name, (tag_fields, tag_nodes) in sorted(self.applies.items()):
+            try:
+                tag = self.tag_list.select(name)
+                if tag is None:
+                    tag = self.tag_list.add(
+                        Tag(self.api_client, name=name, **tag_fields))
+                    self.tag_list.resources[name] = tag
+                    bisect.insort(self.names, name)
+                tag.update_nodes(add=sorted(tag_nodes))
+            except Exception as ex:
+                self.logger.error("Error applying tag %s: %s" %
+                                  (name, str(ex)))
+                failures[name] = str(ex)
+        self.applies = dict()
+
+        return failures
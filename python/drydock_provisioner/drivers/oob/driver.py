@@ -13,9 +13,12 @@
 # limitations under the License.
 """Generic OOB driver."""
 
+import functools
+
 import drydock_provisioner.objects.fields as hd_fields
 
 from drydock_provisioner.drivers.driver import ProviderDriver
+from drydock_provisioner.drivers.oob.scheduler import OobScheduler
 
 
 class OobDriver(ProviderDriver):
@@ -40,6 +43,9 @@ class OobDriver(ProviderDriver):
         self.driver_key = "oob_generic"
         self.driver_desc = "Generic OOB Driver"
 
+        # Limits the nodes acted on at once per management endpoint
+        self.oob_scheduler = OobScheduler()
+
     @classmethod
     def oob_type_support(cls, type_string):
         """Check if this driver support a particular OOB type.
@@ -50,3 +56,37 @@ class OobDriver(ProviderDriver):
             return True
 
         return False
+
+    def get_oob_endpoint(self, node):
+        """Return the management endpoint controlling a node.
+
+        Nodes with the same endpoint share the endpoint's action limit.
+        Nodes in a chassis are keyed by the ``chassis`` OOB parameter, as
+        they are managed through the shared chassis controller. Otherwise
+        the node's own BMC address is the endpoint.
+
+        :param node: instance of objects.BaremetalNode
+        :return: the endpoint, or None if it is unknown
+        """
+        chassis = node.oob_parameters.get('chassis')
+        if chassis:
+            return "chassis:%s" % chassis
+
+        oob_network = node.oob_parameters.get('network')
+        if oob_network is None:
+            return None
+
+        return node.get_network_address(oob_network)
+
+    def submit_actions(self, actions, timeout=None):
+        """Start actions as their nodes' management endpoints allow.
+
+        :param actions: list of (objects.BaremetalNode, action) tuples
+        :param timeout: seconds to wait for endpoint capacity
+        :return: dictionary of subtask_id.bytes => Future instance for the
+                 actions started
+        """
+        jobs = [(a.task.get_id().bytes, self.get_oob_endpoint(n),
+                 functools.partial(self.submit_action, a)) for n, a in actions]
+
+        return self.oob_scheduler.schedule(jobs, timeout=timeout)
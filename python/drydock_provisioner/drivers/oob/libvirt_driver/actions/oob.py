@@ -13,6 +13,7 @@
 # limitations under the License.
 """Driver for controlling OOB interface via libvirt api."""
 
+import contextlib
 import time
 import libvirt
 from urllib.parse import urlparse
@@ -20,6 +21,7 @@ from urllib.parse import urlparse
 import defusedxml.ElementTree as ET
 
 from drydock_provisioner.orchestrator.actions.orchestrator import BaseAction
+from drydock_provisioner.drivers.oob.session_pool import SessionPool
 
 import drydock_provisioner.error as errors
 
@@ -29,6 +31,50 @@ import drydock_provisioner.objects.fields as hd_fields
 class LibvirtBaseAction(BaseAction):
     """Base action for Pyghmi executed actions."""
 
+    def __init__(self, *args, session_pool=None):
+        super().__init__(*args)
+
+        if session_pool is None:
+            session_pool = self.create_session_pool()
+        self.session_pool = session_pool
+
+    @classmethod
+    def create_session_pool(cls, conf=None, logger=None):
+        """Create a pool of libvirt sessions to share between actions.
+
+        :param conf: config group with the session pool options, or None
+                     to use the pool defaults
+        :param logger: logger for the pool
+        """
+        if conf is None:
+            return SessionPool(cls.close_libvirt_session,
+                               keepalive=cls.check_libvirt_session,
+                               logger=logger)
+        return SessionPool.from_config(conf,
+                                       cls.close_libvirt_session,
+                                       keepalive=cls.check_libvirt_session,
+                                       logger=logger)
+
+    @staticmethod
+    def close_libvirt_session(virsh_ses):
+        virsh_ses.close()
+
+    @staticmethod
+    def check_libvirt_session(virsh_ses):
+        if not virsh_ses.isAlive():
+            raise errors.DriverError("Libvirt session is no longer alive.")
+
+    @contextlib.contextmanager
+    def libvirt_session(self, node):
+        """Use a pooled libvirt session to the node hypervisor.
+
+        :param node: instance of objects.BaremetalNode
+        """
+        virsh_url = node.oob_parameters.get('libvirt_uri', None)
+        with self.session_pool.session((virsh_url, ),
+                                       lambda: self.init_session(node)) as ses:
+            yield ses
+
     def init_session(self, node):
         """Initialize a Libvirt session to the node hypervisor.
 
@@ -63,50 +109,45 @@ class LibvirtBaseAction(BaseAction):
 
     def set_node_pxe(self, node):
         """Set a node to PXE boot first."""
-        ses = self.init_session(node)
-        domain = ses.lookupByName(node.name)
-        domain_xml = domain.XMLDesc(libvirt.VIR_DOMAIN_XML_SECURE
-                                    | libvirt.VIR_DOMAIN_XML_INACTIVE)
-        xmltree = ET.fromstring(domain_xml)
-
-        # Delete all the current boot entries
-        os_tree = xmltree.find("./os")
-        boot_elements = os_tree.findall("./boot")
-        for e in boot_elements:
-            os_tree.remove(e)
-
-        # Now apply our boot order which is 'network' and then 'hd'
-        os_tree.append(ET.fromstring("<boot dev='network' />"))
-        os_tree.append(ET.fromstring("<boot dev='hd' />"))
-
-        # And now save the new XML def to the hypervisor
-        domain_xml = ET.tostring(xmltree, encoding="utf-8")
-        ses.defineXML(domain_xml.decode('utf-8'))
-        ses.close()
+        with self.libvirt_session(node) as ses:
+            domain = ses.lookupByName(node.name)
+            domain_xml = domain.XMLDesc(libvirt.VIR_DOMAIN_XML_SECURE
+                                        | libvirt.VIR_DOMAIN_XML_INACTIVE)
+            xmltree = ET.fromstring(domain_xml)
+
+            # Delete all the current boot entries
+            os_tree = xmltree.find("./os")
+            boot_elements = os_tree.findall("./boot")
+            for e in boot_elements:
+                os_tree.remove(e)
+
+            # Now apply our boot order which is 'network' and then 'hd'
+            os_tree.append(ET.fromstring("<boot dev='network' />"))
+            os_tree.append(ET.fromstring("<boot dev='hd' />"))
+
+            # And now save the new XML def to the hypervisor
+            domain_xml = ET.tostring(xmltree, encoding="utf-8")
+            ses.defineXML(domain_xml.decode('utf-8'))
 
     def get_node_status(self, node):
         """Get node status via libvirt api."""
-        try:
-            ses = self.init_session(node)
+        with self.libvirt_session(node) as ses:
             domain = ses.lookupByName(node.name)
             status = domain.isActive()
-        finally:
-            ses.close()
 
         return status
 
     def poweroff_node(self, node):
         """Power off a node."""
-        ses = self.init_session(node)
-        domain = ses.lookupByName(node.name)
+        with self.libvirt_session(node) as ses:
+            domain = ses.lookupByName(node.name)
 
-        if domain.isActive():
-            domain.destroy()
-        else:
-            self.logger.debug("Node already powered off.")
-            return
+            if domain.isActive():
+                domain.destroy()
+            else:
+                self.logger.debug("Node already powered off.")
+                return
 
-        try:
             i = 3
             while i > 0:
                 self.logger.debug("Polling powerstate waiting for success.")
@@ -116,21 +157,18 @@ class LibvirtBaseAction(BaseAction):
                 time.sleep(10)
                 i = i - 1
             raise errors.DriverError("Power state never matched off")
-        finally:
-            ses.close()
 
     def poweron_node(self, node):
         """Power on a node."""
-        ses = self.init_session(node)
-        domain = ses.lookupByName(node.name)
+        with self.libvirt_session(node) as ses:
+            domain = ses.lookupByName(node.name)
 
-        if not domain.isActive():
-            domain.create()
-        else:
-            self.logger.debug("Node already powered on.")
-            return
+            if not domain.isActive():
+                domain.create()
+            else:
+                self.logger.debug("Node already powered on.")
+                return
 
-        try:
             i = 3
             while i > 0:
                 self.logger.debug("Polling powerstate waiting for success.")
@@ -140,8 +178,6 @@ class LibvirtBaseAction(BaseAction):
                 time.sleep(10)
                 i = i - 1
             raise errors.DriverError("Power state never matched on")
-        finally:
-            ses.close()
 
 
 class ValidateOobServices(LibvirtBaseAction):
@@ -229,7 +265,7 @@ class SetNodeBoot(LibvirtBaseAction):
 class PowerOffNode(LibvirtBaseAction):
     """Action to power off a node via libvirt API."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -238,42 +274,49 @@ class PowerOffNode(LibvirtBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            msg = "Shutting down domain %s" % n.name
-            self.logger.debug(msg)
-            self.task.add_status_msg(msg=msg,
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-
-            try:
-                self.poweroff_node(n)
-            except Exception as ex:
-                msg = "Node failed to power off: %s" % str(ex)
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.error(msg)
-                self.task.failure(focus=n.name)
-            else:
-                msg = "Node %s powered off." % n.name
-                self.task.add_status_msg(msg=msg,
-                                         error=False,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.debug(msg)
-                self.task.success(focus=n.name)
+        # Shut down all domains at once
+        await self.run_per_node(self.power_off, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_off(self, n):
+        """Shut down the domain of a node.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        msg = "Shutting down domain %s" % n.name
+        self.logger.debug(msg)
+        self.task.add_status_msg(msg=msg,
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+
+        try:
+            await self.run_blocking(self.poweroff_node, n)
+        except Exception as ex:
+            msg = "Node failed to power off: %s" % str(ex)
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.error(msg)
+            self.task.failure(focus=n.name)
+        else:
+            msg = "Node %s powered off." % n.name
+            self.task.add_status_msg(msg=msg,
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.debug(msg)
+            self.task.success(focus=n.name)
+
 
 class PowerOnNode(LibvirtBaseAction):
     """Action to power on a node via libvirt API."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -282,42 +325,49 @@ class PowerOnNode(LibvirtBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            msg = "Starting domain %s" % n.name
-            self.logger.debug(msg)
-            self.task.add_status_msg(msg=msg,
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-
-            try:
-                self.poweron_node(n)
-            except Exception as ex:
-                msg = "Node failed to power on: %s" % str(ex)
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.error(msg)
-                self.task.failure(focus=n.name)
-            else:
-                msg = "Node %s powered on." % n.name
-                self.task.add_status_msg(msg=msg,
-                                         error=False,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.debug(msg)
-                self.task.success(focus=n.name)
+        # Start all domains at once
+        await self.run_per_node(self.power_on, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_on(self, n):
+        """Start the domain of a node.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        msg = "Starting domain %s" % n.name
+        self.logger.debug(msg)
+        self.task.add_status_msg(msg=msg,
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+
+        try:
+            await self.run_blocking(self.poweron_node, n)
+        except Exception as ex:
+            msg = "Node failed to power on: %s" % str(ex)
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.error(msg)
+            self.task.failure(focus=n.name)
+        else:
+            msg = "Node %s powered on." % n.name
+            self.task.add_status_msg(msg=msg,
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.debug(msg)
+            self.task.success(focus=n.name)
+
 
 class PowerCycleNode(LibvirtBaseAction):
     """Action to hard powercycle a node via IPMI."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -326,38 +376,45 @@ class PowerCycleNode(LibvirtBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            msg = ("Power cycling domain for node %s" % n.name)
-            self.logger.debug(msg)
-            self.task.add_status_msg(msg=msg,
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-
-            try:
-                self.poweroff_node(n)
-                self.poweron_node(n)
-            except Exception as ex:
-                msg = "Node failed to power cycle: %s" % str(ex)
-                self.task.add_status_msg(msg=msg,
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.error(msg)
-                self.task.failure(focus=n.name)
-            else:
-                msg = "Node %s power cycled." % n.name
-                self.task.add_status_msg(msg=msg,
-                                         error=False,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.debug(msg)
-                self.task.success(focus=n.name)
+        # Power cycle all domains at once
+        await self.run_per_node(self.power_cycle, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_cycle(self, n):
+        """Shut down and restart the domain of a node.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        msg = ("Power cycling domain for node %s" % n.name)
+        self.logger.debug(msg)
+        self.task.add_status_msg(msg=msg,
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+
+        try:
+            await self.run_blocking(self.poweroff_node, n)
+            await self.run_blocking(self.poweron_node, n)
+        except Exception as ex:
+            msg = "Node failed to power cycle: %s" % str(ex)
+            self.task.add_status_msg(msg=msg,
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.error(msg)
+            self.task.failure(focus=n.name)
+        else:
+            msg = "Node %s power cycled." % n.name
+            self.task.add_status_msg(msg=msg,
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.debug(msg)
+            self.task.success(focus=n.name)
+
 
 class InterrogateOob(LibvirtBaseAction):
     """Action to complete a basic interrogation of the node IPMI interface."""
@@ -16,14 +16,17 @@
 Based on Openstack Ironic Pyghmi driver.
 """
 
+import asyncio
 import time
 
 from pyghmi.ipmi.command import Command
 from pyghmi.exceptions import IpmiException
 
 from drydock_provisioner.orchestrator.actions.orchestrator import BaseAction
+from drydock_provisioner.drivers.oob.session_pool import SessionPool
 
 import drydock_provisioner.error as errors
+import drydock_provisioner.metrics as metrics
 
 import drydock_provisioner.objects.fields as hd_fields
 
@@ -31,12 +34,76 @@ import drydock_provisioner.objects.fields as hd_fields
 class PyghmiBaseAction(BaseAction):
     """Base action for Pyghmi executed actions."""
 
+    # Seconds to wait before retrying a failed IPMI command, doubled on
+    # each attempt up to IPMI_RETRY_MAX_DELAY
+    IPMI_RETRY_DELAY = 1
+    IPMI_RETRY_MAX_DELAY = 15
+
+    # Polls of a node's power state while waiting for a power change and
+    # the seconds between them
+    POWER_STATE_POLL_ATTEMPTS = 18
+    POWER_STATE_POLL_INTERVAL = 10
+
+    def __init__(self, *args, session_pool=None):
+        super().__init__(*args)
+
+        if session_pool is None:
+            session_pool = self.create_session_pool()
+        self.session_pool = session_pool
+
+    @classmethod
+    def create_session_pool(cls, conf=None, logger=None):
+        """Create a pool of IPMI sessions to share between actions.
+
+        :param conf: config group with the session pool options, or None
+                     to use the pool defaults
+        :param logger: logger for the pool
+        """
+        if conf is None:
+            return SessionPool(cls.close_ipmi_session,
+                               keepalive=cls.check_ipmi_session,
+                               logger=logger)
+        return SessionPool.from_config(conf,
+                                       cls.close_ipmi_session,
+                                       keepalive=cls.check_ipmi_session,
+                                       logger=logger)
+
+    @staticmethod
+    def close_ipmi_session(ipmi_session):
+        ipmi_session.ipmi_session.logout()
+
+    @staticmethod
+    def check_ipmi_session(ipmi_session):
+        # Get Device ID, the cheapest command every BMC supports
+        response = ipmi_session.raw_command(netfn=0x06, command=0x01)
+        if 'error' in response:
+            raise IpmiException(response['error'])
+
     def get_ipmi_session(self, node):
         """Initialize a Pyghmi IPMI session to the node.
 
         :param node: instance of objects.BaremetalNode
         :return: An instance of pyghmi.ipmi.command.Command initialized to nodes' IPMI interface
         """
+        (ipmi_address, ipmi_account,
+         ipmi_credential) = self.get_ipmi_params(node)
+
+        self.logger.debug("Starting IPMI session to %s with %s/%s" %
+                          (ipmi_address, ipmi_account, ipmi_credential[:1]))
+        with metrics.external_request('bmc', 'ipmi/login',
+                                      'IPMI') as req_metrics:
+            ipmi_session = Command(bmc=ipmi_address,
+                                   userid=ipmi_account,
+                                   password=ipmi_credential)
+            req_metrics.status = 'ok'
+
+        return ipmi_session
+
+    def get_ipmi_params(self, node):
+        """Return the IPMI address, account and credential of the node.
+
+        :param node: instance of objects.BaremetalNode
+        """
         if node.oob_type != 'ipmi':
             raise errors.DriverError("Node OOB type is not IPMI")
 
@@ -50,51 +117,78 @@ class PyghmiBaseAction(BaseAction):
         ipmi_account = node.oob_parameters['account']
         ipmi_credential = node.oob_parameters['credential']
 
-        self.logger.debug("Starting IPMI session to %s with %s/%s" %
-                          (ipmi_address, ipmi_account, ipmi_credential[:1]))
-        ipmi_session = Command(bmc=ipmi_address,
-                               userid=ipmi_account,
-                               password=ipmi_credential)
-
-        return ipmi_session
+        return (ipmi_address, ipmi_account, ipmi_credential)
 
     def exec_ipmi_command(self, node, func, *args):
-        """Call an IPMI command after establishing a session.
+        """Call an IPMI command on a pooled session to the node's BMC.
+
+        A session that fails a command is closed and the command retried
+        on a new session.
 
         :param node: Instance of objects.BaremetalNode to execute against
         :param func: The pyghmi Command method to call
         :param args: The args to pass the func
         """
         attempts = 0
+        delay = self.IPMI_RETRY_DELAY
         while attempts < 5:
             try:
-                self.logger.debug("Initializing IPMI session")
-                ipmi_session = self.get_ipmi_session(node)
+                session_key = self.get_ipmi_params(node)
+                with self.session_pool.session(
+                        session_key,
+                        lambda: self.get_ipmi_session(node)) as ipmi_session:
+                    self.logger.debug("Calling IPMI command %s on %s" %
+                                      (func.__name__, node.name))
+                    with metrics.external_request('bmc',
+                                                  'ipmi/%s' % func.__name__,
+                                                  'IPMI') as req_metrics:
+                        response = func(ipmi_session, *args)
+                        if isinstance(response, dict) and 'error' in response:
+                            req_metrics.status = 'error'
+                        else:
+                            req_metrics.status = 'ok'
+                    return response
             except (IpmiException, errors.DriverError) as iex:
-                self.logger.error(
-                    "Error initializing IPMI session for node %s" % node.name)
+                self.logger.error("Error sending IPMI command to node %s" %
+                                  node.name)
                 self.logger.debug("IPMI Exception: %s" % str(iex))
                 self.logger.warning(
-                    "IPMI command failed, retrying after 15 seconds...")
-                time.sleep(15)
-                attempts = attempts + 1
-                continue
-
-            try:
-                self.logger.debug("Calling IPMI command %s on %s" %
-                                  (func.__name__, node.name))
-                response = func(ipmi_session, *args)
-                ipmi_session.ipmi_session.logout()
-                return response
-            except IpmiException as iex:
-                self.logger.error("Error sending command: %s" % str(iex))
-                self.logger.warning(
-                    "IPMI command failed, retrying after 15 seconds...")
-                time.sleep(15)
+                    "IPMI command failed, retrying after %d seconds..." %
+                    delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.IPMI_RETRY_MAX_DELAY)
                 attempts = attempts + 1
 
         raise errors.DriverError("IPMI command failed.")
 
+    async def poll_power_state(self, node, powerstate):
+        """Poll the power state of a node until it reports ``powerstate``.
+
+        Sleeping between polls yields to the event loop, so the power
+        states of nodes handled concurrently are polled together.
+
+        :param node: instance of objects.BaremetalNode
+        :param powerstate: the power state to wait for, 'on' or 'off'
+        :return: the last power state response, or None
+        """
+        power_state = None
+
+        # We'll wait for up to 3 minutes for the power state
+        for _ in range(self.POWER_STATE_POLL_ATTEMPTS):
+            self.logger.debug("Polling powerstate of %s waiting for %s." %
+                              (node.name, powerstate))
+            power_state = await self.run_blocking(self.exec_ipmi_command, node,
+                                                  Command.get_power)
+            if power_state is not None and power_state.get('powerstate',
+                                                           '') == powerstate:
+                break
+            elif power_state is None:
+                self.logger.debug("No response on IPMI power query to %s" %
+                                  node.name)
+            await asyncio.sleep(self.POWER_STATE_POLL_INTERVAL)
+
+        return power_state
+
 
 class ValidateOobServices(PyghmiBaseAction):
     """Action to validation OOB services are available."""
@@ -184,7 +278,7 @@ class SetNodeBoot(PyghmiBaseAction):
 class PowerOffNode(PyghmiBaseAction):
     """Action to power off a node via IPMI."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -193,50 +287,49 @@ class PowerOffNode(PyghmiBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = off command to %s" % n.name)
-            self.task.add_status_msg(msg="Sending set_power = off command.",
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-            self.exec_ipmi_command(n, Command.set_power, 'off')
-
-            i = 18
-
-            while i > 0:
-                self.logger.debug("Polling powerstate waiting for success.")
-                power_state = self.exec_ipmi_command(n, Command.get_power)
-                if power_state is not None and (power_state.get(
-                        'powerstate', '') == 'off'):
-                    self.task.add_status_msg(msg="Node reports power off.",
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.logger.debug("Node %s reports powerstate of off" %
-                                      n.name)
-                    self.task.success(focus=n.name)
-                    break
-                time.sleep(10)
-                i = i - 1
-
-            if power_state is not None and (power_state.get('powerstate', '')
-                                            != 'off'):
-                self.task.add_status_msg(msg="Node failed to power off.",
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.error("Giving up on IPMI command to %s" % n.name)
-                self.task.failure(focus=n.name)
+        # Power off all nodes at once, polling their power states together
+        await self.run_per_node(self.power_off, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_off(self, n):
+        """Power off a node and wait for it to report power off.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = off command to %s" % n.name)
+        self.task.add_status_msg(msg="Sending set_power = off command.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        await self.run_blocking(self.exec_ipmi_command, n, Command.set_power,
+                                'off')
+
+        power_state = await self.poll_power_state(n, 'off')
+
+        if power_state is not None and (power_state.get('powerstate', '')
+                                        == 'off'):
+            self.task.add_status_msg(msg="Node reports power off.",
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.debug("Node %s reports powerstate of off" % n.name)
+            self.task.success(focus=n.name)
+        else:
+            self.task.add_status_msg(msg="Node failed to power off.",
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.error("Giving up on IPMI command to %s" % n.name)
+            self.task.failure(focus=n.name)
+
 
 class PowerOnNode(PyghmiBaseAction):
     """Action to power on a node via IPMI."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -245,50 +338,49 @@ class PowerOnNode(PyghmiBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = off command to %s" % n.name)
-            self.task.add_status_msg(msg="Sending set_power = on command.",
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-            self.exec_ipmi_command(n, Command.set_power, 'off')
-
-            i = 18
-
-            while i > 0:
-                self.logger.debug("Polling powerstate waiting for success.")
-                power_state = self.exec_ipmi_command(n, Command.get_power)
-                if power_state is not None and (power_state.get(
-                        'powerstate', '') == 'on'):
-                    self.logger.debug("Node %s reports powerstate of on" %
-                                      n.name)
-                    self.task.add_status_msg(msg="Node reports power on.",
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.task.success(focus=n.name)
-                    break
-                time.sleep(10)
-                i = i - 1
-
-            if power_state is not None and (power_state.get('powerstate', '')
-                                            != 'on'):
-                self.task.add_status_msg(msg="Node failed to power on.",
-                                         error=True,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.logger.error("Giving up on IPMI command to %s" % n.name)
-                self.task.failure(focus=n.name)
+        # Power on all nodes at once, polling their power states together
+        await self.run_per_node(self.power_on, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_on(self, n):
+        """Power on a node and wait for it to report power on.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = on command to %s" % n.name)
+        self.task.add_status_msg(msg="Sending set_power = on command.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        await self.run_blocking(self.exec_ipmi_command, n, Command.set_power,
+                                'on')
+
+        power_state = await self.poll_power_state(n, 'on')
+
+        if power_state is not None and (power_state.get('powerstate', '')
+                                        == 'on'):
+            self.logger.debug("Node %s reports powerstate of on" % n.name)
+            self.task.add_status_msg(msg="Node reports power on.",
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.task.success(focus=n.name)
+        else:
+            self.task.add_status_msg(msg="Node failed to power on.",
+                                     error=True,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.logger.error("Giving up on IPMI command to %s" % n.name)
+            self.task.failure(focus=n.name)
+
 
 class PowerCycleNode(PyghmiBaseAction):
     """Action to hard powercycle a node via IPMI."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -297,81 +389,65 @@ class PowerCycleNode(PyghmiBaseAction):
         node_list = self.orchestrator.process_node_filter(
             self.task.node_filter, site_design)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = off command to %s" % n.name)
-            self.task.add_status_msg(msg="Power cycling node via IPMI.",
-                                     error=False,
-                                     ctx=n.name,
-                                     ctx_type='node')
-            self.exec_ipmi_command(n, Command.set_power, 'off')
-
-            # Wait for power state of off before booting back up
-            # We'll wait for up to 3 minutes to power off
-            i = 18
-
-            while i > 0:
-                power_state = self.exec_ipmi_command(n, Command.get_power)
-                if power_state is not None and power_state.get(
-                        'powerstate', '') == 'off':
-                    self.logger.debug("%s reports powerstate of off" % n.name)
-                    break
-                elif power_state is None:
-                    self.logger.debug("No response on IPMI power query to %s" %
-                                      n.name)
-                time.sleep(10)
-                i = i - 1
-
-            if power_state.get('powerstate', '') == 'on':
-                self.task.add_status_msg(
-                    msg="Failed to power down during power cycle.",
-                    error=True,
-                    ctx=n.name,
-                    ctx_type='node')
-                self.logger.warning(
-                    "Failed powering down node %s during power cycle task" %
-                    n.name)
-                self.task.failure(focus=n.name)
-                break
-
-            self.logger.debug("Sending set_power = on command to %s" % n.name)
-            self.exec_ipmi_command(n, Command.set_power, 'on')
-
-            i = 18
-
-            while i > 0:
-                power_state = self.exec_ipmi_command(n, Command.get_power)
-                if power_state is not None and power_state.get(
-                        'powerstate', '') == 'on':
-                    self.logger.debug("%s reports powerstate of on" % n.name)
-                    break
-                elif power_state is None:
-                    self.logger.debug("No response on IPMI power query to %s" %
-                                      n.name)
-                time.sleep(10)
-                i = i - 1
-
-            if power_state is not None and (power_state.get('powerstate', '')
-                                            == 'on'):
-                self.task.add_status_msg(msg="Node power cycle complete.",
-                                         error=False,
-                                         ctx=n.name,
-                                         ctx_type='node')
-                self.task.success(focus=n.name)
-            else:
-                self.task.add_status_msg(
-                    msg="Failed to power up during power cycle.",
-                    error=True,
-                    ctx=n.name,
-                    ctx_type='node')
-                self.logger.warning(
-                    "Failed powering up node %s during power cycle task" %
-                    n.name)
-                self.task.failure(focus=n.name)
+        # Power cycle all nodes at once, a failure on one node does not
+        # stop the others
+        await self.run_per_node(self.power_cycle, node_list)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
         return
 
+    async def power_cycle(self, n):
+        """Power a node off and back on.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = off command to %s" % n.name)
+        self.task.add_status_msg(msg="Power cycling node via IPMI.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        await self.run_blocking(self.exec_ipmi_command, n, Command.set_power,
+                                'off')
+
+        # Wait for power state of off before booting back up
+        power_state = await self.poll_power_state(n, 'off')
+
+        if power_state is None or power_state.get('powerstate', '') != 'off':
+            self.task.add_status_msg(
+                msg="Failed to power down during power cycle.",
+                error=True,
+                ctx=n.name,
+                ctx_type='node')
+            self.logger.warning(
+                "Failed powering down node %s during power cycle task" %
+                n.name)
+            self.task.failure(focus=n.name)
+            return
+
+        self.logger.debug("Sending set_power = on command to %s" % n.name)
+        await self.run_blocking(self.exec_ipmi_command, n, Command.set_power,
+                                'on')
+
+        power_state = await self.poll_power_state(n, 'on')
+
+        if power_state is not None and (power_state.get('powerstate', '')
+                                        == 'on'):
+            self.task.add_status_msg(msg="Node power cycle complete.",
+                                     error=False,
+                                     ctx=n.name,
+                                     ctx_type='node')
+            self.task.success(focus=n.name)
+        else:
+            self.task.add_status_msg(
+                msg="Failed to power up during power cycle.",
+                error=True,
+                ctx=n.name,
+                ctx_type='node')
+            self.logger.warning(
+                "Failed powering up node %s during power cycle task" % n.name)
+            self.task.failure(focus=n.name)
+
 
 class InterrogateOob(PyghmiBaseAction):
     """Action to complete a basic interrogation of the node IPMI interface."""
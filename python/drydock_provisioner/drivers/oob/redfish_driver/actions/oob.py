@@ -16,13 +16,15 @@
 Based on Redfish Rest API specification.
 """
 
-import time
+import asyncio
 
 from oslo_config import cfg
 
 from drydock_provisioner.orchestrator.actions.orchestrator import BaseAction
+from drydock_provisioner.drivers.oob.redfish_driver.client import AsyncRedfishSession
 from drydock_provisioner.drivers.oob.redfish_driver.client import RedfishException
 from drydock_provisioner.drivers.oob.redfish_driver.client import RedfishSession
+from drydock_provisioner.drivers.oob.session_pool import SessionPool
 
 import drydock_provisioner.error as errors
 import drydock_provisioner.objects.fields as hd_fields
@@ -31,13 +33,53 @@ REDFISH_MAX_ATTEMPTS = 3
 
 
 class RedfishBaseAction(BaseAction):
-    """Base action for Redfish executed actions."""
+    """Base action for Redfish executed actions.
 
-    def get_redfish_session(self, node):
+    Redfish actions are implemented as coroutines so that waiting on a
+    node's power state does not hold a thread. They run synchronously via
+    BaseAction.start when async actions are not enabled.
+    """
+
+    def __init__(self, *args, session_pool=None):
+        super().__init__(*args)
+
+        if session_pool is None:
+            session_pool = self.create_session_pool()
+        self.session_pool = session_pool
+
+    @classmethod
+    def create_session_pool(cls, conf=None, logger=None):
+        """Create a pool of Redfish sessions to share between actions.
+
+        :param conf: config group with the session pool options, or None
+                     to use the pool defaults
+        :param logger: logger for the pool
+        """
+        if conf is None:
+            return SessionPool(cls.close_redfish_session,
+                               keepalive=cls.check_redfish_session,
+                               logger=logger)
+        return SessionPool.from_config(conf,
+                                       cls.close_redfish_session,
+                                       keepalive=cls.check_redfish_session,
+                                       logger=logger)
+
+    @staticmethod
+    def close_redfish_session(redfish_session):
+        redfish_session.close_session()
+
+    @staticmethod
+    def check_redfish_session(redfish_session):
+        redfish_session.get_system_instance()
+
+    async def get_redfish_session(self, node):
         """Initialize a Redfish session to the node.
 
+        The session is taken from the session pool and must be returned
+        with ``release_redfish_session``.
+
         :param node: instance of objects.BaremetalNode
-        :return: An instance of client.RedfishSession initialized to node's Redfish interface
+        :return: An instance of client.AsyncRedfishSession initialized to node's Redfish interface
         """
         if node.oob_type != 'redfish':
             raise errors.DriverError("Node OOB type is not Redfish")
@@ -51,15 +93,23 @@ class RedfishBaseAction(BaseAction):
         oob_account = node.oob_parameters['account']
         oob_credential = node.oob_parameters['credential']
 
-        self.logger.debug("Starting Redfish session to %s with %s" %
-                          (oob_address, oob_account))
-        try:
-            redfish_obj = RedfishSession(
+        def connect():
+            self.logger.debug("Starting Redfish session to %s with %s" %
+                              (oob_address, oob_account))
+            return RedfishSession(
                 host=oob_address,
                 account=oob_account,
                 password=oob_credential,
                 use_ssl=cfg.CONF.redfish_driver.use_ssl,
                 connection_retries=cfg.CONF.redfish_driver.max_retries)
+
+        session_key = (oob_address, oob_account, oob_credential)
+        try:
+            session = await self.run_blocking(self.session_pool.acquire,
+                                              session_key, connect)
+            redfish_obj = AsyncRedfishSession(session,
+                                              self.run_blocking,
+                                              session_key=session_key)
         except (RedfishException, errors.DriverError) as iex:
             self.logger.error(
                 "Error initializing Redfish session for node %s" % node.name)
@@ -68,20 +118,36 @@ class RedfishBaseAction(BaseAction):
 
         return redfish_obj
 
-    def exec_redfish_command(self, node, session, func, *args):
-        """Call a Redfish command after establishing a session.
+    async def release_redfish_session(self, session):
+        """Return a Redfish session to the session pool.
+
+        Sessions a command failed on are closed instead of reused.
+
+        :param session: instance of client.AsyncRedfishSession or None
+        """
+        if session is None:
+            return
+
+        await self.run_blocking(self.session_pool.release,
+                                session.session_key,
+                                session.session,
+                                discard=session.failed)
+
+    async def exec_redfish_command(self, node, session, func, *args):
+        """Call a Redfish command on a session.
 
         :param node: Instance of objects.BaremetalNode to execute against
         :param session: Redfish session
-        :param func: The redfish Command method to call
+        :param func: The AsyncRedfishSession command method to call
         :param args: The args to pass the func
         """
         try:
             self.logger.debug("Calling Redfish command %s on %s" %
                               (func.__name__, node.name))
-            response = func(session, *args)
+            response = await func(session, *args)
             return response
         except RedfishException as iex:
+            session.failed = True
             self.logger.error(
                 "Error executing Redfish command %s for node %s" %
                 (func.__name__, node.name))
@@ -89,11 +155,42 @@ class RedfishBaseAction(BaseAction):
 
         raise errors.DriverError("Redfish command failed.")
 
+    async def poll_power_state(self, node, session, powerstate):
+        """Poll the power state of a node until it reports ``powerstate``.
+
+        Sleeping between polls yields to the event loop, so the power
+        states of nodes handled concurrently are polled together.
+
+        :param node: instance of objects.BaremetalNode
+        :param session: Redfish session to the node
+        :param powerstate: the power state to wait for, 'On' or 'Off'
+        :return: the last power state response, or None
+        """
+        power_state = None
+        attempts = cfg.CONF.redfish_driver.power_state_change_max_retries
+
+        while attempts > 0:
+            self.logger.debug("Polling powerstate of %s waiting for %s." %
+                              (node.name, powerstate))
+            power_state = await self.exec_redfish_command(
+                node, session, AsyncRedfishSession.get_power)
+            if power_state is not None and power_state.get('powerstate',
+                                                           '') == powerstate:
+                break
+            elif power_state is None:
+                self.logger.debug("No response on Redfish power query to %s" %
+                                  node.name)
+            await asyncio.sleep(
+                cfg.CONF.redfish_driver.power_state_change_retry_interval)
+            attempts = attempts - 1
+
+        return power_state
+
 
 class ValidateOobServices(RedfishBaseAction):
     """Action to validate OOB services are available."""
 
-    def start(self):
+    async def start_async(self):
         self.task.add_status_msg(msg="OOB does not require services.",
                                  error=False,
                                  ctx='NA',
@@ -108,7 +205,7 @@ class ValidateOobServices(RedfishBaseAction):
 class ConfigNodePxe(RedfishBaseAction):
     """Action to configure PXE booting via OOB."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -129,7 +226,7 @@ class ConfigNodePxe(RedfishBaseAction):
 class SetNodeBoot(RedfishBaseAction):
     """Action to configure a node to PXE boot."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
@@ -145,22 +242,23 @@ class SetNodeBoot(RedfishBaseAction):
                 bootdev = None
                 self.logger.debug("Setting bootdev to PXE for %s attempt #%s" %
                                   (n.name, i + 1))
+                session = None
                 try:
-                    session = self.get_redfish_session(n)
-                    bootdev = self.exec_redfish_command(
-                        n, session, RedfishSession.get_bootdev)
+                    session = await self.get_redfish_session(n)
+                    bootdev = await self.exec_redfish_command(
+                        n, session, AsyncRedfishSession.get_bootdev)
                     if bootdev.get('bootdev', '') != 'Pxe':
-                        self.exec_redfish_command(n, session,
-                                                  RedfishSession.set_bootdev,
-                                                  'Pxe')
-                        time.sleep(1)
-                        bootdev = self.exec_redfish_command(
-                            n, session, RedfishSession.get_bootdev)
-                    session.close_session()
+                        await self.exec_redfish_command(
+                            n, session, AsyncRedfishSession.set_bootdev, 'Pxe')
+                        await asyncio.sleep(1)
+                        bootdev = await self.exec_redfish_command(
+                            n, session, AsyncRedfishSession.get_bootdev)
                 except errors.DriverError as e:
                     self.logger.warning(
                         "An exception '%s' occurred while attempting to set boot device on %s"
                         % (e, n.name))
+                finally:
+                    await self.release_redfish_session(session)
 
                 if bootdev is not None and (bootdev.get('bootdev', '')
                                             == 'Pxe'):
@@ -190,23 +288,43 @@ class SetNodeBoot(RedfishBaseAction):
 class PowerOffNode(RedfishBaseAction):
     """Action to power off a node via Redfish."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
         node_list = self.orchestrator.get_target_nodes(self.task)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = off command to %s" % n.name)
-            self.task.add_status_msg(msg="Sending set_power = off command.",
-                                     error=False,
+        # Power off all nodes at once, polling their power states together
+        await self.run_per_node(self.power_off, node_list)
+
+        self.task.set_status(hd_fields.TaskStatus.Complete)
+        self.task.save()
+        return
+
+    async def power_off(self, n):
+        """Power off a node and wait for it to report power off.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = off command to %s" % n.name)
+        self.task.add_status_msg(msg="Sending set_power = off command.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        session = await self.get_redfish_session(n)
+        if session is None:
+            self.task.add_status_msg(msg="Unable to open Redfish session.",
+                                     error=True,
                                      ctx=n.name,
                                      ctx_type='node')
-            session = self.get_redfish_session(n)
-
-            # If power is already off, continue with the next node
-            power_state = self.exec_redfish_command(n,
-                                                    RedfishSession.get_power)
+            self.logger.error("Unable to open Redfish session to %s" %
+                              n.name)
+            self.task.failure(focus=n.name)
+            return
+        try:
+            # If power is already off, there is nothing to do
+            power_state = await self.exec_redfish_command(
+                n, session, AsyncRedfishSession.get_power)
             if power_state is not None and (power_state.get('powerstate', '')
                                             == 'Off'):
                 self.task.add_status_msg(msg="Node reports power off.",
@@ -217,33 +335,23 @@ class PowerOffNode(RedfishBaseAction):
                     "Node %s reports powerstate already off. No action required"
                     % n.name)
                 self.task.success(focus=n.name)
-                continue
+                return
 
-            self.exec_redfish_command(n, session, RedfishSession.set_power,
-                                      'ForceOff')
+            await self.exec_redfish_command(n, session,
+                                            AsyncRedfishSession.set_power,
+                                            'ForceOff')
 
-            attempts = cfg.CONF.redfish_driver.power_state_change_max_retries
-
-            while attempts > 0:
-                self.logger.debug("Polling powerstate waiting for success.")
-                power_state = self.exec_redfish_command(
-                    n, RedfishSession.get_power)
-                if power_state is not None and (power_state.get(
-                        'powerstate', '') == 'Off'):
-                    self.task.add_status_msg(msg="Node reports power off.",
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.logger.debug("Node %s reports powerstate of off" %
-                                      n.name)
-                    self.task.success(focus=n.name)
-                    break
-                time.sleep(
-                    cfg.CONF.redfish_driver.power_state_change_retry_interval)
-                attempts = attempts - 1
+            power_state = await self.poll_power_state(n, session, 'Off')
 
             if power_state is not None and (power_state.get('powerstate', '')
-                                            != 'Off'):
+                                            == 'Off'):
+                self.task.add_status_msg(msg="Node reports power off.",
+                                         error=False,
+                                         ctx=n.name,
+                                         ctx_type='node')
+                self.logger.debug("Node %s reports powerstate of off" % n.name)
+                self.task.success(focus=n.name)
+            else:
                 self.task.add_status_msg(msg="Node failed to power off.",
                                          error=True,
                                          ctx=n.name,
@@ -251,34 +359,50 @@ class PowerOffNode(RedfishBaseAction):
                 self.logger.error("Giving up on Redfish command to %s" %
                                   n.name)
                 self.task.failure(focus=n.name)
-
-            session.close_session()
-
-        self.task.set_status(hd_fields.TaskStatus.Complete)
-        self.task.save()
-        return
+        finally:
+            await self.release_redfish_session(session)
 
 
 class PowerOnNode(RedfishBaseAction):
     """Action to power on a node via Redfish."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
         node_list = self.orchestrator.get_target_nodes(self.task)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = on command to %s" % n.name)
-            self.task.add_status_msg(msg="Sending set_power = on command.",
-                                     error=False,
+        # Power on all nodes at once, polling their power states together
+        await self.run_per_node(self.power_on, node_list)
+
+        self.task.set_status(hd_fields.TaskStatus.Complete)
+        self.task.save()
+        return
+
+    async def power_on(self, n):
+        """Power on a node and wait for it to report power on.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = on command to %s" % n.name)
+        self.task.add_status_msg(msg="Sending set_power = on command.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        session = await self.get_redfish_session(n)
+        if session is None:
+            self.task.add_status_msg(msg="Unable to open Redfish session.",
+                                     error=True,
                                      ctx=n.name,
                                      ctx_type='node')
-            session = self.get_redfish_session(n)
-
-            # If power is already on, continue with the next node
-            power_state = self.exec_redfish_command(n,
-                                                    RedfishSession.get_power)
+            self.logger.error("Unable to open Redfish session to %s" %
+                              n.name)
+            self.task.failure(focus=n.name)
+            return
+        try:
+            # If power is already on, there is nothing to do
+            power_state = await self.exec_redfish_command(
+                n, session, AsyncRedfishSession.get_power)
             if power_state is not None and (power_state.get('powerstate', '')
                                             == 'On'):
                 self.task.add_status_msg(msg="Node reports power on.",
@@ -289,33 +413,23 @@ class PowerOnNode(RedfishBaseAction):
                     "Node %s reports powerstate already on. No action required"
                     % n.name)
                 self.task.success(focus=n.name)
-                continue
-
-            self.exec_redfish_command(n, session, RedfishSession.set_power,
-                                      'On')
-
-            attempts = cfg.CONF.redfish_driver.power_state_change_max_retries
-
-            while attempts > 0:
-                self.logger.debug("Polling powerstate waiting for success.")
-                power_state = self.exec_redfish_command(
-                    n, session, RedfishSession.get_power)
-                if power_state is not None and (power_state.get(
-                        'powerstate', '') == 'On'):
-                    self.logger.debug("Node %s reports powerstate of on" %
-                                      n.name)
-                    self.task.add_status_msg(msg="Node reports power on.",
-                                             error=False,
-                                             ctx=n.name,
-                                             ctx_type='node')
-                    self.task.success(focus=n.name)
-                    break
-                time.sleep(
-                    cfg.CONF.redfish_driver.power_state_change_retry_interval)
-                attempts = attempts - 1
+                return
+
+            await self.exec_redfish_command(n, session,
+                                            AsyncRedfishSession.set_power,
+                                            'On')
+
+            power_state = await self.poll_power_state(n, session, 'On')
 
             if power_state is not None and (power_state.get('powerstate', '')
-                                            != 'On'):
+                                            == 'On'):
+                self.logger.debug("Node %s reports powerstate of on" % n.name)
+                self.task.add_status_msg(msg="Node reports power on.",
+                                         error=False,
+                                         ctx=n.name,
+                                         ctx_type='node')
+                self.task.success(focus=n.name)
+            else:
                 self.task.add_status_msg(msg="Node failed to power on.",
                                          error=True,
                                          ctx=n.name,
@@ -323,51 +437,57 @@ class PowerOnNode(RedfishBaseAction):
                 self.logger.error("Giving up on Redfish command to %s" %
                                   n.name)
                 self.task.failure(focus=n.name)
-
-            session.close_session()
-
-        self.task.set_status(hd_fields.TaskStatus.Complete)
-        self.task.save()
-        return
+        finally:
+            await self.release_redfish_session(session)
 
 
 class PowerCycleNode(RedfishBaseAction):
     """Action to hard powercycle a node via Redfish."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
         node_list = self.orchestrator.get_target_nodes(self.task)
 
-        for n in node_list:
-            self.logger.debug("Sending set_power = off command to %s" % n.name)
-            self.task.add_status_msg(msg="Power cycling node via Redfish.",
-                                     error=False,
+        # Power cycle all nodes at once, a failure on one node does not
+        # stop the others
+        await self.run_per_node(self.power_cycle, node_list)
+
+        self.task.set_status(hd_fields.TaskStatus.Complete)
+        self.task.save()
+        return
+
+    async def power_cycle(self, n):
+        """Power a node off and back on.
+
+        :param n: instance of objects.BaremetalNode
+        """
+        self.logger.debug("Sending set_power = off command to %s" % n.name)
+        self.task.add_status_msg(msg="Power cycling node via Redfish.",
+                                 error=False,
+                                 ctx=n.name,
+                                 ctx_type='node')
+        session = await self.get_redfish_session(n)
+        if session is None:
+            self.task.add_status_msg(msg="Unable to open Redfish session.",
+                                     error=True,
                                      ctx=n.name,
                                      ctx_type='node')
-            session = self.get_redfish_session(n)
-            self.exec_redfish_command(n, session, RedfishSession.set_power,
-                                      'ForceOff')
+            self.logger.error("Unable to open Redfish session to %s" %
+                              n.name)
+            self.task.failure(focus=n.name)
+            return
+        try:
+            await self.exec_redfish_command(n, session,
+                                            AsyncRedfishSession.set_power,
+                                            'ForceOff')
 
             # Wait for power state of off before booting back up
-            attempts = cfg.CONF.redfish_driver.power_state_change_max_retries
-
-            while attempts > 0:
-                power_state = self.exec_redfish_command(
-                    n, session, RedfishSession.get_power)
-                if power_state is not None and power_state.get(
-                        'powerstate', '') == 'Off':
-                    self.logger.debug("%s reports powerstate of off" % n.name)
-                    break
-                elif power_state is None:
-                    self.logger.debug(
-                        "No response on Redfish power query to %s" % n.name)
-                time.sleep(
-                    cfg.CONF.redfish_driver.power_state_change_retry_interval)
-                attempts = attempts - 1
-
-            if power_state.get('powerstate', '') != 'Off':
+            power_state = await self.poll_power_state(n, session, 'Off')
+
+            if power_state is None or power_state.get('powerstate',
+                                                      '') != 'Off':
                 self.task.add_status_msg(
                     msg="Failed to power down during power cycle.",
                     error=True,
@@ -377,27 +497,14 @@ class PowerCycleNode(RedfishBaseAction):
                     "Failed powering down node %s during power cycle task" %
                     n.name)
                 self.task.failure(focus=n.name)
-                break
+                return
 
             self.logger.debug("Sending set_power = on command to %s" % n.name)
-            self.exec_redfish_command(n, session, RedfishSession.set_power,
-                                      'On')
+            await self.exec_redfish_command(n, session,
+                                            AsyncRedfishSession.set_power,
+                                            'On')
 
-            attempts = cfg.CONF.redfish_driver.power_state_change_max_retries
-
-            while attempts > 0:
-                power_state = self.exec_redfish_command(
-                    n, session, RedfishSession.get_power)
-                if power_state is not None and power_state.get(
-                        'powerstate', '') == 'On':
-                    self.logger.debug("%s reports powerstate of on" % n.name)
-                    break
-                elif power_state is None:
-                    self.logger.debug(
-                        "No response on Redfish power query to %s" % n.name)
-                time.sleep(
-                    cfg.CONF.redfish_driver.power_state_change_retry_interval)
-                attempts = attempts - 1
+            power_state = await self.poll_power_state(n, session, 'On')
 
             if power_state is not None and (power_state.get('powerstate', '')
                                             == 'On'):
@@ -416,31 +523,27 @@ class PowerCycleNode(RedfishBaseAction):
                     "Failed powering up node %s during power cycle task" %
                     n.name)
                 self.task.failure(focus=n.name)
-
-            session.close_session()
-
-        self.task.set_status(hd_fields.TaskStatus.Complete)
-        self.task.save()
-        return
+        finally:
+            await self.release_redfish_session(session)
 
 
 class InterrogateOob(RedfishBaseAction):
     """Action to complete a basic interrogation of the node Redfish interface."""
 
-    def start(self):
+    async def start_async(self):
         self.task.set_status(hd_fields.TaskStatus.Running)
         self.task.save()
 
         node_list = self.orchestrator.get_target_nodes(self.task)
 
         for n in node_list:
+            session = None
             try:
                 self.logger.debug("Interrogating node %s Redfish interface." %
                                   n.name)
-                session = self.get_redfish_session(n)
-                powerstate = self.exec_redfish_command(
-                    n, session, RedfishSession.get_power)
-                session.close_session()
+                session = await self.get_redfish_session(n)
+                powerstate = await self.exec_redfish_command(
+                    n, session, AsyncRedfishSession.get_power)
                 if powerstate is None:
                     raise errors.DriverError()
                 self.task.add_status_msg(
@@ -459,6 +562,8 @@ class InterrogateOob(RedfishBaseAction):
                     ctx=n.name,
                     ctx_type='node')
                 self.task.failure(focus=n.name)
+            finally:
+                await self.release_redfish_session(session)
 
         self.task.set_status(hd_fields.TaskStatus.Complete)
         self.task.save()
@@ -16,14 +16,30 @@
 Uses Redfish client to communicate to node.
 """
 
+import threading
+
 from redfish import AuthMethod, redfish_client
 from redfish.rest.v1 import ServerDownOrUnreachableError
 from redfish.rest.v1 import InvalidCredentialsError
 from redfish.rest.v1 import RetriesExhaustedError
 
+import drydock_provisioner.metrics as metrics
+
 
 class RedfishSession(object):
-    """Redfish Client to provide OOB commands"""
+    """Redfish Client to provide OOB commands.
+
+    The URI of the node's system resource and its supported boot and reset
+    actions are cached by the session and shared with other sessions to the
+    same BMC and account, so a command is usually a single request. The
+    cache is invalidated when a request to the system resource fails, and
+    the resource is read again before rejecting a boot or reset action
+    missing from the cached capabilities.
+    """
+
+    # Cached system resource details by Redfish base URL and account
+    system_cache = dict()
+    system_cache_lock = threading.Lock()
 
     def __init__(self,
                  host,
@@ -36,12 +52,18 @@ class RedfishSession(object):
                 redfish_url = 'https://' + host
             else:
                 redfish_url = 'http://' + host
+            self.base_url = redfish_url
+            self.cache_key = (redfish_url, account)
+            self.system = None
             self.redfish_client = redfish_client(base_url=redfish_url,
                                                  username=account,
                                                  password=password)
 
             self.redfish_client.MAX_RETRY = connection_retries
-            self.redfish_client.login(auth=AuthMethod.SESSION)
+            with metrics.external_request('bmc', 'redfish/login',
+                                          'POST') as req_metrics:
+                self.redfish_client.login(auth=AuthMethod.SESSION)
+                req_metrics.status = 'ok'
         except RetriesExhaustedError:
             raise RedfishException("Login failed: Retries exhausted")
         except InvalidCredentialsError:
@@ -56,7 +78,10 @@ class RedfishSession(object):
         self.redfish_client.logout()
 
     def get_system_instance(self):
-        response = self.redfish_client.get("/redfish/v1/Systems")
+        with metrics.external_request('bmc', 'redfish/systems',
+                                      'GET') as req_metrics:
+            response = self.redfish_client.get("/redfish/v1/Systems")
+            req_metrics.status = response.status
 
         if response.status != 200:
             raise RedfishException(response._read)
@@ -69,6 +94,96 @@ class RedfishSession(object):
 
         return instance
 
+    def get_system(self):
+        """Get the cached details of the node's system resource.
+
+        :return: dict -- with the system resource URI as 'instance' and,
+                 once the resource has been read, its 'reset_target',
+                 'reset_types' and 'boot_targets'
+        """
+        if self.system is None:
+            with RedfishSession.system_cache_lock:
+                self.system = RedfishSession.system_cache.get(self.cache_key)
+            metrics.cache_lookup('redfish_system', self.system is not None)
+
+        if self.system is None:
+            self.set_system({'instance': self.get_system_instance()})
+
+        return self.system
+
+    def set_system(self, system):
+        """Cache the details of the node's system resource.
+
+        :param system: dict of system resource details
+        """
+        self.system = system
+        with RedfishSession.system_cache_lock:
+            RedfishSession.system_cache[self.cache_key] = system
+
+    def invalidate_system(self):
+        """Drop the cached details of the node's system resource."""
+        self.system = None
+        with RedfishSession.system_cache_lock:
+            RedfishSession.system_cache.pop(self.cache_key, None)
+
+    def get_system_resource(self):
+        """Read the node's system resource and cache its capabilities.
+
+        :raises: RedfishException on an error
+        :return: dict -- the system resource
+        """
+        system = self.get_system()
+        try:
+            with metrics.external_request('bmc', 'redfish/system',
+                                          'GET') as req_metrics:
+                response = self.redfish_client.get(path=system['instance'])
+                req_metrics.status = response.status
+        except Exception:
+            self.invalidate_system()
+            raise
+
+        if response.status != 200:
+            self.invalidate_system()
+            raise RedfishException(response._read)
+
+        resource = response.dict
+        reset = resource.get('Actions', {}).get('#ComputerSystem.Reset', {})
+        boot = resource.get('Boot', {})
+        self.set_system({
+            'instance':
+            system['instance'],
+            'reset_target':
+            reset.get('target'),
+            'reset_types':
+            reset.get('ResetType@Redfish.AllowableValues'),
+            'boot_targets':
+            boot.get('BootSourceOverrideTarget@Redfish.AllowableValues'),
+        })
+
+        return resource
+
+    def supports(self, capability, value):
+        """Check if the node's system supports an action value.
+
+        A value missing from the cached capabilities is checked again
+        after reading the system resource, so a change of the BMC firmware
+        or BIOS settings is picked up.
+
+        :param capability: 'boot_targets' or 'reset_types'
+        :param value: the boot target or reset type
+        :raises: RedfishException on an error reading the system resource
+        :return: bool -- False only if the system lists its supported
+                 values and ``value`` is not one of them
+        """
+        values = self.get_system().get(capability)
+        if not values or value in values:
+            return True
+
+        self.invalidate_system()
+        self.get_system_resource()
+        values = self.get_system().get(capability)
+        return not values or value in values
+
     def get_bootdev(self):
         """Get current boot type information from Node.
 
@@ -76,13 +191,9 @@ class RedfishSession(object):
         :return: dict -- response will return as dict in format of
                  {'bootdev': bootdev}
         """
-        instance = self.get_system_instance()
-        response = self.redfish_client.get(path=instance)
-
-        if response.status != 200:
-            raise RedfishException(response._read)
+        resource = self.get_system_resource()
 
-        bootdev = response.dict["Boot"]["BootSourceOverrideTarget"]
+        bootdev = resource["Boot"]["BootSourceOverrideTarget"]
         return {'bootdev': bootdev}
 
     def set_bootdev(self, bootdev, **kwargs):
@@ -107,7 +218,10 @@ class RedfishSession(object):
         :return: dict -- response will return as dict in format of
                  {'bootdev': bootdev}
         """
-        instance = self.get_system_instance()
+        if not self.supports('boot_targets', bootdev):
+            raise RedfishException("Unsupported bootdev %s" % bootdev)
+
+        system = self.get_system()
 
         payload = {
             "Boot": {
@@ -120,8 +234,18 @@ class RedfishSession(object):
             payload['Boot']['UefiTargetBootSourceOverride'] = kwargs.get(
                 'UefiTargetBootSourceOverride', '')
 
-        response = self.redfish_client.patch(path=instance, body=payload)
+        try:
+            with metrics.external_request('bmc', 'redfish/system',
+                                          'PATCH') as req_metrics:
+                response = self.redfish_client.patch(path=system['instance'],
+                                                     body=payload)
+                req_metrics.status = response.status
+        except Exception:
+            self.invalidate_system()
+            raise
+
         if response.status != 200:
+            self.invalidate_system()
             raise RedfishException(response._read)
 
         return {'bootdev': bootdev}
@@ -133,13 +257,9 @@ class RedfishSession(object):
         :return: dict -- response will return as dict in format of
                  {'powerstate': powerstate}
         """
-        instance = self.get_system_instance()
+        resource = self.get_system_resource()
 
-        response = self.redfish_client.get(path=instance)
-        if response.status != 200:
-            raise RedfishException(response._read)
-
-        powerstate = response.dict["PowerState"]
+        powerstate = resource["PowerState"]
         return {'powerstate': powerstate}
 
     def set_power(self, powerstate):
@@ -157,26 +277,89 @@ class RedfishSession(object):
         :return: dict -- response will return as dict in format of
                  {'powerstate': powerstate}
         """
-        instance = self.get_system_instance()
-
         if powerstate not in [
                 "On", "ForceOff", "PushPowerButton", "GracefulRestart"
         ]:
             raise RedfishException("Unsupported powerstate")
 
+        if not self.supports('reset_types', powerstate):
+            raise RedfishException("Unsupported powerstate %s" % powerstate)
+
+        system = self.get_system()
+
+        payload = {"ResetType": powerstate}
+
+        url = system.get('reset_target')
+        if not url:
+            url = system['instance'] + "/Actions/ComputerSystem.Reset"
+        try:
+            with metrics.external_request('bmc', 'redfish/reset',
+                                          'POST') as req_metrics:
+                response = self.redfish_client.post(path=url, body=payload)
+                req_metrics.status = response.status
+        except Exception:
+            self.invalidate_system()
+            raise
+
+        if response.status in [200, 201, 204]:
+            return {'powerstate': powerstate}
+
+        # The reset may be refused because the node is already in the
+        # requested power state
         current_state = self.get_power()
         if (powerstate == "On" and current_state["powerstate"] == "On") or \
            (powerstate == "ForceOff" and current_state["powerstate"] == "Off"):
             return {'powerstate': powerstate}
 
-        payload = {"ResetType": powerstate}
+        raise RedfishException(response._read)
 
-        url = instance + "/Actions/ComputerSystem.Reset"
-        response = self.redfish_client.post(path=url, body=payload)
-        if response.status in [200, 201, 204]:
-            return {'powerstate': powerstate}
-        else:
-            raise RedfishException(response._read)
+
+class AsyncRedfishSession(object):
+    """Asyncio wrapper around RedfishSession.
+
+    Each Redfish request is executed by ``run_blocking`` so a coroutine
+    only occupies a thread for the duration of a request and not while it
+    waits between requests.
+
+    :param session: instance of RedfishSession
+    :param run_blocking: coroutine function executing a blocking callable,
+                         e.g. BaseAction.run_blocking
+    :param session_key: key of the session in a session pool, if pooled
+    """
+
+    def __init__(self, session, run_blocking, session_key=None):
+        self.session = session
+        self.run_blocking = run_blocking
+        self.session_key = session_key
+        # Set when a command fails so a pooled session is not reused
+        self.failed = False
+
+    @classmethod
+    async def create(cls, run_blocking, *args, **kwargs):
+        """Login to a Redfish interface and return an AsyncRedfishSession.
+
+        :param run_blocking: coroutine function executing a blocking callable
+        :param args: Positional arguments for RedfishSession
+        :param kwargs: Keyword arguments for RedfishSession
+        """
+        session = await run_blocking(RedfishSession, *args, **kwargs)
+        return cls(session, run_blocking)
+
+    async def close_session(self):
+        return await self.run_blocking(self.session.close_session)
+
+    async def get_bootdev(self):
+        return await self.run_blocking(self.session.get_bootdev)
+
+    async def set_bootdev(self, bootdev, **kwargs):
+        return await self.run_blocking(self.session.set_bootdev, bootdev,
+                                       **kwargs)
+
+    async def get_power(self):
+        return await self.run_blocking(self.session.get_power)
+
+    async def set_power(self, powerstate):
+        return await self.run_blocking(self.session.set_power, powerstate)
 
 
 class RedfishException(Exception):
@@ -16,6 +16,7 @@
 Based on Redfish Rest API specification.
 """
 
+import time
 import uuid
 import logging
 import concurrent.futures
@@ -28,6 +29,8 @@ import drydock_provisioner.config as config
 import drydock_provisioner.objects.fields as hd_fields
 
 import drydock_provisioner.drivers.oob.driver as oob_driver
+import drydock_provisioner.drivers.oob.scheduler as scheduler
+import drydock_provisioner.drivers.oob.session_pool as session_pool
 import drydock_provisioner.drivers.driver as generic_driver
 
 from .actions.oob import ValidateOobServices
@@ -37,6 +40,7 @@ from .actions.oob import PowerOffNode
 from .actions.oob import PowerOnNode
 from .actions.oob import PowerCycleNode
 from .actions.oob import InterrogateOob
+from .actions.oob import RedfishBaseAction
 
 
 class RedfishDriver(oob_driver.OobDriver):
@@ -84,10 +88,21 @@ class RedfishDriver(oob_driver.OobDriver):
 
         cfg.CONF.register_opts(RedfishDriver.redfish_driver_options,
                                group=RedfishDriver.driver_key)
+        cfg.CONF.register_opts(session_pool.session_pool_options,
+                               group=RedfishDriver.driver_key)
+        cfg.CONF.register_opts(scheduler.scheduler_options,
+                               group=RedfishDriver.driver_key)
 
         self.logger = logging.getLogger(
             config.config_mgr.conf.logging.oobdriver_logger_name)
 
+        # BMC sessions are reused by the actions of all tasks
+        self.session_pool = RedfishBaseAction.create_session_pool(
+            conf=getattr(cfg.CONF, RedfishDriver.driver_key),
+            logger=self.logger)
+        self.oob_scheduler = scheduler.OobScheduler.from_config(
+            getattr(cfg.CONF, RedfishDriver.driver_key), logger=self.logger)
+
     def execute_task(self, task_id):
         task = self.state_manager.get_task(task_id)
 
@@ -107,52 +122,69 @@ class RedfishDriver(oob_driver.OobDriver):
 
         target_nodes = self.orchestrator.get_target_nodes(task)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=64) as e:
-            subtask_futures = dict()
-            for n in target_nodes:
-                sub_nf = self.orchestrator.create_nodefilter_from_nodelist([n])
-                subtask = self.orchestrator.create_task(
-                    action=task.action,
-                    design_ref=task.design_ref,
-                    node_filter=sub_nf)
-                task.register_subtask(subtask)
-                self.logger.debug(
-                    "Starting Redfish subtask %s for action %s on node %s" %
-                    (str(subtask.get_id()), task.action, n.name))
-
-                action_class = self.action_class_map.get(task.action, None)
-                if action_class is None:
-                    self.logger.error(
-                        "Could not find action resource for action %s" %
-                        task.action)
-                    self.task.failure()
-                    break
-                action = action_class(subtask, self.orchestrator,
-                                      self.state_manager)
-                subtask_futures[subtask.get_id().bytes] = e.submit(
-                    action.start)
-
-            timeout = config.config_mgr.conf.timeouts.drydock_timeout
-            finished, running = concurrent.futures.wait(
-                subtask_futures.values(), timeout=(timeout * 60))
-
-            for t, f in subtask_futures.items():
-                if not f.done():
-                    task.add_status_msg(
-                        msg="Subtask %s timed out before completing.",
-                        error=True,
-                        ctx=str(uuid.UUID(bytes=t)),
-                        ctx_type='task')
-                    task.failure()
-                else:
-                    if f.exception():
-                        self.logger.error("Uncaught exception in subtask %s" %
-                                          str(uuid.UUID(bytes=t)),
-                                          exc_info=f.exception())
-            task.align_result()
-            task.bubble_results()
-            task.set_status(hd_fields.TaskStatus.Complete)
-            task.save()
+        actions = []
+        for n in target_nodes:
+            sub_nf = self.orchestrator.create_nodefilter_from_nodelist([n])
+            subtask = self.orchestrator.create_task(action=task.action,
+                                                    design_ref=task.design_ref,
+                                                    node_filter=sub_nf)
+            task.register_subtask(subtask)
+            self.logger.debug(
+                "Starting Redfish subtask %s for action %s on node %s" %
+                (str(subtask.get_id()), task.action, n.name))
+
+            action_class = self.action_class_map.get(task.action, None)
+            if action_class is None:
+                self.logger.error(
+                    "Could not find action resource for action %s" %
+                    task.action)
+                task.failure()
+                break
+            action = action_class(subtask,
+                                  self.orchestrator,
+                                  self.state_manager,
+                                  session_pool=self.session_pool)
+            actions.append((n, action))
+
+        # Nodes sharing a management endpoint are started as it has capacity
+        timeout = config.config_mgr.conf.timeouts.drydock_timeout * 60
+        deadline = time.monotonic() + timeout
+        subtask_futures = self.submit_actions(actions, timeout=timeout)
+
+        for n, action in actions:
+            if action.task.get_id().bytes not in subtask_futures:
+                task.add_status_msg(
+                    msg="Subtask %s not started before timeout, OOB endpoint "
+                    "%s is busy." %
+                    (str(action.task.get_id()), self.get_oob_endpoint(n)),
+                    error=True,
+                    ctx=n.name,
+                    ctx_type='node')
+                task.failure(focus=n.name)
+
+        finished, running = concurrent.futures.wait(
+            subtask_futures.values(),
+            timeout=max(0, deadline - time.monotonic()))
+
+        for t, f in subtask_futures.items():
+            if not f.done():
+                task.add_status_msg(
+                    msg="Subtask %s timed out before completing." %
+                    str(uuid.UUID(bytes=t)),
+                    error=True,
+                    ctx=str(uuid.UUID(bytes=t)),
+                    ctx_type='task')
+                task.failure()
+                f.cancel()
+            else:
+                if f.exception():
+                    self.logger.error("Uncaught exception in subtask %s" %
+                                      str(uuid.UUID(bytes=t)),
+                                      exc_info=f.exception())
+        task.align_result()
+        task.bubble_results()
+        task.set_status(hd_fields.TaskStatus.Complete)
+        task.save()
 
         return
 
@@ -168,4 +200,7 @@ class RedfishActionRunner(generic_driver.DriverActionRunner):
 
 
 def list_opts():
-    return {RedfishDriver.driver_key: RedfishDriver.redfish_driver_options}
+    options = list(RedfishDriver.redfish_driver_options)
+    options.extend(session_pool.session_pool_options)
+    options.extend(scheduler.scheduler_options)
+    return {RedfishDriver.driver_key: options}
@@ -0,0 +1,144 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Schedule OOB actions by the management endpoint of their nodes."""
+
+import collections
+import itertools
+import logging
+import threading
+import time
+
+from oslo_config import cfg
+
+import drydock_provisioner.config as config
+
+scheduler_options = [
+    cfg.IntOpt('max_actions_per_endpoint',
+               default=4,
+               min=1,
+               help='Maximum number of nodes acted on at once through a '
+               'single management endpoint, such as a BMC, chassis manager '
+               'or hypervisor'),
+]
+
+
+class OobScheduler(object):
+    """Start OOB actions as their management endpoints have capacity.
+
+    Nodes sharing a management endpoint are acted on at most
+    ``max_per_endpoint`` at a time across all tasks of a driver. Actions
+    for other endpoints are started while an endpoint is at its limit.
+
+    :param max_per_endpoint: maximum running actions per endpoint
+    :param logger: logger to use, defaults to the OOB driver logger
+    """
+
+    def __init__(self, max_per_endpoint=4, logger=None):
+        self.max_per_endpoint = max_per_endpoint
+        self.logger = logger or logging.getLogger(
+            config.config_mgr.conf.logging.oobdriver_logger_name)
+
+        self.cond = threading.Condition()
+        self.active = collections.Counter()
+
+    @classmethod
+    def from_config(cls, conf, logger=None):
+        """Create a scheduler configured from a driver's config group.
+
+        :param conf: oslo_config group with the ``scheduler_options``
+        """
+        return cls(max_per_endpoint=conf.max_actions_per_endpoint,
+                   logger=logger)
+
+    def schedule(self, jobs, timeout=None):
+        """Start jobs as their endpoints have capacity.
+
+        Blocks until all jobs are started or ``timeout`` expires.
+
+        :param jobs: list of (key, endpoint, submit) tuples where submit is
+                     a callable starting the job and returning a
+                     concurrent.futures.Future. An endpoint of None is not
+                     limited.
+        :param timeout: seconds to wait for endpoint capacity, or None to
+                        wait indefinitely
+        :return: dictionary of key => Future for the jobs started
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = self.interleave(jobs)
+        futures = dict()
+
+        with self.cond:
+            while pending:
+                waiting = []
+                for key, endpoint, submit in pending:
+                    if (endpoint is not None and self.active[endpoint]
+                            >= self.max_per_endpoint):
+                        waiting.append((key, endpoint, submit))
+                        continue
+                    futures[key] = self._start(endpoint, submit)
+
+                pending = waiting
+                if not pending:
+                    break
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.logger.warning(
+                            "Timed out waiting for OOB endpoint capacity, "
+                            "%d actions not started." % len(pending))
+                        break
+                self.cond.wait(remaining)
+
+        return futures
+
+    def interleave(self, jobs):
+        """Order jobs round robin across their endpoints.
+
+        :param jobs: list of (key, endpoint, submit) tuples
+        """
+        by_endpoint = collections.OrderedDict()
+        for job in jobs:
+            by_endpoint.setdefault(job[1], []).append(job)
+
+        return [
+            job for group in itertools.zip_longest(*by_endpoint.values())
+            for job in group if job is not None
+        ]
+
+    def active_count(self, endpoint):
+        """Return the number of running actions for an endpoint."""
+        with self.cond:
+            return self.active[endpoint]
+
+    def _start(self, endpoint, submit):
+        if endpoint is None:
+            return submit()
+
+        self.active[endpoint] += 1
+        try:
+            f = submit()
+        except BaseException:
+            self._finish(endpoint)
+            raise
+        f.add_done_callback(lambda _: self._finish(endpoint))
+        return f
+
+    def _finish(self, endpoint):
+        with self.cond:
+            self.active[endpoint] -= 1
+            if self.active[endpoint] <= 0:
+                del self.active[endpoint]
+            self.cond.notify_all()
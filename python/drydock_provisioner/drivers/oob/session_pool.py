@@ -0,0 +1,224 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Pool of reusable sessions to OOB management controllers."""
+
+import contextlib
+import logging
+import threading
+import time
+
+from oslo_config import cfg
+
+import drydock_provisioner.config as config
+import drydock_provisioner.error as errors
+import drydock_provisioner.metrics as metrics
+
+session_pool_options = [
+    cfg.IntOpt('session_idle_timeout',
+               default=300,
+               min=0,
+               help='Seconds an unused BMC session is kept open for reuse'),
+    cfg.IntOpt('session_keepalive_interval',
+               default=60,
+               min=0,
+               help='Seconds a BMC session can be unused before it is checked '
+               'to still be valid when reused'),
+    cfg.IntOpt('max_sessions_per_bmc',
+               default=4,
+               min=1,
+               help='Maximum number of concurrent sessions to a single BMC'),
+    cfg.IntOpt(
+        'session_wait_timeout',
+        default=600,
+        min=1,
+        help='Seconds to wait for a session to a BMC at its session limit'),
+]
+
+
+class SessionPool(object):
+    """Reusable sessions to BMCs, shared by the actions of a driver.
+
+    Sessions are keyed by BMC. A released session is kept for reuse until
+    it has been idle for ``idle_timeout`` seconds. A session idle for more
+    than ``keepalive_interval`` seconds is checked with ``keepalive`` before
+    it is reused and replaced if the check fails. At most ``max_sessions``
+    sessions to one BMC are in use at once.
+
+    :param disconnect: callable closing a session
+    :param keepalive: callable raising an exception if a session is no
+                      longer valid, or None to skip the check
+    :param idle_timeout: seconds an unused session is kept
+    :param keepalive_interval: seconds a session can be unused before
+                               ``keepalive`` is called on reuse
+    :param max_sessions: maximum sessions to a single BMC in use at once
+    :param wait_timeout: seconds to wait for a BMC at its session limit
+    :param logger: logger to use, defaults to the OOB driver logger
+    """
+
+    def __init__(self,
+                 disconnect,
+                 keepalive=None,
+                 idle_timeout=300,
+                 keepalive_interval=60,
+                 max_sessions=4,
+                 wait_timeout=600,
+                 logger=None):
+        self.disconnect = disconnect
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.max_sessions = max_sessions
+        self.wait_timeout = wait_timeout
+        self.logger = logger or logging.getLogger(
+            config.config_mgr.conf.logging.oobdriver_logger_name)
+
+        self.lock = threading.Lock()
+        self.idle = dict()
+        self.limits = dict()
+
+    @classmethod
+    def from_config(cls, conf, disconnect, keepalive=None, logger=None):
+        """Create a pool configured from a driver's config group.
+
+        :param conf: oslo_config group with the ``session_pool_options``
+        """
+        return cls(disconnect,
+                   keepalive=keepalive,
+                   idle_timeout=conf.session_idle_timeout,
+                   keepalive_interval=conf.session_keepalive_interval,
+                   max_sessions=conf.max_sessions_per_bmc,
+                   wait_timeout=conf.session_wait_timeout,
+                   logger=logger)
+
+    @contextlib.contextmanager
+    def session(self, key, connect):
+        """Use a pooled session to a BMC.
+
+        The session is returned to the pool when the block exits, or closed
+        if the block raises an exception.
+
+        :param key: tuple identifying the BMC and credentials, starting
+                    with the BMC address
+        :param connect: callable opening a new session to the BMC
+        """
+        session = self.acquire(key, connect)
+        try:
+            yield session
+        except BaseException:
+            self.release(key, session, discard=True)
+            raise
+        self.release(key, session)
+
+    def acquire(self, key, connect):
+        """Take a session to a BMC out of the pool, opening one if needed.
+
+        :param key: tuple identifying the BMC and credentials, starting
+                    with the BMC address
+        :param connect: callable opening a new session to the BMC
+        """
+        with self.lock:
+            limit = self.limits.setdefault(
+                key, threading.BoundedSemaphore(self.max_sessions))
+
+        if not limit.acquire(timeout=self.wait_timeout):
+            raise errors.DriverError(
+                "Timed out waiting for a session to BMC %s" % str(key[0]))
+
+        try:
+            self.evict_idle()
+            while True:
+                with self.lock:
+                    sessions = self.idle.get(key)
+                    entry = sessions.pop() if sessions else None
+
+                if entry is None:
+                    metrics.cache_lookup('bmc_session', False)
+                    return connect()
+
+                session, last_used = entry
+                idle_time = time.monotonic() - last_used
+                if (self.keepalive is not None
+                        and idle_time > self.keepalive_interval):
+                    try:
+                        self.keepalive(session)
+                    except Exception as ex:
+                        self.logger.debug(
+                            "Pooled session to BMC %s failed keepalive: %s" %
+                            (str(key[0]), str(ex)))
+                        self._close(session)
+                        continue
+
+                metrics.cache_lookup('bmc_session', True)
+                return session
+        except BaseException:
+            limit.release()
+            raise
+
+    def release(self, key, session, discard=False):
+        """Return a session to the pool.
+
+        :param key: the key the session was acquired with
+        :param session: the session
+        :param discard: if True, close the session instead of keeping it
+        """
+        try:
+            if discard or self.idle_timeout <= 0:
+                self._close(session)
+            else:
+                with self.lock:
+                    self.idle.setdefault(key, []).append(
+                        (session, time.monotonic()))
+        finally:
+            with self.lock:
+                limit = self.limits.get(key)
+            if limit is not None:
+                limit.release()
+
+    def evict_idle(self):
+        """Close sessions unused for longer than the idle timeout."""
+        expired = []
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            for key, sessions in self.idle.items():
+                expired.extend(s for s, last_used in sessions
+                               if last_used < cutoff)
+                sessions[:] = [(s, last_used) for s, last_used in sessions
+                               if last_used >= cutoff]
+
+        for session in expired:
+            self._close(session)
+
+        return len(expired)
+
+    def close(self):
+        """Close all unused sessions."""
+        with self.lock:
+            sessions = [s for v in self.idle.values() for s, _ in v]
+            self.idle = dict()
+
+        for session in sessions:
+            self._close(session)
+
+    def idle_count(self, key=None):
+        """Return the number of unused sessions, optionally to one BMC."""
+        with self.lock:
+            if key is not None:
+                return len(self.idle.get(key, []))
+            return sum(len(v) for v in self.idle.values())
+
+    def _close(self, session):
+        try:
+            self.disconnect(session)
+        except Exception as ex:
+            self.logger.debug("Error closing BMC session: %s" % str(ex))
@@ -14,8 +14,11 @@
 """REST client for Drydock API."""
 
 import logging
+import time
+import urllib.parse
 
 from drydock_provisioner import error as errors
+from drydock_provisioner.cli.const import TaskStatus
 
 
 class DrydockClient(object):
@@ -79,26 +82,64 @@ class DrydockClient(object):
 
         return resp.json()
 
-    def get_tasks(self):
+    def get_tasks(self,
+                  status=None,
+                  action=None,
+                  design_ref=None,
+                  parent_only=False,
+                  summary=False,
+                  page_size=None):
         """
         Get a list of all the tasks, completed or running.
 
-        :return: List of string uuid task IDs
+        :param list status: If set, only list tasks in one of these statuses
+        :param list action: If set, only list tasks for one of these actions
+        :param string design_ref: If set, only list tasks for this design reference
+        :param bool parent_only: If true, only list tasks without a parent task
+        :param bool summary: If true, omit the result messages of each task
+        :param int page_size: If set, retrieve the list in pages of this many tasks
+        :return: List of dicts representing the tasks, newest first
         """
 
         endpoint = "v1.0/tasks"
 
-        resp = self.session.get(endpoint)
-
-        self._check_response(resp)
-
-        return resp.json()
+        query = dict()
+        if status:
+            query['status'] = ','.join(status)
+        if action:
+            query['action'] = ','.join(action)
+        if design_ref:
+            query['design_ref'] = design_ref
+        if parent_only:
+            query['parent_only'] = 'true'
+        if summary:
+            query['summary'] = 'true'
+        if page_size:
+            query['limit'] = page_size
+
+        task_list = []
+        while True:
+            resp = self.session.get(endpoint, query=query or None)
+
+            self._check_response(resp)
+
+            task_list.extend(resp.json())
+
+            next_page = resp.links.get('next')
+            if not page_size or next_page is None:
+                break
+            next_query = urllib.parse.parse_qs(
+                urllib.parse.urlparse(next_page['url']).query)
+            query['cursor'] = next_query['cursor'][0]
+
+        return task_list
 
     def get_task(self,
                  task_id,
                  builddata=None,
                  subtaskerrors=None,
-                 layers=None):
+                 layers=None,
+                 wait=None):
         """
         Get the current description of a Drydock task
 
@@ -108,6 +149,8 @@ class DrydockClient(object):
                                       subtask_errors.
         :param int layers: If -1 will include all subtasks, if a positive integer it will include that many layers
                            of subtasks.
+        :param int wait: If set, the API holds the response until the task is complete or terminated, for
+                         at most this many seconds.
         :return: A dict representing the current state of the task.
         """
 
@@ -120,15 +163,44 @@ class DrydockClient(object):
             query_params.append('subtaskerrors=true')
         if layers:
             query_params.append('layers=%s' % layers)
+        timeout = None
+        if wait:
+            query_params.append('wait=%d' % wait)
+            timeout = self.session.default_timeout[1] + wait
         if query_params:
             endpoint = '%s?%s' % (endpoint, '&'.join(query_params))
 
-        resp = self.session.get(endpoint)
+        resp = self.session.get(endpoint, timeout=timeout)
 
         self._check_response(resp)
 
         return resp.json()
 
+    def wait_for_task(self, task_id, poll_interval=15):
+        """
+        Wait for a Drydock task to be complete or terminated
+
+        Each request waits up to ``poll_interval`` seconds for the task to
+        finish, so completion is seen as soon as it happens. Against an API
+        that returns at once, the task is polled every ``poll_interval``
+        seconds.
+
+        :param string task_id: The string uuid task id to wait for.
+        :param int poll_interval: Maximum seconds between requests.
+        :return: A dict representing the final state of the task.
+        """
+        finished = [TaskStatus.Complete.value, TaskStatus.Terminated.value]
+
+        task = self.get_task(task_id)
+        while task.get('status') not in finished:
+            requested = time.monotonic()
+            task = self.get_task(task_id, wait=poll_interval)
+            elapsed = time.monotonic() - requested
+            if task.get('status') not in finished and elapsed < poll_interval:
+                time.sleep(poll_interval - elapsed)
+
+        return task
+
     def delete_tasks(self, days=None):
         """
         Enforce retention policy.
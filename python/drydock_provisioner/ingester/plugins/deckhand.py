@@ -27,6 +27,7 @@ from beaker.cache import CacheManager
 from beaker.util import parse_cache_config_options
 
 from drydock_provisioner import error as errors
+from drydock_provisioner import metrics
 from drydock_provisioner import objects
 from drydock_provisioner.ingester.plugins import IngesterPlugin
 
@@ -57,7 +58,10 @@ class DeckhandIngester(IngesterPlugin):
         :returns: a tuple of a status response and a list of parsed objects from drydock_provisioner.objects
         """
 
+        cache_misses = []
+
         def local_parse():
+            cache_misses.append(True)
             return self.parse_docs(kwargs.get('content'))
 
         if 'content' in kwargs:
@@ -67,6 +71,7 @@ class DeckhandIngester(IngesterPlugin):
                 hv = hashlib.md5(kwargs.get('content', b'')).hexdigest()
                 local_cache = cache.get_cache('parsed_docs')
                 results = local_cache.get(key=hv, createfunc=local_parse)
+                metrics.cache_lookup('parsed_docs', not cache_misses)
                 parse_status, models = results
             except Exception as ex:
                 self.logger.debug("Error parsing design - hash %s",
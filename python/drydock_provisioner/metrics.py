@@ -0,0 +1,253 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Prometheus metrics for the orchestrator, drivers and state manager.
+
+Metrics are recorded in the default registry of the process and served by
+the API at ``/metrics``. Each API worker process runs its own orchestrator,
+so each process reports only the work it executed.
+"""
+
+from datetime import datetime, UTC
+import functools
+import threading
+import time
+import weakref
+
+import prometheus_client
+from prometheus_client.core import GaugeMetricFamily
+
+# Buckets for tasks and stages running from seconds to hours
+TASK_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400,
+                float('inf'))
+
+# Buckets for waits in the orchestrator task queue
+QUEUE_BUCKETS = (0.5, 1, 2.5, 5, 10, 15, 30, 60, 120, 300, 600, 1800,
+                 float('inf'))
+
+TASK_QUEUE_DEPTH = prometheus_client.Gauge(
+    'drydock_task_queue_depth',
+    'Number of queued tasks waiting for the orchestrator')
+
+TASK_PICKUP_LATENCY = prometheus_client.Histogram(
+    'drydock_task_pickup_latency_seconds',
+    'Time from a task being created to the orchestrator starting it',
+    buckets=QUEUE_BUCKETS)
+
+TASK_DURATION = prometheus_client.Histogram(
+    'drydock_task_duration_seconds',
+    'Time from a task starting to run to it finishing, by action and by '
+    'scope: action for tasks requested through the API, node for subtasks '
+    'targeting a single node and stage for other subtasks',
+    labelnames=['action', 'scope', 'result'],
+    buckets=TASK_BUCKETS)
+
+NODE_STAGE_DURATION = prometheus_client.Gauge(
+    'drydock_node_stage_last_duration_seconds',
+    'Duration of the last subtask executing an action on a node',
+    labelnames=['node', 'action'])
+
+EXTERNAL_REQUEST_DURATION = prometheus_client.Histogram(
+    'drydock_external_request_duration_seconds',
+    'Latency of requests to MaaS, BMCs and Promenade by endpoint and '
+    'response status',
+    labelnames=['service', 'endpoint', 'method', 'status'])
+
+DB_QUERY_DURATION = prometheus_client.Histogram(
+    'drydock_db_query_duration_seconds',
+    'Latency of state manager database calls by method',
+    labelnames=['method'])
+
+CACHE_REQUESTS = prometheus_client.Counter('drydock_cache_requests_total',
+                                           'Cache lookups by cache and result',
+                                           labelnames=['cache', 'result'])
+
+
+class ExecutorCollector(object):
+    """Report the utilization of executor pools when scraped.
+
+    Pools with the same name in several ExecutorService instances are
+    summed.
+    """
+
+    def __init__(self):
+        self.executors = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+    def add(self, executor):
+        """Report the pools of ``executor``.
+
+        :param executor: instance of orchestrator.executor.ExecutorService
+        """
+        with self.lock:
+            self.executors.add(executor)
+
+    def collect(self):
+        with self.lock:
+            executors = list(self.executors)
+
+        pools = dict()
+        for executor in executors:
+            for name, stats in executor.get_stats().items():
+                totals = pools.setdefault(name, dict.fromkeys(stats, 0))
+                for k, v in stats.items():
+                    totals[k] = totals.get(k, 0) + v
+
+        families = [
+            ('max_workers', 'drydock_executor_max_workers',
+             'Maximum concurrent work items of an executor pool'),
+            ('active_threads', 'drydock_executor_active_workers',
+             'Work items executing in an executor pool'),
+            ('queue_depth', 'drydock_executor_queue_depth',
+             'Work items waiting for a worker in an executor pool'),
+        ]
+        for key, name, doc in families:
+            family = GaugeMetricFamily(name, doc, labels=['pool'])
+            for pool, stats in sorted(pools.items()):
+                family.add_metric([pool], stats.get(key, 0))
+            yield family
+
+
+executor_collector = ExecutorCollector()
+prometheus_client.REGISTRY.register(executor_collector)
+
+
+def register_executor(executor):
+    """Report the utilization of the pools of an ExecutorService."""
+    executor_collector.add(executor)
+
+
+def generate_latest():
+    """Return the metrics of the process in the Prometheus text format."""
+    return prometheus_client.generate_latest(prometheus_client.REGISTRY)
+
+
+def observe_task_pickup(task):
+    """Record the time a task waited in the queue before being started.
+
+    :param task: instance of objects.Task
+    """
+    if task.created is None:
+        return
+    created = task.created
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=UTC)
+    wait = (datetime.now(UTC) - created).total_seconds()
+    TASK_PICKUP_LATENCY.observe(max(wait, 0))
+
+
+def observe_task_duration(task, duration):
+    """Record the time a task ran.
+
+    :param task: instance of objects.Task
+    :param duration: seconds from the task starting to run to finishing
+    """
+    action = str(task.action)
+    node = task_node_name(task)
+
+    if task.parent_task_id is None:
+        scope = 'action'
+    elif node is not None:
+        scope = 'node'
+        NODE_STAGE_DURATION.labels(node=node, action=action).set(duration)
+    else:
+        scope = 'stage'
+
+    TASK_DURATION.labels(action=action,
+                         scope=scope,
+                         result=str(task.result.status)).observe(duration)
+
+
+def task_node_name(task):
+    """Return the node a task targets if its node filter names only one."""
+    node_filter = task.node_filter
+    if not isinstance(node_filter, dict):
+        return None
+    filter_set = node_filter.get('filter_set') or []
+    if len(filter_set) != 1:
+        return None
+    node_names = filter_set[0].get('node_names') or []
+    if len(node_names) != 1:
+        return None
+    return node_names[0]
+
+
+def cache_lookup(cache, hit):
+    """Record a lookup in a cache.
+
+    :param cache: name of the cache
+    :param hit: whether the lookup was served from the cache
+    """
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def endpoint_template(path):
+    """Replace the IDs in a ``collection/id/collection/id`` path with {id}.
+
+    :param path: API path relative to the API root
+    """
+    segments = [s for s in path.split('?', 1)[0].split('/') if s]
+    return '/'.join(s if i % 2 == 0 else '{id}'
+                    for i, s in enumerate(segments))
+
+
+class ExternalRequest(object):
+    """Time a request to an external service.
+
+    Set ``status`` before the block exits. Requests raising an exception are
+    recorded with a status of ``error``.
+
+    :param service: the service, e.g. maas, bmc or promenade
+    :param endpoint: the endpoint requested, without IDs
+    :param method: the request method
+    """
+
+    def __init__(self, service, endpoint, method):
+        self.service = service
+        self.endpoint = endpoint
+        self.method = method
+        self.status = None
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        status = 'error' if exc_type is not None else self.status
+        EXTERNAL_REQUEST_DURATION.labels(
+            service=self.service,
+            endpoint=self.endpoint,
+            method=self.method,
+            status=str(status)).observe(time.monotonic() - self.start)
+        return False
+
+
+def external_request(service, endpoint, method):
+    """Return a context manager timing a request to an external service."""
+    return ExternalRequest(service, endpoint, method)
+
+
+def db_query(fn):
+    """Decorate a state manager method to record its latency."""
+    histogram = DB_QUERY_DURATION.labels(method=fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.monotonic() - start)
+
+    return wrapper
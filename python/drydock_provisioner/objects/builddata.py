@@ -13,6 +13,7 @@
 # limitations under the License.
 """Models for representing build data."""
 import uuid
+import zlib
 
 from datetime import datetime, UTC
 
@@ -20,6 +21,9 @@ from drydock_provisioner import objects
 
 import drydock_provisioner.error as errors
 
+# Data elements of at least this many characters are stored compressed
+COMPRESS_THRESHOLD = 1024
+
 
 class BuildData(object):
     """Build data
@@ -30,6 +34,7 @@ class BuildData(object):
     :param generator: String description of the source of data (e.g. ``lshw``)
     :param data_format: String MIME-type of ``data_element``
     :param data_element: Data to be saved, will be cast to ``str``
+    :param summary: Whether this instance is a summary without ``data_element``
     """
 
     def __init__(self,
@@ -38,15 +43,18 @@ class BuildData(object):
                  collected_date=None,
                  generator=None,
                  data_format=None,
-                 data_element=None):
+                 data_element=None,
+                 summary=False):
         """Initiator for BuildData."""
-        if not all((node_name, task_id, generator, data_format, data_element)):
+        if not all((node_name, task_id, generator, data_format, summary
+                    or data_element)):
             raise ValueError("Required field missing.")
 
         try:
             if isinstance(data_element, bytes):
                 data_element = data_element.decode('utf-8')
-            elif not isinstance(data_element, str):
+            elif data_element is not None and not isinstance(
+                    data_element, str):
                 data_element = str(data_element)
         except Exception:
             raise errors.BuildDataError(
@@ -59,6 +67,7 @@ class BuildData(object):
         self.generator = generator
         self.data_format = data_format
         self.data_element = data_element
+        self.summary = summary
 
     @classmethod
     def obj_name(cls):
@@ -67,11 +76,20 @@ class BuildData(object):
     def to_db(self):
         """Convert this instance to a dictionary for use persisting to a db.
 
-        include_id=False can be used for doing an update where the primary key
-        of the table shouldn't included in the values set
-
-        :param include_id: Whether to include task_id in the dictionary
+        A ``data_element`` of at least ``COMPRESS_THRESHOLD`` characters is
+        stored zlib compressed in ``data_compressed``.
         """
+        if self.summary:
+            raise errors.BuildDataError(
+                "Summary build data cannot be persisted.")
+
+        if len(self.data_element) >= COMPRESS_THRESHOLD:
+            data_element = None
+            data_compressed = zlib.compress(self.data_element.encode('utf-8'))
+        else:
+            data_element = self.data_element
+            data_compressed = None
+
         _dict = {
             'node_name':
             self.node_name,
@@ -84,7 +102,9 @@ class BuildData(object):
             'data_format':
             self.data_format,
             'data_element':
-            self.data_element,
+            data_element,
+            'data_compressed':
+            data_compressed,
         }
 
         return _dict
@@ -110,7 +130,7 @@ class BuildData(object):
             self.data_format,
         }
 
-        if verbosity > 1:
+        if verbosity > 1 and not self.summary:
             _dict['data_element'] = self.data_element
 
         return _dict
@@ -119,8 +139,19 @@ class BuildData(object):
     def from_db(cls, d):
         """Create an instance from a DB-based dictionary.
 
+        A dictionary without ``data_element`` or ``data_compressed`` creates
+        a summary instance.
+
         :param d: Dictionary of instance data
         """
+        if 'data_element' not in d and 'data_compressed' not in d:
+            d['summary'] = True
+
+        data_compressed = d.pop('data_compressed', None)
+        if data_compressed is not None:
+            d['data_element'] = zlib.decompress(
+                bytes(data_compressed)).decode('utf-8')
+
         d['task_id'] = uuid.UUID(bytes=bytes(d.get('task_id')))
 
         # Ensure collected_date is timezone-aware
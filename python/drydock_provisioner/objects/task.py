@@ -21,6 +21,7 @@ import copy
 
 from datetime import datetime, UTC
 
+from drydock_provisioner import metrics
 from drydock_provisioner import objects
 
 import drydock_provisioner.error as errors
@@ -71,6 +72,10 @@ class Task(object):
         self.request_context = context
         self.terminate = False
         self.logger = logging.getLogger("drydock")
+        # Column values last read from or written to the database
+        self.db_state = None
+        # Monotonic time this instance of the task was set running
+        self.run_start = None
 
         if context is not None:
             self.created_by = context.user
@@ -127,6 +132,15 @@ class Task(object):
         return self.terminate
 
     def set_status(self, status):
+        if status == hd_fields.TaskStatus.Running:
+            if self.run_start is None:
+                self.run_start = time.monotonic()
+        elif (status in [
+                hd_fields.TaskStatus.Complete, hd_fields.TaskStatus.Terminated
+        ] and self.run_start is not None):
+            metrics.observe_task_duration(self,
+                                          time.monotonic() - self.run_start)
+            self.run_start = None
         self.status = status
 
     def get_status(self):
@@ -192,19 +206,43 @@ class Task(object):
             raise errors.OrchestratorError("Error adding subtask.")
 
     def save(self):
-        """Save this task's current state to the database."""
-        chk_task = self.statemgr.get_task(self.get_id())
+        """Save this task's current state to the database.
 
-        if chk_task in [
-                hd_fields.TaskStatus.Terminating,
-                hd_fields.TaskStatus.Terminated
+        Only the columns changed since the task was loaded or last saved are
+        written. Termination requested by other processes is merged into
+        this task rather than overwritten.
+        """
+        # Readers seeing a finished task should also see all its messages
+        if self.status in [
+                hd_fields.TaskStatus.Complete, hd_fields.TaskStatus.Terminated
         ]:
-            self.set_status(chk_task.status)
+            self.statemgr.flush_result_messages()
 
         self.updated = datetime.now(UTC)
-        if not self.statemgr.put_task(self):
+        db_state = copy.deepcopy(self.to_db(include_id=False))
+        stored = self.statemgr.put_task(self,
+                                        columns=self.get_changes(db_state))
+        if not stored:
             raise errors.OrchestratorError("Error saving task.")
 
+        for k, v in stored.items():
+            setattr(self, k, v)
+        db_state.update(stored)
+        self.db_state = db_state
+
+    def get_changes(self, db_state=None):
+        """Get the database columns changed since the task was last persisted.
+
+        Returns all columns if the persisted state of the task is unknown.
+
+        :param db_state: optional current result of ``to_db(include_id=False)``
+        """
+        if db_state is None:
+            db_state = self.to_db(include_id=False)
+        if self.db_state is None:
+            return db_state
+        return {k: v for k, v in db_state.items() if self.db_state.get(k) != v}
+
     def get_subtasks(self):
         """Get list of this task's subtasks."""
         return self.subtask_id_list
@@ -493,6 +531,8 @@ class Task(object):
             i.request_context = DrydockRequestContext.from_dict(
                 i.request_context)
 
+        i.db_state = copy.deepcopy(i.to_db(include_id=False))
+
         return i
 
 
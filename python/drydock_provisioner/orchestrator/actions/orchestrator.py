@@ -13,6 +13,7 @@
 # limitations under the License.
 """Actions for the Orchestrator level of the Drydock workflow."""
 
+import asyncio
 import time
 import datetime
 import logging
@@ -23,9 +24,16 @@ import drydock_provisioner.config as config
 import drydock_provisioner.error as errors
 import drydock_provisioner.objects.fields as hd_fields
 
+from drydock_provisioner.orchestrator.executor import ExecutorService
+
 
 class BaseAction(object):
-    """The base class for actions starts by the orchestrator."""
+    """The base class for actions starts by the orchestrator.
+
+    Subclasses implement either ``start`` or the coroutine ``start_async``.
+    Actions implementing ``start_async`` can be run as coroutines by the
+    ExecutorService and are adapted to run synchronously via ``start``.
+    """
 
     def __init__(self, task, orchestrator, state_manager):
         """Object initializer.
@@ -40,6 +48,81 @@ class BaseAction(object):
         self.logger = logging.getLogger(
             config.config_mgr.conf.logging.global_logger_name)
 
+    def start(self):
+        """Start executing this action.
+
+        Actions that only implement ``start_async`` are run to completion
+        on a private event loop in the calling thread.
+        """
+        if not self.is_async():
+            raise NotImplementedError()
+        return asyncio.run(self.start_async())
+
+    async def start_async(self):
+        """Start executing this action as a coroutine."""
+        raise NotImplementedError()
+
+    def is_async(self):
+        """Return whether this action implements ``start_async``."""
+        return type(self).start_async is not BaseAction.start_async
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """Await a blocking callable from ``start_async``.
+
+        The callable is executed on the bounded async_io executor pool so
+        the event loop is not blocked.
+
+        :param fn: The blocking callable to execute
+        :param args: Positional arguments for fn
+        :param kwargs: Keyword arguments for fn
+        """
+        return await self.orchestrator.executor.run_blocking(
+            fn, *args, **kwargs)
+
+    async def run_per_node(self, fn, node_list):
+        """Await the coroutine function fn for all nodes concurrently.
+
+        An exception raised for one node is recorded as a failure of that
+        node and does not interrupt the other nodes. If this coroutine is
+        cancelled, the nodes not yet finished are recorded as failed before
+        the cancellation is re-raised.
+
+        :param fn: Coroutine function taking a objects.BaremetalNode
+        :param node_list: List of objects.BaremetalNode instances
+        """
+        node_futures = [asyncio.ensure_future(fn(n)) for n in node_list]
+
+        try:
+            await asyncio.gather(*node_futures, return_exceptions=True)
+        except asyncio.CancelledError:
+            # gather has cancelled the nodes still running
+            await self._record_node_failures(node_list, node_futures)
+            raise
+
+        await self._record_node_failures(node_list, node_futures)
+
+    async def _record_node_failures(self, node_list, node_futures):
+        """Record the nodes whose futures failed or were cancelled.
+
+        :param node_list: List of objects.BaremetalNode instances
+        :param node_futures: List of the finished futures of each node
+        """
+        for n, f in zip(node_list, node_futures):
+            if f.cancelled():
+                msg = "Cancelled executing %s" % self.task.action
+            elif f.exception() is not None:
+                msg = "Error executing %s: %s" % (self.task.action,
+                                                  str(f.exception()))
+            else:
+                continue
+            self.logger.error("%s on node %s" % (msg, n.name))
+            await self.run_blocking(self.task.add_status_msg,
+                                    msg=msg,
+                                    error=True,
+                                    ctx=n.name,
+                                    ctx_type='node')
+            await self.run_blocking(self.task.failure, focus=n.name)
+
     def _parallelize_subtasks(self, fn, subtask_id_list, *args, **kwargs):
         """Spawn threads to execute fn for each subtask using concurrent.futures.
 
@@ -52,9 +135,10 @@ class BaseAction(object):
         """
         task_futures = dict()
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=64) as te:
-            for t in subtask_id_list:
-                task_futures[t.bytes] = te.submit(fn, t, *args, **kwargs)
+        te = self.orchestrator.executor.get_pool(
+            ExecutorService.ORCHESTRATOR_SUBTASK)
+        for t in subtask_id_list:
+            task_futures[t.bytes] = te.submit(t, fn, t, *args, **kwargs)
 
         return task_futures
 
@@ -76,18 +160,19 @@ class BaseAction(object):
                 str(self.task.get_id()))
             split_tasks = dict()
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=64) as te:
-                for n in target_nodes:
-                    split_task = self.orchestrator.create_task(
-                        design_ref=self.task.design_ref,
-                        action=hd_fields.OrchestratorAction.PrepareNodes,
-                        node_filter=self.orchestrator.
-                        create_nodefilter_from_nodelist([n]))
-                    self.task.register_subtask(split_task)
-                    action = self.__class__(split_task, self.orchestrator,
-                                            self.state_manager)
-                    split_tasks[split_task.get_id().bytes] = te.submit(
-                        action.start)
+            te = self.orchestrator.executor.get_pool(
+                ExecutorService.ORCHESTRATOR_SPLIT)
+            for n in target_nodes:
+                split_task = self.orchestrator.create_task(
+                    design_ref=self.task.design_ref,
+                    action=hd_fields.OrchestratorAction.PrepareNodes,
+                    node_filter=self.orchestrator.
+                    create_nodefilter_from_nodelist([n]))
+                self.task.register_subtask(split_task)
+                action = self.__class__(split_task, self.orchestrator,
+                                        self.state_manager)
+                split_tasks[split_task.get_id().bytes] = te.submit(
+                    split_task.get_id(), action.start)
 
             return split_tasks
 
@@ -107,12 +192,14 @@ class BaseAction(object):
         for k, v in subtask_futures.items():
             if not v.done():
                 self.task.add_status_msg(
-                    "Subtask thread for %s still executing after timeout." %
-                    str(uuid.UUID(bytes=k)),
+                    msg="Subtask thread for %s still executing after timeout."
+                    % str(uuid.UUID(bytes=k)),
                     error=True,
                     ctx=str(self.task.get_id()),
                     ctx_type='task')
                 self.task.failure()
+                # Don't start work that is still queued for the subtask
+                v.cancel()
             else:
                 if v.exception():
                     self.logger.error(
@@ -1104,40 +1191,51 @@ class BootactionReport(BaseAction):
 
         poll_start = datetime.datetime.now(datetime.UTC)
 
-        still_running = True
         timeout = datetime.timedelta(
             minutes=config.config_mgr.conf.timeouts.bootaction_final_status)
-        running_time = datetime.datetime.now(datetime.UTC) - poll_start
         nodelist = [
             n.get_id() for n in self.orchestrator.get_target_nodes(self.task)
         ]
 
+        # Wake up as soon as a node signals rather than on the next poll
+        listener = self.state_manager.listen_boot_action_status()
+
         self.logger.debug(
             "Waiting for bootaction response signals to complete.")
-        while running_time < timeout:
-            still_running = False
-            for n in nodelist:
-                bas = self.state_manager.get_boot_actions_for_node(n)
-                running_bas = {
-                    k: v
-                    for (k, v) in bas.items() if v.get('action_status')
-                    == hd_fields.ActionResult.Incomplete
-                }
-                if len(running_bas) > 0:
-                    still_running = True
+        try:
+            while True:
+                ba_counts = self.state_manager.get_boot_action_counts(nodelist)
+                if ba_counts is not None:
+                    running_nodes = [
+                        n for (n, c) in ba_counts.items()
+                        if c.get(hd_fields.ActionResult.Incomplete)
+                    ]
+                    if not running_nodes:
+                        break
+                    running_count = sum(
+                        ba_counts[n][hd_fields.ActionResult.Incomplete]
+                        for n in running_nodes)
+                    self.logger.debug(
+                        "Still waiting on %d running bootactions on %d nodes."
+                        % (running_count, len(running_nodes)))
+                elapsed = datetime.datetime.now(datetime.UTC) - poll_start
+                remaining = timeout - elapsed
+                if remaining.total_seconds() <= 0:
                     break
-            if still_running:
-                self.logger.debug("Still waiting on %d running bootactions." %
-                                  len(running_bas))
-                time.sleep(config.config_mgr.conf.poll_interval)
-                running_time = datetime.datetime.now(datetime.UTC) - poll_start
-            else:
-                break
+                listener.wait(
+                    min(config.config_mgr.conf.poll_interval,
+                        remaining.total_seconds()))
+        finally:
+            listener.close()
 
         self.logger.debug("Signals complete or timeout reached.")
 
+        node_bas = self.state_manager.get_boot_actions_for_nodes(nodelist)
+        if node_bas is None:
+            node_bas = dict()
+
         for n in nodelist:
-            bas = self.state_manager.get_boot_actions_for_node(n)
+            bas = node_bas.get(n, dict())
             success_bas = {
                 k: v
                 for (k, v) in bas.items()
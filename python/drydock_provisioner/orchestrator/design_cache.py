@@ -0,0 +1,164 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of compiled site designs for read-only API queries."""
+
+import collections
+import logging
+import threading
+import time
+
+import drydock_provisioner.config as config
+import drydock_provisioner.metrics as metrics
+import drydock_provisioner.objects.fields as hd_fields
+
+
+class NodeIndex(object):
+    """Lookup of the baremetal nodes of a site design by node filter keys.
+
+    :param nodes: list of objects.BaremetalNode
+    """
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes or [])
+
+        self.names = collections.defaultdict(list)
+        self.tags = collections.defaultdict(list)
+        self.racks = collections.defaultdict(list)
+        self.labels = collections.defaultdict(list)
+
+        for n in self.nodes:
+            self.names[n.get_name()].append(n)
+            self.racks[n.get_rack()].append(n)
+            for t in set(getattr(n, 'tags', None) or []):
+                self.tags[t].append(n)
+            for k, v in (getattr(n, 'owner_data', None) or {}).items():
+                self.labels[(k, v)].append(n)
+
+    def with_names(self, node_names):
+        """Return the nodes named in ``node_names``."""
+        return self._lookup(self.names, node_names)
+
+    def with_tags(self, node_tags):
+        """Return the nodes having any of ``node_tags``."""
+        return self._lookup(self.tags, node_tags)
+
+    def in_racks(self, rack_names):
+        """Return the nodes in any of ``rack_names``."""
+        return self._lookup(self.racks, rack_names)
+
+    def with_labels(self, node_labels):
+        """Return the nodes having any of the ``node_labels`` key/value pairs."""
+        return self._lookup(self.labels, node_labels.items())
+
+    def _lookup(self, index, keys):
+        nodes = dict()
+        for k in keys:
+            for n in index.get(k, []):
+                nodes[id(n)] = n
+        return list(nodes.values())
+
+
+class CompiledDesign(object):
+    """A compiled site design and the index of its nodes."""
+
+    def __init__(self, status, site_design):
+        self.status = status
+        self.site_design = site_design
+        self.compiled = time.monotonic()
+
+        nodes = None
+        if site_design is not None:
+            nodes = getattr(site_design, 'baremetal_nodes', None)
+        self.node_index = NodeIndex(nodes)
+
+    def cacheable(self):
+        """Return whether the design loaded and can be reused."""
+        if self.site_design is None or self.status is None:
+            return False
+
+        return self.status.status not in (hd_fields.ValidationResult.Failure,
+                                          hd_fields.ActionResult.Failure)
+
+
+class DesignCache(object):
+    """Compiled site designs keyed by design reference.
+
+    Designs are compiled with the orchestrator on first use and reused for
+    ``design_cache_ttl`` seconds. At most ``design_cache_size`` designs are
+    kept, evicting the least recently used. Designs that failed to load are
+    not cached. Cached designs are shared and must not be modified.
+
+    :param orchestrator: instance of orchestrator.Orchestrator
+    """
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.logger = logging.getLogger('drydock.orchestrator')
+
+        self.lock = threading.Lock()
+        self.designs = collections.OrderedDict()
+        self.compiling = dict()
+
+    def get(self, design_ref):
+        """Return the compiled design referenced by ``design_ref``.
+
+        :param design_ref: Supported URI referencing a design document
+        :return: instance of CompiledDesign
+        """
+        ttl = config.config_mgr.conf.design_cache_ttl
+        size = config.config_mgr.conf.design_cache_size
+
+        if ttl <= 0 or size <= 0:
+            return CompiledDesign(
+                *self.orchestrator.get_effective_site(design_ref))
+
+        with self.lock:
+            compile_lock = self.compiling.setdefault(design_ref,
+                                                     threading.Lock())
+
+        # Concurrent requests for the same design compile it once
+        with compile_lock:
+            with self.lock:
+                design = self.designs.get(design_ref)
+                if (design is not None
+                        and time.monotonic() - design.compiled < ttl):
+                    self.designs.move_to_end(design_ref)
+                    metrics.cache_lookup('design', True)
+                    return design
+                self.designs.pop(design_ref, None)
+
+            metrics.cache_lookup('design', False)
+
+            self.logger.debug("Compiling design %s for the design cache." %
+                              design_ref)
+            design = CompiledDesign(
+                *self.orchestrator.get_effective_site(design_ref))
+
+            if not design.cacheable():
+                with self.lock:
+                    self.compiling.pop(design_ref, None)
+                return design
+
+            with self.lock:
+                self.designs[design_ref] = design
+                while len(self.designs) > size:
+                    evicted, _ = self.designs.popitem(last=False)
+                    self.compiling.pop(evicted, None)
+
+        return design
+
+    def clear(self):
+        """Discard all cached designs."""
+        with self.lock:
+            self.designs.clear()
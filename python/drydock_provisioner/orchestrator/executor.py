@@ -0,0 +1,449 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Bounded, named thread pools for executing orchestrator and driver work.
+
+Every fan-out point in Drydock (the orchestrator task loop, subtask
+parallelization in orchestrator actions and per-node execution in the
+drivers) submits work to a named pool owned by a single ExecutorService
+so the total number of threads in the process is bounded by configuration
+instead of by the size of the deployment.
+
+When ``[executor] async_actions`` is enabled, actions implementing
+``start_async`` are instead run as coroutines on a single event loop and
+only borrow a thread from the ``async_io`` pool for each blocking call.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+
+import drydock_provisioner.config as config
+import drydock_provisioner.metrics as metrics
+
+
+class ExecutorPool(object):
+    """A bounded thread pool tracking queue depth and active workers.
+
+    :param name: The name of this pool, used in thread names and stats
+    :param max_workers: The maximum number of threads this pool will start
+    """
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="drydock-%s" % name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._task_futures = dict()
+
+    @property
+    def queue_depth(self):
+        """Number of submitted work items not yet started."""
+        return self._queued
+
+    @property
+    def active_threads(self):
+        """Number of work items currently executing."""
+        return self._active
+
+    def submit(self, task_id, fn, *args, **kwargs):
+        """Submit ``fn`` for execution on behalf of ``task_id``.
+
+        :param task_id: uuid.UUID of the task this work is executing, used
+                        to cancel pending work when the task is terminated.
+                        May be None for work not bound to a task
+        :param fn: The callable to execute
+        :param args: Positional arguments for fn
+        :param kwargs: Keyword arguments for fn
+        :return: concurrent.futures.Future instance
+        """
+        with self._lock:
+            self._queued = self._queued + 1
+
+        try:
+            f = self._executor.submit(self._run, fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._queued = self._queued - 1
+            raise
+
+        # Pending work is also cancelled directly on the future, e.g. when a
+        # driver times out, so the queue depth is settled on completion
+        f.add_done_callback(self._settle)
+
+        if task_id is not None:
+            key = task_id.bytes
+            with self._lock:
+                self._task_futures.setdefault(key, set()).add(f)
+            f.add_done_callback(lambda x: self._forget(key, x))
+
+        return f
+
+    def cancel_task(self, task_id):
+        """Cancel all work for ``task_id`` that has not yet started.
+
+        :param task_id: uuid.UUID of the task to cancel work for
+        :return: number of work items cancelled
+        """
+        with self._lock:
+            futures = list(self._task_futures.get(task_id.bytes, []))
+
+        cancelled = len([f for f in futures if f.cancel()])
+
+        if cancelled:
+            self.logger.debug(
+                "Cancelled %d pending work items for task %s in pool %s." %
+                (cancelled, str(task_id), self.name))
+        return cancelled
+
+    def get_stats(self):
+        """Return a dictionary of gauges for this pool."""
+        return {
+            'max_workers': self.max_workers,
+            'active_threads': self._active,
+            'queue_depth': self._queued,
+        }
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and optionally wait for running work to finish."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, fn, *args, **kwargs):
+        with self._lock:
+            self._queued = self._queued - 1
+            self._active = self._active + 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active = self._active - 1
+
+    def _settle(self, future):
+        # Work cancelled before starting never decremented the queue depth
+        if future.cancelled():
+            with self._lock:
+                self._queued = self._queued - 1
+
+    def _forget(self, key, future):
+        with self._lock:
+            futures = self._task_futures.get(key)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._task_futures[key]
+
+
+class AsyncExecutorPool(object):
+    """A bounded set of coroutines executing on a shared event loop.
+
+    Exposes the same interface as ExecutorPool, but ``submit`` accepts a
+    coroutine function and ``active_threads`` counts running coroutines.
+
+    :param name: The name of this pool, used in stats
+    :param max_workers: The maximum number of concurrently running coroutines
+    :param loop: The asyncio event loop coroutines are scheduled on
+    """
+
+    def __init__(self, name, max_workers, loop):
+        self.name = name
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._task_futures = dict()
+
+    @property
+    def queue_depth(self):
+        """Number of submitted coroutines not yet started."""
+        return self._queued
+
+    @property
+    def active_threads(self):
+        """Number of coroutines currently executing."""
+        return self._active
+
+    def submit(self, task_id, fn, *args, **kwargs):
+        """Schedule coroutine function ``fn`` on behalf of ``task_id``.
+
+        :param task_id: uuid.UUID of the task this work is executing, used
+                        to cancel the work when the task is terminated.
+                        May be None for work not bound to a task
+        :param fn: The coroutine function to execute
+        :param args: Positional arguments for fn
+        :param kwargs: Keyword arguments for fn
+        :return: concurrent.futures.Future instance
+        """
+        state = {'started': False}
+        with self._lock:
+            self._queued = self._queued + 1
+
+        f = asyncio.run_coroutine_threadsafe(
+            self._run(state, fn, *args, **kwargs), self._loop)
+        f.add_done_callback(lambda x: self._finish(state))
+
+        if task_id is not None:
+            key = task_id.bytes
+            with self._lock:
+                self._task_futures.setdefault(key, set()).add(f)
+            f.add_done_callback(lambda x: self._forget(key, x))
+
+        return f
+
+    def cancel_task(self, task_id):
+        """Cancel all work for ``task_id``.
+
+        Unlike threads, running coroutines are cancelled as well and will
+        receive asyncio.CancelledError at their next await.
+
+        :param task_id: uuid.UUID of the task to cancel work for
+        :return: number of work items cancelled
+        """
+        with self._lock:
+            futures = list(self._task_futures.get(task_id.bytes, []))
+
+        cancelled = len([f for f in futures if f.cancel()])
+
+        if cancelled:
+            self.logger.debug(
+                "Cancelled %d coroutines for task %s in pool %s." %
+                (cancelled, str(task_id), self.name))
+        return cancelled
+
+    def get_stats(self):
+        """Return a dictionary of gauges for this pool."""
+        return {
+            'max_workers': self.max_workers,
+            'active_threads': self._active,
+            'queue_depth': self._queued,
+        }
+
+    def shutdown(self, wait=True):
+        """Cancel outstanding coroutines.
+
+        The event loop is owned by the ExecutorService, so there is nothing
+        to wait for once the work is cancelled.
+        """
+        with self._lock:
+            futures = [f for s in self._task_futures.values() for f in s]
+        for f in futures:
+            f.cancel()
+
+    async def _run(self, state, fn, *args, **kwargs):
+        async with self._semaphore:
+            with self._lock:
+                state['started'] = True
+                self._queued = self._queued - 1
+                self._active = self._active + 1
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active = self._active - 1
+
+    def _finish(self, state):
+        # Coroutines cancelled before acquiring the semaphore never
+        # decremented the queue depth
+        with self._lock:
+            if not state['started']:
+                state['started'] = True
+                self._queued = self._queued - 1
+
+    def _forget(self, key, future):
+        with self._lock:
+            futures = self._task_futures.get(key)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._task_futures[key]
+
+
+class ExecutorService(object):
+    """Registry of named ExecutorPool instances.
+
+    Pools are created on first use and sized from the ``[executor]``
+    configuration group. A pool name of the form ``<prefix>.<suffix>``
+    (e.g. ``maasdriver.deploy_node``) is sized from ``pool_sizes`` using
+    the full name, then the prefix, then ``default_pool_size``.
+    """
+
+    # Pool for top-level tasks picked up by the orchestrator
+    ORCHESTRATOR = 'orchestrator'
+    # Pool for per-node splits of an orchestrator action
+    ORCHESTRATOR_SPLIT = 'orchestrator_split'
+    # Pool for driver tasks started in parallel by an orchestrator action
+    ORCHESTRATOR_SUBTASK = 'orchestrator_subtask'
+    # Pool for blocking calls made by actions running as coroutines
+    ASYNC_IO = 'async_io'
+
+    def __init__(self):
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+        self._pools = dict()
+        self._async_pools = dict()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread = None
+
+        metrics.register_executor(self)
+
+    def get_pool(self, name):
+        """Return the pool ``name``, creating it if needed.
+
+        :param name: string name of the pool
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                size = self.get_pool_size(name)
+                self.logger.debug(
+                    "Creating executor pool %s with %d workers." %
+                    (name, size))
+                pool = ExecutorPool(name, size)
+                self._pools[name] = pool
+            return pool
+
+    def get_async_pool(self, name):
+        """Return the coroutine pool ``name``, creating it if needed.
+
+        :param name: string name of the pool
+        """
+        loop = self.get_event_loop()
+        with self._lock:
+            pool = self._async_pools.get(name)
+            if pool is None:
+                size = config.config_mgr.conf.executor.async_pool_size
+                self.logger.debug(
+                    "Creating async executor pool %s with %d workers." %
+                    (name, size))
+                pool = AsyncExecutorPool(name, size, loop)
+                self._async_pools[name] = pool
+            return pool
+
+    def get_event_loop(self):
+        """Return the event loop coroutine actions run on, starting it if needed."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="drydock-asyncio",
+                    daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def submit_action(self, name, task_id, action):
+        """Start ``action`` in pool ``name`` on behalf of ``task_id``.
+
+        If async actions are enabled and the action implements
+        ``start_async`` it is run as a coroutine, otherwise ``start`` is
+        run on a worker thread.
+
+        :param name: string name of the pool
+        :param task_id: uuid.UUID of the task the action is executing
+        :param action: instance of orchestrator.actions.BaseAction
+        :return: concurrent.futures.Future instance
+        """
+        if (config.config_mgr.conf.executor.async_actions
+                and action.is_async()):
+            return self.get_async_pool(name).submit(task_id,
+                                                    action.start_async)
+        return self.get_pool(name).submit(task_id, action.start)
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """Await ``fn`` executing on the async_io thread pool.
+
+        :param fn: The blocking callable to execute
+        :param args: Positional arguments for fn
+        :param kwargs: Keyword arguments for fn
+        """
+        f = self.get_pool(ExecutorService.ASYNC_IO).submit(
+            None, fn, *args, **kwargs)
+        return await asyncio.wrap_future(f)
+
+    def get_pool_size(self, name):
+        """Resolve the configured number of workers for pool ``name``.
+
+        :param name: string name of the pool
+        """
+        pool_sizes = config.config_mgr.conf.executor.pool_sizes or {}
+
+        for k in [name, name.split('.', 1)[0]]:
+            if k in pool_sizes:
+                try:
+                    size = int(pool_sizes[k])
+                except ValueError:
+                    self.logger.warning(
+                        "Invalid size %s for executor pool %s, ignoring." %
+                        (pool_sizes[k], k))
+                    continue
+                if size > 0:
+                    return size
+
+        return config.config_mgr.conf.executor.default_pool_size
+
+    def cancel_task(self, task_id):
+        """Cancel pending work for ``task_id`` in all pools.
+
+        :param task_id: uuid.UUID of the task to cancel work for
+        :return: number of work items cancelled
+        """
+        with self._lock:
+            pools = list(self._pools.values()) + list(
+                self._async_pools.values())
+
+        return sum([p.cancel_task(task_id) for p in pools])
+
+    def get_stats(self):
+        """Return a dictionary of pool name to pool gauges.
+
+        Coroutine pools are reported with a name suffix of ``.async``.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            async_pools = list(self._async_pools.values())
+
+        stats = {p.name: p.get_stats() for p in pools}
+        stats.update({"%s.async" % p.name: p.get_stats() for p in async_pools})
+        return stats
+
+    def shutdown(self, wait=True):
+        """Shut down all pools and the event loop."""
+        with self._lock:
+            pools = list(self._async_pools.values()) + list(
+                self._pools.values())
+            self._pools = dict()
+            self._async_pools = dict()
+            loop = self._loop
+            loop_thread = self._loop_thread
+            self._loop = None
+            self._loop_thread = None
+
+        for p in pools:
+            p.shutdown(wait=wait)
+
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if wait:
+                loop_thread.join()
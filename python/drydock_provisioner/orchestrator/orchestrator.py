@@ -18,10 +18,10 @@ import importlib
 import logging
 import uuid
 import ulid2
-import concurrent.futures
 import os
 
 import drydock_provisioner.config as config
+import drydock_provisioner.metrics as metrics
 import drydock_provisioner.objects as objects
 import drydock_provisioner.error as errors
 import drydock_provisioner.objects.fields as hd_fields
@@ -36,11 +36,17 @@ from .actions.orchestrator import DeployNodes
 from .actions.orchestrator import RelabelNodes
 from .actions.orchestrator import DestroyNodes
 from .validations.validator import Validator
+from .design_cache import DesignCache
+from .executor import ExecutorService
 
 
 class Orchestrator(object):
     """Defines functionality for task execution workflow."""
 
+    # Seconds between checks by the active orchestrator for missing result
+    # message partitions
+    partition_check_interval = 3600
+
     def __init__(self,
                  enabled_drivers=None,
                  state_manager=None,
@@ -67,6 +73,11 @@ class Orchestrator(object):
 
         self.logger = logging.getLogger('drydock.orchestrator')
 
+        self.executor = ExecutorService()
+
+        # Compiled designs reused by read-only API queries
+        self.design_cache = DesignCache(self)
+
         if enabled_drivers is not None:
             oob_drivers = enabled_drivers.oob_driver
 
@@ -130,11 +141,11 @@ class Orchestrator(object):
 
         # Loop trying to claim status as the active orchestrator
 
-        tp = concurrent.futures.ThreadPoolExecutor(max_workers=64)
+        tp = self.executor.get_pool(ExecutorService.ORCHESTRATOR)
 
         while True:
             if self.stop_flag:
-                tp.shutdown()
+                self.executor.shutdown()
                 return
             claim = self.state_manager.claim_leadership(self.orch_id)
 
@@ -151,12 +162,18 @@ class Orchestrator(object):
 
                 # As active orchestrator, loop looking for queued tasks.
                 task_future = None
+                partitions_checked = None
                 while True:
                     # TODO(sh8121att) Need a timeout here
                     if self.stop_flag:
-                        tp.shutdown()
+                        self.executor.shutdown()
                         self.state_manager.abdicate_leadership(self.orch_id)
                         return
+                    if (partitions_checked is None
+                            or time.monotonic() - partitions_checked
+                            >= self.partition_check_interval):
+                        self.state_manager.create_result_message_partitions()
+                        partitions_checked = time.monotonic()
                     if task_future is not None:
                         if task_future.done():
                             self.logger.debug(
@@ -177,6 +194,7 @@ class Orchestrator(object):
                             self.logger.info(
                                 "Found task %s queued, starting execution." %
                                 str(next_task.get_id()))
+                            metrics.observe_task_pickup(next_task)
                             if next_task.check_terminate():
                                 self.logger.info(
                                     "Task %s marked for termination, skipping execution."
@@ -188,7 +206,8 @@ class Orchestrator(object):
                             action = orch_task_actions[next_task.action](
                                 next_task, self, self.state_manager)
                             if action:
-                                task_future = tp.submit(action.start)
+                                task_future = tp.submit(
+                                    next_task.get_id(), action.start)
                             else:
                                 self.logger.warning(
                                     "Task %s has unsupported action %s, ending execution."
@@ -208,6 +227,14 @@ class Orchestrator(object):
                             self.logger.info(
                                 "No task found, waiting to poll again.")
 
+                    self.logger.debug("Executor pool stats: %s" %
+                                      self.executor.get_stats())
+
+                    queue_depth = self.state_manager.get_queued_task_count(
+                        allowed_actions=list(orch_task_actions.keys()))
+                    if queue_depth is not None:
+                        metrics.TASK_QUEUE_DEPTH.set(queue_depth)
+
                     # TODO(sh8121att) Make this configurable
                     time.sleep(config.config_mgr.conf.poll_interval)
                     claim = self.state_manager.maintain_leadership(
@@ -237,6 +264,7 @@ class Orchestrator(object):
             # Terminate initial task first to prevent add'l subtasks
             self.logger.debug("Terminating task %s." % str(task.get_id()))
             task.terminate_task(terminated_by=terminated_by)
+            self.executor.cancel_task(task.get_id())
 
             if propagate:
                 # Get subtasks list
@@ -395,7 +423,16 @@ class Orchestrator(object):
             else:
                 ba.target_nodes = [x.get_id() for x in target_nodes]
 
-    def process_node_filter(self, node_filter, site_design):
+    def process_node_filter(self, node_filter, site_design, node_index=None):
+        """Select the baremetal nodes of site_design matching node_filter.
+
+        :param node_filter: A node filter set, either a dict or
+                            objects.NodeFilterSet. None selects all nodes.
+        :param site_design: The site design to select nodes from
+        :param node_index: Optional design_cache.NodeIndex of the nodes of
+                           site_design to look nodes up in rather than
+                           scanning all nodes for each filter
+        """
         try:
             target_nodes = site_design.baremetal_nodes
             if target_nodes is None:
@@ -418,14 +455,18 @@ class Orchestrator(object):
 
         if isinstance(node_filter, dict):
             for f in node_filter.get('filter_set', []):
-                result_sets.append(self.process_filter(target_nodes, f))
+                result_sets.append(
+                    self.process_filter(target_nodes, f,
+                                        node_index=node_index))
 
             return self.join_filter_sets(node_filter.get('filter_set_type'),
                                          result_sets)
 
         elif isinstance(node_filter, objects.NodeFilterSet):
             for f in node_filter.filter_set:
-                result_sets.append(self.process_filter(target_nodes, f))
+                result_sets.append(
+                    self.process_filter(target_nodes, f,
+                                        node_index=node_index))
 
             return self.join_filter_sets(node_filter.filter_set_type,
                                          result_sets)
@@ -439,12 +480,13 @@ class Orchestrator(object):
             raise errors.OrchestratorError("Unknown filter set type %s" %
                                            filter_set_type)
 
-    def process_filter(self, node_set, filter_set):
+    def process_filter(self, node_set, filter_set, node_index=None):
         """Take a filter and apply it to the node_set.
 
         :param node_set: A full set of objects.BaremetalNode
         :param filter_set: A node filter describing filters to apply to the node set.
                            Either a dict or objects.NodeFilter
+        :param node_index: Optional design_cache.NodeIndex of node_set
         """
         try:
             if isinstance(filter_set, dict):
@@ -470,30 +512,45 @@ class Orchestrator(object):
 
             if node_names:
                 self.logger.debug("Filtering nodes based on node names.")
-                target_nodes['node_names'] = [
-                    x for x in node_set if x.get_name() in node_names
-                ]
+                if node_index is not None:
+                    target_nodes['node_names'] = node_index.with_names(
+                        node_names)
+                else:
+                    target_nodes['node_names'] = [
+                        x for x in node_set if x.get_name() in node_names
+                    ]
 
             if node_tags:
                 self.logger.debug("Filtering nodes based on node tags.")
-                target_nodes['node_tags'] = [
-                    x for x in node_set for t in node_tags if x.has_tag(t)
-                ]
+                if node_index is not None:
+                    target_nodes['node_tags'] = node_index.with_tags(node_tags)
+                else:
+                    target_nodes['node_tags'] = [
+                        x for x in node_set for t in node_tags if x.has_tag(t)
+                    ]
 
             if rack_names:
                 self.logger.debug("Filtering nodes based on rack names.")
-                target_nodes['rack_names'] = [
-                    x for x in node_set if x.get_rack() in rack_names
-                ]
+                if node_index is not None:
+                    target_nodes['rack_names'] = node_index.in_racks(
+                        rack_names)
+                else:
+                    target_nodes['rack_names'] = [
+                        x for x in node_set if x.get_rack() in rack_names
+                    ]
 
             if node_labels:
                 self.logger.debug("Filtering nodes based on node labels.")
-                target_nodes['node_labels'] = []
-                for k, v in node_labels.items():
-                    target_nodes['node_labels'].extend([
-                        x for x in node_set
-                        if getattr(x, 'owner_data', {}).get(k, None) == v
-                    ])
+                if node_index is not None:
+                    target_nodes['node_labels'] = node_index.with_labels(
+                        node_labels)
+                else:
+                    target_nodes['node_labels'] = []
+                    for k, v in node_labels.items():
+                        target_nodes['node_labels'].extend([
+                            x for x in node_set
+                            if getattr(x, 'owner_data', {}).get(k, None) == v
+                        ])
 
             if rack_labels:
                 self.logger.info(
@@ -553,7 +610,7 @@ class Orchestrator(object):
         else:
             return None
 
-    def create_bootaction_context(self, nodename, task):
+    def create_bootaction_context(self, nodename, task, site_design=None):
         """Save a boot action context for ``nodename``
 
         Generate a identity key and persist the boot action context
@@ -562,51 +619,82 @@ class Orchestrator(object):
 
         :param nodename: Name of the node the bootaction context is targeted for
         :param task: The task instigating the ndoe deployment
+        :param site_design: Optional compiled site design of ``task``
         """
-        design_status, site_design = self.get_effective_site(task.design_ref)
+        identity_keys = self.create_bootaction_contexts(
+            [nodename], task, site_design=site_design)
+
+        return identity_keys.get(nodename)
+
+    def create_bootaction_contexts(self, nodenames, task, site_design=None):
+        """Save the boot action contexts for a list of nodes.
+
+        Generate an identity key for each node targeted by a boot action
+        and persist the boot action contexts and boot action statuses of
+        all the nodes in bulk. Return a dictionary of the generated identity
+        keys as ``bytes`` keyed by node name. Nodes not targeted by any boot
+        action are omitted.
+
+        :param nodenames: List of names of the nodes to create contexts for
+        :param task: The task instigating the node deployment
+        :param site_design: Optional compiled site design of ``task``. If omitted
+                            it will be compiled from the task design_ref.
+        """
+        if site_design is None:
+            design_status, site_design = self.get_effective_site(
+                task.design_ref)
 
         if site_design.bootactions is None:
-            return None
+            return dict()
 
-        identity_key = None
+        identity_keys = dict()
+        boot_actions = []
 
-        self.logger.debug("Creating boot action context for node %s" %
-                          nodename)
+        for nodename in nodenames:
+            self.logger.debug("Creating boot action context for node %s" %
+                              nodename)
 
-        for ba in site_design.bootactions:
-            self.logger.debug("Boot actions target nodes: %s" %
-                              ba.target_nodes)
-            if nodename in ba.target_nodes:
-                if identity_key is None:
-                    identity_key = os.urandom(32)
-                    self.state_manager.post_boot_action_context(
-                        nodename, task.get_id(), identity_key)
-                self.logger.debug(
-                    "Adding boot action %s for node %s to the database." %
-                    (ba.name, nodename))
-                if ba.signaling:
-                    init_status = hd_fields.ActionResult.Incomplete
-                else:
-                    init_status = hd_fields.ActionResult.Unreported
+            for ba in site_design.bootactions:
+                self.logger.debug("Boot actions target nodes: %s" %
+                                  ba.target_nodes)
+                if nodename in ba.target_nodes:
+                    if nodename not in identity_keys:
+                        identity_keys[nodename] = os.urandom(32)
                     self.logger.debug(
-                        "Boot action %s has disabled signaling, marking unreported."
-                        % ba.name)
-                action_id = ulid2.generate_binary_ulid()
-                self.state_manager.post_boot_action(nodename,
-                                                    task.get_id(),
-                                                    identity_key,
-                                                    action_id,
-                                                    ba.name,
-                                                    action_status=init_status)
-        return identity_key
-
-    def find_node_package_lists(self, nodename, task):
+                        "Adding boot action %s for node %s to the database." %
+                        (ba.name, nodename))
+                    if ba.signaling:
+                        init_status = hd_fields.ActionResult.Incomplete
+                    else:
+                        init_status = hd_fields.ActionResult.Unreported
+                        self.logger.debug(
+                            "Boot action %s has disabled signaling, marking unreported."
+                            % ba.name)
+                    boot_actions.append(
+                        dict(nodename=nodename,
+                             task_id=task.get_id(),
+                             identity_key=identity_keys[nodename],
+                             action_id=ulid2.generate_binary_ulid(),
+                             action_name=ba.name,
+                             action_status=init_status))
+
+        if identity_keys:
+            self.state_manager.post_boot_action_contexts(
+                task.get_id(), identity_keys)
+            self.state_manager.post_boot_actions(boot_actions)
+
+        return identity_keys
+
+    def find_node_package_lists(self, nodename, task, site_design=None):
         """Return all packages to be installed on ``nodename``
 
         :param nodename: The name of the node to retrieve packages for
         :param task: The task initiating this request
+        :param site_design: Optional compiled site design of ``task``
         """
-        design_status, site_design = self.get_effective_site(task.design_ref)
+        if site_design is None:
+            design_status, site_design = self.get_effective_site(
+                task.design_ref)
 
         if site_design.bootactions is None:
             return None
@@ -37,15 +37,18 @@ class DrydockPolicy(object):
 
     # Orchestrator Policy
     task_rules = [
-        policy.DocumentedRuleDefault('physical_provisioner:read_task',
-                                     'role:admin', 'Get task status',
-                                     [{
-                                         'path': '/api/v1.0/tasks',
-                                         'method': 'GET'
-                                     }, {
-                                         'path': '/api/v1.0/tasks/{task_id}',
-                                         'method': 'GET'
-                                     }]),
+        policy.DocumentedRuleDefault(
+            'physical_provisioner:read_task', 'role:admin', 'Get task status',
+            [{
+                'path': '/api/v1.0/tasks',
+                'method': 'GET'
+            }, {
+                'path': '/api/v1.0/tasks/{task_id}',
+                'method': 'GET'
+            }, {
+                'path': '/api/v1.0/tasks/{task_id}/events',
+                'method': 'GET'
+            }]),
         policy.DocumentedRuleDefault('physical_provisioner:create_task',
                                      'role:admin', 'Create a task',
                                      [{
@@ -0,0 +1,130 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Monthly range partitioning of the result_message table on ``ts``.
+
+Partitioning is optional and enabled by a database migration. Partitions
+are named ``result_message_pYYYYMM``. Rows outside of every monthly
+partition are stored in ``result_message_default``.
+"""
+import datetime
+
+from sqlalchemy import sql
+
+TABLE_NAME = 'result_message'
+DEFAULT_PARTITION = TABLE_NAME + '_default'
+
+
+def month_start(ts):
+    """Return the first day of the month of ``ts`` as a date."""
+    return datetime.date(ts.year, ts.month, 1)
+
+
+def next_month(month):
+    """Return the first day of the month after the date ``month``."""
+    if month.month == 12:
+        return datetime.date(month.year + 1, 1, 1)
+    return datetime.date(month.year, month.month + 1, 1)
+
+
+def partition_name(month):
+    """Return the partition name for the month starting on ``month``."""
+    return "%s_p%s" % (TABLE_NAME, month.strftime('%Y%m'))
+
+
+def is_partitioned(conn):
+    """Check if result_message is a partitioned table.
+
+    :param conn: a SQLAlchemy connection
+    """
+    query = sql.text("SELECT 1 FROM pg_partitioned_table "
+                     "WHERE partrelid = to_regclass(:table_name)")
+    return conn.execute(query, table_name=TABLE_NAME).first() is not None
+
+
+def create_partitions(conn, start, months):
+    """Create missing monthly partitions of result_message.
+
+    Rows of a month already stored in the default partition are moved to
+    the partition created for the month, which could not be created while
+    the default partition holds them. ``conn`` should be in a transaction
+    so the rows are moved atomically.
+
+    :param conn: a SQLAlchemy connection
+    :param start: datetime or date in the first month to create
+    :param months: number of consecutive months to create
+    :returns: list of the partition names created
+    """
+    created = []
+    month = month_start(start)
+    for _ in range(months):
+        end = next_month(month)
+        name = partition_name(month)
+        exists = conn.execute(sql.text("SELECT to_regclass(:name)"),
+                              name=name).scalar()
+        if exists is None:
+            # Identifiers and bounds are generated from dates above
+            bounds = ("FOR VALUES FROM ('%s') TO ('%s')" %
+                      (month.isoformat(), end.isoformat()))
+            if has_default_rows(conn, month, end):
+                move_default_rows(conn, name, bounds, month, end)
+            else:
+                conn.execute(
+                    sql.text(  # nosec no strings are user-sourced
+                        "CREATE TABLE %s PARTITION OF %s %s" %
+                        (name, TABLE_NAME, bounds)))
+            created.append(name)
+        month = end
+    return created
+
+
+def has_default_rows(conn, month, end):
+    """Check if the default partition holds rows from ``month`` to ``end``.
+
+    :param conn: a SQLAlchemy connection
+    :param month: date of the first day of the month
+    :param end: date of the first day of the next month
+    """
+    query = sql.text(  # nosec no strings are user-sourced
+        "SELECT 1 FROM %s WHERE ts >= :month AND ts < :end LIMIT 1" %
+        DEFAULT_PARTITION)
+    return conn.execute(query, month=month, end=end).first() is not None
+
+
+def move_default_rows(conn, name, bounds, month, end):
+    """Create a partition from the rows of its month in the default partition.
+
+    The partition is created as a plain table, the rows are moved to it
+    and it is then attached to result_message.
+
+    :param conn: a SQLAlchemy connection
+    :param name: name of the partition to create
+    :param bounds: partition bounds clause of the month
+    :param month: date of the first day of the month
+    :param end: date of the first day of the next month
+    """
+    conn.execute(
+        sql.text(  # nosec no strings are user-sourced
+            "CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            % (name, TABLE_NAME)))
+    conn.execute(
+        sql.text(  # nosec no strings are user-sourced
+            "WITH moved AS (DELETE FROM %s WHERE ts >= :month AND ts < :end "
+            "RETURNING *) INSERT INTO %s SELECT * FROM moved" %
+            (DEFAULT_PARTITION, name)),
+        month=month,
+        end=end)
+    conn.execute(
+        sql.text(  # nosec no strings are user-sourced
+            "ALTER TABLE %s ATTACH PARTITION %s %s" %
+            (TABLE_NAME, name, bounds)))
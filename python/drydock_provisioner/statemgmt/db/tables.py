@@ -14,7 +14,8 @@
 """Definitions for Drydock database tables."""
 import copy
 
-from sqlalchemy.schema import Table, Column
+from sqlalchemy import text
+from sqlalchemy.schema import Table, Column, Index
 from sqlalchemy.types import Boolean, DateTime, String, Integer, Text
 from sqlalchemy.dialects import postgresql as pg
 
@@ -60,8 +61,30 @@ class Tasks(ExtendTable):
         Column('result_links', pg.JSON),
     ]
 
+    __add_list_indexes__ = [
+        # Keyset pagination of the task list, newest first
+        Index('ix_tasks_created_task_id', 'created', 'task_id'),
+        # Task list limited to top-level tasks
+        Index('ix_tasks_parent_only_created_task_id',
+              'created',
+              'task_id',
+              postgresql_where=text('parent_task_id IS NULL')),
+        # Task list filtered by design reference
+        Index('ix_tasks_design_ref_created', 'design_ref', 'created'),
+    ]
+
+    __add_access_indexes__ = [
+        # Orchestrator polling for queued tasks and task listing by status
+        Index('ix_tasks_status_created', 'status', 'created'),
+        Index('ix_tasks_action_created', 'action', 'created'),
+        # Subtask rollups and subtask tree queries
+        Index('ix_tasks_parent_task_id_status', 'parent_task_id', 'status'),
+    ]
+
     __schema__ = copy.copy(__baseschema__)
     __schema__.extend(__add_result_links__)
+    __schema__.extend(__add_list_indexes__)
+    __schema__.extend(__add_access_indexes__)
 
 
 class ResultMessage(ExtendTable):
@@ -80,7 +103,13 @@ class ResultMessage(ExtendTable):
         Column('extra', pg.JSON)
     ]
 
+    __add_access_indexes__ = [
+        # Result messages of a task in order
+        Index('ix_result_message_task_id_sequence', 'task_id', 'sequence'),
+    ]
+
     __schema__ = copy.copy(__baseschema__)
+    __schema__.extend(__add_access_indexes__)
 
 
 class ActiveInstance(ExtendTable):
@@ -142,4 +171,9 @@ class BuildData(ExtendTable):
         Column('data_element', Text),
     ]
 
+    __add_compressed_data__ = [
+        Column('data_compressed', pg.BYTEA),
+    ]
+
     __schema__ = copy.copy(__baseschema__)
+    __schema__.extend(__add_compressed_data__)
@@ -0,0 +1,231 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Wait for Postgres notifications of state changes."""
+
+import collections
+import logging
+import select
+import threading
+import time
+
+from sqlalchemy import sql
+
+from drydock_provisioner import config
+
+
+class NotificationListener(object):
+    """Wait for notifications sent with NOTIFY on a channel.
+
+    The listener holds a dedicated connection outside of the engine's pool.
+    If listening fails, ``wait`` falls back to sleeping for the timeout so
+    it can replace the sleep of a polling loop.
+
+    :param db_engine: SQLAlchemy engine to connect with
+    :param channel: name of the channel to LISTEN on
+    """
+
+    def __init__(self, db_engine, channel):
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+        self.channel = channel
+        self.conn = None
+
+        try:
+            conn = db_engine.raw_connection()
+            # Close the connection on close() rather than return it to the
+            # pool still listening
+            conn.detach()
+            conn.connection.autocommit = True
+            cursor = conn.connection.cursor()
+            # The channel name is not user-sourced
+            cursor.execute('LISTEN "%s"' % channel)
+            cursor.close()
+            self.conn = conn
+        except Exception as ex:
+            self.logger.warning(
+                "Unable to listen on channel %s, falling back to polling: %s" %
+                (channel, str(ex)))
+
+    def wait(self, timeout):
+        """Wait up to ``timeout`` seconds for notifications.
+
+        :param timeout: seconds to wait
+        :returns: list of the payloads of the notifications received
+        """
+        if self.conn is None:
+            time.sleep(timeout)
+            return []
+
+        try:
+            dbapi_conn = self.conn.connection
+            if not dbapi_conn.notifies:
+                select.select([dbapi_conn], [], [], timeout)
+                dbapi_conn.poll()
+            payloads = [n.payload for n in dbapi_conn.notifies]
+            del dbapi_conn.notifies[:]
+            return payloads
+        except Exception as ex:
+            self.logger.warning(
+                "Error waiting on channel %s, falling back to polling: %s" %
+                (self.channel, str(ex)))
+            self.close()
+            return []
+
+    def close(self):
+        """Stop listening and close the connection."""
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+
+def notify(conn, channel, payloads):
+    """Send a notification on a channel for each payload.
+
+    Notifications are delivered to listeners when the transaction
+    commits, and repeated payloads within a transaction are sent once.
+    Errors are logged rather than raised, as listeners do not rely on
+    being notified.
+
+    :param conn: SQLAlchemy connection to send the notifications with
+    :param channel: name of the channel to NOTIFY on
+    :param payloads: list of string payloads
+    """
+    if not payloads:
+        return
+
+    try:
+        query = sql.text(
+            "SELECT pg_notify(:channel, p) "
+            "FROM unnest(CAST(:payloads AS text[])) AS p").execution_options(
+                autocommit=True)
+        conn.execute(query, channel=channel, payloads=list(payloads))
+    except Exception as ex:
+        logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name).warning(
+                "Error notifying channel %s: %s" % (channel, str(ex)))
+
+
+class NotificationDispatcher(object):
+    """Share one listener among the threads waiting on a channel.
+
+    A background thread waits on a NotificationListener and wakes the
+    subscribers of each payload received. The thread is started with the
+    first subscription. If listening fails it is retried every
+    ``retry_interval`` seconds, subscribers should not rely on being woken.
+
+    :param listen: callable returning a NotificationListener for the channel
+    :param poll_interval: seconds to wait on the listener at a time
+    :param retry_interval: seconds between attempts to listen again
+    """
+
+    def __init__(self, listen, poll_interval=1, retry_interval=60):
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+        self.listen = listen
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+
+        self.cond = threading.Condition()
+        self.subscribers = collections.Counter()
+        self.counts = dict()
+        self.thread = None
+
+    def subscribe(self, payload):
+        """Subscribe to the notifications with ``payload``.
+
+        :param payload: string payload to wait for
+        :returns: instance of Subscription
+        """
+        with self.cond:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run,
+                                               name='drydock-notifications',
+                                               daemon=True)
+                self.thread.start()
+            self.subscribers[payload] += 1
+            self.counts.setdefault(payload, 0)
+            return Subscription(self, payload, self.counts[payload])
+
+    def unsubscribe(self, payload):
+        with self.cond:
+            self.subscribers[payload] -= 1
+            if self.subscribers[payload] <= 0:
+                del self.subscribers[payload]
+                self.counts.pop(payload, None)
+
+    def dispatch(self, payloads):
+        """Wake the subscribers of ``payloads``."""
+        with self.cond:
+            woken = False
+            for p in payloads:
+                if p in self.counts:
+                    self.counts[p] += 1
+                    woken = True
+            if woken:
+                self.cond.notify_all()
+
+    def _run(self):
+        listener = None
+        while True:
+            if listener is None or listener.conn is None:
+                if listener is not None:
+                    time.sleep(self.retry_interval)
+                listener = self.listen()
+            try:
+                self.dispatch(listener.wait(self.poll_interval))
+            except Exception as ex:
+                self.logger.error("Error dispatching notifications: %s" %
+                                  str(ex))
+
+
+class Subscription(object):
+    """Wait for the notifications of one payload from a dispatcher.
+
+    Notifications received after the subscription is created and not yet
+    waited for are kept, so a change made between subscribing and waiting
+    is not missed. Use as a context manager to unsubscribe.
+    """
+
+    def __init__(self, dispatcher, payload, seen):
+        self.dispatcher = dispatcher
+        self.payload = payload
+        self.seen = seen
+
+    def wait(self, timeout):
+        """Wait up to ``timeout`` seconds for a notification.
+
+        :returns: True if notified since the last wait, otherwise False
+        """
+        cond = self.dispatcher.cond
+        with cond:
+            notified = cond.wait_for(self.changed, timeout)
+            self.seen = self.dispatcher.counts.get(self.payload, self.seen)
+            return notified
+
+    def changed(self):
+        """Return whether a notification arrived since the last wait."""
+        count = self.dispatcher.counts.get(self.payload, self.seen)
+        return count != self.seen
+
+    def close(self):
+        self.dispatcher.unsubscribe(self.payload)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,158 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Write-behind buffering of task result messages."""
+
+import atexit
+import logging
+import threading
+import uuid
+
+from drydock_provisioner import config
+
+from .listener import notify
+
+
+class ResultMessageWriter(object):
+    """Buffer result messages and write them to the database in batches.
+
+    Messages are kept in a single FIFO buffer and flushed by one writer at a
+    time, so the order messages are posted in (and therefore the order of
+    their ``sequence`` values) is preserved. The buffer is flushed when it
+    reaches ``batch_size`` messages, every ``flush_interval`` seconds by a
+    background thread and whenever ``flush`` is called.
+
+    :param db_engine: SQLAlchemy engine to write with
+    :param table: the result_message table
+    :param batch_size: number of buffered messages that triggers a flush
+    :param flush_interval: seconds between background flushes
+    :param max_pending: maximum messages kept for retry when writes fail
+    :param channel: optional channel notified with the ID of each task that
+                    messages were written for
+    """
+
+    def __init__(self,
+                 db_engine,
+                 table,
+                 batch_size=100,
+                 flush_interval=1.0,
+                 max_pending=None,
+                 channel=None):
+        self.logger = logging.getLogger(
+            config.config_mgr.conf.logging.global_logger_name)
+        self.db_engine = db_engine
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or batch_size * 100
+        self.channel = channel
+
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+
+        self.flusher = None
+        self.stop_event = threading.Event()
+
+    def post(self, task_id, msg):
+        """Buffer a result message for a task.
+
+        :param task_id: uuid.UUID ID of the task the msg belongs to
+        :param msg: instance of objects.TaskStatusMessage
+        """
+        row = dict(task_id=task_id.bytes, **(msg.to_db()))
+
+        with self.pending_lock:
+            self.pending.append(row)
+            pending_count = len(self.pending)
+            if self.flusher is None:
+                self._start_flusher()
+
+        if pending_count >= self.batch_size:
+            return self.flush()
+
+        return True
+
+    def flush(self):
+        """Write all buffered messages to the database.
+
+        Returns False if any messages could not be written. Those messages
+        are kept and retried on the next flush.
+        """
+        with self.flush_lock:
+            with self.pending_lock:
+                batch = self.pending
+                self.pending = []
+
+            for i in range(0, len(batch), self.batch_size):
+                try:
+                    with self.db_engine.connect() as conn:
+                        # psycopg2 sends this as multi-row INSERTs
+                        conn.execute(self.table.insert(),
+                                     batch[i:i + self.batch_size])
+                except Exception as ex:
+                    self.logger.error(
+                        "Error inserting %d result messages: %s" %
+                        (len(batch) - i, str(ex)))
+                    self._requeue(batch[i:])
+                    return False
+                self._notify(batch[i:i + self.batch_size])
+
+        return True
+
+    def pending_count(self):
+        """Return the number of buffered messages."""
+        with self.pending_lock:
+            return len(self.pending)
+
+    def stop(self):
+        """Stop the background flush and write out buffered messages."""
+        self.stop_event.set()
+        return self.flush()
+
+    def _notify(self, rows):
+        """Notify the channel of the tasks messages were written for."""
+        if self.channel is None:
+            return
+
+        task_ids = set(str(uuid.UUID(bytes=r['task_id'])) for r in rows)
+        try:
+            with self.db_engine.connect() as conn:
+                notify(conn, self.channel, task_ids)
+        except Exception as ex:
+            self.logger.warning("Error notifying %s of result messages: %s" %
+                                (self.channel, str(ex)))
+
+    def _requeue(self, rows):
+        """Return unwritten rows to the front of the buffer."""
+        with self.pending_lock:
+            self.pending = rows + self.pending
+            dropped = len(self.pending) - self.max_pending
+            if dropped > 0:
+                self.logger.error(
+                    "Result message buffer full, dropping %d messages." %
+                    dropped)
+                self.pending = self.pending[dropped:]
+
+    def _start_flusher(self):
+        """Start the background flush thread."""
+        self.flusher = threading.Thread(target=self._flush_loop,
+                                        name='drydock-message-writer',
+                                        daemon=True)
+        self.flusher.start()
+        atexit.register(self.stop)
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            if self.pending_count():
+                self.flush()
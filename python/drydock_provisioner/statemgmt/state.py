@@ -14,6 +14,7 @@
 """Access methods for managing external data access and persistence."""
 
 import logging
+import time
 import uuid
 from datetime import datetime, UTC
 import ulid2
@@ -21,22 +22,37 @@ import ulid2
 from sqlalchemy import create_engine
 from sqlalchemy import sql
 from sqlalchemy import MetaData
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 import drydock_provisioner.objects as objects
 import drydock_provisioner.objects.fields as hd_fields
 import drydock_provisioner.error as errors
 
+from .db import partitions
 from .db import tables
+from .listener import NotificationDispatcher
+from .listener import NotificationListener
+from .listener import notify
+from .message_writer import ResultMessageWriter
 
 from drydock_provisioner import config
+from drydock_provisioner import metrics
 from .design.resolver import ReferenceResolver
 
+# Channel notified with the node name when a boot action status is updated
+BOOT_ACTION_STATUS_CHANNEL = 'boot_action_status'
+
+# Channel notified with the task ID when a task is updated or result
+# messages are added to it
+TASK_STATUS_CHANNEL = 'task_status'
+
 
 class DrydockState(object):
 
     def __init__(self):
         self.logger = logging.getLogger(
             config.config_mgr.conf.logging.global_logger_name)
+        self.message_writer = None
 
         return
 
@@ -57,6 +73,18 @@ class DrydockState(object):
         self.boot_action_tbl = tables.BootAction(self.db_metadata)
         self.ba_status_tbl = tables.BootActionStatus(self.db_metadata)
         self.build_data_tbl = tables.BuildData(self.db_metadata)
+
+        db_conf = config.config_mgr.conf.database
+        if db_conf.result_message_flush_interval > 0:
+            self.message_writer = ResultMessageWriter(
+                self.db_engine,
+                self.result_message_tbl,
+                batch_size=db_conf.result_message_batch_size,
+                flush_interval=db_conf.result_message_flush_interval,
+                channel=TASK_STATUS_CHANNEL)
+
+        # Listening starts with the first task watched
+        self.task_dispatcher = NotificationDispatcher(self.listen_task_status)
         return
 
     def tabularasa(self):
@@ -82,26 +110,85 @@ class DrydockState(object):
     def get_design_documents(self, design_ref):
         return ReferenceResolver.resolve_reference(design_ref)
 
-    def get_tasks(self):
-        """Get all tasks in the database."""
+    @metrics.db_query
+    def get_tasks(self,
+                  status=None,
+                  action=None,
+                  created_after=None,
+                  created_before=None,
+                  parent_only=False,
+                  design_ref=None,
+                  cursor=None,
+                  limit=None,
+                  summary=False):
+        """Get tasks in the database, newest first.
+
+        All filters are optional and combined with AND.
+
+        :param status: list of task statuses to select
+        :param action: list of task actions to select
+        :param created_after: datetime, select tasks created at or after this time
+        :param created_before: datetime, select tasks created before this time
+        :param parent_only: if True, only select tasks without a parent task
+        :param design_ref: select tasks for this design reference
+        :param cursor: tuple of (created, uuid.UUID task_id) of the last task
+                       of the previous page, select tasks following it
+        :param limit: maximum number of tasks to return
+        :param summary: if True, do not attach result messages to the tasks
+        """
         try:
             with self.db_engine.connect() as conn:
                 query = sql.select([self.tasks_tbl])
+
+                conditions = []
+                if status:
+                    conditions.append(self.tasks_tbl.c.status.in_(status))
+                if action:
+                    conditions.append(self.tasks_tbl.c.action.in_(action))
+                if created_after is not None:
+                    conditions.append(
+                        self.tasks_tbl.c.created >= created_after)
+                if created_before is not None:
+                    conditions.append(
+                        self.tasks_tbl.c.created < created_before)
+                if parent_only:
+                    conditions.append(
+                        self.tasks_tbl.c.parent_task_id.is_(None))
+                if design_ref is not None:
+                    conditions.append(
+                        self.tasks_tbl.c.design_ref == design_ref)
+                if cursor is not None:
+                    cursor_created, cursor_id = cursor
+                    conditions.append(
+                        sql.tuple_(self.tasks_tbl.c.created,
+                                   self.tasks_tbl.c.task_id) < sql.tuple_(
+                                       cursor_created, cursor_id.bytes))
+
+                if conditions:
+                    query = query.where(sql.and_(*conditions))
+
+                query = query.order_by(self.tasks_tbl.c.created.desc(),
+                                       self.tasks_tbl.c.task_id.desc())
+                if limit is not None:
+                    query = query.limit(limit)
+
                 rs = conn.execute(query)
 
                 task_list = [objects.Task.from_db(dict(r)) for r in rs]
 
+            if not summary:
                 self._assemble_tasks(task_list=task_list)
 
-                # add reference to this state manager to each task
-                for t in task_list:
-                    t.statemgr = self
+            # add reference to this state manager to each task
+            for t in task_list:
+                t.statemgr = self
 
             return task_list
         except Exception as ex:
             self.logger.error("Error querying task list: %s" % str(ex))
             return []
 
+    @metrics.db_query
     def get_complete_subtasks(self, task_id):
         """Query database for subtasks of the provided task that are complete.
 
@@ -117,6 +204,7 @@ class DrydockState(object):
         return self._query_subtasks(task_id, query_text,
                                     "Error querying complete subtask: %s")
 
+    @metrics.db_query
     def get_active_subtasks(self, task_id):
         """Query database for subtasks of the provided task that are active.
 
@@ -133,6 +221,7 @@ class DrydockState(object):
         return self._query_subtasks(task_id, query_text,
                                     "Error querying active subtask: %s")
 
+    @metrics.db_query
     def get_all_subtasks(self, task_id):
         """Query database for all subtasks of the provided task.
 
@@ -158,6 +247,7 @@ class DrydockState(object):
             self.logger.error(error % str(ex))
             return []
 
+    @metrics.db_query
     def get_next_queued_task(self, allowed_actions=None):
         """Query the database for the next (by creation timestamp) queued task.
 
@@ -199,10 +289,43 @@ class DrydockState(object):
                               exc_info=True)
             return None
 
-    def get_task(self, task_id):
+    @metrics.db_query
+    def get_queued_task_count(self, allowed_actions=None):
+        """Query the database for the number of queued tasks.
+
+        If specified, only count tasks for one of the actions in the
+        allowed_actions list.
+
+        :param allowed_actions: list of string action names
+        """
+        try:
+            with self.db_engine.connect() as conn:
+                if allowed_actions is None:
+                    query = sql.text("SELECT count(*) FROM tasks WHERE "
+                                     "status = :queued_status")
+                    rs = conn.execute(
+                        query, queued_status=hd_fields.TaskStatus.Queued)
+                else:
+                    query = sql.text("SELECT count(*) FROM tasks WHERE "
+                                     "status = :queued_status AND "
+                                     "action = ANY(:actions)")
+                    rs = conn.execute(
+                        query,
+                        queued_status=hd_fields.TaskStatus.Queued,
+                        actions=allowed_actions)
+
+                return rs.scalar()
+        except Exception as ex:
+            self.logger.error("Error counting queued tasks: %s" % str(ex),
+                              exc_info=True)
+            return None
+
+    @metrics.db_query
+    def get_task(self, task_id, messages=True):
         """Query database for task matching task_id.
 
         :param task_id: uuid.UUID of a task_id to query against
+        :param messages: whether to attach the result messages of the task
         """
         try:
             with self.db_engine.connect() as conn:
@@ -213,9 +336,10 @@ class DrydockState(object):
 
             task = objects.Task.from_db(dict(r))
 
-            self.logger.debug("Assembling result messages for task %s." %
-                              str(task.task_id))
-            self._assemble_tasks(task_list=[task])
+            if messages:
+                self.logger.debug("Assembling result messages for task %s." %
+                                  str(task.task_id))
+                self._assemble_tasks(task_list=[task])
             task.statemgr = self
 
             return task
@@ -226,17 +350,26 @@ class DrydockState(object):
                               exc_info=True)
             return None
 
+    @metrics.db_query
     def post_result_message(self, task_id, msg):
         """Add a result message to database attached to task task_id.
 
+        If write-behind is enabled the message is buffered and written
+        with other messages, at most ``result_message_flush_interval``
+        seconds later.
+
         :param task_id: uuid.UUID ID of the task the msg belongs to
         :param msg: instance of objects.TaskStatusMessage
         """
+        if self.message_writer is not None:
+            return self.message_writer.post(task_id, msg)
+
         try:
             with self.db_engine.connect() as conn:
                 query = self.result_message_tbl.insert().values(
                     task_id=task_id.bytes, **(msg.to_db()))
                 conn.execute(query)
+                notify(conn, TASK_STATUS_CHANNEL, [str(task_id)])
             return True
         except Exception as ex:
             self.logger.error(
@@ -244,12 +377,49 @@ class DrydockState(object):
                 (str(task_id), str(ex)))
             return False
 
+    @metrics.db_query
+    def get_result_messages(self, task_id, after=None):
+        """Query the result messages of a task in the order they were added.
+
+        :param task_id: uuid.UUID ID of the task
+        :param after: optional sequence number, only messages added after
+                      the message with this sequence are returned
+        :returns: list of (sequence, objects.TaskStatusMessage) tuples
+        """
+        self.flush_result_messages()
+        try:
+            with self.db_engine.connect() as conn:
+                query = sql.select([self.result_message_tbl]).where(
+                    self.result_message_tbl.c.task_id == task_id.bytes)
+                if after is not None:
+                    query = query.where(
+                        self.result_message_tbl.c.sequence > after)
+                query = query.order_by(
+                    self.result_message_tbl.c.sequence.asc())
+                rs = conn.execute(query)
+                return [(r['sequence'],
+                         objects.TaskStatusMessage.from_db(dict(r)))
+                        for r in rs]
+        except Exception as ex:
+            self.logger.error(
+                "Error querying result messages for task %s: %s" %
+                (str(task_id), str(ex)))
+            return []
+
+    def flush_result_messages(self):
+        """Write any buffered result messages to the database."""
+        if self.message_writer is not None:
+            return self.message_writer.flush()
+        return True
+
+    @metrics.db_query
     def delete_result_message(self, task_id, msg):
         """Delete a result message to database attached to task task_id.
 
         :param task_id: uuid.UUID ID of the task the msg belongs to
         :param msg: instance of objects.TaskStatusMessage
         """
+        self.flush_result_messages()
         try:
             with self.db_engine.connect() as conn:
                 query = self.result_message_tbl.delete().values(
@@ -264,28 +434,98 @@ class DrydockState(object):
     def _assemble_tasks(self, task_list=None):
         """Attach all the appropriate result messages to the tasks in the list.
 
+        Messages are loaded in batches of tasks rather than with a query
+        per task.
+
         :param task_list: a list of objects.Task instances to attach result messages to
         """
         if task_list is None:
             return None
 
+        tasks = dict()
+        for t in task_list:
+            t.result.error_count = 0
+            tasks.setdefault(t.task_id.bytes, []).append(t)
+
+        task_ids = list(tasks.keys())
+        batch_size = 1000
+
+        # Buffered messages posted by this process should be visible to it
+        self.flush_result_messages()
+
         with self.db_engine.connect() as conn:
-            query = sql.select([
-                self.result_message_tbl
-            ]).where(self.result_message_tbl.c.task_id == sql.bindparam(
-                'task_id')).order_by(self.result_message_tbl.c.sequence.asc())
-            query.compile(self.db_engine)
+            query = sql.select([self.result_message_tbl]).where(
+                self.result_message_tbl.c.task_id.in_(
+                    sql.bindparam('task_ids', expanding=True))).order_by(
+                        self.result_message_tbl.c.sequence.asc())
+
+            for i in range(0, len(task_ids), batch_size):
+                rs = conn.execute(query,
+                                  task_ids=task_ids[i:i + batch_size])
+                for r in rs:
+                    msg_dict = dict(r)
+                    msg = objects.TaskStatusMessage.from_db(msg_dict)
+                    for t in tasks.get(bytes(msg_dict['task_id']), []):
+                        if msg.error:
+                            t.result.error_count = t.result.error_count + 1
+                        t.result.message_list.append(msg)
+
+    @metrics.db_query
+    def get_task_tree(self, task_id, depth=None, errors_only=False):
+        """Get a task and its subtasks, recursively, with a single query.
+
+        The task is at depth 1, its subtasks at depth 2 and so on. The result
+        is ordered by depth, so the first entry is the task itself.
+
+        :param task_id: uuid.UUID ID of the task at the root of the tree
+        :param depth: maximum depth of the tree to return, None for all
+        :param errors_only: if True, only return subtasks with error messages.
+                            The root task is always returned.
+        :returns: list of tuples of (depth, objects.Task)
+        """
+        query_text = ("WITH RECURSIVE task_tree AS ("
+                      "SELECT tasks.*, 1 AS depth FROM tasks "
+                      "WHERE task_id = :task_id "
+                      "UNION ALL "
+                      "SELECT tasks.*, task_tree.depth + 1 FROM tasks "
+                      "JOIN task_tree "
+                      "ON tasks.parent_task_id = task_tree.task_id")
+        if depth is not None:
+            query_text += " WHERE task_tree.depth < :depth"
+        query_text += ") SELECT * FROM task_tree"
+        if errors_only:
+            query_text += (" WHERE task_tree.depth = 1 OR EXISTS ("
+                           "SELECT 1 FROM result_message "
+                           "WHERE result_message.task_id = task_tree.task_id "
+                           "AND result_message.error)")
+        query_text += " ORDER BY task_tree.depth"
 
-            for t in task_list:
-                rs = conn.execute(query, task_id=t.task_id.bytes)
-                error_count = 0
+        try:
+            with self.db_engine.connect() as conn:
+                params = dict(task_id=task_id.bytes)
+                if depth is not None:
+                    params['depth'] = depth
+                rs = conn.execute(sql.text(query_text), **params)
+
+                task_tree = []
                 for r in rs:
-                    msg = objects.TaskStatusMessage.from_db(dict(r))
-                    if msg.error:
-                        error_count = error_count + 1
-                    t.result.message_list.append(msg)
-                t.result.error_count = error_count
+                    task_dict = dict(r)
+                    task_tree.append((task_dict.pop('depth'),
+                                      objects.Task.from_db(task_dict)))
+
+            self._assemble_tasks(task_list=[t for _, t in task_tree])
+
+            for _, t in task_tree:
+                t.statemgr = self
+
+            return task_tree
+        except Exception as ex:
+            self.logger.error("Error querying task tree %s: %s" %
+                              (str(task_id), str(ex)),
+                              exc_info=True)
+            return None
 
+    @metrics.db_query
     def post_task(self, task):
         """Insert a task into the database.
 
@@ -304,85 +544,182 @@ class DrydockState(object):
                               (str(task.task_id), str(ex)))
             return False
 
-    def put_task(self, task):
+    @metrics.db_query
+    def put_task(self, task, columns=None):
         """Update a task in the database.
 
+        Termination state is merged with the stored task rather than
+        overwritten: a set terminate flag is never cleared and a terminating
+        or terminated status is only replaced by a terminated status.
+
         :param task: objects.Task instance to reference for update values
+        :param columns: optional dict of the column values to update, by
+                        default all columns of ``task`` are written
+        :returns: dict of the stored ``status``, ``terminate``,
+                  ``terminated`` and ``terminated_by`` values, or None if
+                  the task could not be updated
         """
+        if columns is None:
+            columns = task.to_db(include_id=False)
+        values = dict(columns)
+
+        if not values.get('terminate', True):
+            values.pop('terminate')
+        for c in ['terminated', 'terminated_by']:
+            if c in values and values[c] is None:
+                values.pop(c)
+        status = values.get('status')
+        if status is not None and status != hd_fields.TaskStatus.Terminated:
+            values['status'] = sql.case(
+                (self.tasks_tbl.c.status.in_([
+                    hd_fields.TaskStatus.Terminating,
+                    hd_fields.TaskStatus.Terminated
+                ]), self.tasks_tbl.c.status),
+                else_=status)
+
         try:
             with self.db_engine.connect() as conn:
                 query = self.tasks_tbl.update().where(
                     self.tasks_tbl.c.task_id == task.task_id.bytes).values(
-                        **(task.to_db(include_id=False)))
+                        **values).returning(self.tasks_tbl.c.status,
+                                            self.tasks_tbl.c.terminate,
+                                            self.tasks_tbl.c.terminated,
+                                            self.tasks_tbl.c.terminated_by)
                 rs = conn.execute(query)
-                if rs.rowcount == 1:
-                    return True
+                r = rs.fetchone()
+                if r is not None:
+                    notify(conn, TASK_STATUS_CHANNEL, [str(task.task_id)])
+                    return dict(r)
                 else:
-                    return False
+                    return None
         except Exception as ex:
             self.logger.error("Error updating task %s: %s" %
                               (str(task.task_id), str(ex)))
+            return None
+
+    @metrics.db_query
+    def create_result_message_partitions(self, months_ahead=3):
+        """Create missing monthly partitions of the result_message table.
+
+        Does nothing unless the table was partitioned by a migration. Rows
+        of the months created that were stored in the default partition
+        are moved to the new partitions.
+
+        :param months_ahead: number of months after the current one to create
+        """
+        try:
+            with self.db_engine.begin() as conn:
+                if not partitions.is_partitioned(conn):
+                    return True
+                created = partitions.create_partitions(conn, datetime.now(UTC),
+                                                       months_ahead + 1)
+            for name in created:
+                self.logger.info("Created result message partition %s." % name)
+            return True
+        except Exception as ex:
+            self.logger.error("Error creating result message partitions: %s" %
+                              str(ex))
             return False
 
-    def task_retention(self, retain_days):
+    @metrics.db_query
+    def task_retention(self, retain_days, batch_size=None):
         """Delete all tasks in the database older than x days.
 
-        :param days: number of days to keep tasks
+        Tasks are deleted in batches, each in a short transaction, so the
+        tables stay available while old tasks are removed. Each batch also
+        deletes the subtasks of the selected tasks and the result messages,
+        build data and boot action statuses of all deleted tasks. Space is
+        reclaimed with a plain VACUUM, which does not block readers or
+        writers.
+
+        :param retain_days: number of days to keep tasks
+        :param batch_size: number of tasks selected per batch, defaults to
+                           the ``retention_batch_size`` option
+        :returns: dict of deleted row counts per table, or False on error
         """
-        with self.db_engine.connect() as conn:
-            try:
-                query_tasks_text = sql.text(
-                    "DELETE FROM tasks WHERE created < now() - interval '"
-                    + retain_days
-                    + " days'").execution_options(autocommit=True)
-                conn.execute(query_tasks_text)
-                conn.close()
-            except Exception as ex:
-                self.logger.error("Error deleting tasks: %s" % str(ex))
-                return False
+        self.create_result_message_partitions()
+
+        if batch_size is None:
+            batch_size = config.config_mgr.conf.database.retention_batch_size
+
+        query = sql.text(
+            "WITH RECURSIVE batch AS ("
+            "SELECT task_id FROM tasks "
+            "WHERE created < now() - make_interval(days => :retain_days) "
+            "ORDER BY created LIMIT :batch_size"
+            "), doomed AS ("
+            "SELECT task_id FROM batch "
+            "UNION "
+            "SELECT tasks.task_id FROM tasks "
+            "JOIN doomed ON tasks.parent_task_id = doomed.task_id"
+            "), del_result_message AS ("
+            "DELETE FROM result_message "
+            "WHERE task_id IN (SELECT task_id FROM doomed) RETURNING 1"
+            "), del_build_data AS ("
+            "DELETE FROM build_data "
+            "WHERE task_id IN (SELECT task_id FROM doomed) RETURNING 1"
+            "), del_boot_action_status AS ("
+            "DELETE FROM boot_action_status "
+            "WHERE task_id IN (SELECT task_id FROM doomed) RETURNING 1"
+            "), del_tasks AS ("
+            "DELETE FROM tasks "
+            "WHERE task_id IN (SELECT task_id FROM doomed) RETURNING 1"
+            ") SELECT "
+            "(SELECT count(*) FROM del_tasks) AS tasks, "
+            "(SELECT count(*) FROM del_result_message) AS result_message, "
+            "(SELECT count(*) FROM del_build_data) AS build_data, "
+            "(SELECT count(*) FROM del_boot_action_status) "
+            "AS boot_action_status").execution_options(autocommit=True)
+
+        deleted = dict(tasks=0,
+                       result_message=0,
+                       build_data=0,
+                       boot_action_status=0)
+        start = time.monotonic()
+        batches = 0
+        try:
+            with self.db_engine.connect() as conn:
+                while True:
+                    r = conn.execute(query,
+                                     retain_days=int(retain_days),
+                                     batch_size=batch_size).first()
+                    counts = dict(r)
+                    if not counts['tasks']:
+                        break
+                    batches = batches + 1
+                    for k in deleted.keys():
+                        deleted[k] = deleted[k] + counts[k]
+                    self._log_retention_progress(batches, deleted, start)
+        except Exception as ex:
+            self.logger.error("Error deleting tasks: %s" % str(ex))
+            return False
 
-        with self.db_engine.connect() as conn:
-            try:
-                query_subtasks_text = ("DELETE FROM tasks "
-                                       "WHERE parent_task_id IS NOT NULL AND "
-                                       "parent_task_id NOT IN "
-                                       "(SELECT task_id FROM tasks);")
-                conn.execute(sql.text(query_subtasks_text))
-                conn.close()
-            except Exception as ex:
-                self.logger.error("Error deleting subtasks: %s" % str(ex))
-                return False
+        self._log_retention_progress(batches, deleted, start, done=True)
 
-        with self.db_engine.connect() as conn:
+        if batches:
             try:
-                query_result_message_text = (
-                    "DELETE FROM result_message WHERE ts IN "
-                    "(SELECT result_message.ts FROM result_message "
-                    "LEFT JOIN tasks ON "
-                    "result_message.task_id=tasks.task_id "
-                    "WHERE tasks.task_id IS NULL);")
-                conn.execute(sql.text(query_result_message_text))
-                conn.close()
+                with self.db_engine.connect() as conn:
+                    conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+                    for t in deleted.keys():
+                        conn.execute(
+                            sql.text(  # nosec table names are not user-sourced
+                                "VACUUM ANALYZE %s" % t))
             except Exception as ex:
-                self.logger.error("Error deleting result messages: %s" %
-                                  str(ex))
-                return False
+                self.logger.warning("Error running vacuum: %s" % str(ex))
 
-        with self.db_engine.connect() as conn:
-            try:
-                real_conn = conn.connection
-                old_isolation_level = real_conn.isolation_level
-                real_conn.set_isolation_level(0)
-                query_vacuum_text = sql.text("VACUUM FULL")
-                conn.execute(query_vacuum_text)
-                real_conn.set_isolation_level(old_isolation_level)
-                conn.close()
-            except Exception as ex:
-                self.logger.error("Error running vacuum full: %s" % str(ex))
-                return False
+        return deleted
 
-            return True
+    def _log_retention_progress(self, batches, deleted, start, done=False):
+        """Log the rows deleted by task retention and the rate of deletion."""
+        elapsed = time.monotonic() - start
+        total = sum(deleted.values())
+        rate = total / elapsed if elapsed > 0 else 0
+        self.logger.info(
+            "Task retention %s: %d batches, %s rows in %.1fs (%.0f rows/sec)" %
+            ('complete' if done else 'in progress', batches, ', '.join(
+                "%d %s" % (v, k) for k, v in deleted.items()), elapsed, rate))
 
+    @metrics.db_query
     def add_subtask(self, task_id, subtask_id):
         """Add new task to subtask list.
 
@@ -409,6 +746,7 @@ class DrydockState(object):
                               (str(subtask_id), str(task_id), str(ex)))
             return False
 
+    @metrics.db_query
     def maintain_leadership(self, leader_id):
         """The active leader reaffirms its existence.
 
@@ -429,6 +767,7 @@ class DrydockState(object):
         except Exception as ex:
             self.logger.error("Error maintaining leadership: %s" % str(ex))
 
+    @metrics.db_query
     def claim_leadership(self, leader_id):
         """Claim active instance status for leader_id.
 
@@ -466,6 +805,7 @@ class DrydockState(object):
             self.logger.error("Error executing leadership claim: %s" % str(ex))
             return False
 
+    @metrics.db_query
     def abdicate_leadership(self, leader_id):
         """Give up leadership for ``leader_id``.
 
@@ -485,6 +825,7 @@ class DrydockState(object):
         except Exception as ex:
             self.logger.error("Error abidcating leadership: %s" % str(ex))
 
+    @metrics.db_query
     def post_boot_action_context(self, nodename, task_id, identity):
         """Save the context for a boot action for later access by a node.
 
@@ -519,6 +860,37 @@ class DrydockState(object):
                               exc_info=ex)
             return False
 
+    @metrics.db_query
+    def post_boot_action_contexts(self, task_id, identity_keys):
+        """Save the boot action contexts for a list of nodes.
+
+        The contexts are upserted with a single multi-row statement.
+
+        :param task_id: The uuid.UUID task id instigating the node deployments
+        :param identity_keys: Dictionary of the 32 byte identity key of each
+                              node keyed by node name
+        """
+        rows = [
+            dict(node_name=n, task_id=task_id.bytes, identity_key=k)
+            for n, k in identity_keys.items()
+        ]
+        try:
+            with self.db_engine.connect() as conn:
+                query = pg_insert(self.boot_action_tbl)
+                query = query.on_conflict_do_update(
+                    index_elements=[self.boot_action_tbl.c.node_name],
+                    set_=dict(task_id=query.excluded.task_id,
+                              identity_key=query.excluded.identity_key))
+                conn.execute(query, rows)
+
+            return True
+        except Exception as ex:
+            self.logger.error("Error posting boot action contexts for nodes %s"
+                              % ', '.join(identity_keys.keys()),
+                              exc_info=ex)
+            return False
+
+    @metrics.db_query
     def get_boot_action_context(self, nodename):
         """Get the boot action context for a node.
 
@@ -546,6 +918,7 @@ class DrydockState(object):
                 exc_info=ex)
             return None
 
+    @metrics.db_query
     def post_boot_action(self,
                          nodename,
                          task_id,
@@ -577,20 +950,62 @@ class DrydockState(object):
                               exc_info=ex)
             return False
 
+    @metrics.db_query
+    def post_boot_actions(self, boot_actions, batch_size=100):
+        """Post a list of boot actions with multi-row inserts.
+
+        :param boot_actions: list of dictionaries with the ``nodename``, ``task_id``,
+                             ``identity_key``, ``action_id``, ``action_name`` and
+                             ``action_status`` of each boot action as accepted by
+                             ``post_boot_action``
+        :param batch_size: maximum number of rows in each insert
+        """
+        rows = [
+            dict(node_name=ba['nodename'],
+                 action_id=ba['action_id'],
+                 action_name=ba['action_name'],
+                 task_id=ba['task_id'].bytes,
+                 identity_key=ba['identity_key'],
+                 action_status=ba.get('action_status',
+                                      hd_fields.ActionResult.Incomplete))
+            for ba in boot_actions
+        ]
+        try:
+            with self.db_engine.connect() as conn:
+                with conn.begin():
+                    for i in range(0, len(rows), batch_size):
+                        conn.execute(self.ba_status_tbl.insert(),
+                                     rows[i:i + batch_size])
+                return True
+        except Exception as ex:
+            self.logger.error("Error saving %d boot actions." % len(rows),
+                              exc_info=ex)
+            return False
+
+    @metrics.db_query
     def put_bootaction_status(self,
                               action_id,
                               action_status=hd_fields.ActionResult.Incomplete):
         """Update the status of a bootaction.
 
+        Listeners on ``BOOT_ACTION_STATUS_CHANNEL`` are notified with the
+        name of the node the boot action belongs to.
+
         :param action_id: string ULID ID of the boot action
         :param action_status: The string statu to set for the boot action
         """
         try:
             with self.db_engine.connect() as conn:
-                query = self.ba_status_tbl.update().where(
-                    self.ba_status_tbl.c.action_id == ulid2.decode_ulid_base32(
-                        action_id)).values(action_status=action_status)
-                conn.execute(query)
+                query = sql.text(
+                    "WITH updated AS ("
+                    "UPDATE boot_action_status SET action_status = :status "
+                    "WHERE action_id = :action_id RETURNING node_name) "
+                    "SELECT pg_notify(:channel, node_name) FROM updated"
+                ).execution_options(autocommit=True)
+                conn.execute(query,
+                             status=action_status,
+                             action_id=ulid2.decode_ulid_base32(action_id),
+                             channel=BOOT_ACTION_STATUS_CHANNEL)
                 return True
         except Exception as ex:
             self.logger.error("Error updating boot action %s status." %
@@ -598,6 +1013,32 @@ class DrydockState(object):
                               exc_info=ex)
             return False
 
+    def listen_boot_action_status(self):
+        """Return a listener notified of boot action status updates.
+
+        :returns: instance of listener.NotificationListener
+        """
+        return NotificationListener(self.db_engine,
+                                    BOOT_ACTION_STATUS_CHANNEL)
+
+    def listen_task_status(self):
+        """Return a listener notified of task updates.
+
+        :returns: instance of listener.NotificationListener
+        """
+        return NotificationListener(self.db_engine, TASK_STATUS_CHANNEL)
+
+    def watch_task(self, task_id):
+        """Return a subscription woken when task ``task_id`` is updated.
+
+        Subscriptions of all threads share a single listener.
+
+        :param task_id: uuid.UUID ID of the task to watch
+        :returns: instance of listener.Subscription
+        """
+        return self.task_dispatcher.subscribe(str(task_id))
+
+    @metrics.db_query
     def get_boot_actions_for_node(self, nodename):
         """Query for getting all boot action statuses for a node.
 
@@ -606,25 +1047,73 @@ class DrydockState(object):
 
         :param nodename: string nodename of the target node
         """
+        node_actions = self.get_boot_actions_for_nodes([nodename])
+        if node_actions is None:
+            return None
+        return node_actions.get(nodename, dict())
+
+    @metrics.db_query
+    def get_boot_actions_for_nodes(self, nodenames):
+        """Query for getting all boot action statuses for a list of nodes.
+
+        Return a dictionary keyed by node name of dictionaries of boot
+        action dictionaries keyed by the boot action name.
+
+        :param nodenames: list of string nodenames of the target nodes
+        """
         try:
             with self.db_engine.connect() as conn:
                 query = self.ba_status_tbl.select().where(
-                    self.ba_status_tbl.c.node_name == nodename)
+                    self.ba_status_tbl.c.node_name.in_(nodenames))
                 rs = conn.execute(query)
-                actions = dict()
+                node_actions = dict()
                 for r in rs:
                     ba_dict = dict(r)
                     ba_dict['action_id'] = bytes(ba_dict['action_id'])
                     ba_dict['identity_key'] = bytes(ba_dict['identity_key'])
                     ba_dict['task_id'] = uuid.UUID(bytes=ba_dict['task_id'])
+                    actions = node_actions.setdefault(ba_dict['node_name'],
+                                                      dict())
                     actions[ba_dict.get('action_name', 'undefined')] = ba_dict
-                return actions
+                return node_actions
         except Exception as ex:
-            self.logger.error("Error selecting boot actions for node %s" %
-                              nodename,
+            self.logger.error("Error selecting boot actions for nodes %s" %
+                              ', '.join(nodenames),
+                              exc_info=ex)
+            return None
+
+    @metrics.db_query
+    def get_boot_action_counts(self, nodenames):
+        """Count the boot actions of a list of nodes by status.
+
+        Return a dictionary keyed by node name of dictionaries of the number
+        of boot actions keyed by action status.
+
+        :param nodenames: list of string nodenames of the target nodes
+        """
+        try:
+            with self.db_engine.connect() as conn:
+                query = sql.select([
+                    self.ba_status_tbl.c.node_name,
+                    self.ba_status_tbl.c.action_status,
+                    sql.func.count().label('count')
+                ]).where(
+                    self.ba_status_tbl.c.node_name.in_(nodenames)).group_by(
+                        self.ba_status_tbl.c.node_name,
+                        self.ba_status_tbl.c.action_status)
+                rs = conn.execute(query)
+                counts = dict()
+                for r in rs:
+                    counts.setdefault(r['node_name'],
+                                      dict())[r['action_status']] = r['count']
+                return counts
+        except Exception as ex:
+            self.logger.error("Error counting boot actions for nodes %s" %
+                              ', '.join(nodenames),
                               exc_info=ex)
             return None
 
+    @metrics.db_query
     def get_boot_action(self, action_id):
         """Query for a single boot action by ID.
 
@@ -649,6 +1138,7 @@ class DrydockState(object):
             self.logger.error("Error querying boot action %s" % action_id,
                               exc_info=ex)
 
+    @metrics.db_query
     def post_build_data(self, build_data):
         """Write a new build data element to the database.
 
@@ -664,6 +1154,34 @@ class DrydockState(object):
             self.logger.error("Error saving build data.", exc_info=ex)
             return False
 
+    @metrics.db_query
+    def post_build_data_list(self, build_data_list, batch_size=100):
+        """Write a list of build data elements to the database.
+
+        The elements are written in a single transaction with multi-row
+        inserts of up to ``batch_size`` rows.
+
+        :param build_data_list: list of objects.BuildData instances to write
+        :param batch_size: maximum number of rows in each insert
+        """
+        if not build_data_list:
+            return True
+
+        rows = [bd.to_db() for bd in build_data_list]
+        try:
+            with self.db_engine.connect() as conn:
+                with conn.begin():
+                    for i in range(0, len(rows), batch_size):
+                        conn.execute(self.build_data_tbl.insert(),
+                                     rows[i:i + batch_size])
+                return True
+        except Exception as ex:
+            self.logger.error("Error saving %d build data elements." %
+                              len(rows),
+                              exc_info=ex)
+            return False
+
+    @metrics.db_query
     def get_build_data(self,
                        node_name=None,
                        task_id=None,
@@ -685,53 +1203,93 @@ class DrydockState(object):
                           be. 1 is summary, 2 includes the collected data
         :returns: list of objects.BuildData instances
         """
-        # TODO(sh8121att) possibly optimize queries by changing select column
-        # list based on verbosity
-        try:
-            with self.db_engine.connect() as conn:
-                if node_name and task_id:
-                    query = self.build_data_tbl.select().where(
-                        self.build_data_tbl.c.node_name == node_name
-                        and self.build_data_tbl.c.task_id
-                        == task_id.bytes).order_by(
-                            self.build_data_tbl.c.collected_date.desc())
-                    rs = conn.execute(query)
-                elif node_name:
-                    if latest:
-                        query = sql.text(
-                            'SELECT DISTINCT ON (generator) build_data.* '
-                            'FROM build_data '
-                            'WHERE build_data.node_name = :nodename '
-                            'ORDER BY generator, build_data.collected_date DESC'
-                        )
-                        rs = conn.execute(query, nodename=node_name)
-                    else:
-                        query = self.build_data_tbl.select().where(
-                            self.build_data_tbl.c.node_name == node_name)
-                        rs = conn.execute(query)
-                elif task_id:
-                    query = self.build_data_tbl.select().where(
-                        self.build_data_tbl.c.task_id == task_id.bytes)
-                    rs = conn.execute(query)
-                else:
-                    if latest:
-                        query = sql.text(
-                            'SELECT DISTINCT ON (generator), build_data.* '
-                            'FROM build_data '
-                            'ORDER BY generator, build_data.collected.date DESC'
-                        )
-                        rs = conn.execute(query)
-                    else:
-                        query = self.build_data_tbl.select()
-                        rs = conn.execute(query)
-
-                result_data = rs.fetchall()
-
-            return [objects.BuildData.from_db(dict(r)) for r in result_data]
-        except Exception as ex:
-            self.logger.error("Error selecting build data.", exc_info=ex)
-            raise errors.BuildDataError("Error selecting build data.")
+        return list(
+            self.stream_build_data(node_name=node_name,
+                                   task_id=task_id,
+                                   latest=latest,
+                                   verbosity=verbosity))
+
+    def stream_build_data(self,
+                          node_name=None,
+                          task_id=None,
+                          latest=False,
+                          verbosity=2,
+                          batch_size=50):
+        """Retrieve build data from the database as it is read.
+
+        Accepts the same filters as ``get_build_data``. Rows are read in
+        keyset-paginated pages of ``batch_size`` rows, each with its own
+        short connection checkout, so a slow reader neither holds a pooled
+        connection nor more than a page of build data. With a ``verbosity``
+        of 1 the data elements are not selected and summary instances are
+        returned.
+
+        :param batch_size: number of rows read per page
+        :returns: generator of objects.BuildData instances
+        """
+        columns = [
+            self.build_data_tbl.c.node_name,
+            self.build_data_tbl.c.task_id,
+            self.build_data_tbl.c.collected_date,
+            self.build_data_tbl.c.generator,
+            self.build_data_tbl.c.data_format,
+        ]
+        if verbosity > 1:
+            columns.extend([
+                self.build_data_tbl.c.data_element,
+                self.build_data_tbl.c.data_compressed,
+            ])
+
+        distinct = latest and not task_id
+        if not distinct:
+            # build_data has no key, the row location breaks ties between
+            # rows collected at the same time
+            columns.append(sql.literal_column('build_data.ctid').label('ctid'))
+
+        query = sql.select(columns)
+        if node_name:
+            query = query.where(self.build_data_tbl.c.node_name == node_name)
+        if task_id:
+            query = query.where(
+                self.build_data_tbl.c.task_id == task_id.bytes)
+
+        if distinct:
+            query = query.distinct(self.build_data_tbl.c.generator).order_by(
+                self.build_data_tbl.c.generator,
+                self.build_data_tbl.c.collected_date.desc())
+        else:
+            query = query.order_by(self.build_data_tbl.c.collected_date.desc(),
+                                   sql.literal_column('build_data.ctid').desc())
+
+        page = query
+        while True:
+            try:
+                with self.db_engine.connect() as conn:
+                    rows = conn.execute(page.limit(batch_size)).fetchall()
+            except Exception as ex:
+                self.logger.error("Error selecting build data.", exc_info=ex)
+                raise errors.BuildDataError("Error selecting build data.")
+
+            for r in rows:
+                bd = dict(r)
+                bd.pop('ctid', None)
+                yield objects.BuildData.from_db(bd)
+
+            if len(rows) < batch_size:
+                return
+
+            last = rows[-1]
+            if distinct:
+                page = query.where(
+                    self.build_data_tbl.c.generator > last['generator'])
+            else:
+                page = query.where(
+                    sql.text("(build_data.collected_date, build_data.ctid) < "
+                             "(:collected_date, CAST(:ctid AS tid))").bindparams(
+                                 collected_date=last['collected_date'],
+                                 ctid=last['ctid']))
 
+    @metrics.db_query
     def get_now(self):
         """Query the database for now() from dual.
         """
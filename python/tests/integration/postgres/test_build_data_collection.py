@@ -40,7 +40,11 @@ class TestBuildDataCollection(object):
 
         action = ConfigureHardware(task, deckhand_orchestrator, blank_state)
 
-        action.collect_build_data(machine)
+        build_data = action.collect_build_data(machine)
+
+        assert len(build_data) == 2
+
+        blank_state.post_build_data_list(build_data)
 
         bd = blank_state.get_build_data(node_name='foo')
 
@@ -13,7 +13,7 @@
 # limitations under the License.
 """Test build data collection and persistence."""
 from drydock_provisioner.objects import fields as hd_fields
-from drydock_provisioner.drivers.node.maasdriver.actions.node import BaseMaasAction
+from drydock_provisioner.drivers.node.maasdriver.actions.node import ConfigureHardware
 from drydock_provisioner.drivers.node.maasdriver.models.machine import Machine
 
 
@@ -60,12 +60,18 @@ class TestNodeResultLinks(object):
         node = mocker.MagicMock()
         node.configure_mock(name='n1')
 
-        action = BaseMaasAction(task, deckhand_orchestrator, blank_state)
+        action = ConfigureHardware(task,
+                                   deckhand_orchestrator,
+                                   blank_state,
+                                   maas_client=api_client)
+        action.finished_machines = [(node, machine)]
 
         with mocker.patch(
                 'drydock_provisioner.drivers.node.maasdriver.actions.node.get_internal_api_href',
                 mocker.MagicMock(return_value='http://drydock/api/v1.0')):
-            action._add_detail_logs(node, machine, 'hello_world')
+            ConfigureHardware.finish_stage(task, [action],
+                                           deckhand_orchestrator, blank_state,
+                                           api_client)
 
         bd = blank_state.get_build_data(task_id=task.task_id)
         assert len(bd) == 1
@@ -59,6 +59,79 @@ class TestPostgresBootAction(object):
 
         assert ba.get('identity_key') == id_key
 
+    def test_bootaction_counts(self, populateddb, drydock_state):
+        """Test that boot action statuses are counted for a set of nodes."""
+        for nodename in ['node1', 'node2', 'node2']:
+            drydock_state.post_boot_action(nodename, populateddb.get_id(),
+                                           os.urandom(32),
+                                           ulid2.generate_binary_ulid(),
+                                           'helloworld')
+
+        counts = drydock_state.get_boot_action_counts(['node1', 'node2'])
+
+        assert counts == {
+            'node1': {
+                objects.fields.ActionResult.Incomplete: 1
+            },
+            'node2': {
+                objects.fields.ActionResult.Incomplete: 2
+            },
+        }
+
+    def test_bootaction_put_notifies(self, populateddb, drydock_state):
+        """Test that updating a boot action status notifies listeners."""
+        action_id = ulid2.generate_binary_ulid()
+        drydock_state.post_boot_action('testnode', populateddb.get_id(),
+                                       os.urandom(32), action_id, 'helloworld')
+
+        listener = drydock_state.listen_boot_action_status()
+        try:
+            drydock_state.put_bootaction_status(
+                ulid2.encode_ulid_base32(action_id),
+                action_status=objects.fields.ActionResult.Success)
+
+            assert listener.wait(5) == ['testnode']
+        finally:
+            listener.close()
+
+        bas = drydock_state.get_boot_actions_for_nodes(['testnode'])
+        assert bas['testnode']['helloworld'][
+            'action_status'] == objects.fields.ActionResult.Success
+
+    def test_bootaction_contexts_upsert(self, populateddb, drydock_state):
+        """Test that boot action contexts are saved and replaced in bulk."""
+        for _ in range(2):
+            identity_keys = {
+                'node1': os.urandom(32),
+                'node2': os.urandom(32),
+            }
+            result = drydock_state.post_boot_action_contexts(
+                populateddb.get_id(), identity_keys)
+
+            assert result
+
+        for nodename, identity_key in identity_keys.items():
+            ctx = drydock_state.get_boot_action_context(nodename)
+            assert ctx['identity_key'] == identity_key
+            assert ctx['task_id'] == populateddb.get_id()
+
+    def test_bootactions_post_bulk(self, populateddb, drydock_state):
+        """Test that a list of boot actions can be added."""
+        boot_actions = [
+            dict(nodename=nodename,
+                 task_id=populateddb.get_id(),
+                 identity_key=os.urandom(32),
+                 action_id=ulid2.generate_binary_ulid(),
+                 action_name='helloworld') for nodename in ['node1', 'node2']
+        ]
+
+        result = drydock_state.post_boot_actions(boot_actions)
+
+        assert result
+
+        bas = drydock_state.get_boot_actions_for_nodes(['node1', 'node2'])
+        assert set(bas.keys()) == set(['node1', 'node2'])
+
     @pytest.fixture(scope='function')
     def populateddb(self, blank_state):
         """Add dummy task to test against."""
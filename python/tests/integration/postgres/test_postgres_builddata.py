@@ -111,3 +111,76 @@ class TestBuildData(object):
         assert len(bd_list) == 1
 
         assert bd_list[0].to_dict() == build_data1.to_dict()
+
+    def test_build_data_compressed(self, blank_state):
+        """Test that large build data is stored compressed and read back."""
+        data_element = '<lshw>%s</lshw>' % ('<node/>' * 1000)
+        build_data = objects.BuildData(node_name='foo',
+                                       generator='lshw',
+                                       data_format='text/xml',
+                                       data_element=data_element,
+                                       task_id=uuid.uuid4())
+
+        result = blank_state.post_build_data(build_data)
+
+        assert result
+
+        with blank_state.db_engine.connect() as conn:
+            r = conn.execute(blank_state.build_data_tbl.select()).first()
+
+        assert r['data_element'] is None
+        assert len(r['data_compressed']) < len(data_element)
+
+        bd_list = blank_state.get_build_data(node_name='foo')
+
+        assert bd_list[0].data_element == data_element
+
+    def test_build_data_select_summary(self, blank_state):
+        """Test that summary build data omits the data element."""
+        build_data = objects.BuildData(node_name='foo',
+                                       generator='hello_world',
+                                       data_format='text/plain',
+                                       data_element='Hello World!',
+                                       task_id=uuid.uuid4())
+
+        blank_state.post_build_data(build_data)
+
+        bd_list = list(
+            blank_state.stream_build_data(task_id=build_data.task_id,
+                                          verbosity=1))
+
+        assert len(bd_list) == 1
+        assert bd_list[0].data_element is None
+        assert bd_list[0].to_dict() == build_data.to_dict(verbosity=1)
+
+    def test_build_data_stream_pages(self, blank_state):
+        """Test build data is streamed in pages without losing rows."""
+        task_id = uuid.uuid4()
+        collected_date = datetime.now(UTC)
+        build_data_list = []
+        for i in range(5):
+            # Rows collected at the same time are paged by location
+            build_data_list.append(
+                objects.BuildData(node_name='foo',
+                                  generator='gen%d' % (i % 3),
+                                  data_format='text/plain',
+                                  data_element='Hello World %d' % i,
+                                  collected_date=collected_date
+                                  - timedelta(minutes=i // 2),
+                                  task_id=task_id))
+
+        blank_state.post_build_data_list(build_data_list)
+
+        bd_list = list(
+            blank_state.stream_build_data(task_id=task_id, batch_size=2))
+        assert sorted(bd.data_element for bd in bd_list) == sorted(
+            bd.data_element for bd in build_data_list)
+
+        bd_list = list(
+            blank_state.stream_build_data(node_name='foo',
+                                          latest=True,
+                                          batch_size=2))
+        assert [bd.generator for bd in bd_list] == ['gen0', 'gen1', 'gen2']
+        assert [bd.data_element for bd in bd_list] == [
+            'Hello World 0', 'Hello World 1', 'Hello World 2'
+        ]
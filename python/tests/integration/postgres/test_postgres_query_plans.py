@@ -0,0 +1,140 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the task and result message access paths on a seeded database.
+
+Each query is timed with index scans disabled, emulating the schema without
+indexes, and then with them enabled. The timings are logged and the indexed
+plans are checked to not scan the tables sequentially.
+"""
+import json
+import logging
+import time
+
+import pytest
+from sqlalchemy import sql
+
+from drydock_provisioner import objects
+import drydock_provisioner.objects.fields as hd_fields
+from drydock_provisioner.statemgmt.state import DrydockState
+
+LOG = logging.getLogger(__name__)
+
+PARENT_TASKS = 200
+SUBTASKS_PER_PARENT = 50
+MESSAGES_PER_TASK = 5
+
+QUERIES = {
+    'next_queued_task':
+    ("SELECT * FROM tasks WHERE status = :queued_status "
+     "AND action = ANY(:actions) ORDER BY created ASC LIMIT 1"),
+    'complete_subtasks':
+    ("SELECT * FROM tasks WHERE parent_task_id = :parent_task_id "
+     "AND status IN ('complete', 'terminated')"),
+    'task_messages':
+    ("SELECT * FROM result_message WHERE task_id = ANY(:task_ids) "
+     "ORDER BY sequence ASC"),
+    'task_list_by_status':
+    ("SELECT * FROM tasks WHERE status = :queued_status "
+     "ORDER BY created DESC LIMIT 100"),
+}
+
+
+class TestPostgresQueryPlans(object):
+
+    @pytest.mark.parametrize('query_name', sorted(QUERIES.keys()))
+    def test_query_uses_index(self, seeded_state, query_name):
+        params = dict(queued_status=hd_fields.TaskStatus.Queued,
+                      actions=[hd_fields.OrchestratorAction.DeployNode],
+                      parent_task_id=seeded_state['parent_task_id'],
+                      task_ids=seeded_state['task_ids'])
+        query_text = QUERIES[query_name]
+
+        with seeded_state['state'].db_engine.connect() as conn:
+            with conn.begin():
+                conn.execute(sql.text("SET LOCAL enable_indexscan = off"))
+                conn.execute(sql.text("SET LOCAL enable_bitmapscan = off"))
+                unindexed_ms, _ = self.explain(conn, query_text, params)
+
+            with conn.begin():
+                indexed_ms, plan = self.explain(conn, query_text, params)
+
+        LOG.info("Query %s: %.2fms without indexes, %.2fms with indexes" %
+                 (query_name, unindexed_ms, indexed_ms))
+
+        assert not self.seq_scans(plan, ['tasks', 'result_message'])
+
+    def explain(self, conn, query_text, params):
+        """Return the execution time in ms and the plan of a query."""
+        start = time.monotonic()
+        rs = conn.execute(
+            sql.text("EXPLAIN (ANALYZE, FORMAT JSON) " + query_text), **params)
+        plan = rs.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        elapsed = (time.monotonic() - start) * 1000
+        return plan[0].get('Execution Time', elapsed), plan[0]['Plan']
+
+    def seq_scans(self, plan, tables):
+        """Return the sequential scans of ``tables`` in a plan."""
+        scans = []
+        if (plan.get('Node Type') == 'Seq Scan'
+                and plan.get('Relation Name') in tables):
+            scans.append(plan.get('Relation Name'))
+        for p in plan.get('Plans', []):
+            scans.extend(self.seq_scans(p, tables))
+        return scans
+
+
+@pytest.fixture(scope='module')
+def seeded_state(setup):
+    """Seed the database with a deployment-sized task history."""
+    state = DrydockState()
+    state.connect_db()
+    state.tabularasa()
+
+    task_ids = []
+    parent_task_id = None
+    with state.db_engine.connect() as conn:
+        for _ in range(PARENT_TASKS):
+            parent = objects.Task(
+                action=hd_fields.OrchestratorAction.DeployNodes)
+            parent.set_status(hd_fields.TaskStatus.Complete)
+            subtasks = []
+            for _ in range(SUBTASKS_PER_PARENT):
+                st = objects.Task(
+                    action=hd_fields.OrchestratorAction.DeployNode,
+                    parent_task_id=parent.task_id)
+                st.set_status(hd_fields.TaskStatus.Complete)
+                parent.subtask_id_list.append(st.task_id)
+                subtasks.append(st)
+            rows = [t.to_db() for t in [parent] + subtasks]
+            conn.execute(state.tasks_tbl.insert(), rows)
+
+            messages = []
+            for t in [parent] + subtasks:
+                for i in range(MESSAGES_PER_TASK):
+                    msg = objects.TaskStatusMessage('Message %d' % i, False,
+                                                    'node', 'n1')
+                    messages.append(
+                        dict(task_id=t.task_id.bytes, **msg.to_db()))
+            conn.execute(state.result_message_tbl.insert(), messages)
+            parent_task_id = parent.task_id.bytes
+            task_ids = [t.task_id.bytes for t in subtasks[:10]]
+
+        conn.execute(sql.text("ANALYZE tasks"))
+        conn.execute(sql.text("ANALYZE result_message"))
+
+    yield dict(state=state, parent_task_id=parent_task_id, task_ids=task_ids)
+
+    state.tabularasa()
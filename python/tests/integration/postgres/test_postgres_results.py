@@ -21,6 +21,20 @@ class TestPostgres(object):
 
         assert len(task.result.message_list) == 2
 
+    def test_result_message_batched(self, populateddb, drydock_state):
+        """Test that buffered result messages keep their order."""
+        for i in range(250):
+            msg = objects.TaskStatusMessage('Status %d' % i, False, 'node',
+                                            'node1')
+            assert drydock_state.post_result_message(populateddb.task_id, msg)
+
+        assert drydock_state.flush_result_messages()
+
+        task = drydock_state.get_task(populateddb.task_id)
+
+        assert [m.message for m in task.result.message_list
+                ] == ['Status %d' % i for i in range(250)]
+
     @pytest.fixture(scope='function')
     def populateddb(self, blank_state):
         """Add dummy task to test against."""
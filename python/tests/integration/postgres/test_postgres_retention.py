@@ -0,0 +1,59 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test postgres integration for task retention."""
+
+from datetime import datetime, timedelta, UTC
+
+from drydock_provisioner import objects
+
+
+class TestTaskRetention(object):
+
+    def test_task_retention_batched(self, blank_state):
+        """Test that old tasks and their dependent rows are deleted."""
+        old_tasks = []
+        for _ in range(5):
+            task = objects.Task(action='deploy_nodes',
+                                design_ref='http://foo.bar/design')
+            task.created = datetime.now(UTC) - timedelta(days=10)
+            subtask = objects.Task(action='deploy_node',
+                                   design_ref='http://foo.bar/design',
+                                   parent_task_id=task.task_id)
+            blank_state.post_task(task)
+            blank_state.post_task(subtask)
+            blank_state.post_result_message(
+                subtask.task_id,
+                objects.TaskStatusMessage('Deployed', False, 'node', 'n1'))
+            blank_state.post_build_data(
+                objects.BuildData(node_name='n1',
+                                  task_id=subtask.task_id,
+                                  generator='test',
+                                  data_format='text/plain',
+                                  data_element='Hello World!'))
+            old_tasks.extend([task, subtask])
+        blank_state.flush_result_messages()
+
+        new_task = objects.Task(action='deploy_nodes',
+                                design_ref='http://foo.bar/design')
+        blank_state.post_task(new_task)
+
+        result = blank_state.task_retention(retain_days=1, batch_size=2)
+
+        assert result['tasks'] == 10
+        assert result['result_message'] == 5
+        assert result['build_data'] == 5
+        for t in old_tasks:
+            assert blank_state.get_task(t.task_id) is None
+        assert blank_state.get_task(new_task.task_id) is not None
+        assert blank_state.get_build_data(node_name='n1') == []
@@ -18,6 +18,7 @@ import pytest
 import uuid
 
 from drydock_provisioner import objects
+import drydock_provisioner.objects.fields as hd_fields
 
 from drydock_provisioner.control.base import DrydockRequestContext
 
@@ -81,6 +82,44 @@ class TestPostgres(object):
 
         assert subtask.task_id in test_task.subtask_id_list
 
+    def test_task_save_merges_terminate(self, populateddb, drydock_state):
+        """Test that saving a task does not clear a termination request."""
+        populateddb.statemgr = drydock_state
+        other = drydock_state.get_task(populateddb.task_id)
+        other.terminate_task(terminated_by='Test')
+
+        populateddb.set_status(hd_fields.TaskStatus.Running)
+        populateddb.save()
+
+        assert populateddb.check_terminate()
+        result = drydock_state.get_task(populateddb.task_id)
+        assert result.terminate
+        assert result.terminated_by == 'Test'
+        assert result.status == hd_fields.TaskStatus.Running
+
+    def test_task_update_notifies(self, populateddb, drydock_state):
+        """Test that updating a task and adding messages notifies listeners."""
+        populateddb.statemgr = drydock_state
+        listener = drydock_state.listen_task_status()
+        try:
+            populateddb.set_status(hd_fields.TaskStatus.Running)
+            populateddb.save()
+            assert listener.wait(5) == [str(populateddb.task_id)]
+
+            populateddb.add_status_msg(msg='Test',
+                                       error=False,
+                                       ctx_type='NA',
+                                       ctx='NA')
+            drydock_state.flush_result_messages()
+            assert listener.wait(5) == [str(populateddb.task_id)]
+        finally:
+            listener.close()
+
+        messages = drydock_state.get_result_messages(populateddb.task_id)
+        assert [m.message for _, m in messages] == ['Test']
+        assert drydock_state.get_result_messages(populateddb.task_id,
+                                                 after=messages[0][0]) == []
+
     def test_task_select(self, populateddb, drydock_state):
         """Test that a task can be selected."""
         result = drydock_state.get_task(populateddb.task_id)
@@ -95,6 +134,85 @@ class TestPostgres(object):
 
         assert len(result) == 1
 
+    def test_task_list_filtered_paged(self, blank_state):
+        """Test filtering and keyset pagination of the task list."""
+        for i in range(5):
+            task = objects.Task(action='deploy_nodes',
+                                design_ref='http://test.com/design%d' % i)
+            blank_state.post_task(task)
+        blank_state.post_task(
+            objects.Task(action='prepare_site',
+                         design_ref='http://test.com/design'))
+
+        result = blank_state.get_tasks(action=['deploy_nodes'])
+        assert len(result) == 5
+
+        result = blank_state.get_tasks(design_ref='http://test.com/design')
+        assert len(result) == 1
+
+        seen = []
+        cursor = None
+        while True:
+            page = blank_state.get_tasks(action=['deploy_nodes'],
+                                         cursor=cursor,
+                                         limit=2,
+                                         summary=True)
+            seen.extend([t.task_id for t in page])
+            if len(page) < 2:
+                break
+            cursor = (page[-1].created, page[-1].task_id)
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_task_tree(self, blank_state):
+        """Test selecting a task tree with a recursive query."""
+        task = objects.Task(action='deploy_nodes',
+                            design_ref='http://foobar/design')
+        blank_state.post_task(task)
+        subtask = objects.Task(action='deploy_node',
+                               design_ref='http://foobar/design',
+                               parent_task_id=task.task_id)
+        blank_state.post_task(subtask)
+        leaves = []
+        for _ in range(2):
+            leaf = objects.Task(action='deploy_node',
+                                design_ref='http://foobar/design',
+                                parent_task_id=subtask.task_id)
+            blank_state.post_task(leaf)
+            leaves.append(leaf)
+
+        blank_state.post_result_message(
+            leaves[0].task_id,
+            objects.TaskStatusMessage('Failed', True, 'node', 'foo'))
+
+        result = blank_state.get_task_tree(task.task_id)
+        assert [d for d, _ in result] == [1, 2, 3, 3]
+        assert result[0][1].task_id == task.task_id
+
+        result = blank_state.get_task_tree(task.task_id, depth=2)
+        assert len(result) == 2
+
+        result = blank_state.get_task_tree(task.task_id, errors_only=True)
+        assert [t.task_id
+                for _, t in result] == [task.task_id, leaves[0].task_id]
+        assert result[1][1].result.error_count == 1
+
+    def test_queued_task_count(self, blank_state):
+        """Test counting the tasks waiting for the orchestrator."""
+        for action in ['deploy_nodes', 'deploy_nodes', 'prepare_site']:
+            task = objects.Task(action=action,
+                                design_ref='http://test.com/design')
+            task.set_status(hd_fields.TaskStatus.Queued)
+            blank_state.post_task(task)
+        blank_state.post_task(
+            objects.Task(action='deploy_nodes',
+                         design_ref='http://test.com/design'))
+
+        assert blank_state.get_queued_task_count() == 3
+        assert blank_state.get_queued_task_count(
+            allowed_actions=['deploy_nodes']) == 2
+
     @pytest.fixture(scope='function')
     def populateddb(self, blank_state):
         """Add dummy task to test against."""
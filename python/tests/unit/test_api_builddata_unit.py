@@ -0,0 +1,186 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the streamed build data API and build data compression."""
+import json
+import uuid
+
+from falcon import testing
+import pytest
+
+from drydock_provisioner import config
+from drydock_provisioner import policy
+from drydock_provisioner.control.api import start_api
+from drydock_provisioner.control.base import BaseResource
+import drydock_provisioner.objects as objects
+import drydock_provisioner.objects.builddata as builddata
+
+import falcon
+
+
+class TestBuildDataApi(object):
+
+    def test_get_node_builddata(self, falcontest, mock_stream_build_data):
+        result = falcontest.simulate_get('/api/v1.0/nodes/foo/builddata',
+                                         headers=self.get_standard_header(),
+                                         query_string='latest=true')
+
+        assert result.status == falcon.HTTP_200
+        bd_list = json.loads(result.text)
+        assert len(bd_list) == 3
+        assert bd_list[0]['data_element'] == 'Hello World!'
+        kwargs = mock_stream_build_data.call_args.kwargs
+        assert kwargs['node_name'] == 'foo'
+        assert kwargs['latest']
+        assert kwargs['verbosity'] == 2
+
+    def test_get_task_builddata_summary(self, falcontest,
+                                        mock_stream_build_data):
+        task_id = str(uuid.uuid4())
+        result = falcontest.simulate_get('/api/v1.0/tasks/%s/builddata' %
+                                         task_id,
+                                         headers=self.get_standard_header(),
+                                         query_string='verbosity=1')
+
+        assert result.status == falcon.HTTP_200
+        bd_list = json.loads(result.text)
+        assert len(bd_list) == 3
+        assert 'data_element' not in bd_list[0]
+        kwargs = mock_stream_build_data.call_args.kwargs
+        assert kwargs['task_id'] == uuid.UUID(task_id)
+        assert kwargs['verbosity'] == 1
+
+    def test_get_node_builddata_missing(self, falcontest, mocker,
+                                        drydock_state):
+        mocker.patch.object(drydock_state,
+                            'stream_build_data',
+                            return_value=iter([]))
+
+        result = falcontest.simulate_get('/api/v1.0/nodes/foo/builddata',
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_404
+
+    def test_stream_json_list_chunks(self):
+        items = [dict(value=i) for i in range(100)]
+        chunks = list(BaseResource().stream_json_list(items, chunk_size=64))
+
+        assert len(chunks) > 1
+        assert json.loads(b''.join(chunks)) == items
+        assert json.loads(b''.join(BaseResource().stream_json_list([]))) == []
+
+    def test_stream_json_object_chunks(self):
+        items = [('task%d' % i, dict(value=i)) for i in range(100)]
+        chunks = list(BaseResource().stream_json_object(items, chunk_size=64))
+
+        assert len(chunks) > 1
+        assert json.loads(b''.join(chunks)) == dict(items)
+        assert json.loads(b''.join(BaseResource().stream_json_object(
+            []))) == {}
+
+    def test_orjson_encoder(self, setup):
+        pytest.importorskip('orjson')
+        config.config_mgr.conf.set_override(name='json_encoder',
+                                            override='orjson')
+        try:
+            value = {'id': uuid.UUID(int=1), 1: [None, 1.5, 'x']}
+            assert json.loads(BaseResource().encode_json(value)) == {
+                'id': str(uuid.UUID(int=1)),
+                '1': [None, 1.5, 'x']
+            }
+        finally:
+            config.config_mgr.conf.clear_override(name='json_encoder')
+
+    @pytest.fixture()
+    def falcontest(self, drydock_state, deckhand_ingester,
+                   deckhand_orchestrator):
+        """Create a test harness for the Falcon API framework."""
+        policy.policy_engine = policy.DrydockPolicy()
+        policy.policy_engine.register_policy()
+
+        return testing.TestClient(
+            start_api(state_manager=drydock_state,
+                      ingester=deckhand_ingester,
+                      orchestrator=deckhand_orchestrator))
+
+    def get_standard_header(self):
+        hdr = {
+            'Content-Type': 'application/json',
+            'X-IDENTITY-STATUS': 'Confirmed',
+            'X-USER-NAME': 'Test',
+            'X-ROLES': 'admin'
+        }
+        return hdr
+
+
+class TestBuildDataCompression(object):
+
+    def test_compressed_round_trip(self):
+        data = '<node>%s</node>' % ('x' * builddata.COMPRESS_THRESHOLD)
+        bd = objects.BuildData(node_name='foo',
+                               task_id=uuid.uuid4(),
+                               generator='lshw',
+                               data_format='text/xml',
+                               data_element=data)
+
+        db_dict = bd.to_db()
+        assert db_dict['data_element'] is None
+        assert len(db_dict['data_compressed']) < len(data)
+
+        # Read back as the database returns it
+        db_dict['collected_date'] = bd.collected_date
+
+        bd = objects.BuildData.from_db(db_dict)
+        assert bd.data_element == data
+
+    def test_small_uncompressed(self):
+        bd = objects.BuildData(node_name='foo',
+                               task_id=uuid.uuid4(),
+                               generator='lshw',
+                               data_format='text/plain',
+                               data_element='Hello World!')
+
+        db_dict = bd.to_db()
+        assert db_dict['data_element'] == 'Hello World!'
+        assert db_dict['data_compressed'] is None
+
+    def test_summary_from_db(self):
+        bd = objects.BuildData.from_db(
+            dict(node_name='foo',
+                 task_id=uuid.uuid4().bytes,
+                 collected_date=None,
+                 generator='lshw',
+                 data_format='text/plain'))
+
+        assert bd.summary
+        assert 'data_element' not in bd.to_dict()
+
+
+@pytest.fixture()
+def mock_stream_build_data(drydock_state, mocker):
+
+    def side_effect(**kwargs):
+        for _ in range(3):
+            bd = objects.BuildData(node_name='foo',
+                                   task_id=uuid.uuid4(),
+                                   generator='hello_world',
+                                   data_format='text/plain',
+                                   data_element='Hello World!')
+            if kwargs.get('verbosity') == 1:
+                bd.data_element = None
+                bd.summary = True
+            yield bd
+
+    return mocker.patch.object(drydock_state,
+                               'stream_build_data',
+                               side_effect=side_effect)
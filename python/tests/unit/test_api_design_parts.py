@@ -0,0 +1,84 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the design parts API."""
+from falcon import testing
+
+import pytest
+import json
+
+from drydock_provisioner import policy
+from drydock_provisioner.control.api import start_api
+
+import falcon
+
+
+class TestDesignPartsApiUnit(object):
+
+    def test_get_design_parts(self, input_files, falcontest, mocker,
+                              deckhand_orchestrator):
+        """Test the parts of a design are streamed."""
+        input_file = input_files.join("deckhand_fullsite.yaml")
+        design_ref = "file://%s" % str(input_file)
+        status, design = deckhand_orchestrator.get_described_site(design_ref)
+
+        # A design reference URI can not be part of the request path
+        get_site = mocker.patch.object(deckhand_orchestrator,
+                                       'get_described_site',
+                                       return_value=(status, design))
+
+        result = falcontest.simulate_get('/api/v1.0/designs/site1/parts',
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_200
+        get_site.assert_called_once_with('site1')
+
+        parts = json.loads(result.text)
+        assert parts[0] == {'kind': 'Region', 'key': 'sitename'}
+        kinds = [p['kind'] for p in parts]
+        assert kinds.count('Network') == len(design.networks)
+        assert kinds.count('BaremetalNode') == len(design.baremetal_nodes)
+        assert {'kind': 'BaremetalNode', 'key': 'compute01'} in parts
+
+    def test_get_design_parts_not_found(self, falcontest, mocker,
+                                        deckhand_orchestrator):
+        """Test a design that can not be loaded is not found."""
+        mocker.patch.object(deckhand_orchestrator,
+                            'get_described_site',
+                            return_value=(None, None))
+
+        result = falcontest.simulate_get('/api/v1.0/designs/site1/parts',
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_404
+
+    @pytest.fixture()
+    def falcontest(self, drydock_state, deckhand_ingester,
+                   deckhand_orchestrator):
+        """Create a test harness for the Falcon API framework."""
+        policy.policy_engine = policy.DrydockPolicy()
+        policy.policy_engine.register_policy()
+
+        return testing.TestClient(
+            start_api(state_manager=drydock_state,
+                      ingester=deckhand_ingester,
+                      orchestrator=deckhand_orchestrator))
+
+    def get_standard_header(self):
+        hdr = {
+            'Content-Type': 'application/json',
+            'X-IDENTITY-STATUS': 'Confirmed',
+            'X-USER-NAME': 'Test',
+            'X-ROLES': 'admin'
+        }
+        return hdr
@@ -0,0 +1,87 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test Health API"""
+import json
+
+from drydock_provisioner.control.health import HealthLivenessResource
+from drydock_provisioner.control.health import HealthMonitor
+from drydock_provisioner.control.health import HealthResource
+from drydock_provisioner.objects.healthcheck import HealthCheck
+from drydock_provisioner.objects.healthcheck import HealthCheckMessage
+
+import falcon
+
+
+def test_get_liveness(mocker):
+    api = HealthLivenessResource()
+
+    req = mocker.MagicMock(spec=falcon.Request)
+    resp = mocker.MagicMock(spec=falcon.Response)
+
+    api.on_get(req, resp)
+
+    assert resp.status == falcon.HTTP_204
+
+
+def test_get_readiness_cached(mocker, setup):
+    state_manager = mocker.MagicMock()
+    orchestrator = mocker.MagicMock()
+    monitor = HealthMonitor(state_manager=state_manager,
+                            orchestrator=orchestrator)
+    mocker.patch.object(monitor.checker, 'check', return_value=HealthCheck())
+    # Don't run the background thread
+    mocker.patch('threading.Thread')
+
+    api = HealthResource(state_manager=state_manager,
+                         orchestrator=orchestrator,
+                         health_monitor=monitor)
+
+    req = mocker.MagicMock(spec=falcon.Request)
+    for _ in range(3):
+        resp = mocker.MagicMock(spec=falcon.Response)
+        api.on_get(req, resp)
+        assert resp.status == falcon.HTTP_204
+
+    assert monitor.checker.check.call_count == 1
+    orchestrator.create_task.assert_not_called()
+
+
+def test_get_readiness_unhealthy(mocker, setup):
+    health_check = HealthCheck()
+    health_check.add_detail_msg(
+        msg=HealthCheckMessage(msg='Unable to connect to MaaS', error=True))
+
+    monitor = HealthMonitor()
+    mocker.patch.object(monitor.checker, 'check', return_value=health_check)
+    mocker.patch('threading.Thread')
+
+    req = mocker.MagicMock(spec=falcon.Request)
+    resp = mocker.MagicMock(spec=falcon.Response)
+
+    monitor.get(req, resp, extended=True)
+
+    assert resp.status == falcon.HTTP_503
+    assert json.loads(resp.text)['details']['errorCount'] == 1
+
+
+def test_get_readiness_stale(mocker, setup):
+    monitor = HealthMonitor()
+    mocker.patch.object(monitor.checker, 'check', return_value=HealthCheck())
+    mocker.patch('threading.Thread')
+
+    assert monitor.get_health_check().is_healthy()
+
+    monitor.last_check = monitor.last_check - 3600
+
+    assert not monitor.get_health_check().is_healthy()
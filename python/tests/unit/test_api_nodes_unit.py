@@ -17,9 +17,13 @@ from falcon import testing
 import pytest
 import json
 import logging
+import threading
+from threading import Thread
 
 from drydock_provisioner import policy
 from drydock_provisioner.control.api import start_api
+from drydock_provisioner.control.nodes import NodeInventory
+from drydock_provisioner.drivers.node.maasdriver.models.machine import Machines
 import drydock_provisioner.objects as objects
 
 import falcon
@@ -51,6 +55,50 @@ class TestNodesApiUnit(object):
         assert result.text.count('n1') == 1
         assert result.text.count('n2') == 1
 
+    def test_post_nodes_batch(self, input_files, falcontest):
+        input_file = input_files.join("deckhand_fullsite.yaml")
+        design_ref = "file://%s" % str(input_file)
+
+        url = '/api/v1.0/nodefilter'
+        hdr = self.get_standard_header()
+        body = {
+            'design_ref':
+            design_ref,
+            'node_filters': [
+                {
+                    'filter_set_type':
+                    'union',
+                    'filter_set': [{
+                        'filter_type': 'union',
+                        'node_names': ['compute01']
+                    }]
+                },
+                {
+                    'filter_set_type':
+                    'intersection',
+                    'filter_set': [{
+                        'filter_type': 'intersection',
+                        'node_names': ['compute01', 'controller01'],
+                        'node_tags': ['bogus']
+                    }]
+                },
+            ],
+        }
+
+        result = falcontest.simulate_post(url,
+                                          headers=hdr,
+                                          body=json.dumps(body))
+
+        assert result.status == falcon.HTTP_200
+        assert json.loads(result.text) == [['compute01'], []]
+
+        body['node_filters'] = 'filters'
+        result = falcontest.simulate_post(url,
+                                          headers=hdr,
+                                          body=json.dumps(body))
+
+        assert result.status == falcon.HTTP_400
+
     def test_input_error(self, falcontest):
         url = '/api/v1.0/nodefilter'
         hdr = self.get_standard_header()
@@ -63,6 +111,95 @@ class TestNodesApiUnit(object):
         LOG.debug(result.text)
         assert result.status == falcon.HTTP_400
 
+    def test_get_nodes_inventory(self, falcontest, mock_machines):
+        url = '/api/v1.0/nodes'
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get(url, headers=hdr)
+
+        assert result.status == falcon.HTTP_200
+        node_list = json.loads(result.text)
+        assert node_list[0]['hostname'] == 'n1'
+        assert node_list[0]['power_address'] == '10.0.0.1'
+        assert node_list[0]['boot_mac'] == 'aa:bb:cc:dd:ee:ff'
+        assert node_list[0]['boot_ip'] == '172.16.0.10'
+
+        # Polling with the ETag is answered from the snapshot
+        hdr['If-None-Match'] = result.headers['etag']
+        result = falcontest.simulate_get(url, headers=hdr)
+
+        assert result.status == falcon.HTTP_304
+        assert mock_machines.get_machine_list.call_count == 1
+        assert mock_machines.get_power_params.call_count == 1
+
+    def test_get_nodes_unavailable(self, falcontest, mock_machines):
+        """Test a failed first read is not retried by every request."""
+        url = '/api/v1.0/nodes'
+        hdr = self.get_standard_header()
+        mock_machines.get_machine_list.side_effect = Exception('MaaS down')
+
+        result = falcontest.simulate_get(url, headers=hdr)
+        assert result.status == falcon.HTTP_503
+
+        result = falcontest.simulate_get(url, headers=hdr)
+        assert result.status == falcon.HTTP_503
+        assert mock_machines.get_machine_list.call_count == 1
+
+    def test_get_nodes_single_read(self, mock_machines):
+        """Test requests wait for the first read of another request."""
+        inventory = NodeInventory()
+        reading = threading.Event()
+        release = threading.Event()
+        machine_list = mock_machines.get_machine_list.return_value
+
+        def slow_machine_list():
+            reading.set()
+            release.wait(10)
+            return machine_list
+
+        mock_machines.get_machine_list.side_effect = slow_machine_list
+
+        results = []
+        # threading.Thread is mocked to not run the background refresh
+        first = Thread(target=lambda: results.append(inventory.get()))
+        first.start()
+        assert reading.wait(10)
+
+        second = Thread(target=lambda: results.append(inventory.get()))
+        second.start()
+        # The second request waits for the read of the first
+        second.join(0.1)
+        assert second.is_alive()
+        release.set()
+        first.join(10)
+        second.join(10)
+
+        assert len(results) == 2
+        assert results[0] is not None
+        assert results[0] == results[1]
+        assert mock_machines.get_machine_list.call_count == 1
+
+    def test_get_nodes_fields(self, falcontest, mock_machines):
+        url = '/api/v1.0/nodes'
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get(url,
+                                         headers=hdr,
+                                         query_string='fields=hostname,'
+                                         'power_state')
+
+        assert result.status == falcon.HTTP_200
+        assert json.loads(result.text) == [
+            dict(hostname='n1', power_state='on'),
+            dict(hostname='n2', power_state='off')
+        ]
+
+        result = falcontest.simulate_get(url,
+                                         headers=hdr,
+                                         query_string='fields=bogus')
+
+        assert result.status == falcon.HTTP_400
+
     @pytest.fixture()
     def falcontest(self, drydock_state, deckhand_ingester,
                    deckhand_orchestrator, mock_get_build_data):
@@ -100,3 +237,39 @@ def mock_process_node_filter(mocker, deckhand_orchestrator):
         return_value=mock_results
     )
     yield
+
+
+@pytest.fixture()
+def mock_machines(mocker):
+    # Don't run the background refresh thread
+    mocker.patch('threading.Thread')
+    mocker.patch.object(NodeInventory, 'get_maas_client')
+
+    machine_list = [
+        dict(system_id='abc123',
+             hostname='n1',
+             memory=4096,
+             cpu_count=4,
+             status_name='Deployed',
+             power_state='on',
+             boot_interface=dict(mac_address='aa:bb:cc:dd:ee:ff',
+                                 links=[dict(ip_address='172.16.0.10')])),
+        dict(system_id='def456',
+             hostname='n2',
+             memory=4096,
+             cpu_count=4,
+             status_name='Ready',
+             power_state='off',
+             boot_interface=None),
+    ]
+    power_params = {
+        'abc123': dict(power_address='10.0.0.1'),
+        'def456': dict(power_address='10.0.0.2'),
+    }
+
+    mock = mocker.MagicMock()
+    mocker.patch.object(Machines, 'get_machine_list', mock.get_machine_list)
+    mocker.patch.object(Machines, 'get_power_params', mock.get_power_params)
+    mock.get_machine_list.return_value = machine_list
+    mock.get_power_params.return_value = power_params
+    yield mock
@@ -0,0 +1,185 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test waiting on tasks and streaming task events from the Tasks API."""
+from falcon import testing
+
+import pytest
+import itertools
+import json
+import uuid
+
+from drydock_provisioner import policy
+from drydock_provisioner.control.api import start_api
+import drydock_provisioner.objects as objects
+import drydock_provisioner.objects.fields as hd_fields
+
+import falcon
+
+TASK_ID = '11111111-1111-1111-1111-111111111111'
+
+
+class TestTaskEventsApiUnit(object):
+
+    def test_get_task_wait(self, falcontest, mock_state):
+        """Test a waiting request returns when the task is complete."""
+        url = '/api/v1.0/tasks/%s' % TASK_ID
+
+        result = falcontest.simulate_get(url,
+                                         headers=self.get_standard_header(),
+                                         query_string='wait=30')
+
+        assert result.status == falcon.HTTP_200
+        assert json.loads(result.text)['status'] == 'complete'
+        assert mock_state.subscription.wait.call_count == 1
+        assert mock_state.get_task.call_count == 3
+
+    def test_get_task_wait_invalid(self, falcontest, mock_state):
+        """Test a malformed wait parameter is a client error."""
+        url = '/api/v1.0/tasks/%s' % TASK_ID
+
+        result = falcontest.simulate_get(url,
+                                         headers=self.get_standard_header(),
+                                         query_string='wait=abc')
+
+        assert result.status == falcon.HTTP_400
+        assert mock_state.get_task.call_count == 0
+
+    def test_get_task_events(self, falcontest, mock_state):
+        """Test task changes and result messages are streamed as events."""
+        url = '/api/v1.0/tasks/%s/events' % TASK_ID
+
+        result = falcontest.simulate_get(url,
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_200
+        assert result.headers['content-type'] == 'text/event-stream'
+
+        events = [
+            dict(line.split(': ', 1) for line in e.split('\n'))
+            for e in result.text.strip().split('\n\n')
+        ]
+        assert [e['event'] for e in events
+                ] == ['task', 'message', 'task', 'message', 'end']
+        assert json.loads(events[0]['data'])['status'] == 'running'
+        assert 'details' not in json.loads(events[0]['data'])['result']
+        assert events[1]['id'] == '1'
+        assert json.loads(events[3]['data'])['message'] == 'Done'
+        assert json.loads(events[2]['data'])['status'] == 'complete'
+
+        mock_state.get_result_messages.assert_any_call(uuid.UUID(TASK_ID),
+                                                       after=1)
+        mock_state.subscription.close.assert_called_once_with()
+
+    def test_get_task_events_resume(self, falcontest, mock_state):
+        """Test a reconnecting client only receives new messages."""
+        url = '/api/v1.0/tasks/%s/events' % TASK_ID
+        hdr = self.get_standard_header()
+        hdr['Last-Event-ID'] = '1'
+
+        falcontest.simulate_get(url, headers=hdr)
+
+        assert mock_state.get_result_messages.call_args_list[0][1] == {
+            'after': 1
+        }
+
+    def test_get_task_events_expired(self, falcontest, mock_state, mocker):
+        """Test a stream past task_events_max asks the client to reconnect."""
+        url = '/api/v1.0/tasks/%s/events' % TASK_ID
+
+        mocker.patch('drydock_provisioner.control.tasks.time.monotonic',
+                     side_effect=itertools.count(0, 1000))
+
+        result = falcontest.simulate_get(url,
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_200
+        events = result.text.strip().split('\n\n')
+        assert len(events) == 3
+        assert 'event: task' in events[0]
+        assert 'id: 1\nevent: message' in events[1]
+        assert events[2] == 'retry: 1000'
+        assert mock_state.subscription.wait.call_count == 0
+        mock_state.subscription.close.assert_called_once_with()
+
+    def test_get_task_events_not_found(self, falcontest, mock_state):
+        url = '/api/v1.0/tasks/11111111-1111-1111-1111-111111111112/events'
+
+        mock_state.get_task.side_effect = None
+        mock_state.get_task.return_value = None
+
+        result = falcontest.simulate_get(url,
+                                         headers=self.get_standard_header())
+
+        assert result.status == falcon.HTTP_404
+        mock_state.subscription.close.assert_called_once_with()
+
+    @pytest.fixture()
+    def falcontest(self, drydock_state, deckhand_ingester,
+                   deckhand_orchestrator):
+        """Create a test harness for the Falcon API framework."""
+        policy.policy_engine = policy.DrydockPolicy()
+        policy.policy_engine.register_policy()
+
+        return testing.TestClient(
+            start_api(state_manager=drydock_state,
+                      ingester=deckhand_ingester,
+                      orchestrator=deckhand_orchestrator))
+
+    def get_standard_header(self):
+        hdr = {
+            'Content-Type': 'application/json',
+            'X-IDENTITY-STATUS': 'Confirmed',
+            'X-USER-NAME': 'Test',
+            'X-ROLES': 'admin'
+        }
+        return hdr
+
+
+@pytest.fixture()
+def mock_state(mocker, drydock_state):
+    """Mock a task that completes after one update."""
+
+    def make_task(status):
+        task = objects.Task()
+        task.task_id = uuid.UUID(TASK_ID)
+        task.status = status
+        task.result = objects.TaskStatus()
+        return task
+
+    tasks = [
+        make_task(hd_fields.TaskStatus.Running),
+        make_task(hd_fields.TaskStatus.Complete)
+    ]
+
+    messages = [[(1, objects.TaskStatusMessage('Started', False, 'n/a',
+                                               'n/a'))],
+                [(2, objects.TaskStatusMessage('Done', False, 'n/a', 'n/a'))]]
+
+    subscription = mocker.MagicMock()
+    subscription.__enter__.return_value = subscription
+
+    mock = mocker.MagicMock()
+    mock.subscription = subscription
+    mock.get_task = mocker.patch.object(
+        drydock_state,
+        'get_task',
+        side_effect=lambda *args, **kwargs: tasks.pop(0)
+        if len(tasks) > 1 else tasks[0])
+    mock.get_result_messages = mocker.patch.object(
+        drydock_state,
+        'get_result_messages',
+        side_effect=lambda *args, **kwargs: messages.pop(0)
+        if messages else [])
+    mocker.patch.object(drydock_state, 'watch_task', return_value=subscription)
+    yield mock
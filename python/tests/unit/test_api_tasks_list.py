@@ -0,0 +1,130 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the filtered and paginated task list API"""
+import datetime
+import json
+import urllib.parse
+
+from falcon import testing
+import pytest
+
+from drydock_provisioner import policy
+from drydock_provisioner.control.api import start_api
+from drydock_provisioner.control.tasks import TasksResource
+import drydock_provisioner.objects as objects
+import drydock_provisioner.objects.fields as hd_fields
+
+import falcon
+
+
+class TestTasksListApi(object):
+
+    def test_get_tasks_filters(self, falcontest, mock_get_tasks):
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get(
+            '/api/v1.0/tasks',
+            headers=hdr,
+            query_string='status=complete,running&action=deploy_nodes'
+            '&parent_only=true&design_ref=deckhand%2Bhttp://foo'
+            '&created_after=2018-01-01T00:00:00%2B01:00')
+
+        assert result.status == falcon.HTTP_200
+        kwargs = mock_get_tasks.call_args.kwargs
+        assert kwargs['status'] == ['complete', 'running']
+        assert kwargs['action'] == ['deploy_nodes']
+        assert kwargs['parent_only']
+        assert kwargs['design_ref'] == 'deckhand+http://foo'
+        assert kwargs['created_after'] == datetime.datetime(
+            2017, 12, 31, 23, 0, 0)
+        assert kwargs['limit'] is None
+        assert 'link' not in result.headers
+
+    def test_get_tasks_paged(self, falcontest, mock_get_tasks):
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get('/api/v1.0/tasks',
+                                         headers=hdr,
+                                         query_string='limit=2&summary=true')
+
+        assert result.status == falcon.HTTP_200
+        task_list = json.loads(result.text)
+        assert len(task_list) == 2
+        assert 'messageList' not in task_list[0]['result']['details']
+        assert mock_get_tasks.call_args.kwargs['summary']
+
+        link = result.headers['link']
+        assert link.endswith('rel=next')
+        next_url = urllib.parse.urlparse(link[1:link.index('>')])
+        cursor = urllib.parse.parse_qs(next_url.query)['cursor'][0]
+        created, task_id = TasksResource.decode_cursor(cursor)
+        assert task_id == mock_get_tasks.task_list[-1].task_id
+
+        result = falcontest.simulate_get('/api/v1.0/tasks',
+                                         headers=hdr,
+                                         query_string=next_url.query)
+
+        assert result.status == falcon.HTTP_200
+        assert mock_get_tasks.call_args.kwargs['cursor'] == (created, task_id)
+
+    @pytest.mark.parametrize('query_string', [
+        'limit=0', 'limit=foo', 'status=bogus', 'created_before=yesterday',
+        'cursor=notacursor'
+    ])
+    def test_get_tasks_invalid_query(self, falcontest, mock_get_tasks,
+                                     query_string):
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get('/api/v1.0/tasks',
+                                         headers=hdr,
+                                         query_string=query_string)
+
+        assert result.status == falcon.HTTP_400
+        mock_get_tasks.assert_not_called()
+
+    @pytest.fixture()
+    def falcontest(self, drydock_state, deckhand_ingester,
+                   deckhand_orchestrator):
+        """Create a test harness for the Falcon API framework."""
+        policy.policy_engine = policy.DrydockPolicy()
+        policy.policy_engine.register_policy()
+
+        return testing.TestClient(
+            start_api(state_manager=drydock_state,
+                      ingester=deckhand_ingester,
+                      orchestrator=deckhand_orchestrator))
+
+    def get_standard_header(self):
+        hdr = {
+            'Content-Type': 'application/json',
+            'X-IDENTITY-STATUS': 'Confirmed',
+            'X-USER-NAME': 'Test',
+            'X-ROLES': 'admin'
+        }
+        return hdr
+
+
+@pytest.fixture()
+def mock_get_tasks(drydock_state, mocker):
+    task_list = []
+    for _ in range(2):
+        t = objects.Task(action=hd_fields.OrchestratorAction.DeployNodes)
+        t.set_status(hd_fields.TaskStatus.Complete)
+        task_list.append(t)
+
+    mock = mocker.patch.object(drydock_state,
+                               'get_tasks',
+                               return_value=task_list)
+    mock.task_list = task_list
+    return mock
@@ -199,6 +199,27 @@ class TestTasksApiUnit(object):
             '11111111-1111-1111-1111-111111111116']['details'][
                 'errorCount'] == 1
 
+    def test_get_tasks_id_layers_errorsonly_resp(self, falcontest,
+                                                 drydock_state):
+        url = '/api/v1.0/tasks/11111111-1111-1111-1111-111111111113'
+        hdr = self.get_standard_header()
+
+        result = falcontest.simulate_get(
+            url, headers=hdr, query_string='layers=-1&errorsonly=true')
+
+        LOG.debug(result.text)
+        assert result.status == falcon.HTTP_200
+        response_json = json.loads(result.text)
+        init_task_id = '11111111-1111-1111-1111-111111111113'
+        assert response_json['init_task_id'] == init_task_id
+        assert response_json[init_task_id]['task_id'] == init_task_id
+        assert '11111111-1111-1111-1111-111111111116' in response_json
+        assert '11111111-1111-1111-1111-111111111114' not in response_json
+        assert '11111111-1111-1111-1111-111111111115' not in response_json
+        # The tree is loaded at once rather than task by task
+        drydock_state.get_task_tree.assert_called_once()
+        drydock_state.get_task.assert_not_called()
+
     def test_input_not_found(self, falcontest):
         url = '/api/v1.0/tasks/11111111-1111-1111-1111-111111111112'
         hdr = self.get_standard_header()
@@ -286,9 +307,28 @@ def mock_get_task(drydock_state):
         LOG.debug('returning None')
         return None
 
+    def tree_side_effect(task_id, depth=None, errors_only=False):
+        task_tree = []
+        queued = [(1, task_id)]
+        while queued:
+            task_depth, queued_id = queued.pop(0)
+            task = side_effect(queued_id)
+            if task is None:
+                continue
+            if (task_depth == 1 or not errors_only
+                    or task.result.error_count > 0):
+                task_tree.append((task_depth, task))
+            if depth is None or task_depth < depth:
+                queued.extend([(task_depth + 1, t)
+                               for t in task.subtask_id_list])
+        return task_tree
+
     drydock_state.real_get_task = drydock_state.get_task
     drydock_state.get_task = Mock(side_effect=side_effect)
+    drydock_state.real_get_task_tree = drydock_state.get_task_tree
+    drydock_state.get_task_tree = Mock(side_effect=tree_side_effect)
 
     yield
     drydock_state.get_task = Mock(wraps=None, side_effect=None)
     drydock_state.get_task = drydock_state.real_get_task
+    drydock_state.get_task_tree = drydock_state.real_get_task_tree
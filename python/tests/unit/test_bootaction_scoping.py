@@ -58,3 +58,35 @@ class TestClass(object):
             if ba.get_id() == 'hw_filtered':
                 assert 'controller01' not in ba.target_nodes
                 assert 'compute01' in ba.target_nodes
+
+    def test_bootaction_contexts_bulk(self, input_files, deckhand_orchestrator,
+                                      drydock_state, mock_get_build_data,
+                                      mocker):
+        """Test boot action contexts for many nodes use one design compile."""
+        input_file = input_files.join("deckhand_fullsite.yaml")
+
+        design_ref = "file://%s" % str(input_file)
+
+        task = objects.Task(action=objects.fields.OrchestratorAction.Noop,
+                            design_ref=design_ref)
+
+        mocker.spy(deckhand_orchestrator, 'get_effective_site')
+        post_contexts = mocker.patch.object(drydock_state,
+                                            'post_boot_action_contexts')
+        post_actions = mocker.patch.object(drydock_state, 'post_boot_actions')
+
+        identity_keys = deckhand_orchestrator.create_bootaction_contexts(
+            ['compute01', 'controller01'], task)
+
+        assert deckhand_orchestrator.get_effective_site.call_count == 1
+        assert set(identity_keys.keys()) == set(['compute01', 'controller01'])
+        post_contexts.assert_called_once_with(task.get_id(), identity_keys)
+        post_actions.assert_called_once()
+
+        boot_actions = post_actions.call_args.args[0]
+        compute_bas = [
+            ba for ba in boot_actions if ba['nodename'] == 'compute01'
+        ]
+        assert len(compute_bas) == 2
+        assert all(ba['identity_key'] == identity_keys['compute01']
+                   for ba in compute_bas)
@@ -0,0 +1,96 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the cache of compiled site designs."""
+from unittest.mock import Mock
+
+import drydock_provisioner.config as config
+import drydock_provisioner.objects.fields as hd_fields
+
+from drydock_provisioner.orchestrator.design_cache import DesignCache
+
+
+class TestDesignCache():
+
+    def test_design_reused(self, setup, input_files, deckhand_orchestrator,
+                           mocker):
+        """Test a design is compiled once and its nodes are indexed."""
+        input_file = input_files.join("deckhand_fullsite.yaml")
+        design_ref = "file://%s" % str(input_file)
+
+        spy = mocker.spy(deckhand_orchestrator, 'get_effective_site')
+        cache = DesignCache(deckhand_orchestrator)
+
+        design = cache.get(design_ref)
+
+        assert cache.get(design_ref) is design
+        assert spy.call_count == 1
+        assert [n.name for n in design.node_index.with_names(['compute01'])
+                ] == ['compute01']
+
+        cache.clear()
+        assert cache.get(design_ref) is not design
+        assert spy.call_count == 2
+
+    def test_failed_design_not_cached(self, setup):
+        """Test designs that failed to load are compiled again."""
+        status = Mock(status=hd_fields.ActionResult.Failure)
+        orchestrator = Mock()
+        orchestrator.get_effective_site.return_value = (
+            status, Mock(baremetal_nodes=[]))
+
+        cache = DesignCache(orchestrator)
+        cache.get('file:///bogus')
+        cache.get('file:///bogus')
+
+        assert orchestrator.get_effective_site.call_count == 2
+
+    def test_size_limit(self, setup):
+        """Test the least recently used design is evicted."""
+        status = Mock(status=hd_fields.ValidationResult.Success)
+        orchestrator = Mock()
+        orchestrator.get_effective_site.side_effect = (
+            lambda design_ref: (status, Mock(baremetal_nodes=[])))
+
+        config.config_mgr.conf.set_override(name='design_cache_size',
+                                            override=2)
+        try:
+            cache = DesignCache(orchestrator)
+            first = cache.get('file:///a')
+            cache.get('file:///b')
+            assert cache.get('file:///a') is first
+            cache.get('file:///c')
+
+            assert list(cache.designs.keys()) == ['file:///a', 'file:///c']
+            assert orchestrator.get_effective_site.call_count == 3
+        finally:
+            config.config_mgr.conf.clear_override(name='design_cache_size')
+
+    def test_cache_disabled(self, setup):
+        """Test a TTL of 0 compiles the design on every request."""
+        status = Mock(status=hd_fields.ValidationResult.Success)
+        orchestrator = Mock()
+        orchestrator.get_effective_site.return_value = (
+            status, Mock(baremetal_nodes=[]))
+
+        config.config_mgr.conf.set_override(name='design_cache_ttl',
+                                            override=0)
+        try:
+            cache = DesignCache(orchestrator)
+            cache.get('file:///a')
+            cache.get('file:///a')
+
+            assert orchestrator.get_effective_site.call_count == 2
+            assert not cache.designs
+        finally:
+            config.config_mgr.conf.clear_override(name='design_cache_ttl')
@@ -123,6 +123,82 @@ def test_client_task_get():
     assert task_resp['status'] == task['status']
 
 
+@responses.activate
+def test_client_wait_for_task():
+    host = 'foo.bar.baz'
+    url = "http://%s/api/v1.0/tasks/1476902c-758b-49c0-b618-79ff3fd15166" % (
+        host)
+
+    responses.add(responses.GET,
+                  url,
+                  match=[responses.matchers.query_param_matcher({})],
+                  json={'status': 'running'},
+                  status=200)
+    responses.add(
+        responses.GET,
+        url,
+        match=[responses.matchers.query_param_matcher({'wait': '15'})],
+        json={'status': 'complete'},
+        status=200)
+
+    dd_ses = dc_session.DrydockSession(host)
+    dd_client = dc_client.DrydockClient(dd_ses)
+
+    with mock.patch('time.sleep') as mock_sleep:
+        task = dd_client.wait_for_task('1476902c-758b-49c0-b618-79ff3fd15166',
+                                       poll_interval=15)
+
+    assert task['status'] == 'complete'
+    assert len(responses.calls) == 2
+    mock_sleep.assert_not_called()
+
+
+@responses.activate
+def test_client_tasks_get_paged():
+    host = 'foo.bar.baz'
+
+    responses.add(responses.GET,
+                  "http://%s/api/v1.0/tasks" % (host),
+                  match=[
+                      responses.matchers.query_param_matcher({
+                          'status': 'complete',
+                          'summary': 'true',
+                          'limit': '1'
+                      })
+                  ],
+                  json=[{
+                      'task_id': '1476902c-758b-49c0-b618-79ff3fd15166'
+                  }],
+                  headers={
+                      'Link':
+                      '</api/v1.0/tasks?status=complete&summary=true&limit=1'
+                      '&cursor=abc>; rel="next"'
+                  },
+                  status=200)
+    responses.add(responses.GET,
+                  "http://%s/api/v1.0/tasks" % (host),
+                  match=[
+                      responses.matchers.query_param_matcher({
+                          'status': 'complete',
+                          'summary': 'true',
+                          'limit': '1',
+                          'cursor': 'abc'
+                      })
+                  ],
+                  json=[],
+                  status=200)
+
+    dd_ses = dc_session.DrydockSession(host)
+    dd_client = dc_client.DrydockClient(dd_ses)
+
+    task_list = dd_client.get_tasks(status=['complete'],
+                                    summary=True,
+                                    page_size=1)
+
+    assert len(task_list) == 1
+    assert len(responses.calls) == 2
+
+
 @responses.activate
 def test_client_get_nodes_for_filter_post():
     node_list = ['node1', 'node2']
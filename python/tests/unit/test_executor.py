@@ -0,0 +1,267 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the named executor pools used for task execution."""
+import asyncio
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import drydock_provisioner.config as config
+
+from drydock_provisioner.orchestrator.actions.orchestrator import BaseAction
+from drydock_provisioner.orchestrator.executor import ExecutorService
+
+
+class SyncAction(BaseAction):
+
+    def start(self):
+        return threading.current_thread().name
+
+
+class AsyncAction(BaseAction):
+
+    async def start_async(self):
+        await asyncio.sleep(0)
+        return await self.run_blocking(lambda: threading.current_thread().name)
+
+
+class PerNodeAction(BaseAction):
+
+    def __init__(self, *args, started=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = started
+
+    async def start_async(self):
+        await self.run_per_node(self.node_action, self.nodes)
+
+    async def node_action(self, node):
+        if node.name == 'error':
+            raise Exception('failed')
+        if node.name == 'slow':
+            self.started.set()
+            await asyncio.sleep(60)
+
+
+class TestExecutorService():
+
+    def test_pool_size_resolution(self, setup):
+        """Test pool sizes resolve by full name, prefix then default."""
+        config.config_mgr.conf.set_override(name='pool_sizes',
+                                            group='executor',
+                                            override={
+                                                'maasdriver': '8',
+                                                'maasdriver.deploy_node': '2',
+                                            })
+        try:
+            svc = ExecutorService()
+            assert svc.get_pool_size('maasdriver.deploy_node') == 2
+            assert svc.get_pool_size('maasdriver.identify_node') == 8
+            assert svc.get_pool_size('orchestrator') == \
+                config.config_mgr.conf.executor.default_pool_size
+        finally:
+            config.config_mgr.conf.clear_override(name='pool_sizes',
+                                                  group='executor')
+
+    def test_pool_reuse(self, setup):
+        """Test that a named pool is created once."""
+        svc = ExecutorService()
+        try:
+            assert svc.get_pool('test') is svc.get_pool('test')
+        finally:
+            svc.shutdown()
+
+    def test_pool_gauges_and_cancel(self, setup):
+        """Test the gauges of a bounded pool and cancelling pending work."""
+        config.config_mgr.conf.set_override(name='pool_sizes',
+                                            group='executor',
+                                            override={'test': '1'})
+        svc = ExecutorService()
+        try:
+            pool = svc.get_pool('test')
+
+            started = threading.Event()
+            release = threading.Event()
+
+            def blocker():
+                started.set()
+                release.wait(10)
+
+            task_id = uuid.uuid4()
+            running = pool.submit(task_id, blocker)
+            assert started.wait(10)
+
+            pending = [pool.submit(task_id, lambda: None) for _ in range(3)]
+
+            stats = svc.get_stats()['test']
+            assert stats['max_workers'] == 1
+            assert stats['active_threads'] == 1
+            assert stats['queue_depth'] == 3
+
+            assert svc.cancel_task(task_id) == 3
+            assert all(f.cancelled() for f in pending)
+            assert pool.queue_depth == 0
+
+            release.set()
+            running.result(timeout=10)
+            assert pool.active_threads == 0
+        finally:
+            release.set()
+            svc.shutdown()
+            config.config_mgr.conf.clear_override(name='pool_sizes',
+                                                  group='executor')
+
+    def test_pool_cancel_future(self, setup):
+        """Test cancelling a pending future directly settles the queue depth."""
+        config.config_mgr.conf.set_override(name='pool_sizes',
+                                            group='executor',
+                                            override={'test': '1'})
+        svc = ExecutorService()
+        try:
+            pool = svc.get_pool('test')
+
+            started = threading.Event()
+            release = threading.Event()
+
+            def blocker():
+                started.set()
+                release.wait(10)
+
+            running = pool.submit(None, blocker)
+            assert started.wait(10)
+
+            task_id = uuid.uuid4()
+            pending = [pool.submit(task_id, lambda: None) for _ in range(2)]
+            assert pool.queue_depth == 2
+
+            assert pending[0].cancel()
+            assert pool.queue_depth == 1
+            assert svc.cancel_task(task_id) == 1
+            assert pool.queue_depth == 0
+
+            release.set()
+            running.result(timeout=10)
+            assert pool.get_stats()['queue_depth'] == 0
+        finally:
+            release.set()
+            svc.shutdown()
+            config.config_mgr.conf.clear_override(name='pool_sizes',
+                                                  group='executor')
+
+    def test_submit_action_sync(self, setup):
+        """Test actions run on worker threads when async is disabled."""
+        svc = ExecutorService()
+        orch = Mock(executor=svc)
+        try:
+            f = svc.submit_action('test', uuid.uuid4(),
+                                  AsyncAction(None, orch, None))
+            assert f.result(timeout=10).startswith('drydock-async_io')
+            assert 'test' in svc.get_stats()
+
+            f = svc.submit_action('test', uuid.uuid4(),
+                                  SyncAction(None, orch, None))
+            assert f.result(timeout=10).startswith('drydock-test')
+        finally:
+            svc.shutdown()
+
+    def test_submit_action_async(self, setup):
+        """Test async actions run as coroutines when async is enabled."""
+        config.config_mgr.conf.set_override(name='async_actions',
+                                            group='executor',
+                                            override=True)
+        svc = ExecutorService()
+        orch = Mock(executor=svc)
+        try:
+            f = svc.submit_action('test', uuid.uuid4(),
+                                  AsyncAction(None, orch, None))
+            assert f.result(timeout=10).startswith('drydock-async_io')
+            assert 'test.async' in svc.get_stats()
+            assert 'test' not in svc.get_stats()
+
+            # Synchronous actions are still run on a worker thread
+            f = svc.submit_action('test', uuid.uuid4(),
+                                  SyncAction(None, orch, None))
+            assert f.result(timeout=10).startswith('drydock-test')
+        finally:
+            svc.shutdown()
+            config.config_mgr.conf.clear_override(name='async_actions',
+                                                  group='executor')
+
+    def test_async_pool_cancel(self, setup):
+        """Test cancelling a running coroutine for a task."""
+        svc = ExecutorService()
+        try:
+            pool = svc.get_async_pool('test')
+
+            started = threading.Event()
+
+            async def waiter():
+                started.set()
+                await asyncio.sleep(60)
+
+            task_id = uuid.uuid4()
+            f = pool.submit(task_id, waiter)
+            assert started.wait(10)
+            assert pool.active_threads == 1
+
+            assert svc.cancel_task(task_id) == 1
+            assert f.cancelled()
+        finally:
+            svc.shutdown()
+
+    def test_per_node_cancel(self, setup):
+        """Test cancelled and failed nodes are recorded as failures."""
+        svc = ExecutorService()
+        try:
+            pool = svc.get_async_pool('test')
+
+            started = threading.Event()
+            recorded = threading.Event()
+            task = Mock(action='test')
+            task.failure.side_effect = (
+                lambda **kwargs: task.failure.call_count == 2 and recorded.set())
+
+            action = PerNodeAction(task,
+                                   Mock(executor=svc),
+                                   None,
+                                   started=started)
+            action.nodes = [
+                SimpleNamespace(name=n) for n in ('ok', 'error', 'slow')
+            ]
+
+            task_id = uuid.uuid4()
+            f = pool.submit(task_id, action.start_async)
+            assert started.wait(10)
+
+            assert svc.cancel_task(task_id) == 1
+            assert f.cancelled()
+            assert recorded.wait(10)
+
+            # The cancellation is re-raised once the failures are recorded
+            deadline = time.monotonic() + 10
+            while pool.active_threads and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert pool.active_threads == 0
+
+            failed = [c.kwargs['focus'] for c in task.failure.call_args_list]
+            assert failed == ['error', 'slow']
+            msgs = [
+                c.kwargs['msg'] for c in task.add_status_msg.call_args_list
+            ]
+            assert msgs == [
+                'Error executing test: failed', 'Cancelled executing test'
+            ]
+        finally:
+            svc.shutdown()
@@ -0,0 +1,68 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for preparing the deploy stage of the maasdriver.'''
+from unittest.mock import Mock
+
+from drydock_provisioner.drivers.node.maasdriver.actions.node import DeployNode
+import drydock_provisioner.objects.fields as hd_fields
+
+
+class TestMaasDeployStage():
+
+    def test_prepare_stage(self, mocker):
+        '''Test node statuses are read from one machine listing.'''
+        api_client = mocker.MagicMock()
+        api_client.get.return_value = Mock(status_code=200,
+                                           json=Mock(return_value=[{
+                                               'hostname': 'n1',
+                                               'system_id': 'abc123',
+                                               'status_name': 'Ready'
+                                           }, {
+                                               'hostname': 'n2',
+                                               'system_id': 'def456',
+                                               'status_name': 'Deployed'
+                                           }, {
+                                               'hostname': 'n3',
+                                               'system_id': 'ghi789',
+                                               'status_name': 'Ready'
+                                           }]))
+        tags = mocker.patch(
+            'drydock_provisioner.drivers.node.maasdriver.actions.node.maas_tag.TagReconciler'
+        ).return_value
+        tags.commit.return_value = dict()
+
+        site_design = Mock()
+        orchestrator = Mock()
+        orchestrator.get_effective_site.return_value = (Mock(
+            status=hd_fields.ActionResult.Success), site_design)
+        orchestrator.create_bootaction_contexts.return_value = {
+            'n1': bytes.fromhex('aa')
+        }
+        orchestrator.find_node_package_lists.return_value = dict()
+
+        nodes = [Mock(), Mock()]
+        nodes[0].name = 'n1'
+        nodes[1].name = 'n2'
+
+        stage_data = DeployNode.prepare_stage(Mock(), nodes, orchestrator,
+                                              Mock(), api_client)
+
+        api_client.get.assert_called_once_with('machines/')
+        assert stage_data['site_design'] is site_design
+        assert stage_data['tagged'] == ['n1']
+        assert orchestrator.create_bootaction_contexts.call_args.args[0] == [
+            'n1'
+        ]
+        tags.replace.assert_called_once_with('n1__baid__', 'n1__baid__aa',
+                                             'abc123')
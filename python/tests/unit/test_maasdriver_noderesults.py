@@ -12,6 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 '''Tests for the maasdriver node_results routine.'''
+from unittest.mock import Mock
+
+from drydock_provisioner import objects
+from drydock_provisioner.drivers.node.maasdriver.driver import MaasNodeDriver
+from drydock_provisioner.drivers.node.maasdriver.actions.node import ConfigureHardware
 from drydock_provisioner.drivers.node.maasdriver.models.node_results import NodeResults
 
 
@@ -55,3 +60,84 @@ class TestMaasNodeResults():
         nr = nr_list.singleton({'name': 'hello_world'})
 
         assert nr.get_decoded_data() == b'Hello World!'
+
+    def test_detail_logs_batched(self, mocker, setup):
+        '''Test the results of all nodes of a stage are saved with one query.'''
+
+        class MockedResponse():
+
+            status_code = 200
+
+            def json(self):
+                resp_content = []
+                for i, system_id in enumerate(['n1id', 'n2id', 'n2id']):
+                    resp_content.append({
+                        "id": i,
+                        "data": "SGVsbG8gV29ybGQh",
+                        "result_type": i % 2,
+                        "script_result": 0,
+                        "updated": "2018-07-06T14:32:20.129",
+                        "node": {
+                            "system_id": system_id
+                        },
+                        "name": "hello_world"
+                    })
+
+                return resp_content
+
+        api_client = mocker.MagicMock()
+        api_client.get.return_value = MockedResponse()
+        state_manager = mocker.MagicMock()
+
+        # One action per node, as the driver runs them for a stage
+        actions = []
+        for name in ['n1', 'n2']:
+            node = mocker.MagicMock()
+            node.configure_mock(name=name)
+            machine = mocker.MagicMock(resource_id=name + 'id')
+            action = ConfigureHardware(objects.Task(statemgr=state_manager),
+                                       None,
+                                       state_manager,
+                                       maas_client=api_client)
+            action.finished_machines = [(node, machine)]
+            actions.append(action)
+        mocker.patch(
+            'drydock_provisioner.drivers.node.maasdriver.actions.node.get_internal_api_href',
+            return_value='http://drydock/api/v1.0')
+
+        ConfigureHardware.finish_stage(objects.Task(statemgr=state_manager),
+                                       actions, None, state_manager,
+                                       api_client)
+
+        api_client.get.assert_called_once_with(
+            'commissioning-results/', files={'system_id': ['n1id', 'n2id']})
+        state_manager.post_build_data_list.assert_called_once()
+        build_data = state_manager.post_build_data_list.call_args.args[0]
+        # The deploy result of n2 is not saved
+        assert [bd.node_name for bd in build_data] == ['n1', 'n2']
+        assert [bd.generator for bd in build_data
+                ] == ['commission:hello_world', 'commission:hello_world']
+        # The results of each node are saved to the task of its action
+        assert [bd.task_id for bd in build_data
+                ] == [a.task.task_id for a in actions]
+        for a in actions:
+            assert a.task.result.get_links()
+
+    def test_finish_stage_fallback(self, setup):
+        '''Test the data of each action is saved if the stage save fails.'''
+        driver = MaasNodeDriver(orchestrator=Mock(), state_manager=Mock())
+        task = Mock()
+        actions = [Mock(), Mock(), Mock()]
+        action_class = Mock()
+        action_class.finish_stage.side_effect = [
+            Exception('stage failed'), None,
+            Exception('node failed'), None
+        ]
+
+        driver._finish_stage(task, action_class, actions, Mock())
+
+        assert [c.args[1] for c in action_class.finish_stage.call_args_list
+                ] == [actions, [actions[0]], [actions[1]], [actions[2]]]
+        task.add_status_msg.assert_called_once()
+        assert task.add_status_msg.call_args.kwargs['error']
+        assert 'stage failed' in task.add_status_msg.call_args.kwargs['msg']
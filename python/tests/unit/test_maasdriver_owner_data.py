@@ -0,0 +1,53 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for setting MaaS machine owner data.'''
+from drydock_provisioner.drivers.node.maasdriver.models.machine import Machine
+
+
+class TestMaasOwnerData():
+
+    def test_update_owner_data(self, mocker):
+        '''Test only changed owner data keys are sent in one request.'''
+        api_client = mocker.MagicMock()
+        api_client.post.return_value.status_code = 200
+
+        machine = Machine(api_client,
+                          resource_id='abc123',
+                          owner_data={
+                              'rack': 'rack01',
+                              'role': 'compute',
+                              'old': 'x'
+                          })
+
+        changes = machine.update_owner_data({
+            'rack': 'rack01',
+            'role': 'control',
+            'zone': 1,
+            'old': None,
+            'absent': None
+        })
+
+        assert changes == {'role': 'control', 'zone': 1, 'old': None}
+        api_client.post.assert_called_once_with('machines/abc123/',
+                                                op='set_workload_annotations',
+                                                files=changes)
+        assert machine.owner_data == {
+            'rack': 'rack01',
+            'role': 'control',
+            'zone': '1'
+        }
+
+        api_client.post.reset_mock()
+        assert machine.update_owner_data({'zone': '1'}) == dict()
+        api_client.post.assert_not_called()
@@ -0,0 +1,151 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for planning node storage against a MaaS machine snapshot.'''
+from unittest.mock import Mock
+
+import pytest
+
+from drydock_provisioner.drivers.node.maasdriver.actions.node import ApplyNodeStorage
+from drydock_provisioner.drivers.node.maasdriver.actions.node import StoragePlan
+from drydock_provisioner.drivers.node.maasdriver.models.blockdev import BlockDevice
+from drydock_provisioner.drivers.node.maasdriver.models.blockdev import BlockDevices
+from drydock_provisioner.drivers.node.maasdriver.models.partition import Partition
+from drydock_provisioner.drivers.node.maasdriver.models.partition import Partitions
+from drydock_provisioner.drivers.node.maasdriver.models.volumegroup import VolumeGroup
+from drydock_provisioner.drivers.node.maasdriver.models.volumegroup import VolumeGroups
+
+GB = 1000 * 1000 * 1000
+MB = 1000 * 1000
+
+
+class TestStoragePlan():
+
+    def test_plan_layout(self, node):
+        '''Test the root layout is planned from the node design.'''
+        plan = StoragePlan(node)
+
+        assert plan.layout == {
+            'layout_type': 'flat',
+            'root_device': 'sda',
+            'root_size': 20 * GB,
+            'boot_size': 1 * GB,
+        }
+
+    def test_matches_unchanged(self, node):
+        '''Test an unchanged layout matches without MaaS API calls.'''
+        api_client = Mock()
+        machine = self.machine(api_client)
+
+        assert StoragePlan(node).matches(machine)
+        assert api_client.mock_calls == []
+
+    def test_matches_changed_lv(self, node):
+        '''Test a logical volume of another size does not match.'''
+        machine = self.machine(Mock(), log_lv_size=400 * MB)
+
+        assert not StoragePlan(node).matches(machine)
+
+    def test_matches_extra_partition(self, node):
+        '''Test a partition not in the design does not match.'''
+        machine = self.machine(Mock(), extra_partition=True)
+
+        assert not StoragePlan(node).matches(machine)
+
+    def test_allocate(self, node):
+        '''Test sizes are planned against the tracked free space.'''
+        plan = StoragePlan(node)
+        dev = Mock(resource_id=1, size=100 * GB, available_size=50 * GB)
+
+        assert plan.allocate(dev, '10g') == 10 * GB
+
+        available = 50 * GB - plan._align(10 * GB)
+        reserved = ApplyNodeStorage.PART_TABLE_RESERVATION
+        assert plan.allocate(dev, '>1g') == available - reserved
+
+    def machine(self, api_client, log_lv_size=500 * MB, extra_partition=False):
+        sda = BlockDevice(api_client,
+                          resource_id=1,
+                          name='sda',
+                          type='physical',
+                          size=100 * GB,
+                          available_size=10 * GB)
+        sda.partitions = Partitions(api_client)
+        parts = [
+            Partition(api_client,
+                      resource_id=10,
+                      size=20 * GB,
+                      filesystem={
+                          'fstype': 'ext4',
+                          'mount_point': '/',
+                          'mount_options': 'defaults'
+                      }),
+            Partition(api_client,
+                      resource_id=11,
+                      size=1 * GB,
+                      filesystem={
+                          'fstype': 'ext4',
+                          'mount_point': '/boot',
+                          'mount_options': 'defaults'
+                      }),
+        ]
+        if extra_partition:
+            parts.append(Partition(api_client, resource_id=12, size=1 * GB))
+        sda.partitions.resources = {p.resource_id: p for p in parts}
+
+        sdb = BlockDevice(api_client,
+                          resource_id=2,
+                          name='sdb',
+                          type='physical',
+                          size=100 * GB,
+                          filesystem={'fstype': 'lvm-pv'})
+        sdb.partitions = Partitions(api_client)
+
+        log_lv = BlockDevice(api_client,
+                             resource_id=3,
+                             name='log_vg-log_lv',
+                             type='virtual',
+                             size=log_lv_size,
+                             filesystem={
+                                 'fstype': 'xfs',
+                                 'mount_point': '/var/log',
+                                 'mount_options': 'defaults'
+                             })
+
+        machine = Mock()
+        machine.block_devices = BlockDevices(api_client)
+        machine.block_devices.resources = {
+            d.resource_id: d
+            for d in [sda, sdb, log_lv]
+        }
+        machine.volume_groups = VolumeGroups(api_client)
+        machine.volume_groups.resources = {
+            20:
+            VolumeGroup(api_client,
+                        resource_id=20,
+                        name='log_vg',
+                        logical_volumes={'log_lv': 3})
+        }
+
+        return machine
+
+
+@pytest.fixture()
+def node(input_files, deckhand_orchestrator):
+    input_file = input_files.join("deckhand_fullsite.yaml")
+    design_ref = "file://%s" % str(input_file)
+
+    design_status, design_data = deckhand_orchestrator.get_effective_site(
+        design_ref)
+
+    return design_data.get_baremetal_node('controller01')
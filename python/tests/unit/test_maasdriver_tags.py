@@ -0,0 +1,74 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for the maasdriver tag reconciliation.'''
+from drydock_provisioner.drivers.node.maasdriver.models.tag import TagReconciler
+
+
+class TestMaasTagReconciler():
+
+    def test_reconcile_tags(self, mocker):
+        '''Test tags are replaced with batched deletes and node updates.'''
+
+        class MockedResponse():
+
+            status_code = 200
+            ok = True
+            text = ''
+
+            def __init__(self, content=None):
+                self.content = content
+
+            def json(self):
+                return self.content
+
+        api_client = mocker.MagicMock()
+        api_client.get.return_value = MockedResponse([{
+            'name': 'n1__baid__aa'
+        }, {
+            'name': 'n2__baid__bb'
+        }, {
+            'name': 'n10__baid__cc'
+        }, {
+            'name': 'compute'
+        }])
+        api_client.post.side_effect = (
+            lambda url, **kwargs: MockedResponse(kwargs.get('files')))
+
+        tags = TagReconciler(api_client)
+
+        assert [t.name
+                for t in tags.startswith('n1__baid__')] == ['n1__baid__aa']
+
+        tags.replace('n1__baid__', 'n1__baid__dd', 'abc123')
+        tags.replace('n2__baid__', 'n2__baid__ee', 'def456')
+        tags.apply('compute', ['abc123'])
+        tags.apply('compute', ['def456'])
+
+        assert tags.commit() == dict()
+
+        api_client.get.assert_called_once_with('tags/')
+
+        deleted = sorted(c.args[0] for c in api_client.delete.call_args_list)
+        assert deleted == ['tags/n1__baid__aa/', 'tags/n2__baid__bb/']
+
+        updates = {
+            c.args[0]: c.kwargs['files']
+            for c in api_client.post.call_args_list
+            if c.kwargs.get('op') == 'update_nodes'
+        }
+        assert updates['tags/compute/'] == {'add': ['abc123', 'def456']}
+        assert updates['tags/n1__baid__dd/'] == {'add': ['abc123']}
+        assert len(updates) == 3
+
+        assert tags.startswith('n1__baid__')[0].name == 'n1__baid__dd'
@@ -0,0 +1,149 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the Prometheus metrics and the metrics API."""
+import uuid
+
+from falcon import testing
+import prometheus_client
+import pytest
+
+from drydock_provisioner import metrics
+from drydock_provisioner import policy
+from drydock_provisioner.control.api import start_api
+import drydock_provisioner.objects as objects
+import drydock_provisioner.objects.fields as hd_fields
+
+import falcon
+
+
+def sample(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(object):
+
+    def test_get_metrics(self, falcontest, deckhand_orchestrator):
+        """Test the metrics include the executor pools."""
+        deckhand_orchestrator.executor.get_pool('orchestrator')
+
+        result = falcontest.simulate_get('/metrics')
+
+        assert result.status == falcon.HTTP_200
+        assert result.headers['content-type'].startswith('text/plain')
+        assert 'drydock_task_queue_depth' in result.text
+        assert 'drydock_executor_max_workers{pool="orchestrator"}' in (
+            result.text)
+
+    def test_task_duration(self, setup):
+        """Test finished tasks are recorded by scope."""
+        task = objects.Task(action=hd_fields.OrchestratorAction.DeployNodes)
+        labels = dict(action='deploy_nodes',
+                      scope='action',
+                      result=str(task.result.status))
+        before = sample('drydock_task_duration_seconds_count', **labels)
+
+        task.set_status(hd_fields.TaskStatus.Running)
+        task.set_status(hd_fields.TaskStatus.Complete)
+        # Only the first completion of a run is recorded
+        task.set_status(hd_fields.TaskStatus.Complete)
+
+        assert sample('drydock_task_duration_seconds_count',
+                      **labels) == before + 1
+
+        subtask = objects.Task(action=hd_fields.OrchestratorAction.DeployNode,
+                               parent_task_id=task.task_id,
+                               node_filter={
+                                   'filter_set_type':
+                                   'intersection',
+                                   'filter_set': [{
+                                       'filter_type': 'union',
+                                       'node_names': ['compute01']
+                                   }]
+                               })
+        subtask.set_status(hd_fields.TaskStatus.Running)
+        subtask.set_status(hd_fields.TaskStatus.Complete)
+
+        assert sample('drydock_task_duration_seconds_count',
+                      action='deploy_node',
+                      scope='node',
+                      result=str(subtask.result.status)) >= 1
+        assert prometheus_client.REGISTRY.get_sample_value(
+            'drydock_node_stage_last_duration_seconds', {
+                'node': 'compute01',
+                'action': 'deploy_node'
+            }) is not None
+
+    def test_task_pickup(self, setup):
+        """Test the time a task waited in the queue is recorded."""
+        name = 'drydock_task_pickup_latency_seconds_count'
+        before = sample(name)
+
+        task = objects.Task(action=hd_fields.OrchestratorAction.Noop)
+        task.created = task.created.replace(tzinfo=None)
+        metrics.observe_task_pickup(task)
+
+        assert sample(name) == before + 1
+
+    def test_endpoint_template(self):
+        assert metrics.endpoint_template('version/') == 'version'
+        assert metrics.endpoint_template('machines/4y3h7n/') == (
+            'machines/{id}')
+        assert metrics.endpoint_template(
+            'nodes/4y3h7n/blockdevices/12/partitions/?x=1') == (
+                'nodes/{id}/blockdevices/{id}/partitions')
+
+    def test_external_request(self):
+        """Test requests raising an exception have a status of error."""
+        labels = dict(service='maas',
+                      endpoint='machines',
+                      method='GET',
+                      status='error')
+        before = sample('drydock_external_request_duration_seconds_count',
+                        **labels)
+
+        with pytest.raises(ValueError):
+            with metrics.external_request('maas', 'machines', 'GET') as req:
+                req.status = 200
+                raise ValueError()
+
+        assert sample('drydock_external_request_duration_seconds_count',
+                      **labels) == before + 1
+
+    def test_db_query(self):
+        """Test state manager calls are recorded by method."""
+
+        @metrics.db_query
+        def get_widget(widget_id):
+            return widget_id
+
+        before = sample('drydock_db_query_duration_seconds_count',
+                        method='get_widget')
+        widget_id = uuid.uuid4()
+
+        assert get_widget(widget_id) == widget_id
+        assert get_widget.__name__ == 'get_widget'
+        assert sample('drydock_db_query_duration_seconds_count',
+                      method='get_widget') == before + 1
+
+    @pytest.fixture()
+    def falcontest(self, drydock_state, deckhand_ingester,
+                   deckhand_orchestrator):
+        """Create a test harness for the Falcon API framework."""
+        policy.policy_engine = policy.DrydockPolicy()
+        policy.policy_engine.register_policy()
+
+        return testing.TestClient(
+            start_api(state_manager=drydock_state,
+                      ingester=deckhand_ingester,
+                      orchestrator=deckhand_orchestrator))
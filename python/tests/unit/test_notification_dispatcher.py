@@ -0,0 +1,83 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test sharing a notification listener among waiting threads."""
+import queue
+import threading
+
+from drydock_provisioner.statemgmt.listener import NotificationDispatcher
+
+
+class QueueListener():
+    """Listener returning the payloads put on a queue."""
+
+    def __init__(self):
+        self.conn = object()
+        self.payloads = queue.Queue()
+
+    def wait(self, timeout):
+        try:
+            return [self.payloads.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+
+class TestNotificationDispatcher():
+
+    def test_subscription_wait(self, setup):
+        """Test subscribers are woken by the notifications of their payload."""
+        listener = QueueListener()
+        dispatcher = NotificationDispatcher(lambda: listener,
+                                            poll_interval=0.1)
+
+        with dispatcher.subscribe('task1') as sub:
+            # Notifications of other payloads do not wake the subscriber
+            listener.payloads.put('task2')
+            assert not sub.wait(0.3)
+
+            # A notification sent before waiting is not missed
+            listener.payloads.put('task1')
+            assert sub.wait(5)
+            assert not sub.wait(0.1)
+
+        assert 'task1' not in dispatcher.counts
+
+    def test_shared_listener(self, setup):
+        """Test one listener is shared by all subscribers."""
+        listener = QueueListener()
+        listeners = []
+
+        def listen():
+            listeners.append(listener)
+            return listener
+
+        dispatcher = NotificationDispatcher(listen, poll_interval=0.1)
+
+        subs = [dispatcher.subscribe('task1') for _ in range(3)]
+        woken = []
+        threads = [
+            threading.Thread(target=lambda s=s: woken.append(s.wait(5)))
+            for s in subs
+        ]
+        for t in threads:
+            t.start()
+
+        listener.payloads.put('task1')
+        for t in threads:
+            t.join()
+
+        assert woken == [True, True, True]
+        assert len(listeners) == 1
+
+        for s in subs:
+            s.close()
@@ -0,0 +1,91 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test OOB power actions handle their nodes concurrently."""
+import threading
+from unittest.mock import AsyncMock, Mock
+
+from pyghmi.ipmi.command import Command
+
+from drydock_provisioner.drivers.oob.pyghmi_driver.actions.oob import PowerCycleNode
+from drydock_provisioner.drivers.oob.redfish_driver.actions import oob as redfish_oob
+from drydock_provisioner.orchestrator.executor import ExecutorService
+import drydock_provisioner.error as errors
+
+
+class TestOobPowerActions():
+
+    def test_power_cycle_nodes(self, setup, mocker):
+        """Test a failing node does not stop the power cycle of others."""
+        mocker.patch.object(PowerCycleNode, 'POWER_STATE_POLL_ATTEMPTS', 2)
+        mocker.patch.object(PowerCycleNode, 'POWER_STATE_POLL_INTERVAL', 0)
+
+        nodes = [Mock(), Mock(), Mock()]
+        for name, n in zip(['stuck', 'ok', 'broken'], nodes):
+            n.name = name
+
+        power = dict()
+        lock = threading.Lock()
+
+        def exec_ipmi_command(node, func, *args):
+            if node.name == 'broken':
+                raise errors.DriverError("IPMI command failed.")
+            with lock:
+                if func is Command.set_power:
+                    if node.name != 'stuck':
+                        power[node.name] = args[0]
+                    return None
+                return {'powerstate': power.get(node.name, 'on')}
+
+        svc = ExecutorService()
+        orch = Mock(executor=svc)
+        orch.get_effective_site.return_value = (None, None)
+        orch.process_node_filter.return_value = nodes
+        task = Mock()
+        try:
+            action = PowerCycleNode(task, orch, None, session_pool=Mock())
+            action.exec_ipmi_command = exec_ipmi_command
+            action.start()
+        finally:
+            svc.shutdown()
+
+        task.success.assert_called_once_with(focus='ok')
+        failed = sorted(c.kwargs['focus'] for c in task.failure.mock_calls)
+        assert failed == ['broken', 'stuck']
+
+    def test_redfish_no_session(self, setup):
+        """Test a node without a Redfish session fails explicitly."""
+        node = Mock()
+        node.name = 'n1'
+
+        svc = ExecutorService()
+        orch = Mock(executor=svc)
+        orch.get_target_nodes.return_value = [node]
+        task = Mock()
+        try:
+            for action_class in [
+                    redfish_oob.PowerOffNode, redfish_oob.PowerOnNode,
+                    redfish_oob.PowerCycleNode
+            ]:
+                task.reset_mock()
+                action = action_class(task, orch, None, session_pool=Mock())
+                action.get_redfish_session = AsyncMock(return_value=None)
+                action.exec_redfish_command = AsyncMock()
+                action.start()
+
+                action.exec_redfish_command.assert_not_awaited()
+                task.failure.assert_called_once_with(focus='n1')
+                msgs = [c.kwargs['msg'] for c in task.add_status_msg.mock_calls]
+                assert "Unable to open Redfish session." in msgs
+        finally:
+            svc.shutdown()
@@ -0,0 +1,115 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for scheduling OOB actions by management endpoint.'''
+import concurrent.futures
+import threading
+from unittest.mock import Mock
+
+from drydock_provisioner.drivers.oob.driver import OobDriver
+from drydock_provisioner.drivers.oob.scheduler import OobScheduler
+
+
+class TestOobScheduler():
+
+    def test_interleave(self, setup):
+        '''Test jobs are ordered round robin across endpoints.'''
+        jobs = [(k, e, None)
+                for k, e in [('a1', 'a'), ('a2', 'a'), ('a3', 'a'), ('b1',
+                                                                     'b')]]
+
+        order = [k for k, _, _ in OobScheduler().interleave(jobs)]
+        assert order == ['a1', 'b1', 'a2', 'a3']
+
+    def test_endpoint_limit(self, setup):
+        '''Test the running actions per endpoint are limited.'''
+        scheduler = OobScheduler(max_per_endpoint=2)
+        lock = threading.Lock()
+        running = dict(a=0, b=0)
+        peak = dict(a=0, b=0)
+
+        def job(endpoint):
+            with lock:
+                running[endpoint] += 1
+                peak[endpoint] = max(peak[endpoint], running[endpoint])
+            threading.Event().wait(0.05)
+            with lock:
+                running[endpoint] -= 1
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            jobs = [(i, e, lambda e=e: pool.submit(job, e))
+                    for i, e in enumerate('aaaaaab')]
+            futures = scheduler.schedule(jobs, timeout=10)
+            concurrent.futures.wait(futures.values(), timeout=10)
+
+        assert len(futures) == 7
+        assert peak == dict(a=2, b=1)
+        assert scheduler.active_count('a') == 0
+
+    def test_schedule_timeout(self, setup):
+        '''Test jobs for a busy endpoint are not started after timeout.'''
+        scheduler = OobScheduler(max_per_endpoint=1)
+        blocked = concurrent.futures.Future()
+
+        futures = scheduler.schedule([(1, 'a', lambda: blocked),
+                                      (2, 'a', concurrent.futures.Future),
+                                      (3, None, concurrent.futures.Future)],
+                                     timeout=0.05)
+
+        assert sorted(futures.keys()) == [1, 3]
+
+        blocked.set_result(None)
+        assert scheduler.active_count('a') == 0
+
+    def test_shared_chassis(self, setup):
+        '''Test nodes in one chassis share the chassis' limit.'''
+        driver = OobDriver(orchestrator=Mock(), state_manager=Mock())
+        driver.oob_scheduler = OobScheduler(max_per_endpoint=1)
+
+        nodes = []
+        for name, chassis in [('n1', 'c1'), ('n2', 'c1'), ('n3', None)]:
+            n = Mock(oob_parameters={'network': 'oob', 'chassis': chassis})
+            n.name = name
+            n.get_network_address.return_value = '10.0.0.%s' % name[1]
+            nodes.append(n)
+
+        assert driver.get_oob_endpoint(nodes[0]) == driver.get_oob_endpoint(
+            nodes[1])
+        assert driver.get_oob_endpoint(nodes[2]) == '10.0.0.3'
+
+        lock = threading.Lock()
+        running = []
+        peak = dict()
+
+        def job(n):
+            endpoint = driver.get_oob_endpoint(n)
+            with lock:
+                running.append(endpoint)
+                peak[endpoint] = max(peak.get(endpoint, 0),
+                                     running.count(endpoint))
+            threading.Event().wait(0.05)
+            with lock:
+                running.remove(endpoint)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            driver.submit_action = lambda a: pool.submit(job, a.node)
+            actions = []
+            for n in nodes:
+                a = Mock(node=n)
+                a.task.get_id.return_value.bytes = n.name
+                actions.append((n, a))
+            futures = driver.submit_actions(actions, timeout=10)
+            concurrent.futures.wait(futures.values(), timeout=10)
+
+        assert len(futures) == 3
+        assert peak == {'chassis:c1': 1, '10.0.0.3': 1}
@@ -0,0 +1,91 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for the pool of OOB driver BMC sessions.'''
+from unittest.mock import Mock
+
+import pytest
+
+from drydock_provisioner.drivers.oob.session_pool import SessionPool
+import drydock_provisioner.error as errors
+
+KEY = ('10.0.0.1', 'admin', 'password')
+
+
+class TestSessionPool():
+
+    def test_session_reuse(self, setup):
+        '''Test a released session is reused for the same BMC.'''
+        pool = SessionPool(Mock())
+        connect = Mock(side_effect=lambda: object())
+
+        with pool.session(KEY, connect) as first:
+            pass
+        with pool.session(KEY, connect) as second:
+            pass
+
+        assert first is second
+        assert connect.call_count == 1
+        assert pool.idle_count(KEY) == 1
+
+    def test_session_discard_on_error(self, setup):
+        '''Test a session is closed if it is used by a failing block.'''
+        disconnect = Mock()
+        pool = SessionPool(disconnect)
+
+        with pytest.raises(RuntimeError):
+            with pool.session(KEY, lambda: 'session'):
+                raise RuntimeError()
+
+        disconnect.assert_called_once_with('session')
+        assert pool.idle_count() == 0
+
+    def test_evict_idle(self, setup):
+        '''Test sessions are closed after the idle timeout.'''
+        disconnect = Mock()
+        pool = SessionPool(disconnect, idle_timeout=0.01)
+
+        pool.release(KEY, pool.acquire(KEY, lambda: 'session'))
+        assert pool.idle_count(KEY) == 1
+
+        pool.idle[KEY][0] = ('session', 0)
+        assert pool.evict_idle() == 1
+        disconnect.assert_called_once_with('session')
+        assert pool.idle_count(KEY) == 0
+
+    def test_keepalive_failure(self, setup):
+        '''Test a session failing keepalive is replaced.'''
+        disconnect = Mock()
+        keepalive = Mock(side_effect=RuntimeError())
+        pool = SessionPool(disconnect,
+                           keepalive=keepalive,
+                           keepalive_interval=0)
+        sessions = iter(['stale', 'fresh'])
+
+        pool.release(KEY, pool.acquire(KEY, lambda: next(sessions)))
+        session = pool.acquire(KEY, lambda: next(sessions))
+
+        assert session == 'fresh'
+        keepalive.assert_called_once_with('stale')
+        disconnect.assert_called_once_with('stale')
+
+    def test_session_limit(self, setup):
+        '''Test acquiring a session to a BMC at its limit times out.'''
+        pool = SessionPool(Mock(), max_sessions=1, wait_timeout=0.01)
+
+        pool.acquire(KEY, lambda: 'session')
+        with pytest.raises(errors.DriverError):
+            pool.acquire(KEY, lambda: 'session')
+
+        # Other BMCs are not limited
+        assert pool.acquire(('10.0.0.2', ), lambda: 'other') == 'other'
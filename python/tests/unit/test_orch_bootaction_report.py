@@ -0,0 +1,116 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests collecting boot action signals for a set of nodes.'''
+from unittest.mock import Mock
+
+import pytest
+
+from drydock_provisioner import objects
+import drydock_provisioner.objects.fields as hd_fields
+from drydock_provisioner.orchestrator.actions.orchestrator import BootactionReport
+
+
+class TestBootactionReport():
+
+    def test_report_waits_for_last_signal(self, setup, state_manager,
+                                          orchestrator):
+        '''The report finishes once the last node signals.'''
+        state_manager.get_boot_action_counts.side_effect = [
+            {
+                'n1': {
+                    hd_fields.ActionResult.Incomplete: 1
+                },
+                'n2': {
+                    hd_fields.ActionResult.Incomplete: 2
+                },
+            },
+            {
+                'n1': {
+                    hd_fields.ActionResult.Success: 1
+                },
+                'n2': {
+                    hd_fields.ActionResult.Success: 2
+                },
+            },
+        ]
+        state_manager.get_boot_actions_for_nodes.return_value = {
+            'n1': self.boot_actions(hd_fields.ActionResult.Success),
+            'n2': self.boot_actions(hd_fields.ActionResult.Success),
+        }
+
+        task = objects.Task(statemgr=state_manager)
+        action = BootactionReport(task, orchestrator, state_manager)
+        action.start()
+
+        assert state_manager.get_boot_action_counts.call_count == 2
+        state_manager.get_boot_action_counts.assert_called_with(['n1', 'n2'])
+        state_manager.listener.wait.assert_called_once()
+        state_manager.listener.close.assert_called_once()
+        state_manager.get_boot_actions_for_nodes.assert_called_once_with(
+            ['n1', 'n2'])
+        assert sorted(task.result.successes) == ['n1', 'n2']
+
+    def test_report_each_node(self, setup, state_manager, orchestrator):
+        '''Every node's boot actions are reported.'''
+        state_manager.get_boot_action_counts.return_value = {
+            'n1': {
+                hd_fields.ActionResult.Failure: 1
+            },
+            'n2': {
+                hd_fields.ActionResult.Success: 1
+            },
+        }
+        state_manager.get_boot_actions_for_nodes.return_value = {
+            'n1': self.boot_actions(hd_fields.ActionResult.Failure),
+            'n2': self.boot_actions(hd_fields.ActionResult.Success),
+        }
+
+        task = objects.Task(statemgr=state_manager)
+        action = BootactionReport(task, orchestrator, state_manager)
+        action.start()
+
+        state_manager.listener.wait.assert_not_called()
+        assert task.result.failures == ['n1']
+        assert task.result.successes == ['n2']
+
+    def boot_actions(self, action_status):
+        return {
+            'helloworld':
+            dict(action_name='helloworld', action_status=action_status)
+        }
+
+
+@pytest.fixture()
+def state_manager():
+    state_manager = Mock()
+    state_manager.put_task.return_value = dict(status=None,
+                                               terminate=False,
+                                               terminated=None,
+                                               terminated_by=None)
+    state_manager.listener = Mock()
+    state_manager.listen_boot_action_status.return_value = (
+        state_manager.listener)
+    return state_manager
+
+
+@pytest.fixture()
+def orchestrator():
+    orchestrator = Mock()
+    nodes = []
+    for name in ['n1', 'n2']:
+        n = Mock()
+        n.get_id.return_value = name
+        nodes.append(n)
+    orchestrator.get_target_nodes.return_value = nodes
+    return orchestrator
@@ -15,6 +15,7 @@
 
 from drydock_provisioner.statemgmt.state import DrydockState
 import drydock_provisioner.objects as objects
+from drydock_provisioner.orchestrator.design_cache import NodeIndex
 
 
 class TestClass(object):
@@ -155,3 +156,42 @@ class TestClass(object):
             None, design_data)
 
         assert node_list == []
+
+    def test_node_filter_index(self, input_files, setup,
+                               deckhand_orchestrator):
+        """Test filtering with a node index matches scanning the nodes."""
+        input_file = input_files.join("deckhand_fullsite.yaml")
+
+        design_ref = "file://%s" % str(input_file)
+
+        design_status, design_data = deckhand_orchestrator.get_effective_site(
+            design_ref)
+
+        node_index = NodeIndex(design_data.baremetal_nodes)
+
+        filters = [
+            {
+                'filter_type': 'intersection',
+                'node_names': ['compute01', 'controller01'],
+                'node_tags': ['test'],
+            },
+            {
+                'filter_type': 'union',
+                'rack_names': ['rack2', 'rack3'],
+                'node_labels': {
+                    'foo': 'baz'
+                },
+            },
+        ]
+
+        for set_type in ['union', 'intersection']:
+            nfs = {'filter_set_type': set_type, 'filter_set': filters}
+
+            scanned = deckhand_orchestrator.process_node_filter(
+                nfs, design_data)
+            indexed = deckhand_orchestrator.process_node_filter(
+                nfs, design_data, node_index=node_index)
+
+            assert scanned
+            assert sorted(n.name for n in indexed) == sorted(
+                n.name for n in scanned)
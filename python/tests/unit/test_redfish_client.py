@@ -0,0 +1,141 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests for caching the Redfish system resource per BMC.'''
+from unittest.mock import Mock
+
+import pytest
+
+from drydock_provisioner.drivers.oob.redfish_driver import client
+from drydock_provisioner.drivers.oob.redfish_driver.client import RedfishException
+from drydock_provisioner.drivers.oob.redfish_driver.client import RedfishSession
+
+SYSTEMS = {
+    'Members@odata.count': 1,
+    'Members': [{
+        '@odata.id': '/redfish/v1/Systems/1'
+    }],
+}
+
+SYSTEM = {
+    'PowerState': 'Off',
+    'Boot': {
+        'BootSourceOverrideTarget': 'Pxe',
+        'BootSourceOverrideTarget@Redfish.AllowableValues': ['Pxe', 'Hdd'],
+    },
+    'Actions': {
+        '#ComputerSystem.Reset': {
+            'target': '/redfish/v1/Systems/1/Actions/Reset',
+            'ResetType@Redfish.AllowableValues': ['On', 'ForceOff'],
+        }
+    },
+}
+
+
+class TestRedfishSession():
+
+    def test_system_cached_per_bmc(self, rf_client):
+        '''Test the system resource URI is looked up once per BMC.'''
+        session = RedfishSession('10.0.0.1', 'admin', 'password')
+
+        assert session.get_power() == {'powerstate': 'Off'}
+        assert session.get_power() == {'powerstate': 'Off'}
+
+        other = RedfishSession('10.0.0.1', 'admin', 'password')
+        assert other.get_bootdev() == {'bootdev': 'Pxe'}
+
+        paths = [self.path(c) for c in rf_client.get.call_args_list]
+        assert paths == ['/redfish/v1/Systems'] + ['/redfish/v1/Systems/1'] * 3
+
+    def test_set_power_single_request(self, rf_client):
+        '''Test a power change is a single request with cached actions.'''
+        session = RedfishSession('10.0.0.1', 'admin', 'password')
+        session.get_power()
+        rf_client.get.reset_mock()
+
+        assert session.set_power('On') == {'powerstate': 'On'}
+
+        rf_client.get.assert_not_called()
+        rf_client.post.assert_called_once_with(
+            path='/redfish/v1/Systems/1/Actions/Reset',
+            body={'ResetType': 'On'})
+
+        with pytest.raises(RedfishException):
+            session.set_power('GracefulRestart')
+
+    def test_invalidate_on_error(self, rf_client):
+        '''Test a failed request drops the cached system resource.'''
+        session = RedfishSession('10.0.0.1', 'admin', 'password')
+        session.get_power()
+
+        rf_client.get.side_effect = lambda path: Mock(status=404, _read='')
+        with pytest.raises(RedfishException):
+            session.get_power()
+
+        assert session.system is None
+        assert ('https://10.0.0.1', 'admin') not in RedfishSession.system_cache
+
+    def test_system_cached_per_account(self, rf_client):
+        '''Test sessions with other accounts do not share the cache.'''
+        RedfishSession('10.0.0.1', 'admin', 'password').get_power()
+        RedfishSession('10.0.0.1', 'operator', 'password').get_power()
+
+        paths = [self.path(c) for c in rf_client.get.call_args_list]
+        assert paths.count('/redfish/v1/Systems') == 2
+
+    def test_reread_unsupported_action(self, rf_client, mocker):
+        '''Test the system is read again before rejecting an action.'''
+        session = RedfishSession('10.0.0.1', 'admin', 'password')
+        session.get_power()
+        rf_client.get.reset_mock()
+
+        # The BMC firmware now allows graceful restarts
+        system = dict(SYSTEM)
+        system['Actions'] = {
+            '#ComputerSystem.Reset': {
+                'target': '/redfish/v1/Systems/1/Actions/Reset',
+                'ResetType@Redfish.AllowableValues':
+                ['On', 'ForceOff', 'GracefulRestart'],
+            }
+        }
+        mocker.patch.dict(SYSTEM, system)
+
+        assert session.set_power('GracefulRestart') == {
+            'powerstate': 'GracefulRestart'
+        }
+        paths = [self.path(c) for c in rf_client.get.call_args_list]
+        assert paths == ['/redfish/v1/Systems', '/redfish/v1/Systems/1']
+
+        with pytest.raises(RedfishException):
+            session.set_bootdev('Cd')
+
+    def path(self, call):
+        return call.kwargs.get('path', call.args[0] if call.args else None)
+
+
+@pytest.fixture()
+def rf_client(mocker):
+    '''Mock the Redfish client used by RedfishSession.'''
+    mocker.patch.object(RedfishSession, 'system_cache', dict())
+
+    def get(path):
+        if path == '/redfish/v1/Systems':
+            return Mock(status=200, dict=SYSTEMS)
+        return Mock(status=200, dict=SYSTEM)
+
+    rf_client = Mock()
+    rf_client.get.side_effect = get
+    rf_client.post.return_value = Mock(status=204)
+    mocker.patch.object(client, 'redfish_client', return_value=rf_client)
+
+    return rf_client
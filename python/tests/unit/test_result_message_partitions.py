@@ -0,0 +1,64 @@
+# Copyright 2018 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test creating the monthly partitions of result_message."""
+import datetime
+from unittest.mock import MagicMock
+
+from drydock_provisioner.statemgmt.db import partitions
+
+
+class TestResultMessagePartitions():
+
+    def test_create_partitions(self):
+        """Test rows in the default partition are moved to a new partition."""
+        conn = MagicMock()
+        statements = []
+
+        def execute(query, **kwargs):
+            text = str(query)
+            statements.append(text)
+            result = MagicMock()
+            if text.startswith('SELECT to_regclass'):
+                # Only the first month exists
+                result.scalar.return_value = (
+                    'exists' if kwargs['name'].endswith('202601') else None)
+            elif text.startswith('SELECT 1 FROM result_message_default'):
+                # Only the second month has rows in the default partition
+                result.first.return_value = (
+                    (1, ) if kwargs['month'].month == 2 else None)
+            return result
+
+        conn.execute.side_effect = execute
+
+        created = partitions.create_partitions(conn,
+                                               datetime.date(2026, 1, 15), 3)
+
+        assert created == ['result_message_p202602', 'result_message_p202603']
+        ddl = [
+            s for s in statements
+            if not s.startswith('SELECT') and not s.startswith('WITH')
+        ]
+        assert ddl == [
+            "CREATE TABLE result_message_p202602 (LIKE result_message "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            "ALTER TABLE result_message ATTACH PARTITION "
+            "result_message_p202602 "
+            "FOR VALUES FROM ('2026-02-01') TO ('2026-03-01')",
+            "CREATE TABLE result_message_p202603 PARTITION OF result_message "
+            "FOR VALUES FROM ('2026-03-01') TO ('2026-04-01')",
+        ]
+        moves = [s for s in statements if s.startswith('WITH')]
+        assert len(moves) == 1
+        assert 'DELETE FROM result_message_default' in moves[0]
+        assert 'INSERT INTO result_message_p202602' in moves[0]
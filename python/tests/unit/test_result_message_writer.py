@@ -0,0 +1,104 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test write-behind batching of task result messages."""
+import pytest
+import time
+import uuid
+from unittest.mock import MagicMock
+
+from drydock_provisioner import objects
+from drydock_provisioner.statemgmt.message_writer import ResultMessageWriter
+
+
+class TestResultMessageWriter():
+
+    def test_flush_on_size(self, setup, mock_engine):
+        """Test messages are written in one batch once batch_size is hit."""
+        writer = ResultMessageWriter(mock_engine,
+                                     MagicMock(),
+                                     batch_size=3,
+                                     flush_interval=60)
+        task_id = uuid.uuid4()
+        try:
+            for i in range(2):
+                writer.post(task_id, self.msg(i))
+            assert mock_engine.rows == []
+
+            writer.post(task_id, self.msg(2))
+            assert len(mock_engine.batches) == 1
+            assert [r['message']
+                    for r in mock_engine.rows] == ['msg 0', 'msg 1', 'msg 2']
+            assert writer.pending_count() == 0
+        finally:
+            writer.stop()
+
+    def test_flush_on_interval(self, setup, mock_engine):
+        """Test buffered messages are written by the background thread."""
+        writer = ResultMessageWriter(mock_engine,
+                                     MagicMock(),
+                                     batch_size=100,
+                                     flush_interval=0.05)
+        try:
+            writer.post(uuid.uuid4(), self.msg(0))
+
+            deadline = time.monotonic() + 10
+            while not mock_engine.rows and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+            assert len(mock_engine.rows) == 1
+        finally:
+            writer.stop()
+
+    def test_failed_flush_retained(self, setup, mock_engine):
+        """Test messages are kept in order when a write fails."""
+        writer = ResultMessageWriter(mock_engine,
+                                     MagicMock(),
+                                     batch_size=100,
+                                     flush_interval=60)
+        task_id = uuid.uuid4()
+        try:
+            writer.post(task_id, self.msg(0))
+            mock_engine.fail = True
+            assert not writer.flush()
+            assert writer.pending_count() == 1
+
+            writer.post(task_id, self.msg(1))
+            mock_engine.fail = False
+            assert writer.flush()
+            assert [r['message']
+                    for r in mock_engine.rows] == ['msg 0', 'msg 1']
+        finally:
+            writer.stop()
+
+    def msg(self, i):
+        return objects.TaskStatusMessage('msg %d' % i, False, 'node', 'n1')
+
+
+@pytest.fixture()
+def mock_engine():
+    engine = MagicMock()
+    engine.fail = False
+    engine.batches = []
+    engine.rows = []
+
+    def execute(query, rows):
+        if engine.fail:
+            raise Exception("Database unavailable")
+        engine.batches.append(rows)
+        engine.rows.extend(rows)
+
+    conn = engine.connect.return_value.__enter__.return_value
+    conn.execute.side_effect = execute
+
+    return engine
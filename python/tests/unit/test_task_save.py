@@ -0,0 +1,84 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Tests saving a task's state.'''
+from unittest.mock import Mock
+
+import pytest
+
+from drydock_provisioner import objects
+import drydock_provisioner.error as errors
+import drydock_provisioner.objects.fields as hd_fields
+
+
+class TestTaskSave():
+
+    def test_save_changed_columns(self, statemgr):
+        '''Only columns changed since the last save are written.'''
+        task = objects.Task(action=hd_fields.OrchestratorAction.DeployNodes,
+                            statemgr=statemgr)
+
+        task.save()
+        columns = statemgr.put_task.call_args.kwargs['columns']
+        assert 'action' in columns
+        assert 'status' in columns
+
+        task.set_status(hd_fields.TaskStatus.Running)
+        task.result.add_failure('n1')
+        task.save()
+        columns = statemgr.put_task.call_args.kwargs['columns']
+        assert set(columns.keys()) == set(
+            ['status', 'result_failures', 'updated'])
+
+        statemgr.get_task.assert_not_called()
+
+    def test_save_merges_termination(self, statemgr):
+        '''A termination stored by another process is merged on save.'''
+        task = objects.Task(action=hd_fields.OrchestratorAction.DeployNodes,
+                            statemgr=statemgr)
+        task.set_status(hd_fields.TaskStatus.Running)
+        statemgr.stored['terminate'] = True
+        statemgr.stored['terminated_by'] = 'Test'
+
+        task.save()
+
+        assert task.check_terminate()
+        assert task.terminated_by == 'Test'
+
+    def test_save_failed(self, statemgr):
+        '''A failed update raises an error.'''
+        task = objects.Task(action=hd_fields.OrchestratorAction.DeployNodes,
+                            statemgr=statemgr)
+        statemgr.put_task.side_effect = None
+        statemgr.put_task.return_value = None
+
+        with pytest.raises(errors.OrchestratorError):
+            task.save()
+
+
+@pytest.fixture()
+def statemgr():
+    statemgr = Mock()
+    statemgr.stored = dict(status=None,
+                           terminate=False,
+                           terminated=None,
+                           terminated_by=None)
+
+    def put_task(task, columns=None):
+        if 'status' in columns:
+            statemgr.stored['status'] = columns['status']
+        return dict(statemgr.stored)
+
+    statemgr.put_task.side_effect = put_task
+
+    return statemgr